@@ -0,0 +1,36 @@
+"""add audit checkpoint table
+
+Revision ID: add_audit_checkpoint
+Revises: add_user_update_pref
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "add_audit_checkpoint"
+down_revision = "add_user_update_pref"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_checkpoint",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("last_thread_pk", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cycle", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cycle_started_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_audit_checkpoint_name", "audit_checkpoint", ["name"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_checkpoint_name", table_name="audit_checkpoint")
+    op.drop_table("audit_checkpoint")
@@ -0,0 +1,148 @@
+"""add materialized channel tag statistics
+
+Revision ID: add_channel_tag_stat
+Revises: add_thread_backfill
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "add_channel_tag_stat"
+down_revision = "add_thread_backfill"
+branch_labels = None
+depends_on = None
+
+# 与 shared/database.py 中的 TAG_STAT_TRIGGERS 保持一致
+TAG_STAT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_insert_stat
+    AFTER INSERT ON threadtaglink BEGIN
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT t.guild_id, t.channel_id, new.tag_id, 1 FROM thread t
+        WHERE t.id = new.thread_id AND t.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_delete_stat
+    AFTER DELETE ON threadtaglink BEGIN
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE tag_id = old.tag_id AND (guild_id, channel_id) = (
+            SELECT guild_id, channel_id FROM thread
+            WHERE id = old.thread_id AND not_found_count = 0
+        );
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_update_stat
+    AFTER UPDATE OF thread_id, tag_id ON threadtaglink BEGIN
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE tag_id = old.tag_id AND (guild_id, channel_id) = (
+            SELECT guild_id, channel_id FROM thread
+            WHERE id = old.thread_id AND not_found_count = 0
+        );
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT t.guild_id, t.channel_id, new.tag_id, 1 FROM thread t
+        WHERE t.id = new.thread_id AND t.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_insert_stat
+    AFTER INSERT ON thread WHEN new.not_found_count = 0 BEGIN
+        INSERT INTO channel_thread_stat(guild_id, channel_id, thread_count)
+        VALUES (new.guild_id, new.channel_id, 1)
+        ON CONFLICT(guild_id, channel_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_delete_stat
+    AFTER DELETE ON thread WHEN old.not_found_count = 0 BEGIN
+        UPDATE channel_thread_stat SET thread_count = thread_count - 1
+        WHERE guild_id = old.guild_id AND channel_id = old.channel_id;
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE guild_id = old.guild_id AND channel_id = old.channel_id
+            AND tag_id IN (SELECT tag_id FROM threadtaglink WHERE thread_id = old.id);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_update_stat
+    AFTER UPDATE OF not_found_count, guild_id, channel_id ON thread
+    WHEN (old.not_found_count = 0) IS NOT (new.not_found_count = 0)
+        OR old.guild_id IS NOT new.guild_id
+        OR old.channel_id IS NOT new.channel_id
+    BEGIN
+        UPDATE channel_thread_stat SET thread_count = thread_count - 1
+        WHERE old.not_found_count = 0
+            AND guild_id = old.guild_id AND channel_id = old.channel_id;
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE old.not_found_count = 0
+            AND guild_id = old.guild_id AND channel_id = old.channel_id
+            AND tag_id IN (SELECT tag_id FROM threadtaglink WHERE thread_id = old.id);
+        INSERT INTO channel_thread_stat(guild_id, channel_id, thread_count)
+        SELECT new.guild_id, new.channel_id, 1 WHERE new.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id) DO UPDATE SET thread_count = thread_count + 1;
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT new.guild_id, new.channel_id, tag_id, 1 FROM threadtaglink
+        WHERE thread_id = new.id AND new.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+]
+
+TRIGGER_NAMES = [
+    "threadtaglink_after_insert_stat",
+    "threadtaglink_after_delete_stat",
+    "threadtaglink_after_update_stat",
+    "thread_after_insert_stat",
+    "thread_after_delete_stat",
+    "thread_after_update_stat",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_tag_stat",
+        sa.Column("guild_id", sa.BigInteger(), nullable=False),
+        sa.Column("channel_id", sa.BigInteger(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column("thread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("guild_id", "channel_id", "tag_id"),
+    )
+    op.create_table(
+        "channel_thread_stat",
+        sa.Column("guild_id", sa.BigInteger(), nullable=False),
+        sa.Column("channel_id", sa.BigInteger(), nullable=False),
+        sa.Column("thread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("guild_id", "channel_id"),
+    )
+
+    # 用现有数据初始化统计表，之后由触发器增量维护
+    op.execute(
+        """
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT t.guild_id, t.channel_id, l.tag_id, COUNT(*)
+        FROM threadtaglink l JOIN thread t ON t.id = l.thread_id
+        WHERE t.not_found_count = 0
+        GROUP BY t.guild_id, t.channel_id, l.tag_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO channel_thread_stat(guild_id, channel_id, thread_count)
+        SELECT guild_id, channel_id, COUNT(*) FROM thread
+        WHERE not_found_count = 0
+        GROUP BY guild_id, channel_id
+        """
+    )
+    for trigger in TAG_STAT_TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    for name in TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name};")
+    op.drop_table("channel_thread_stat")
+    op.drop_table("channel_tag_stat")
@@ -0,0 +1,136 @@
+"""materialize per-user unread counts for thread follows
+
+Revision ID: add_follow_unread_stat
+Revises: add_tag_vote_triggers
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "add_follow_unread_stat"
+down_revision = "add_tag_vote_triggers"
+branch_labels = None
+depends_on = None
+
+# 与 shared/database.py 中的 FOLLOW_UNREAD_TRIGGERS 保持一致
+FOLLOW_UNREAD_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_insert_unread
+    AFTER INSERT ON thread_follow BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT new.user_id, 1 FROM thread t
+        WHERE t.thread_id = new.thread_id AND t.latest_update_at IS NOT NULL
+            AND (new.last_viewed_at IS NULL OR t.latest_update_at > new.last_viewed_at)
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_delete_unread
+    AFTER DELETE ON thread_follow BEGIN
+        UPDATE follow_unread_stat SET unread_count = unread_count - 1
+        WHERE user_id = old.user_id AND EXISTS (
+            SELECT 1 FROM thread t
+            WHERE t.thread_id = old.thread_id AND t.latest_update_at IS NOT NULL
+                AND (old.last_viewed_at IS NULL OR t.latest_update_at > old.last_viewed_at)
+        );
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_update_unread
+    AFTER UPDATE OF user_id, thread_id, last_viewed_at ON thread_follow BEGIN
+        UPDATE follow_unread_stat SET unread_count = unread_count - 1
+        WHERE user_id = old.user_id AND EXISTS (
+            SELECT 1 FROM thread t
+            WHERE t.thread_id = old.thread_id AND t.latest_update_at IS NOT NULL
+                AND (old.last_viewed_at IS NULL OR t.latest_update_at > old.last_viewed_at)
+        );
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT new.user_id, 1 FROM thread t
+        WHERE t.thread_id = new.thread_id AND t.latest_update_at IS NOT NULL
+            AND (new.last_viewed_at IS NULL OR t.latest_update_at > new.last_viewed_at)
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_insert_unread
+    AFTER INSERT ON thread WHEN new.latest_update_at IS NOT NULL BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT f.user_id, COUNT(*) FROM thread_follow f
+        WHERE f.thread_id = new.thread_id
+            AND (f.last_viewed_at IS NULL OR new.latest_update_at > f.last_viewed_at)
+        GROUP BY f.user_id
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_delete_unread
+    AFTER DELETE ON thread WHEN old.latest_update_at IS NOT NULL BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT f.user_id, -COUNT(*) FROM thread_follow f
+        WHERE f.thread_id = old.thread_id
+            AND (f.last_viewed_at IS NULL OR old.latest_update_at > f.last_viewed_at)
+        GROUP BY f.user_id
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_update_unread
+    AFTER UPDATE OF latest_update_at, thread_id ON thread
+    WHEN old.latest_update_at IS NOT new.latest_update_at OR old.thread_id IS NOT new.thread_id
+    BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT user_id, SUM(delta) FROM (
+            SELECT f.user_id, -1 AS delta FROM thread_follow f
+            WHERE f.thread_id = old.thread_id AND old.latest_update_at IS NOT NULL
+                AND (f.last_viewed_at IS NULL OR old.latest_update_at > f.last_viewed_at)
+            UNION ALL
+            SELECT f.user_id, 1 FROM thread_follow f
+            WHERE f.thread_id = new.thread_id AND new.latest_update_at IS NOT NULL
+                AND (f.last_viewed_at IS NULL OR new.latest_update_at > f.last_viewed_at)
+        )
+        WHERE true
+        GROUP BY user_id HAVING SUM(delta) != 0
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+]
+
+TRIGGER_NAMES = [
+    "thread_follow_after_insert_unread",
+    "thread_follow_after_delete_unread",
+    "thread_follow_after_update_unread",
+    "thread_after_insert_unread",
+    "thread_after_delete_unread",
+    "thread_after_update_unread",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "follow_unread_stat",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # 用现有数据初始化未读数，之后由触发器增量维护
+    op.execute(
+        """
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT f.user_id, COUNT(*)
+        FROM thread_follow f JOIN thread t ON t.thread_id = f.thread_id
+        WHERE t.latest_update_at IS NOT NULL
+            AND (f.last_viewed_at IS NULL OR t.latest_update_at > f.last_viewed_at)
+        GROUP BY f.user_id
+        """
+    )
+    for trigger in FOLLOW_UNREAD_TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    for name in TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name};")
+    op.drop_table("follow_unread_stat")
@@ -0,0 +1,77 @@
+"""maintain tag vote tallies with triggers
+
+Revision ID: add_tag_vote_triggers
+Revises: add_channel_tag_stat
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "add_tag_vote_triggers"
+down_revision = "add_channel_tag_stat"
+branch_labels = None
+depends_on = None
+
+# 与 shared/database.py 中的 TAG_VOTE_TRIGGERS 保持一致
+TAG_VOTE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_insert_tally
+    AFTER INSERT ON tag_vote WHEN new.vote != 0 BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes + (new.vote = 1), downvotes = downvotes + (new.vote = -1)
+        WHERE thread_id = new.thread_id AND tag_id = new.tag_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_update_tally
+    AFTER UPDATE OF vote ON tag_vote WHEN old.vote IS NOT new.vote BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes + (new.vote = 1) - (old.vote = 1),
+            downvotes = downvotes + (new.vote = -1) - (old.vote = -1)
+        WHERE thread_id = new.thread_id AND tag_id = new.tag_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_delete_tally
+    AFTER DELETE ON tag_vote WHEN old.vote != 0 BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes - (old.vote = 1), downvotes = downvotes - (old.vote = -1)
+        WHERE thread_id = old.thread_id AND tag_id = old.tag_id;
+    END;
+    """,
+]
+
+TRIGGER_NAMES = [
+    "tag_vote_after_insert_tally",
+    "tag_vote_after_update_tally",
+    "tag_vote_after_delete_tally",
+]
+
+
+def upgrade() -> None:
+    # 以 tag_vote 为准校正一次现有的计数，之后由触发器增量维护
+    op.execute(
+        """
+        UPDATE threadtaglink SET
+            upvotes = (
+                SELECT COUNT(*) FROM tag_vote v
+                WHERE v.thread_id = threadtaglink.thread_id
+                    AND v.tag_id = threadtaglink.tag_id AND v.vote = 1
+            ),
+            downvotes = (
+                SELECT COUNT(*) FROM tag_vote v
+                WHERE v.thread_id = threadtaglink.thread_id
+                    AND v.tag_id = threadtaglink.tag_id AND v.vote = -1
+            )
+        """
+    )
+    for trigger in TAG_VOTE_TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    for name in TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name};")
+    # 旧代码取消投票时直接删除记录
+    op.execute("DELETE FROM tag_vote WHERE vote = 0")
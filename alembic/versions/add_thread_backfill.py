@@ -0,0 +1,38 @@
+"""add thread backfill queue table
+
+Revision ID: add_thread_backfill
+Revises: add_thread_sync_fingerprint
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "add_thread_backfill"
+down_revision = "add_thread_sync_fingerprint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "thread_backfill",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("thread_id", sa.BigInteger(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False, server_default=""),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("enqueued_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_thread_backfill_thread_id",
+        "thread_backfill",
+        ["thread_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_thread_backfill_thread_id", table_name="thread_backfill")
+    op.drop_table("thread_backfill")
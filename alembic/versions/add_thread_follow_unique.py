@@ -0,0 +1,51 @@
+"""enforce unique (user_id, thread_id) on thread_follow
+
+Revision ID: add_thread_follow_unique
+Revises: add_follow_unread_stat
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "add_thread_follow_unique"
+down_revision = "add_follow_unread_stat"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 由 create_all 建出的库没有该唯一索引，可能存在重复的关注记录。
+    # 先合并重复记录：保留 id 最小的一条，最后查看时间取组内最大值
+    op.execute(
+        """
+        UPDATE thread_follow
+        SET last_viewed_at = (
+            SELECT MAX(f.last_viewed_at) FROM thread_follow f
+            WHERE f.user_id = thread_follow.user_id AND f.thread_id = thread_follow.thread_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM thread_follow
+            GROUP BY user_id, thread_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM thread_follow
+        WHERE id NOT IN (SELECT MIN(id) FROM thread_follow GROUP BY user_id, thread_id)
+        """
+    )
+
+    # 批量关注依赖该唯一索引执行 INSERT ... ON CONFLICT DO NOTHING
+    op.execute("DROP INDEX IF EXISTS ix_thread_follow_user_thread")
+    op.execute(
+        "CREATE UNIQUE INDEX ix_thread_follow_user_thread "
+        "ON thread_follow (user_id, thread_id)"
+    )
+
+
+def downgrade() -> None:
+    # add_thread_follow_and_update_fields 中该索引本就是唯一索引，保留即可；
+    # 被合并删除的重复记录无法恢复
+    pass
@@ -0,0 +1,27 @@
+"""add thread sync fingerprint column
+
+Revision ID: add_thread_sync_fingerprint
+Revises: add_index_checkpoint
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "add_thread_sync_fingerprint"
+down_revision = "add_index_checkpoint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("thread", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("sync_fingerprint", sa.String(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("thread", schema=None) as batch_op:
+        batch_op.drop_column("sync_fingerprint")
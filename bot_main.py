@@ -21,9 +21,16 @@ from shared.database import AsyncSessionFactory, init_db, close_db
 from shared.redis_client import RedisManager
 from ThreadManager.cog import ThreadManager
 from core.tag_cache_service import TagCacheService
+from core.tag_vote_service import TagVoteService
+from core.mutex_tag_matcher import MutexTagMatcher
 from core.cache_service import CacheService
 from core.sync_service import SyncService
 from core.impression_cache_service import ImpressionCacheService
+from core.author_cache_service import AuthorCacheService
+from core.thread_backfill_queue import ThreadBackfillQueue
+from core.follow_unread_reconciler import FollowUnreadReconciler
+from core.follow_unread_repository import FollowUnreadRepository
+from core.tag_stat_repository import TagStatRepository
 from indexer.cog import Indexer
 from search.cog import Search
 from preferences.cog import Preferences
@@ -33,7 +40,12 @@ from banner.cog import BannerManagement
 from core.config_repository import ConfigRepository
 from collection.cog import CollectionCog
 from update_detector.cog import UpdateDetector
-from shared.api_scheduler import APIScheduler
+from shared.api_scheduler import (
+    APIScheduler,
+    parse_queue_config,
+    parse_rate_limit_config,
+)
+from shared.rate_limit_monitor import RateLimitMonitor
 from shared.enum.search_config_type import SearchConfigDefaults, SearchConfigDefaultsInt
 from api.v1.routers import (
     preferences as preferences_api,
@@ -44,6 +56,8 @@ from api.v1.routers import (
     tags as tags_api,
     discovery as discovery_api,
     booklists as booklists_api,
+    admin as admin_api,
+    follows as follows_api,
 )
 from api.main import app as fastapi_app
 from api.v1.dependencies.security import initialize_api_security
@@ -63,15 +77,32 @@ class MyBot(commands.Bot):
         self.config = config
         self.db_url = config["db_url"]
         self.tag_cache_service: TagCacheService
+        self.tag_vote_service: TagVoteService
+        self.mutex_tag_matcher: MutexTagMatcher
         self.cache_service: CacheService
         self.sync_service: SyncService
         self.impression_cache_service: ImpressionCacheService
+        self.author_cache_service: AuthorCacheService
+        self.backfill_queue: ThreadBackfillQueue
 
         # 从配置初始化API调度器
-        concurrency = self.config.get("performance", {}).get(
-            "api_scheduler_concurrency", 40
+        performance_config = self.config.get("performance", {})
+        global_rate_limit, route_buckets = parse_rate_limit_config(performance_config)
+        self.api_scheduler = APIScheduler(
+            concurrent_requests=performance_config.get("api_scheduler_concurrency", 40),
+            min_concurrent_requests=performance_config.get(
+                "api_scheduler_min_concurrency", 4
+            ),
+            target_latency=performance_config.get("api_target_latency_ms", 2000) / 1000,
+            global_rate_limit=global_rate_limit,
+            route_buckets=route_buckets,
+            **parse_queue_config(performance_config),
         )
-        self.api_scheduler = APIScheduler(concurrent_requests=concurrency)
+
+        # 统计 Discord API 的 429 响应，供索引器等后台任务自适应调整并发
+        self.rate_limit_monitor = RateLimitMonitor()
+        # discord.py 收到 429 时，让调度器在 retry_after 内暂停对应的桶
+        self.rate_limit_monitor.add_listener(self.api_scheduler.on_rate_limited)
 
     async def process_commands(self, message: discord.Message):
         """
@@ -106,7 +137,16 @@ class MyBot(commands.Bot):
             concurrency = self.config.get("performance", {}).get(
                 "api_scheduler_concurrency", 40
             )
-            self.api_scheduler.update_concurrency(concurrency)
+            self.api_scheduler.update_concurrency(
+                concurrency,
+                self.config.get("performance", {}).get("api_scheduler_min_concurrency"),
+            )
+            self.api_scheduler.update_rate_limits(
+                *parse_rate_limit_config(self.config.get("performance", {}))
+            )
+            self.api_scheduler.update_queue_policy(
+                **parse_queue_config(self.config.get("performance", {}))
+            )
 
             logger.info("配置文件重载成功")
             return True, "配置重载成功"
@@ -119,6 +159,7 @@ class MyBot(commands.Bot):
         """在机器人登录前执行的初始化。"""
         # 启动API调度器
         self.api_scheduler.start()
+        self.rate_limit_monitor.install()
         await init_db()
 
         main_guild_id = self._get_main_guild_id_from_config()
@@ -128,22 +169,66 @@ class MyBot(commands.Bot):
             config_repository = ConfigRepository(session)
             await config_repository.initialize_search_configs(main_guild_id)
 
+        # 未经迁移直接升级时物化的标签统计表为空，需要先聚合一次
+        async with AsyncSessionFactory() as session:
+            tag_stat_repository = TagStatRepository(session)
+            if await tag_stat_repository.is_empty_with_threads():
+                logger.info("标签统计表为空，正在从帖子数据重建...")
+                await tag_stat_repository.rebuild()
+                await session.commit()
+        async with AsyncSessionFactory() as session:
+            follow_unread_repository = FollowUnreadRepository(session)
+            if await follow_unread_repository.is_empty_with_unread():
+                logger.info("关注未读数表为空，正在从关注数据重建...")
+                await follow_unread_repository.rebuild()
+                await session.commit()
+
         # 1. 初始化核心服务
         self.tag_cache_service = TagCacheService(AsyncSessionFactory)
+        self.tag_vote_service = TagVoteService(AsyncSessionFactory)
+        self.mutex_tag_matcher = MutexTagMatcher(AsyncSessionFactory)
         self.cache_service = CacheService(self, AsyncSessionFactory)
+        self.author_cache_service = AuthorCacheService(
+            bot=self,
+            session_factory=AsyncSessionFactory,
+            ttl=self.config.get("performance", {}).get("author_cache_ttl", 3600),
+        )
+        self.author_cache_service.start()
         self.sync_service = SyncService(
             bot=self,
             session_factory=AsyncSessionFactory,
+            author_cache=self.author_cache_service,
+        )
+        self.backfill_queue = ThreadBackfillQueue(
+            session_factory=AsyncSessionFactory,
+            sync_service=self.sync_service,
+            max_size=self.config.get("performance", {}).get(
+                "ghost_backfill_max_queue", 5000
+            ),
+            rate_per_minute=self.config.get("performance", {}).get(
+                "ghost_backfill_per_minute", 60
+            ),
         )
+        await self.backfill_queue.load()
+        self.backfill_queue.start()
         self.impression_cache_service = ImpressionCacheService(
             bot=self, session_factory=AsyncSessionFactory
         )
         self.impression_cache_service.start()
+        self.follow_unread_reconciler = FollowUnreadReconciler(
+            AsyncSessionFactory,
+            interval=self.config.get("performance", {}).get(
+                "follow_unread_reconcile_interval", 3600
+            ),
+        )
+        self.follow_unread_reconciler.start()
 
         # 并行构建缓存
         await asyncio.gather(
             self.tag_cache_service.build_cache(),
             self.cache_service.build_or_refresh_cache(),
+            self.sync_service.followed_index.rebuild(),
+            self.mutex_tag_matcher.refresh(),
         )
 
         # 2. 加载 Cogs
@@ -211,6 +296,9 @@ class MyBot(commands.Bot):
     async def close(self):
         """关闭机器人时，一并关闭调度器和数据库连接。"""
         await self.impression_cache_service.stop()
+        await self.author_cache_service.stop()
+        await self.backfill_queue.stop()
+        await self.follow_unread_reconciler.stop()
         await self.api_scheduler.stop()
         await close_db()
         await super().close()
@@ -246,6 +334,10 @@ class MyBot(commands.Bot):
         banner_api.banner_config = self.config.get("banner", {})
         banner_api.bot_instance = self
 
+        admin_api.bot_instance = self
+
+        follows_api.followed_index = self.sync_service.followed_index
+
         # 注入频道映射配置
         channel_mappings_config = self._build_channel_mappings_config()
         search_api.channel_mappings_config = channel_mappings_config
@@ -1,14 +1,15 @@
 import asyncio
 import logging
-from collections import defaultdict
+import time
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from sqlmodel import select
 
-from core.sync_service import SyncService
+from core.thread_backfill_queue import ThreadBackfillQueue
 from core.thread_repository import ThreadRepository
-from models import Thread
+from shared.api_scheduler_metrics import LatencyHistogram
 from shared.enum.constant_enum import ConstantEnum
 from ThreadManager.update_data_dto import UpdateData
 from core.redis_trend_service import RedisTrendService
@@ -18,19 +19,30 @@ logger = logging.getLogger(__name__)
 # 数据结构: {thread_id: {"increment": count, "last_active_at": datetime_obj}}
 UpdatePayload = dict[int, UpdateData]
 
+# 一次刷新的各个阶段：写入数据库、查询帖子是否存在及创建时间、放入补录队列、写入趋势 (后台进行)
+FLUSH_PHASES = ("db_write", "lookup", "backfill", "trend")
+
 
 class BatchUpdateService:
-    """负责批量更新帖子回复数和活跃时间的服务。"""
+    """
+    负责批量更新帖子回复数和活跃时间的服务。
+
+    回复数增量提交到数据库后，趋势数据 (Redis) 交给后台任务写入：
+    Redis 变慢或不可用时不会拖慢数据库写入，期间的增量在内存中按帖子合并，
+    下一次写入时通过一次管道提交。各阶段的耗时记录在 phase_seconds 中。
+    """
 
     def __init__(
         self,
         session_factory: async_sessionmaker,
-        sync_service: SyncService,
+        backfill_queue: ThreadBackfillQueue,
         interval: int = 30,
+        trend_service: Optional[RedisTrendService] = None,
     ):
         self.session_factory = session_factory
-        self.sync_service = sync_service
+        self.backfill_queue = backfill_queue
         self.interval = interval  # 每隔多少秒写入一次数据库
+        self.trend_service = trend_service or RedisTrendService()
 
         # 待处理的更新
         self.pending_updates: defaultdict[int, UpdateData] = defaultdict(
@@ -41,6 +53,14 @@ class BatchUpdateService:
         self.lock = asyncio.Lock()
 
         self._task: asyncio.Task | None = None
+
+        # 已提交到数据库、等待写入趋势服务的回复数增量
+        self._pending_trends: Counter[int] = Counter()
+        self._trend_task: asyncio.Task | None = None
+
+        # 各阶段耗时
+        self.phase_seconds = {phase: LatencyHistogram() for phase in FLUSH_PHASES}
+        self.trend_failures = 0
         logger.debug("BatchUpdateService 已初始化。")
 
     def start(self):
@@ -56,6 +76,8 @@ class BatchUpdateService:
 
         logger.debug("正在执行最后的批量数据刷新...")
         await self.flush_to_db()
+        if self._trend_task is not None:
+            await asyncio.gather(self._trend_task, return_exceptions=True)
         logger.debug("最后的批量数据刷新完成。")
 
     async def add_update(self, thread_id: int, message_time: datetime):
@@ -84,63 +106,101 @@ class BatchUpdateService:
 
         intended_count = len(updates_to_process)
         logger.debug(f"准备将 {intended_count} 个帖子的更新写入数据库。")
+        timings: dict[str, float] = {}
         try:
             async with self.session_factory() as session:
                 repo = ThreadRepository(session)
+                started = time.perf_counter()
                 updated_count = await repo.batch_update_thread_activity(
                     updates_to_process
                 )
                 await session.commit()
+                timings["db_write"] = time.perf_counter() - started
 
-            logger.debug(f"批量更新成功写入数据库，影响了 {updated_count} 行。")
-
-            # 筛选出 60 天内创建的帖子 ID
-            threshold = datetime.now(timezone.utc) - timedelta(days=ConstantEnum.STATISTICS_THRESHOLD_DAYS.value)
-            all_ids = list(updates_to_process.keys())
-            
-            # 从数据库查询在有效期内的帖子ID
-            async with self.session_factory() as session:
-                stmt = select(Thread.thread_id).where(
-                    Thread.thread_id.in_(all_ids), # type: ignore
-                    Thread.created_at >= threshold
+                # 一次查询得到哪些帖子存在 (其余为幽灵数据)，以及其中哪些是有效期内创建的
+                started = time.perf_counter()
+                threshold = datetime.now(timezone.utc) - timedelta(
+                    days=ConstantEnum.STATISTICS_THRESHOLD_DAYS.value
                 )
-                valid_result = await session.execute(stmt)
-                valid_ids = set(valid_result.scalars().all())
+                recent_flags = await repo.get_created_since_flags(
+                    list(updates_to_process), threshold
+                )
+                timings["lookup"] = time.perf_counter() - started
+
+            logger.debug(f"批量更新成功写入数据库，影响了 {updated_count} 行。")
 
-            # 将讨论数的增量同步至趋势服务 (redis) (仅针对有效ID)
-            trend_service = RedisTrendService()
-            for tid, update_data in updates_to_process.items():
-                if tid in valid_ids and update_data["increment"] > 0:
-                    await trend_service.record_increment("reply", tid, update_data["increment"])
+            # 将讨论数的增量交给后台写入趋势服务 (redis) (仅针对有效ID)
+            self._queue_trend_increments(
+                {
+                    tid: update_data["increment"]
+                    for tid, update_data in updates_to_process.items()
+                    if recent_flags.get(tid) and update_data["increment"] > 0
+                }
+            )
 
             # 处理可能不存在于数据库里的数据
             if updated_count < intended_count:
                 logger.info(
                     f"批量更新消息数时发现 {intended_count - updated_count} 条幽灵数据，"
-                    "将触发数据补录。"
+                    "将加入补录队列。"
                 )
+                started = time.perf_counter()
+                ghost_ids = set(updates_to_process) - set(recent_flags)
 
-                # 查询比对
-                async with self.session_factory() as session:
-                    repo = ThreadRepository(session)
-                    all_ids_in_batch = list(updates_to_process.keys())
-                    existing_ids = await repo.get_existing_thread_ids(all_ids_in_batch)
-
-                ghost_ids = set(all_ids_in_batch) - set(existing_ids)
-
-                logger.info(f"需要补录的帖子ID: {list(ghost_ids)}")
-
-                # 为每个帖子触发一次完整的同步，使用 create_task 在后台执行
-                for thread_id in ghost_ids:
-                    asyncio.create_task(
-                        self.sync_service.sync_thread(thread_id, priority=10)
-                    )
+                # 放入有上限、按帖子去重的补录队列，由其按固定速率同步
+                added = await self.backfill_queue.enqueue_many(ghost_ids, source="reply_count")
+                timings["backfill"] = time.perf_counter() - started
+                logger.info(
+                    f"{added} 个帖子加入补录队列，当前队列长度 {self.backfill_queue.queue_length}。"
+                )
 
         except Exception as e:
             logger.error("批量更新写入数据库时发生严重错误！", exc_info=e)
             # todo: 可以在这里添加错误重试逻辑，例如将 updates_to_process 放回 self.pending_updates
             # 我想想，嗯
 
+        for phase, seconds in timings.items():
+            self.phase_seconds[phase].observe(seconds)
+        if timings:
+            logger.debug(
+                f"批量更新 {intended_count} 个帖子，各阶段耗时 (毫秒): "
+                + ", ".join(f"{phase}={seconds * 1000:.1f}" for phase, seconds in timings.items())
+            )
+
+    def _queue_trend_increments(self, increments: dict[int, int]):
+        """合并待写入的趋势增量，没有正在进行的写入时启动一次"""
+        self._pending_trends.update(increments)
+        if self._pending_trends and (
+            self._trend_task is None or self._trend_task.done()
+        ):
+            self._trend_task = asyncio.create_task(self._flush_trends())
+
+    async def _flush_trends(self):
+        """把合并后的增量通过一次管道写入趋势服务；写入期间新到的增量在下一轮写入"""
+        while self._pending_trends:
+            increments, self._pending_trends = dict(self._pending_trends), Counter()
+            started = time.perf_counter()
+            try:
+                await self.trend_service.record_increments("reply", increments)
+            except Exception:
+                # 趋势数据只用于排行，失败时丢弃这一批，不影响已提交的回复数
+                self.trend_failures += 1
+                logger.warning(
+                    f"写入 {len(increments)} 个帖子的趋势增量失败", exc_info=True
+                )
+            self.phase_seconds["trend"].observe(time.perf_counter() - started)
+
+    def get_metrics(self) -> dict:
+        """各阶段耗时的直方图，以及等待写入趋势服务的帖子数和失败次数"""
+        return {
+            "phase_seconds": {
+                phase: histogram.snapshot()
+                for phase, histogram in self.phase_seconds.items()
+            },
+            "pending_trend_threads": len(self._pending_trends),
+            "trend_failures": self.trend_failures,
+        }
+
     async def _run_loop(self):
         """后台任务的主循环。"""
         while True:
@@ -6,11 +6,14 @@ from discord import app_commands
 from discord.ext import commands
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from core.follow_join_buffer import FollowJoinBuffer
 from core.follow_repository import ThreadFollowRepository
+from core.thread_sync_debouncer import ThreadSyncDebouncer
 from core.thread_repository import ThreadRepository
 from shared.safe_defer import safe_defer
 from shared.enum.constant_enum import ConstantEnum
 from ThreadManager.batch_update_service import BatchUpdateService
+from ThreadManager.reaction_count_service import ReactionCountService
 from ThreadManager.thread_logic import ThreadLogic
 from ThreadManager.views.visibility_view import ThreadVisibilityView
 from ThreadManager.views.vote_view import TagVoteView
@@ -38,10 +41,39 @@ class ThreadManager(commands.Cog):
             "batch_update_interval", 30
         )
         self.batch_update_service = BatchUpdateService(
-            session_factory, sync_service=self.sync_service,
+            session_factory, backfill_queue=bot.backfill_queue,
             interval=update_interval
         )
+        # 反应数由网关事件在内存中维护，与回复数使用相同的写入间隔
+        self.reaction_count_service = ReactionCountService(
+            session_factory, backfill_queue=bot.backfill_queue,
+            api_scheduler=bot.api_scheduler,
+            interval=update_interval,
+            reconcile_interval=self.config.get("performance", {}).get(
+                "reaction_reconcile_interval", 600
+            ),
+        )
         
+        # 短时间内同一帖子的多次更新事件合并为一次同步
+        self.sync_debouncer = ThreadSyncDebouncer(
+            self.sync_service,
+            window=self.config.get("performance", {}).get(
+                "thread_sync_debounce_seconds", 3
+            ),
+        )
+
+        # 用户加入帖子的自动关注先记入内存，批量写入数据库
+        performance_config = self.config.get("performance", {})
+        self.follow_join_buffer = FollowJoinBuffer(
+            session_factory,
+            self.sync_service.followed_index,
+            journal_path=performance_config.get(
+                "follow_join_journal_path", "data/follow_join_buffer.log"
+            ),
+            flush_interval=performance_config.get("follow_join_flush_interval", 2),
+            max_batch=performance_config.get("follow_join_max_batch", 500),
+        )
+
         # 实例化业务逻辑处理器
         self.logic = ThreadLogic(bot, session_factory, config,
                                  self.sync_service)
@@ -50,6 +82,9 @@ class ThreadManager(commands.Cog):
     async def cog_load(self):
         """当 Cog 加载时，启动后台任务，并注册持久化视图。"""
         self.batch_update_service.start()
+        self.reaction_count_service.start()
+        await self.follow_join_buffer.load()
+        self.follow_join_buffer.start()
         # 注册可见性切换的持久化视图
         self.bot.add_view(ThreadVisibilityView(self.bot,
                                                self.session_factory))
@@ -57,6 +92,9 @@ class ThreadManager(commands.Cog):
     async def cog_unload(self):
         """当 Cog 卸载时，确保所有数据都被写入。"""
         await self.batch_update_service.stop()
+        await self.reaction_count_service.stop()
+        await self.sync_debouncer.flush()
+        await self.follow_join_buffer.stop()
 
     def is_channel_indexed(self, channel_id: int) -> bool:
         """检查频道是否已索引"""
@@ -80,11 +118,17 @@ class ThreadManager(commands.Cog):
             ):
                 async with self.session_factory() as session:
                     follow_service = ThreadFollowRepository(session)
-                    await follow_service.add_follow(
+                    if await follow_service.add_follow(
                         user_id=thread.owner_id,
                         thread_id=thread.id,
                         auto_view=False  # 贴主发布时不标记为已查看
-                    )
+                    ):
+                        self.sync_service.followed_index.mark(thread.id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 新会话不会补发断线期间的反应事件
+        self.reaction_count_service.tracker.invalidate_all()
 
     @commands.Cog.listener()
     async def on_thread_member_join(self, member: discord.ThreadMember):
@@ -100,12 +144,8 @@ class ThreadManager(commands.Cog):
             if user and user.bot:
                 return
 
-            async with self.session_factory() as session:
-                follow_service = ThreadFollowRepository(session)
-                # 用户主动加入时，标记为已查看
-                await follow_service.add_follow(
-                    user_id=member.id, thread_id=thread.id, auto_view=True
-                )
+            # 用户主动加入时，标记为已查看；由缓冲去重后批量写入
+            self.follow_join_buffer.add(member.id, thread.id)
         except Exception as e:
             logger.error(f"用户加入帖子自动关注失败: {e}", exc_info=True)
 
@@ -118,12 +158,13 @@ class ThreadManager(commands.Cog):
         ):
             modified = await self.logic.apply_mutex_tag_rules(after)
             if not modified:
-                await self.sync_service.sync_thread(thread=after)
+                self.sync_debouncer.request(after, source="thread_update")
 
     @commands.Cog.listener()
     async def on_thread_delete(self, thread: discord.Thread):
         """当整个 Thread 被从 Discord 删除时触发"""
         if self.is_channel_indexed(thread.parent_id):
+            self.sync_debouncer.cancel(thread.id)
             await self.logic.delete_thread_permanently(thread.id)
 
     @commands.Cog.listener()
@@ -157,8 +198,9 @@ class ThreadManager(commands.Cog):
             if (isinstance(channel, discord.Thread)
                     and self.is_channel_indexed(channel.parent_id)):
                 if payload.message_id == channel.id:
-                    await self.sync_service.sync_thread(
-                        thread=channel, fetch_if_incomplete=True
+                    self.sync_debouncer.request(
+                        channel, source="first_message_edit",
+                        fetch_if_incomplete=True,
                     )
                 else:
                     async with self.session_factory() as session:
@@ -213,9 +255,8 @@ class ThreadManager(commands.Cog):
                             "reaction", channel.id, 1
                         )
                 
-                await self.bot.api_scheduler.submit(
-                    coro_factory=lambda: self.logic.update_reaction_count_and_sync(channel),  # noqa: E501
-                    priority=5
+                await self.reaction_count_service.record_reaction(
+                    channel, payload.emoji, 1
                 )
         except Exception:
             logger.warning("处理反应添加事件失败", exc_info=True)
@@ -234,9 +275,8 @@ class ThreadManager(commands.Cog):
                 and self.is_channel_indexed(channel.parent_id)
                 and payload.message_id == channel.id
             ):
-                await self.bot.api_scheduler.submit(
-                    coro_factory=lambda: self.logic.update_reaction_count_and_sync(channel),  # noqa: E501
-                    priority=5
+                await self.reaction_count_service.record_reaction(
+                    channel, payload.emoji, -1
                 )
         except Exception:
             logger.warning("处理反应移除事件失败", exc_info=True)
@@ -303,15 +343,13 @@ class ThreadManager(commands.Cog):
                 thread_id=interaction.channel.id,
                 thread_name=interaction.channel.name,
                 tag_map=tag_map,
-                session_factory=self.session_factory,
+                tag_vote_service=self.bot.tag_vote_service,
                 api_scheduler=self.bot.api_scheduler,
             )
-            # 获取初始统计数据
-            async with self.session_factory() as session:
-                repo = ThreadRepository(session)
-                initial_stats = await repo.get_tag_vote_stats(
-                    interaction.channel.id, tag_map
-                )
+            # 获取初始统计数据 (缓存命中时不查询数据库)
+            initial_stats = await self.bot.tag_vote_service.get_stats(
+                interaction.channel.id, tag_map
+            )
 
             # 使用初始统计数据创建嵌入
             embed = view.create_embed(initial_stats)
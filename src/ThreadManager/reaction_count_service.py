@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Union
+
+import discord
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.thread_backfill_queue import ThreadBackfillQueue
+from core.thread_repository import ThreadRepository
+from shared.enum.api_route import APIRoute
+
+if TYPE_CHECKING:
+    from shared.api_scheduler import APIScheduler
+
+logger = logging.getLogger(__name__)
+
+EmojiLike = Union[discord.PartialEmoji, discord.Emoji, str]
+
+
+def emoji_key(emoji: EmojiLike) -> str:
+    """反应的统计键：自定义表情用 ID，Unicode 表情用字符本身"""
+    emoji_id = getattr(emoji, "id", None)
+    if emoji_id:
+        return str(emoji_id)
+    return getattr(emoji, "name", None) or str(emoji)
+
+
+class ReactionCountTracker:
+    """
+    在内存中按表情维护首楼消息的反应数，与原先 "取各表情反应数的最大值" 的逻辑一致。
+    只有经过一次 REST 校准 (seed) 的帖子才接受增量，否则由调用方发起校准。
+    """
+
+    def __init__(
+        self,
+        reconcile_interval: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.reconcile_interval = reconcile_interval
+        self._clock = clock
+        # {thread_id: {表情: 数量}}
+        self._counts: dict[int, Counter[str]] = {}
+        # 上次校准的时间
+        self._reconciled_at: dict[int, float] = {}
+        # 正在校准的帖子，期间到达的事件已包含在即将返回的快照中
+        self._reconciling: set[int] = set()
+        # 反应数有变化、等待写入数据库的帖子
+        self._dirty: set[int] = set()
+
+    def needs_reconcile(self, thread_id: int) -> bool:
+        """帖子状态未知或距上次校准超过 reconcile_interval 时需要校准"""
+        if thread_id in self._reconciling:
+            return False
+        reconciled_at = self._reconciled_at.get(thread_id)
+        return (
+            reconciled_at is None
+            or self._clock() - reconciled_at >= self.reconcile_interval
+        )
+
+    def begin_reconcile(self, thread_id: int):
+        self._reconciling.add(thread_id)
+
+    def cancel_reconcile(self, thread_id: int):
+        self._reconciling.discard(thread_id)
+
+    def seed(self, thread_id: int, reactions: Iterable[tuple[EmojiLike, int]]):
+        """用 REST 获取的 (表情, 数量) 覆盖内存中的计数"""
+        self._reconciling.discard(thread_id)
+        self._counts[thread_id] = Counter(
+            {emoji_key(emoji): count for emoji, count in reactions if count > 0}
+        )
+        self._reconciled_at[thread_id] = self._clock()
+        self._dirty.add(thread_id)
+
+    def apply(self, thread_id: int, emoji: EmojiLike, delta: int) -> bool:
+        """
+        应用一次网关反应事件。帖子已校准时更新计数并返回 True；
+        正在校准时忽略 (结果会包含本次事件) 并返回 True；状态未知时返回 False。
+        """
+        if thread_id in self._reconciling:
+            return True
+        counts = self._counts.get(thread_id)
+        if counts is None:
+            return False
+        key = emoji_key(emoji)
+        counts[key] += delta
+        if counts[key] <= 0:
+            del counts[key]
+        self._dirty.add(thread_id)
+        return True
+
+    def reaction_count(self, thread_id: int) -> Optional[int]:
+        counts = self._counts.get(thread_id)
+        if counts is None:
+            return None
+        return max(counts.values(), default=0)
+
+    def invalidate_all(self):
+        """断线后内存计数可能漏掉了事件：下一次事件到来时重新校准，未写入的计数照常写入"""
+        self._reconciled_at = dict.fromkeys(self._reconciled_at, float("-inf"))
+
+    def forget(self, thread_id: int):
+        self._counts.pop(thread_id, None)
+        self._reconciled_at.pop(thread_id, None)
+        self._reconciling.discard(thread_id)
+        self._dirty.discard(thread_id)
+
+    def pop_dirty(self) -> dict[int, int]:
+        """取出所有待写入的 {thread_id: 反应数}，并清理长时间未活动的帖子状态"""
+        dirty = {
+            thread_id: self.reaction_count(thread_id) or 0
+            for thread_id in self._dirty
+            if thread_id in self._counts
+        }
+        self._dirty.clear()
+
+        now = self._clock()
+        for thread_id, reconciled_at in list(self._reconciled_at.items()):
+            if now - reconciled_at >= self.reconcile_interval:
+                # 过期的状态下次事件到来时本就要重新校准，不必继续占用内存
+                self._counts.pop(thread_id, None)
+                del self._reconciled_at[thread_id]
+        return dirty
+
+    @property
+    def tracked_count(self) -> int:
+        return len(self._counts)
+
+
+class ReactionCountService:
+    """
+    根据网关的反应事件维护帖子首楼的反应数，定期批量写入数据库。
+    只在帖子状态未知或超过校准间隔时通过 REST 获取首楼消息校准一次。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        backfill_queue: ThreadBackfillQueue,
+        api_scheduler: "APIScheduler",
+        interval: int = 30,
+        reconcile_interval: float = 600,
+    ):
+        self.session_factory = session_factory
+        self.backfill_queue = backfill_queue
+        self.api_scheduler = api_scheduler
+        self.interval = interval  # 每隔多少秒写入一次数据库
+        self.tracker = ReactionCountTracker(reconcile_interval=reconcile_interval)
+        self.lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+        # 统计信息
+        self.events_applied = 0
+        self.reconcile_count = 0
+
+    def start(self):
+        """启动后台的批量写入任务。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """停止后台任务并执行最后一次数据刷新。"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        await self.flush_to_db()
+
+    async def record_reaction(
+        self, thread: discord.Thread, emoji: EmojiLike, delta: int
+    ):
+        """处理首楼消息上的一次反应添加 (+1) 或移除 (-1)"""
+        if self.tracker.needs_reconcile(thread.id):
+            await self.reconcile(thread)
+            return
+        if self.tracker.apply(thread.id, emoji, delta):
+            self.events_applied += 1
+        else:
+            await self.reconcile(thread)
+
+    async def reconcile(self, thread: discord.Thread):
+        """通过 REST 获取首楼消息，用其反应数覆盖内存中的计数"""
+        self.tracker.begin_reconcile(thread.id)
+        try:
+            first_msg = await self.api_scheduler.submit(
+                coro_factory=lambda: thread.get_partial_message(thread.id).fetch(),
+                priority=5,
+                route=APIRoute.FETCH_MESSAGE,
+                major_id=thread.id,
+                label="reaction.reconcile",
+            )
+        except discord.NotFound:
+            self.tracker.forget(thread.id)
+            return
+        except Exception:
+            self.tracker.cancel_reconcile(thread.id)
+            logger.warning(f"校准反应数时失败 (帖子ID: {thread.id})", exc_info=True)
+            return
+        self.reconcile_count += 1
+        async with self.lock:
+            self.tracker.seed(thread.id, ((r.emoji, r.count) for r in first_msg.reactions))
+
+    async def flush_to_db(self):
+        """将内存中有变化的反应数批量写入数据库，不存在的帖子放入补录队列。"""
+        async with self.lock:
+            counts = self.tracker.pop_dirty()
+        if not counts:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                repo = ThreadRepository(session)
+                updated_count = await repo.batch_update_thread_reaction_counts(counts)
+                await session.commit()
+
+                ghost_ids: set[int] = set()
+                if updated_count < len(counts):
+                    existing_ids = await repo.get_existing_thread_ids(list(counts))
+                    ghost_ids = set(counts) - set(existing_ids)
+
+            logger.debug(f"批量写入 {updated_count} 个帖子的反应数。")
+            if ghost_ids:
+                logger.warning(f"{len(ghost_ids)} 个帖子反应数更新失败，加入补录队列。")
+                await self.backfill_queue.enqueue_many(ghost_ids, source="reaction_count")
+        except Exception as e:
+            logger.error("批量写入反应数时发生错误！", exc_info=e)
+
+    async def _run_loop(self):
+        """后台任务的主循环。"""
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.flush_to_db()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("反应数批量写入循环发生错误。", exc_info=e)
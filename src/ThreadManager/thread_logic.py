@@ -5,7 +5,6 @@ import re
 from typing import TYPE_CHECKING, Any, Dict, List
 import discord
 
-from core.config_repository import ConfigRepository
 from core.follow_repository import ThreadFollowRepository
 from core.tag_repository import TagRepository
 from core.thread_repository import ThreadRepository
@@ -78,60 +77,58 @@ class ThreadLogic:
             return False
 
         post_tag_name_to_obj = {tag.name: tag for tag in applied_tags}
-        post_tag_names = set(post_tag_name_to_obj.keys())
 
-        async with self.session_factory() as session:
-            repo = ConfigRepository(session)
-            groups = await repo.get_all_mutex_groups_with_rules()
-            notify_config = await repo.get_search_config(SearchConfigType.NOTIFY_ON_MUTEX_CONFLICT)
-            should_notify_management = notify_config and notify_config.value_int == 1
+        # 编译后的规则只需查内存中的索引，没有冲突时不访问数据库
+        matcher = self.bot.mutex_tag_matcher
+        await matcher.ensure_loaded()
+        conflicts = matcher.match(post_tag_name_to_obj.keys())
+        if not conflicts:
+            return False
 
-            tags_to_remove, tags_to_add = set(), set()
-            all_conflicts = []
+        notify_config = await self.bot.cache_service.get_bot_config(SearchConfigType.NOTIFY_ON_MUTEX_CONFLICT)
+        should_notify_management = notify_config and notify_config.value_int == 1
 
-            for group in groups:
-                sorted_rules = sorted(group.rules, key=lambda r: r.priority)
-                group_tag_names = {rule.tag_name for rule in sorted_rules}
-                conflicting_names = post_tag_names.intersection(group_tag_names)
-
-                if len(conflicting_names) > 1:
-                    override_tag_obj = None
-                    if group.override_tag_name:
-                        override_tag_obj = discord.utils.get(thread.parent.available_tags, name=group.override_tag_name)
-
-                    if override_tag_obj:
-                        for name in conflicting_names:
-                            tags_to_remove.add(post_tag_name_to_obj[name])
-                        tags_to_add.add(override_tag_obj)
-                        all_conflicts.append({"group": group, "removed": conflicting_names, "added": override_tag_obj.name})
-                    else:
-                        highest_priority_tag_name = next(
-                            (rule.tag_name for rule in sorted_rules if rule.tag_name in conflicting_names), ""
-                        )
-                        tags_to_remove_from_group = {
-                            post_tag_name_to_obj[name] for name in conflicting_names if name != highest_priority_tag_name
-                        }
-                        tags_to_remove.update(tags_to_remove_from_group)
-                        all_conflicts.append({
-                            "group": group, "removed": {t.name for t in tags_to_remove_from_group}, "added": None
-                        })
-
-            if tags_to_remove or tags_to_add:
-                if all_conflicts:
-                    user_notified_publicly = await self._notify_user_of_mutex_removal(thread, all_conflicts)
-                    if should_notify_management:
-                        await self._notify_management_of_mutex_conflict(thread, all_conflicts, user_notified_publicly)
-
-                final_tags = list((set(applied_tags) - tags_to_remove) | tags_to_add)
-                try:
-                    await self.bot.api_scheduler.submit(
-                        coro_factory=lambda: thread.edit(applied_tags=final_tags),
-                        priority=2,
-                    )
-                    return True
-                except Exception as e:
-                    logger.error(f"自动修改帖子 {thread.id} 的标签时失败", exc_info=True)
-                    return False
+        tags_to_remove, tags_to_add = set(), set()
+        all_conflicts = []
+
+        for conflict in conflicts:
+            group = conflict.group
+            conflicting_names = conflict.conflicting_names
+
+            override_tag_obj = None
+            if conflict.override_tag_name:
+                override_tag_obj = discord.utils.get(thread.parent.available_tags, name=conflict.override_tag_name)
+
+            if override_tag_obj:
+                for name in conflicting_names:
+                    tags_to_remove.add(post_tag_name_to_obj[name])
+                tags_to_add.add(override_tag_obj)
+                all_conflicts.append({"group": group, "removed": conflicting_names, "added": override_tag_obj.name})
+            else:
+                tags_to_remove_from_group = {
+                    post_tag_name_to_obj[name] for name in conflicting_names if name != conflict.keep_name
+                }
+                tags_to_remove.update(tags_to_remove_from_group)
+                all_conflicts.append({
+                    "group": group, "removed": {t.name for t in tags_to_remove_from_group}, "added": None
+                })
+
+        if tags_to_remove or tags_to_add:
+            if all_conflicts:
+                user_notified_publicly = await self._notify_user_of_mutex_removal(thread, all_conflicts)
+                if should_notify_management:
+                    await self._notify_management_of_mutex_conflict(thread, all_conflicts, user_notified_publicly)
+
+            final_tags = list((set(applied_tags) - tags_to_remove) | tags_to_add)
+            try:
+                await self.bot.api_scheduler.submit(
+                    coro_factory=lambda: thread.edit(applied_tags=final_tags),
+                    priority=2,
+                )
+                return True
+            except Exception as e:
+                logger.error(f"自动修改帖子 {thread.id} 的标签时失败", exc_info=True)
+                return False
         return False
 
     async def _notify_user_of_mutex_removal(self, thread: discord.Thread, conflicts: List[Dict[str, Any]]) -> bool:
@@ -285,7 +282,7 @@ class ThreadLogic:
         logger.debug(f"已在帖子 {thread.id} 中发送互斥标签管理通知。")
 
     # ---------------------------------------------------------
-    # 其他零散逻辑 (预同步、反应补录、指令逻辑)
+    # 其他零散逻辑 (预同步、指令逻辑)
     # ---------------------------------------------------------
     async def pre_sync_forum_tags(self, channel: discord.ForumChannel):
         """预同步一个论坛频道的所有可用标签"""
@@ -295,23 +292,6 @@ class ThreadLogic:
             tag_service = TagRepository(session)
             await tag_service.get_or_create_tags(tags_data)
 
-    async def update_reaction_count_and_sync(self, thread: discord.Thread):
-        """(协程) 更新帖子的反应数。如果记录不存在，则触发一次完整的同步进行补录。"""
-        try:
-            first_msg = await thread.get_partial_message(thread.id).fetch()
-            reaction_count = max([r.count for r in first_msg.reactions]) if first_msg.reactions else 0
-            async with self.session_factory() as session:
-                repo = ThreadRepository(session)
-                update_succeeded = await repo.update_thread_reaction_count(thread.id, reaction_count)
-                
-                if not update_succeeded:
-                    logger.warning(f"帖子 {thread.id} 反应数更新失败，触发同步补录。")
-                    await self.sync_service.sync_thread(thread=thread)
-        except discord.NotFound:
-            pass
-        except Exception:
-            logger.warning(f"更新或补录反应数时失败 (帖子ID: {thread.id})", exc_info=True)
-
     async def process_publish_update(self, interaction: discord.Interaction, thread: discord.Thread, message_link: str):
         """处理发布更新的指令逻辑"""
         link_pattern = r"https://discord\.com/channels/(\d+)/(\d+)/(\d+)"
@@ -1,11 +1,14 @@
 import logging
+from typing import TYPE_CHECKING
 
 import discord
 
-from core.thread_repository import ThreadRepository
 from shared.safe_defer import safe_defer
 from ThreadManager.views.components.vote_button import TagVoteButton
 
+if TYPE_CHECKING:
+    from core.tag_vote_service import TagVoteService
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,14 +21,14 @@ class TagVoteView(discord.ui.View):
         thread_name: str,
         tag_map: dict[int, str],
         api_scheduler,
-        session_factory,
+        tag_vote_service: "TagVoteService",
     ):
         super().__init__(timeout=180)
         self.thread_id = thread_id
         self.thread_name = thread_name
         self.tag_map = tag_map
         self.api_scheduler = api_scheduler
-        self.session_factory = session_factory
+        self.tag_vote_service = tag_vote_service
 
         # 对标签进行一次性排序，以确保所有地方的顺序一致
         self.sorted_tags = sorted(self.tag_map.items(), key=lambda item: item[1])
@@ -71,16 +74,14 @@ class TagVoteView(discord.ui.View):
         """处理按钮点击"""
         await safe_defer(interaction)
         try:
-            async with self.session_factory() as session:
-                repo = ThreadRepository(session)
-                # 调用repo方法，返回更新后的统计数据
-                updated_stats = await repo.record_tag_vote(
-                    user_id=interaction.user.id,
-                    thread_id=self.thread_id,
-                    tag_id=button.tag_id,
-                    vote_value=button.vote_value,
-                    tag_map=self.tag_map,
-                )
+            # 一条 Upsert 语句完成投票，返回更新后的统计数据 (来自缓存)
+            updated_stats = await self.tag_vote_service.record_vote(
+                user_id=interaction.user.id,
+                thread_id=self.thread_id,
+                tag_id=button.tag_id,
+                vote_value=button.vote_value,
+                tag_map=self.tag_map,
+            )
 
             # 投票成功后，使用返回的最新数据更新视图
             await self.update_view(interaction, updated_stats)
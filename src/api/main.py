@@ -6,6 +6,7 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import ORJSONResponse
 
 from api.v1.routers import (
+    admin,
     auth,
     authors,
     banner,
@@ -103,6 +104,7 @@ app.include_router(collections.router, prefix="/v1")
 app.include_router(booklists.router, prefix="/v1")
 app.include_router(tags.router, prefix="/v1")
 app.include_router(discovery.router, prefix="/v1")
+app.include_router(admin.router, prefix="/v1")
 
 
 # 包含 v1 的健康检查端点
@@ -0,0 +1,60 @@
+"""BOT 管理员专用的运维 API 路由"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from api.v1.dependencies.security import require_auth
+
+if TYPE_CHECKING:
+    from bot_main import MyBot
+
+logger = logging.getLogger(__name__)
+
+# 全局变量，将在应用启动时由 bot_main.py 注入
+bot_instance: "MyBot | None" = None
+
+
+async def require_bot_admin(
+    user: Dict[str, Any] = Depends(require_auth),
+) -> Dict[str, Any]:
+    """要求当前用户在 bot_admin_user_ids 中，否则返回 403"""
+    if not bot_instance:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bot 服务尚未初始化"
+        )
+    admin_ids = {int(uid) for uid in bot_instance.config.get("bot_admin_user_ids", [])}
+    if int(user["id"]) not in admin_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="需要BOT管理员权限")
+    return user
+
+
+router = APIRouter(
+    prefix="/admin", tags=["管理"], dependencies=[Depends(require_bot_admin)]
+)
+
+
+@router.get("/scheduler-metrics", summary="获取 API 调度器的观测数据")
+async def get_scheduler_metrics() -> Dict[str, Any]:
+    """返回各优先级的排队数，以及按优先级和调用方标签统计的去向计数、重试次数与耗时直方图"""
+    if not bot_instance or not getattr(bot_instance, "api_scheduler", None):
+        raise HTTPException(status_code=503, detail="API 调度器尚未初始化")
+    return bot_instance.api_scheduler.get_metrics()
+
+
+@router.get("/backfill-queue", summary="获取幽灵帖子补录队列的状态")
+async def get_backfill_queue_stats() -> Dict[str, Any]:
+    """返回补录队列的长度，以及加入、去重、丢弃、补录成功、重试和放弃的次数"""
+    if not bot_instance or not getattr(bot_instance, "backfill_queue", None):
+        raise HTTPException(status_code=503, detail="补录队列尚未初始化")
+    return bot_instance.backfill_queue.get_stats()
+
+
+@router.get("/batch-update-metrics", summary="获取回复数批量写入各阶段的耗时")
+async def get_batch_update_metrics() -> Dict[str, Any]:
+    """返回数据库写入、存在性查询、补录入队和趋势写入各阶段的耗时直方图"""
+    thread_manager = bot_instance.get_cog("ThreadManager") if bot_instance else None
+    if thread_manager is None:
+        raise HTTPException(status_code=503, detail="ThreadManager 尚未加载")
+    return thread_manager.batch_update_service.get_metrics()  # type: ignore[attr-defined]
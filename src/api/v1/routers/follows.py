@@ -1,16 +1,20 @@
 """关注列表相关路由"""
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.v1.dependencies.security import get_current_user
 from shared.database import AsyncSessionFactory
 from core.follow_repository import ThreadFollowRepository
+from core.followed_thread_index import FollowedThreadIndex
 
 logger = logging.getLogger(__name__)
 
+# 由 bot 注入，新增关注后同步更新已关注帖子索引
+followed_index: Optional[FollowedThreadIndex] = None
+
 router = APIRouter(prefix="/follows", tags=["关注列表"])
 
 
@@ -129,6 +133,8 @@ async def add_follow(
             )
 
         if success:
+            if followed_index is not None:
+                followed_index.mark(thread_id)
             return {"message": "关注成功", "thread_id": thread_id}
         else:
             return {"message": "已经关注过此帖", "thread_id": thread_id}
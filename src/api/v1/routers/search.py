@@ -6,7 +6,12 @@ from sqlmodel import select
 
 from api.v1.dependencies.security import get_current_user, require_auth
 from api.v1.schemas.banner import BannerItem
-from api.v1.schemas.search import SearchRequest, SearchResponse, ThreadDetail
+from api.v1.schemas.search import (
+    SearchFacets,
+    SearchRequest,
+    SearchResponse,
+    ThreadDetail,
+)
 from api.v1.schemas.search.author_detail import AuthorDetail
 from banner.banner_service import BannerService
 from core.cache_service import CacheService
@@ -14,6 +19,7 @@ from core.collection_repository import CollectionRepository
 from core.follow_repository import ThreadFollowRepository
 from core.impression_cache_service import ImpressionCacheService
 from core.tag_cache_service import TagCacheService
+from search.dto.search_facets import SearchFacetsDTO
 from search.qo.thread_search import ThreadSearchQuery
 from models import Thread
 from search.search_service import SearchService
@@ -111,8 +117,10 @@ async def execute_search(
 
         async with async_session_factory() as session:
             # 执行搜索查询并更新展示计数
-            threads, total_threads = await _perform_search_and_update_counts(
-                session, query_object, search_config, request.limit, exclude_thread_ids  # type: ignore
+            threads, total_threads, search_facets = await _perform_search_and_update_counts(
+                session, query_object, search_config, request.limit, exclude_thread_ids,  # type: ignore
+                facets=request.include_facets,
+                histograms=request.include_histograms,
             )
 
             # 获取当前用户ID用于后续收藏状态和未读数查询
@@ -154,6 +162,11 @@ async def execute_search(
             virtual_tags=virtual_tags,
             banner_carousel=banner_carousel,
             unread_count=unread_count,
+            facets=(
+                SearchFacets.model_validate(search_facets.model_dump())
+                if search_facets
+                else None
+            ),
         )
     except Exception as e:
         print(f"搜索时发生内部错误: {e}")
@@ -331,21 +344,26 @@ async def _perform_search_and_update_counts(
     search_config: Dict[str, Any],
     limit: int,
     exclude_thread_ids: List[int],
-) -> tuple[Any, int]:
+    *,
+    facets: bool = False,
+    histograms: bool = False,
+) -> tuple[Any, int, SearchFacetsDTO | None]:
     """
     执行搜索查询并更新帖子展示次数计数。
 
     Returns:
-        tuple: (帖子列表, 总数)
+        tuple: (帖子列表, 总数, 分面统计；未请求时为 None)
     """
     repo = SearchService(session, tag_cache_service_instance)  # type: ignore[arg-type]
-    threads, total_threads = await repo.search_threads_with_count(
+    threads, total_threads, search_facets = await repo.search_threads_with_facets(
         query_object,
         limit=limit,
         total_display_count=search_config["total_display_count"],
         exploration_factor=search_config["exploration_factor"],
         strength_weight=search_config["strength_weight"],
         exclude_thread_ids=exclude_thread_ids,
+        facets=facets,
+        histograms=histograms,
     )
 
     # 按创建时间或收藏时间排序时，不记录展示次数，避免影响热度排序
@@ -362,7 +380,7 @@ async def _perform_search_and_update_counts(
             thread_ids_to_update
         )
 
-    return threads, total_threads
+    return threads, total_threads, search_facets
 
 
 def _build_thread_results(
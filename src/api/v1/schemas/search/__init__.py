@@ -1,4 +1,5 @@
+from api.v1.schemas.search.search_facets import SearchFacets
 from api.v1.schemas.search.search_request import SearchRequest
 from api.v1.schemas.search.search_response import SearchResponse, ThreadDetail
 
-__all__ = ["SearchRequest", "SearchResponse", "ThreadDetail"]
+__all__ = ["SearchFacets", "SearchRequest", "SearchResponse", "ThreadDetail"]
@@ -0,0 +1,27 @@
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+
+class SearchFacets(BaseModel):
+    """
+    搜索结果集 (全部匹配的帖子，而非当前页) 的分面统计
+    """
+
+    tag_counts: Dict[str, int] = Field(
+        default_factory=dict,
+        description="结果集中带有各标签的帖子数，按数量降序排列；不同频道的同名标签合并计数",
+    )
+    reaction_histogram: Dict[str, int] = Field(
+        default_factory=dict,
+        description="按点赞数分段的帖子数 (如 '10-24': 3)，仅在 include_histograms 为 true 时返回",
+    )
+    created_histogram: Dict[str, int] = Field(
+        default_factory=dict,
+        description="按发帖月份 (YYYY-MM) 统计的帖子数，仅在 include_histograms 为 true 时返回",
+    )
+    histograms_skipped: bool = Field(
+        default=False,
+        description="请求了直方图，但结果集过大 (超过 3 万个帖子) 而未计算，此时两个直方图为空",
+    )
+    elapsed_ms: float = Field(default=0.0, description="计算分面统计的耗时 (毫秒)")
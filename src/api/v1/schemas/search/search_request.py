@@ -101,6 +101,15 @@ class SearchRequest(BaseModel):
     offset: int = Field(
         default=0, ge=0, description="结果的偏移页（已弃用，为兼容旧版本保留）"
     )
+    include_facets: bool = Field(
+        default=False,
+        description="是否返回结果集中各标签的帖子数。统计范围会排除 exclude_thread_ids，"
+        "通常只在请求第一页时开启",
+    )
+    include_histograms: bool = Field(
+        default=False,
+        description="是否在分面统计中额外返回点赞数与发帖月份直方图 (需同时开启 include_facets)",
+    )
 
     # --- 统一转换逻辑 ---
 
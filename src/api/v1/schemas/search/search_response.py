@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import Field
 
 from api.v1.schemas.banner import BannerItem
 from api.v1.schemas.base import PaginatedResponse
+from api.v1.schemas.search.search_facets import SearchFacets
 from api.v1.schemas.search.thread_detail import ThreadDetail
 
 
@@ -23,3 +24,7 @@ class SearchResponse(PaginatedResponse[ThreadDetail]):
         description="Banner轮播列表，包含当前频道+全频道的banner（最多8个）",
     )
     unread_count: int = Field(default=0, description="当前用户关注列表的未读更新数量")
+    facets: Optional[SearchFacets] = Field(
+        default=None,
+        description="结果集的分面统计，仅在请求 include_facets 为 true 时返回",
+    )
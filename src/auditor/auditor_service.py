@@ -1,7 +1,13 @@
-from sqlalchemy import delete, select
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models import Thread
+from models import AuditCheckpoint, Thread
+
+# 帖子审计任务在检查点表中的名称
+THREAD_AUDIT_CHECKPOINT = "thread_audit"
 
 
 class AuditorService:
@@ -12,16 +18,69 @@ class AuditorService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all_thread_ids(self) -> list[int]:
+    async def get_thread_batch_after(
+        self, last_thread_pk: int, limit: int
+    ) -> list[tuple[int, int]]:
         """
-        从数据库中获取所有已索引帖子的 ID。
+        以主键为游标，分块获取已索引的帖子。
+
+        Args:
+            last_thread_pk: 上一批最后一个帖子的主键 (Thread.id)，从 0 开始。
+            limit: 本批最多返回的帖子数。
 
         Returns:
-            一个包含所有帖子 ID 的列表。
+            按主键升序排列的 (主键, 帖子 Discord ID) 列表；为空表示已遍历到末尾。
         """
-        stmt = select(Thread.thread_id)  # type: ignore
+        stmt = (
+            select(Thread.id, Thread.thread_id)  # type: ignore
+            .where(Thread.id > last_thread_pk)  # type: ignore
+            .order_by(Thread.id)  # type: ignore
+            .limit(limit)
+        )
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def get_checkpoint(
+        self, name: str = THREAD_AUDIT_CHECKPOINT
+    ) -> AuditCheckpoint:
+        """获取审计检查点，如不存在则创建一个从头开始的检查点。"""
+        await self.session.execute(
+            sqlite_insert(AuditCheckpoint)
+            .values(name=name, last_thread_pk=0, cycle=0)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await self.session.execute(
+            select(AuditCheckpoint).where(AuditCheckpoint.name == name)  # type: ignore
+        )
+        checkpoint = result.scalar_one()
+        await self.session.commit()
+        return checkpoint
+
+    async def save_cursor(
+        self, last_thread_pk: int, name: str = THREAD_AUDIT_CHECKPOINT
+    ) -> None:
+        """持久化审计游标。"""
+        stmt = (
+            update(AuditCheckpoint)
+            .where(AuditCheckpoint.name == name)  # type: ignore
+            .values(last_thread_pk=last_thread_pk)
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def start_new_cycle(self, name: str = THREAD_AUDIT_CHECKPOINT) -> None:
+        """一轮审计完成后，将游标归零并开始新一轮。"""
+        stmt = (
+            update(AuditCheckpoint)
+            .where(AuditCheckpoint.name == name)  # type: ignore
+            .values(
+                last_thread_pk=0,
+                cycle=AuditCheckpoint.cycle + 1,
+                cycle_started_at=datetime.now(timezone.utc),
+            )
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
 
     async def delete_stale_threads(self, threshold: int) -> int:
         """
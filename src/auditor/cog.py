@@ -1,12 +1,13 @@
 import logging
-import random
 from asyncio import sleep
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING
 
 from discord.ext import commands, tasks
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from auditor.auditor_service import AuditorService
+from auditor.gap_recovery_service import GapRecoveryService
+from shared.exceptions import APIQueueFullError
 
 
 if TYPE_CHECKING:
@@ -20,8 +21,9 @@ class Auditor(commands.Cog):
     负责后台数据审计的 Cog
 
     这个 Cog 包含一个后台循环任务，该任务会定期执行完整的审计周期。
-    在每个周期开始时，它会从数据库获取所有已索引的帖子ID，然后以非常低的速率
-    将它们逐一提交给 API 调度器进行数据同步。这确保了本地数据与 Discord 的数据最终一致
+    审计以帖子主键为游标，分块从数据库读取帖子ID，并以非常低的速率
+    逐一同步 (同步中的 API 请求以最低优先级经调度器执行)。这确保了本地数据与 Discord 的数据最终一致。
+    游标会持久化到数据库，机器人重启后将从上次的位置继续审计。
     """
 
     def __init__(
@@ -31,9 +33,27 @@ class Auditor(commands.Cog):
     ):
         self.bot = bot
         self.session_factory = session_factory
-        self.api_scheduler = bot.api_scheduler
         self.sync_service = bot.sync_service
-        self.audit_queue: List[int] = []
+
+        performance_config = bot.config.get("performance", {})
+        # 每次从数据库读取的帖子数，决定了内存占用上限和重启后最多重复审计的帖子数
+        self.audit_batch_size: int = performance_config.get("audit_batch_size", 50)
+        # 每提交一个审计任务后的休眠时间 (秒)
+        self.audit_interval: float = performance_config.get("audit_interval", 4)
+        # 每隔多少轮审计完整解析一次所有帖子。指纹不包含首楼反应数、摘要和缩略图，
+        # 离线期间的这类变化没有事件补发，只能靠完整解析修正；为 1 时每轮都完整解析
+        self.full_parse_every_cycles: int = performance_config.get(
+            "audit_full_parse_every_cycles", 4
+        )
+        # 重连后的补漏同步，以低于交互请求的优先级和有限的帖子数预算执行
+        self.gap_recovery = GapRecoveryService(
+            bot,
+            session_factory,
+            self.sync_service,
+            priority=performance_config.get("gap_recovery_priority", 9),
+            max_threads=performance_config.get("gap_recovery_max_threads", 500),
+            concurrency=performance_config.get("gap_recovery_concurrency", 4),
+        )
         logger.info("Auditor 模块已加载")
 
     async def cog_load(self):
@@ -45,52 +65,97 @@ class Auditor(commands.Cog):
         """当 Cog 卸载时，取消后台审计循环。"""
         self.audit_loop.cancel()
         self.cleanup_loop.cancel()
+        await self.gap_recovery.stop()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """重新建立会话 (包括重启) 后，补同步断线期间发生变化的活跃帖子。"""
+        self.gap_recovery.trigger("on_ready")
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        """会话恢复后同样补漏一轮，确保断线期间的变化不必等到审计循环。"""
+        self.gap_recovery.trigger("on_resumed")
 
-    async def _reload_audit_queue(self):
+    def should_skip_unchanged(self, cycle: int) -> bool:
+        """第 cycle 轮审计是否跳过指纹未变化的帖子 (每 full_parse_every_cycles 轮完整解析一轮)"""
+        if self.full_parse_every_cycles <= 1:
+            return False
+        return cycle % self.full_parse_every_cycles != 0
+
+    async def _audit_next_batch(self) -> int:
         """
-        从数据库重新加载需要审计的帖子 ID 列表。
+        从检查点游标处读取下一批帖子并逐一提交审计。
+
+        每批结束 (或被中断) 时都会把游标持久化，重启后从最后一个已提交的帖子之后继续。
 
-        它会获取所有帖子的ID，并随机打乱顺序，以避免每次都从相同的帖子开始审计。
+        Returns:
+            本批提交的帖子数。返回 0 表示一轮审计已完成，游标已归零。
         """
-        logger.debug("正在从数据库重新加载审计队列...")
         async with self.session_factory() as session:
             repo = AuditorService(session)
-            self.audit_queue = await repo.get_all_thread_ids()
-            random.shuffle(self.audit_queue)
-        logger.debug(f"审计队列加载完成，共 {len(self.audit_queue)} 个帖子需要审计。")
+            checkpoint = await repo.get_checkpoint()
+            batch = await repo.get_thread_batch_after(
+                checkpoint.last_thread_pk, self.audit_batch_size
+            )
+            if not batch:
+                if checkpoint.last_thread_pk > 0:
+                    await repo.start_new_cycle()
+                    logger.debug(
+                        f"第 {checkpoint.cycle + 1} 轮审计完成，游标已归零。"
+                        f"累计跳过未变化帖子 {self.sync_service.skipped_count} 个，"
+                        f"完整解析 {self.sync_service.parsed_count} 个。"
+                    )
+                return 0
+
+        skip_unchanged = self.should_skip_unchanged(checkpoint.cycle)
+        last_pk = checkpoint.last_thread_pk
+        submitted = 0
+        try:
+            for thread_pk, thread_id in batch:
+                if self.audit_loop.is_being_cancelled():
+                    logger.info("审计循环被中断。")
+                    break
+
+                try:
+                    # sync_thread 内部的 REST 请求各自经过调度器排队；不能再把整个同步包成一个请求提交，
+                    # 否则外层请求占着并发名额等待内层请求，并发上限降到下限时会互相卡死
+                    await self.sync_service.sync_thread(
+                        thread_id, skip_unchanged=skip_unchanged
+                    )
+                except APIQueueFullError:
+                    # 调度器繁忙时让出队列，游标停在已审计的位置，下一轮从这里继续
+                    logger.info("API 调度队列已满，本批审计提前结束。")
+                    break
+                last_pk = thread_pk
+                submitted += 1
+                await sleep(self.audit_interval)
+        finally:
+            if last_pk != checkpoint.last_thread_pk:
+                async with self.session_factory() as session:
+                    await AuditorService(session).save_cursor(last_pk)
+
+        return submitted
 
     @tasks.loop(seconds=60)
     async def audit_loop(self):
         """
         主审计循环。
 
-        这个循环负责执行一个完整的审计周期。它会先加载所有帖子ID，然后逐一处理。
-        处理完所有帖子后，会等待一段时间，再开始下一个周期。
+        这个循环负责执行一个完整的审计周期。它从检查点游标处分块读取帖子ID并逐一处理，
+        直到遍历完所有帖子。处理完所有帖子后，会等待一段时间，再开始下一个周期。
         """
         try:
             logger.debug("开始新一轮的后台数据审计周期...")
-            await self._reload_audit_queue()
+            total_submitted = 0
+            while not self.audit_loop.is_being_cancelled():
+                submitted = await self._audit_next_batch()
+                if submitted == 0:
+                    break
+                total_submitted += submitted
 
-            if not self.audit_queue:
-                logger.debug("没有需要审计的帖子，本轮审计周期跳过。")
-            else:
-                for thread_id in self.audit_queue:
-                    if self.audit_loop.is_being_cancelled():
-                        logger.info("审计循环被中断。")
-                        break
-
-                    await self.api_scheduler.submit(
-                        coro_factory=lambda tid=thread_id: self.sync_service.sync_thread(
-                            tid
-                        ),
-                        priority=10,
-                    )
-                    await sleep(4)
-
-                if not self.audit_loop.is_being_cancelled():
-                    logger.debug(
-                        f"本轮 {len(self.audit_queue)} 个帖子的审计任务已全部提交。"
-                    )
+            if not self.audit_loop.is_being_cancelled():
+                logger.debug(f"本轮 {total_submitted} 个帖子的审计任务已全部提交。")
 
         except Exception as e:
             logger.error(f"审计循环发生严重错误: {e}", exc_info=True)
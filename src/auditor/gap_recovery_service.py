@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Optional
+
+import discord
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.sync_service import SyncService
+from core.thread_repository import ThreadRepository
+
+if TYPE_CHECKING:
+    from bot_main import MyBot
+
+logger = logging.getLogger(__name__)
+
+# 每次查询指纹的帖子数
+FINGERPRINT_CHUNK_SIZE = 500
+
+
+class GapRecoveryService:
+    """
+    网关重连 (或重启) 后的补漏同步。
+
+    断线期间的新帖、标题/标签修改和新回复不会触发事件，原本只能等审计循环轮到这些帖子。
+    补漏在 on_ready / on_resumed 时列出已索引频道中的活跃帖子 (来自网关下发的缓存，不需要 REST 请求)，
+    与数据库中的元数据指纹 (标题、标签、消息数、最后消息ID) 批量比对，只同步有变化或未入库的帖子。
+    每轮最多同步 max_threads 个帖子，最多 concurrency 个同时在调度器中排队，
+    并以较低的优先级提交，不会挤占交互请求；超出预算的帖子留给审计循环。
+    """
+
+    def __init__(
+        self,
+        bot: "MyBot",
+        session_factory: async_sessionmaker,
+        sync_service: SyncService,
+        *,
+        priority: int = 9,
+        max_threads: int = 500,
+        concurrency: int = 4,
+    ):
+        self.bot = bot
+        self.session_factory = session_factory
+        self.sync_service = sync_service
+        self.priority = priority
+        self.max_threads = max_threads
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._rerun = False
+
+        # 最近一轮的统计信息
+        self.last_run: dict = {}
+
+    def trigger(self, reason: str):
+        """
+        请求一轮补漏。已有一轮在进行时不并发执行，只在其结束后再补一轮。
+        """
+        if self._task is not None and not self._task.done():
+            self._rerun = True
+            return
+        self._task = asyncio.create_task(self._run_loop(reason))
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run_loop(self, reason: str):
+        while True:
+            self._rerun = False
+            try:
+                await self.run(reason)
+            except Exception:
+                logger.exception("重连补漏同步失败")
+            if not self._rerun:
+                return
+            reason = "补漏期间再次重连"
+
+    def list_active_threads(self) -> list[discord.Thread]:
+        """列出缓存中属于已索引频道的活跃帖子"""
+        cache_service = self.bot.cache_service
+        return [
+            thread
+            for guild in self.bot.guilds
+            for thread in guild.threads
+            if thread.parent_id is not None
+            and cache_service.is_channel_indexed(thread.parent_id)
+        ]
+
+    async def find_changed_threads(
+        self, threads: list[discord.Thread]
+    ) -> list[discord.Thread]:
+        """返回未入库或指纹与上次同步不同的帖子，最近活跃的排在前面"""
+        stored: dict[int, Optional[str]] = {}
+        async with self.session_factory() as session:
+            repo = ThreadRepository(session)
+            for start in range(0, len(threads), FINGERPRINT_CHUNK_SIZE):
+                chunk = threads[start : start + FINGERPRINT_CHUNK_SIZE]
+                stored.update(await repo.get_sync_fingerprints([t.id for t in chunk]))
+
+        changed = [
+            thread
+            for thread in threads
+            if thread.id not in stored
+            or stored[thread.id] != self.sync_service.compute_fingerprint(thread)
+        ]
+        changed.sort(key=lambda t: t.last_message_id or t.id, reverse=True)
+        return changed
+
+    async def run(self, reason: str) -> dict:
+        """执行一轮补漏，返回统计信息"""
+        started = time.perf_counter()
+        threads = self.list_active_threads()
+        changed = await self.find_changed_threads(threads)
+        to_sync = changed[: self.max_threads]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failed = 0
+
+        async def sync(thread: discord.Thread):
+            nonlocal failed
+            async with semaphore:
+                try:
+                    # 直接调用：同步中的 REST 请求以 self.priority 各自经过调度器
+                    await self.sync_service.sync_thread(thread, priority=self.priority)
+                except Exception:
+                    failed += 1
+                    logger.debug(f"补漏同步帖子 {thread.id} 失败", exc_info=True)
+
+        await asyncio.gather(*(sync(thread) for thread in to_sync))
+
+        self.last_run = {
+            "reason": reason,
+            "listed": len(threads),
+            "changed": len(changed),
+            "synced": len(to_sync) - failed,
+            "failed": failed,
+            "deferred": len(changed) - len(to_sync),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(
+            f"重连补漏 ({reason}): 活跃帖子 {len(threads)} 个，有变化 {len(changed)} 个，"
+            f"已同步 {len(to_sync) - failed} 个，失败 {failed} 个，"
+            f"超出预算留给审计 {len(changed) - len(to_sync)} 个，"
+            f"耗时 {self.last_run['seconds']} 秒"
+        )
+        return self.last_run
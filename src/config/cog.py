@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from config.general_config_handler import GeneralConfigHandler
 from config.mutex_tags_handler import MutexTagsHandler
+from core.tag_stat_repository import TagStatRepository
 from shared.safe_defer import safe_defer
 
 if TYPE_CHECKING:
@@ -138,6 +139,43 @@ class Configuration(commands.Cog):
             logger.error("刷新缓存时出错", exc_info=e)
             await interaction.followup.send(f"❌ 刷新缓存失败: {e}", ephemeral=True)
 
+    @config_group.command(
+        name="校验标签统计", description="比对物化的标签/频道帖子数与实际数据，可选择重建"
+    )
+    @app_commands.describe(重建="发现偏差时从帖子和标签关联重新聚合统计表")
+    @is_admin_or_bot_admin()
+    async def verify_tag_stats(self, interaction: discord.Interaction, 重建: bool = False):
+        """校验 (并可重建) 由触发器维护的标签统计表"""
+        await safe_defer(interaction, ephemeral=True)
+
+        try:
+            async with self.session_factory() as session:
+                repo = TagStatRepository(session)
+                drift = await repo.find_drift()
+                drift_count = sum(len(items) for items in drift.values())
+                if drift_count == 0:
+                    await interaction.followup.send("✅ 标签统计与实际数据一致。", ephemeral=True)
+                    return
+
+                logger.warning(f"标签统计存在偏差: {drift}")
+                summary = (
+                    f"⚠️ 发现 {len(drift['channel_tag'])} 个频道标签计数、"
+                    f"{len(drift['channel_thread'])} 个频道帖子数与实际数据不一致。"
+                )
+                if not 重建:
+                    await interaction.followup.send(
+                        summary + " 可使用 `重建: True` 重新聚合。", ephemeral=True
+                    )
+                    return
+
+                await repo.rebuild()
+                await session.commit()
+            await interaction.followup.send(summary + " 已重建统计表。", ephemeral=True)
+
+        except Exception as e:
+            logger.error("校验标签统计时出错", exc_info=e)
+            await interaction.followup.send(f"❌ 校验标签统计失败: {e}", ephemeral=True)
+
     async def cog_app_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ):
@@ -148,6 +148,7 @@ class MutexTagsHandler:
             logger.info(
                 f"成功添加新的互斥标签组，包含标签: {priority_tags}，覆盖标签: {override_tag_name}"
             )
+        await self.bot.mutex_tag_matcher.refresh()
 
         # 在保存成功后，关闭 AddMutexGroupView 消息
         await interaction.delete_original_response()
@@ -174,6 +175,7 @@ class MutexTagsHandler:
                 success = await repo.delete_mutex_group(group_id)
 
             if success:
+                await self.bot.mutex_tag_matcher.refresh()
                 await self.bot.api_scheduler.submit(
                     coro_factory=lambda: interaction.followup.send(
                         f"✅ 已成功删除互斥组 ID: {group_id}。", ephemeral=True
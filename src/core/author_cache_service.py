@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import discord
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.author_repository import AuthorRepository
+from shared.discord_utils import DiscordUtils
+
+if TYPE_CHECKING:
+    from bot_main import MyBot
+
+logger = logging.getLogger(__name__)
+
+AuthorData = Dict[str, Any]
+
+
+class _CacheEntry:
+    __slots__ = ("data", "fetched_at", "written")
+
+    def __init__(self, data: Optional[AuthorData], fetched_at: float):
+        self.data = data
+        self.fetched_at = fetched_at
+        # 最近一次写入数据库的数据，与 data 相同时无需再写
+        self.written: Optional[AuthorData] = None
+
+
+class AuthorCacheService:
+    """
+    帖子作者信息的缓存与批量回写服务。
+
+    - 缓存: 作者信息在 ttl 秒内只获取一次 (包括获取失败的结果)，同一作者的并发请求共用一次获取。
+      缓存条目数超过 max_entries 时按最近最少使用淘汰。
+    - 回写: 同步帖子时只把作者ID放入待写集合 (按作者去重，最多 max_pending 个，满时丢弃并计数，
+      下次同步该作者的帖子时会再次加入)。后台任务每 flush_interval 秒或待写数达到 batch_size 时，
+      获取这些作者的信息，只把与上次写入不同的作者用一条批量 Upsert 写入数据库。
+    """
+
+    # 回写时同时获取作者信息的最大并发数
+    FETCH_CONCURRENCY = 8
+
+    def __init__(
+        self,
+        bot: "MyBot",
+        session_factory: async_sessionmaker,
+        *,
+        ttl: float = 3600,
+        max_entries: int = 10000,
+        max_pending: int = 5000,
+        batch_size: int = 200,
+        flush_interval: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bot = bot
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._clock = clock
+
+        self._cache: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._inflight: dict[int, asyncio.Future] = {}
+        # {作者ID: (服务器, 可直接使用的成员对象)}
+        self._pending: dict[int, tuple[discord.Guild, Optional[discord.abc.User]]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._is_running = False
+
+        # 统计信息
+        self.threads_seen = 0
+        """请求过作者信息的帖子数"""
+        self.user_lookups = 0
+        """缓存未命中、实际调用 get_or_fetch_user 的次数"""
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.db_rows_written = 0
+        self.db_batches = 0
+
+    def start(self):
+        """启动后台回写任务。"""
+        if self._is_running:
+            return
+        self._is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """停止服务并写入剩余的作者。"""
+        if not self._is_running:
+            return
+        self._is_running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.flush()
+
+    # ---------------------------------------------------------
+    # 缓存
+    # ---------------------------------------------------------
+    def _get_fresh(self, author_id: int) -> Optional[_CacheEntry]:
+        entry = self._cache.get(author_id)
+        if entry is None:
+            return None
+        if self._clock() - entry.fetched_at >= self.ttl:
+            # 过期的条目保留上次写入的数据，重新获取后未变化的作者仍不必写入
+            return None
+        self._cache.move_to_end(author_id)
+        return entry
+
+    async def get_author_data(
+        self,
+        author_id: int,
+        guild: discord.Guild,
+        source_member: Optional[discord.abc.User] = None,
+    ) -> Optional[AuthorData]:
+        """获取可直接写入 Author 表的作者信息，优先使用缓存"""
+        entry = self._get_fresh(author_id)
+        if entry is not None:
+            self.cache_hits += 1
+            return entry.data
+
+        future = self._inflight.get(author_id)
+        if future is not None:
+            self.cache_hits += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[author_id] = future
+        try:
+            self.user_lookups += 1
+            data = await self._lookup(author_id, guild, source_member)
+            self._store(author_id, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            del self._inflight[author_id]
+
+    async def _lookup(
+        self,
+        author_id: int,
+        guild: discord.Guild,
+        source_member: Optional[discord.abc.User],
+    ) -> Optional[AuthorData]:
+        user_obj = await DiscordUtils.get_or_fetch_user(
+            bot=self.bot,
+            user_id=author_id,
+            guild=guild,
+            source_member=source_member,  # type: ignore[arg-type]
+        )
+        if not user_obj:
+            return None
+        return {
+            "id": user_obj.id,
+            "name": user_obj.name,
+            "global_name": user_obj.global_name,
+            "display_name": user_obj.display_name,
+            "avatar_url": user_obj.display_avatar.url,
+        }
+
+    def _store(self, author_id: int, data: Optional[AuthorData]):
+        previous = self._cache.pop(author_id, None)
+        entry = _CacheEntry(data, self._clock())
+        if previous is not None:
+            entry.written = previous.written
+        self._cache[author_id] = entry
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def claim_write(self, author_data: AuthorData) -> bool:
+        """
+        作者信息与上次写入的不同时返回 True，并记为已写入；相同时返回 False，调用方可以跳过写入。
+        写入失败时调用 release_write 撤销。
+        """
+        entry = self._cache.get(author_data["id"])
+        if entry is None:
+            return True
+        if entry.written == author_data:
+            return False
+        entry.written = dict(author_data)
+        return True
+
+    def release_write(self, author_id: int):
+        entry = self._cache.get(author_id)
+        if entry is not None:
+            entry.written = None
+
+    async def get_author_for_record(
+        self,
+        author_id: int,
+        guild: discord.Guild,
+        source_member: Optional[discord.abc.User] = None,
+    ) -> Optional[AuthorData]:
+        """
+        供批量写入路径使用：返回需要随帖子一起写入的作者信息，与上次写入相同时返回 None。
+        """
+        self.threads_seen += 1
+        data = await self.get_author_data(author_id, guild, source_member)
+        if data is None or not self.claim_write(data):
+            return None
+        return data
+
+    # ---------------------------------------------------------
+    # 回写
+    # ---------------------------------------------------------
+    def enqueue(
+        self,
+        author_id: int,
+        guild: discord.Guild,
+        source_member: Optional[discord.abc.User] = None,
+    ):
+        """把作者放入待写集合，立即返回"""
+        self.threads_seen += 1
+        entry = self._get_fresh(author_id)
+        if entry is not None and (entry.data is None or entry.written == entry.data):
+            # 缓存有效期内已经写过 (或确认获取不到)，无需再写
+            self.cache_hits += 1
+            return
+        if author_id in self._pending:
+            self.deduplicated += 1
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending[author_id] = (guild, source_member)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """获取待写作者的信息，把有变化的作者批量写入数据库"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+
+        async def resolve(author_id: int) -> Optional[AuthorData]:
+            guild, source_member = pending[author_id]
+            async with semaphore:
+                try:
+                    return await self.get_author_data(author_id, guild, source_member)
+                except Exception as e:
+                    logger.error(f"获取作者 {author_id} 信息时失败: {e}", exc_info=True)
+                    return None
+
+        resolved = await asyncio.gather(*(resolve(author_id) for author_id in pending))
+        to_write = [data for data in resolved if data and self.claim_write(data)]
+        if not to_write:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await AuthorRepository(session).bulk_upsert_authors(to_write)
+                await session.commit()
+            self.db_rows_written += len(to_write)
+            self.db_batches += 1
+        except Exception as e:
+            for data in to_write:
+                self.release_write(data["id"])
+            logger.error(f"批量写入 {len(to_write)} 个作者信息时失败: {e}", exc_info=True)
+
+    async def _run_loop(self):
+        while self._is_running:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("作者信息回写循环发生错误。", exc_info=e)
+
+    def get_stats(self) -> dict:
+        """统计信息，含每 1000 个帖子的用户获取次数和数据库写入行数"""
+        per_1k = 1000 / self.threads_seen if self.threads_seen else 0.0
+        return {
+            "threads_seen": self.threads_seen,
+            "user_lookups": self.user_lookups,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "db_rows_written": self.db_rows_written,
+            "db_batches": self.db_batches,
+            "user_lookups_per_1k_threads": round(self.user_lookups * per_1k, 1),
+            "db_writes_per_1k_threads": round(self.db_rows_written * per_1k, 1),
+            "cached_authors": len(self._cache),
+            "pending": len(self._pending),
+        }
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import func, select
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
@@ -41,6 +41,28 @@ class AuthorRepository:
             )
             raise  # 重新抛出异常
 
+    async def bulk_upsert_authors(self, authors_data: List[Dict[str, Any]]) -> None:
+        """
+        批量更新或插入作者信息，不提交事务。
+
+        Args:
+            authors_data: 作者信息字典列表，各字典的键相同。同一作者出现多次时以最后一次为准。
+        """
+        # 同一条语句中不能对同一行冲突更新两次，先按作者ID去重
+        unique_authors = list({data["id"]: data for data in authors_data}.values())
+        if not unique_authors:
+            return
+
+        # 以 executemany 方式执行同一条 Upsert 语句，语句只编译一次
+        stmt = sqlite_insert(Author.__table__)  # type: ignore[attr-defined]
+        update_stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                key: stmt.excluded[key] for key in unique_authors[0] if key != "id"
+            },
+        )
+        await self.session.execute(update_stmt, unique_authors)
+
     async def get_author(self, author_id: int) -> Optional[Author]:
         """根据作者ID获取作者实体信息。"""
         statement = select(Author).where(Author.id == author_id)  # type: ignore
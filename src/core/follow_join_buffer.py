@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, TextIO
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.follow_repository import ThreadFollowRepository
+
+if TYPE_CHECKING:
+    from core.followed_thread_index import FollowedThreadIndex
+
+logger = logging.getLogger(__name__)
+
+
+class FollowJoinBuffer:
+    """
+    用户加入帖子时的自动关注缓冲。
+
+    热门帖子短时间内涌入大量成员时，不再为每次加入各开一个事务查询并插入关注记录：
+    - 加入事件只记入内存，按 (用户, 帖子) 去重，保留最早的加入时间。
+    - 每 flush_interval 秒，或缓冲达到 max_batch 条时，用一条 INSERT ... ON CONFLICT DO NOTHING
+      批量写入 (ThreadFollowRepository.add_joined_follows)，已存在的关注保持不变。
+    - 每次加入同时追加到日志文件 journal_path，写库成功后日志文件被改写为仍未写入的部分；
+      进程意外退出后由 load() 重放日志。重放与写入都是幂等的，重复写入不会产生重复关注。
+    写入失败时本批保留在缓冲中，下次写入时重试。journal_path 为 None 时不持久化。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        followed_index: "FollowedThreadIndex",
+        *,
+        journal_path: Optional[str] = None,
+        flush_interval: float = 2.0,
+        max_batch: int = 500,
+    ):
+        self.session_factory = session_factory
+        self.followed_index = followed_index
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        # {(用户ID, 帖子ID): 加入时间}
+        self._pending: dict[tuple[int, int], datetime] = {}
+        self._journal: Optional[TextIO] = None
+        self._flush_lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计信息
+        self.joined_count = 0
+        self.deduplicated_count = 0
+        self.flushed_count = 0
+        self.inserted_count = 0
+        self.failed_flushes = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def load(self):
+        """重放上次未写入数据库的加入记录，并立即写入一次"""
+        if not self.journal_path:
+            return
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    entry = self._parse_line(line)
+                    if entry is None:
+                        continue
+                    key, joined_at = entry
+                    if key not in self._pending:
+                        self._pending[key] = joined_at
+                        replayed += 1
+        self._rewrite_journal()
+        if replayed:
+            logger.info(f"已恢复 {replayed} 条待写入的加入帖子自动关注。")
+            await self.flush()
+
+    def start(self):
+        """启动后台写入任务。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """停止后台任务并写入剩余的关注。写入失败的部分保留在日志中，下次启动时重放。"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def add(self, user_id: int, thread_id: int) -> bool:
+        """记录一次加入，立即返回。同一用户与帖子已在缓冲中时返回 False"""
+        key = (user_id, thread_id)
+        if key in self._pending:
+            self.deduplicated_count += 1
+            return False
+
+        joined_at = datetime.now(timezone.utc)
+        self._pending[key] = joined_at
+        self.joined_count += 1
+        self._append_journal(key, joined_at)
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return True
+
+    async def flush(self) -> int:
+        """将缓冲中的关注写入数据库，返回实际新增的关注数"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            # 写入期间到达的加入记入新的缓冲
+            batch, self._pending = self._pending, {}
+            try:
+                async with self.session_factory() as session:
+                    inserted = await ThreadFollowRepository(session).add_joined_follows(
+                        batch
+                    )
+                    await session.commit()
+            except Exception:
+                self.failed_flushes += 1
+                logger.error(
+                    f"写入 {len(batch)} 条加入帖子自动关注失败，稍后重试", exc_info=True
+                )
+                for key, joined_at in batch.items():
+                    if key not in self._pending or joined_at < self._pending[key]:
+                        self._pending[key] = joined_at
+                return 0
+
+            for thread_id in {thread_id for _, thread_id in batch}:
+                self.followed_index.mark(thread_id)
+            self.flushed_count += len(batch)
+            self.inserted_count += inserted
+            # 日志只保留仍在缓冲中的记录，写入期间到达的加入也在其中
+            self._rewrite_journal()
+            return inserted
+
+    # ---------------------------------------------------------
+    # 日志
+    # ---------------------------------------------------------
+    @staticmethod
+    def _format_line(key: tuple[int, int], joined_at: datetime) -> str:
+        return f"{key[0]} {key[1]} {joined_at.isoformat()}\n"
+
+    @staticmethod
+    def _parse_line(line: str) -> Optional[tuple[tuple[int, int], datetime]]:
+        # 意外退出时最后一行可能不完整，跳过即可
+        try:
+            user_id, thread_id, joined_at = line.split()
+            return (int(user_id), int(thread_id)), datetime.fromisoformat(joined_at)
+        except ValueError:
+            return None
+
+    def _append_journal(self, key: tuple[int, int], joined_at: datetime):
+        if not self.journal_path:
+            return
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(self._format_line(key, joined_at))
+            self._journal.flush()
+        except OSError:
+            # 内存中的缓冲仍然有效，只是意外退出后不会恢复
+            logger.error("写入加入帖子自动关注日志失败", exc_info=True)
+
+    def _rewrite_journal(self):
+        """用当前缓冲的内容原子地替换日志文件"""
+        if not self.journal_path:
+            return
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        temp_path = f"{self.journal_path}.tmp"
+        try:
+            directory = os.path.dirname(self.journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as journal:
+                journal.writelines(
+                    self._format_line(key, joined_at)
+                    for key, joined_at in self._pending.items()
+                )
+            os.replace(temp_path, self.journal_path)
+        except OSError:
+            logger.error("改写加入帖子自动关注日志失败", exc_info=True)
+
+    async def _run_loop(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._full.clear()
+                # 停止时不打断进行中的写入，stop() 的最后一次写入会等它完成
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("加入帖子自动关注写入循环发生错误。", exc_info=e)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "joined": self.joined_count,
+            "deduplicated": self.deduplicated_count,
+            "flushed": self.flushed_count,
+            "inserted": self.inserted_count,
+            "failed_flushes": self.failed_flushes,
+        }
@@ -2,14 +2,19 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import col
 
+from core.follow_unread_repository import FollowUnreadRepository
 from models import Thread, ThreadFollow
 
 logger = logging.getLogger(__name__)
 
+# 批量删除时每次 IN 条件中的帖子数
+THREAD_ID_CHUNK_SIZE = 500
+
 
 class ThreadFollowRepository:
     """关注列表服务"""
@@ -32,34 +37,16 @@ class ThreadFollowRepository:
             是否成功添加（如果已存在则返回False）
         """
         try:
-            # 检查是否已关注
-            statement = select(ThreadFollow).where(
-                and_(
-                    ThreadFollow.user_id == user_id, # type: ignore
-                    ThreadFollow.thread_id == thread_id # type: ignore
-                )
-            )
-            result = await self.session.execute(statement)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                logger.debug(f"用户 {user_id} 已关注帖子 {thread_id}")
-                return False
-
-            # 创建关注记录
-            now = datetime.now(timezone.utc)
-            follow = ThreadFollow(
-                user_id=user_id,
-                thread_id=thread_id,
-                followed_at=now,
-                last_viewed_at=now if auto_view else None,
+            added = await self._insert_follows(
+                [(user_id, thread_id)], auto_view=auto_view
             )
-
-            self.session.add(follow)
             await self.session.commit()
 
-            logger.debug(f"用户 {user_id} 已关注帖子 {thread_id}")
-            return True
+            if added:
+                logger.debug(f"用户 {user_id} 已关注帖子 {thread_id}")
+            else:
+                logger.debug(f"用户 {user_id} 已关注帖子 {thread_id}，跳过")
+            return added > 0
 
         except Exception as e:
             logger.error(f"添加关注失败: {e}", exc_info=True)
@@ -81,46 +68,108 @@ class ThreadFollowRepository:
             return 0
 
         try:
-            # 查询已存在的关注记录
-            statement = select(ThreadFollow.user_id).where(
-                and_(
-                    ThreadFollow.thread_id == thread_id,
-                    col(ThreadFollow.user_id).in_(user_ids),
-                )
+            added = await self._insert_follows(
+                [(user_id, thread_id) for user_id in user_ids]
             )
-            result = await self.session.execute(statement)
-            existing_user_ids = set(result.scalars().all())
-
-            # 过滤出需要添加的用户
-            new_user_ids = [uid for uid in user_ids if uid not in existing_user_ids]
+            await self.session.commit()
 
-            if not new_user_ids:
+            if not added:
                 logger.debug(f"帖子 {thread_id} 的所有用户都已关注")
-                return 0
+            return added
 
-            # 批量创建关注记录
-            now = datetime.now(timezone.utc)
-            follows = [
-                ThreadFollow(
-                    user_id=user_id,
-                    thread_id=thread_id,
-                    followed_at=now,
-                    last_viewed_at=None,  # 首次添加时不标记为已查看
-                )
-                for user_id in new_user_ids
-            ]
+        except Exception as e:
+            logger.error(f"批量添加关注失败: {e}", exc_info=True)
+            await self.session.rollback()
+            return 0
 
-            self.session.add_all(follows)
-            await self.session.commit()
+    async def batch_follow_threads(
+        self, user_id: int, thread_ids: List[int], auto_view: bool = False
+    ) -> int:
+        """
+        为一个用户批量关注多个帖子，已关注的帖子会被跳过
+
+        Args:
+            user_id: 用户Discord ID
+            thread_ids: 帖子Discord ID列表
+            auto_view: 是否标记为已查看
+
+        Returns:
+            成功添加的数量
+        """
+        if not thread_ids:
+            return 0
 
-            # logger.info(f"为帖子 {thread_id} 批量添加了 {len(new_user_ids)} 个关注")
-            return len(new_user_ids)
+        try:
+            added = await self._insert_follows(
+                [(user_id, thread_id) for thread_id in thread_ids], auto_view=auto_view
+            )
+            await self.session.commit()
+            return added
 
         except Exception as e:
-            logger.error(f"批量添加关注失败: {e}", exc_info=True)
+            logger.error(f"批量关注失败: {e}", exc_info=True)
             await self.session.rollback()
             return 0
 
+    async def add_joined_follows(self, joins: Dict[tuple[int, int], datetime]) -> int:
+        """
+        写入用户加入帖子产生的关注，关注时间与最后查看时间均为加入时间，已存在的关注保持不变。
+        不提交事务，由调用方 (FollowJoinBuffer) 提交并在失败时重试。
+
+        Args:
+            joins: {(用户ID, 帖子ID): 加入时间}
+
+        Returns:
+            实际插入的行数
+        """
+        return await self._insert_follow_rows(
+            [
+                {
+                    "user_id": user_id,
+                    "thread_id": thread_id,
+                    "followed_at": joined_at,
+                    "last_viewed_at": joined_at,
+                }
+                for (user_id, thread_id), joined_at in joins.items()
+            ]
+        )
+
+    async def _insert_follows(
+        self, pairs: List[tuple[int, int]], auto_view: bool = False
+    ) -> int:
+        """按 (用户ID, 帖子ID) 去重后写入关注，不提交事务。返回实际插入的行数"""
+        now = datetime.now(timezone.utc)
+        return await self._insert_follow_rows(
+            [
+                {
+                    "user_id": user_id,
+                    "thread_id": thread_id,
+                    "followed_at": now,
+                    "last_viewed_at": now if auto_view else None,
+                }
+                for user_id, thread_id in dict.fromkeys(pairs)
+            ]
+        )
+
+    async def _insert_follow_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        以 executemany 方式执行同一条 INSERT ... ON CONFLICT DO NOTHING，不逐个构造 ORM 对象，
+        由 (user_id, thread_id) 唯一索引 (init_db 中保证存在) 跳过已存在的关注。不提交事务。
+
+        Returns:
+            实际插入的行数
+        """
+        if not rows:
+            return 0
+        result = await self.session.execute(
+            # 显式指定冲突列：缺少唯一索引时直接报错，而不是悄悄插入重复的关注
+            sqlite_insert(ThreadFollow.__table__).on_conflict_do_nothing(  # type: ignore[attr-defined]
+                index_elements=["user_id", "thread_id"]
+            ),
+            rows,
+        )
+        return max(result.rowcount or 0, 0)  # type: ignore[attr-defined]
+
     async def remove_follow(self, user_id: int, thread_id: int) -> bool:
         """
         取消关注
@@ -154,6 +203,43 @@ class ThreadFollowRepository:
             await self.session.rollback()
             return False
 
+    async def batch_unfollow_threads(self, user_id: int, thread_ids: List[int]) -> int:
+        """
+        为一个用户批量取消关注多个帖子
+
+        Args:
+            user_id: 用户Discord ID
+            thread_ids: 帖子Discord ID列表
+
+        Returns:
+            实际取消的数量
+        """
+        if not thread_ids:
+            return 0
+
+        try:
+            unique_thread_ids = list(dict.fromkeys(thread_ids))
+            removed = 0
+            # 分块执行，避免超出 SQLite 的参数数量上限
+            for start in range(0, len(unique_thread_ids), THREAD_ID_CHUNK_SIZE):
+                chunk = unique_thread_ids[start : start + THREAD_ID_CHUNK_SIZE]
+                result = await self.session.execute(
+                    delete(ThreadFollow).where(
+                        and_(
+                            ThreadFollow.user_id == user_id,  # type: ignore
+                            col(ThreadFollow.thread_id).in_(chunk),
+                        )
+                    )
+                )
+                removed += result.rowcount  # type: ignore[attr-defined]
+            await self.session.commit()
+            return removed
+
+        except Exception as e:
+            logger.error(f"批量取消关注失败: {e}", exc_info=True)
+            await self.session.rollback()
+            return 0
+
     async def update_last_viewed(
         self, user_id: int, thread_id: Optional[int] = None
     ) -> bool:
@@ -170,39 +256,25 @@ class ThreadFollowRepository:
         try:
             now = datetime.now(timezone.utc)
 
+            # 单个帖子或全部关注都只执行一条 UPDATE，不加载 ORM 对象
+            statement = (
+                update(ThreadFollow)
+                .where(ThreadFollow.user_id == user_id)  # type: ignore
+                .values(last_viewed_at=now)
+            )
             if thread_id is not None:
-                # 更新单个帖子
-                statement = select(ThreadFollow).where(
-                    and_(
-                        ThreadFollow.user_id == user_id, # type: ignore
-                        ThreadFollow.thread_id == thread_id, # type: ignore
-                    )
-                )
-                result = await self.session.execute(statement)
-                follow = result.scalar_one_or_none()
-
-                if follow:
-                    follow.last_viewed_at = now
-                    self.session.add(follow)
-                    await self.session.commit()
-                    logger.debug(f"已更新用户 {user_id} 对帖子 {thread_id} 的查看时间")
-                    return True
-                else:
-                    logger.warning(f"用户 {user_id} 未关注帖子 {thread_id}")
-                    return False
-            else:
-                # 更新所有关注
-                statement = select(ThreadFollow).where(ThreadFollow.user_id == user_id) # type: ignore
-                result = await self.session.execute(statement)
-                follows = result.scalars().all()
-
-                for follow in follows:
-                    follow.last_viewed_at = now
-                    self.session.add(follow)
+                statement = statement.where(ThreadFollow.thread_id == thread_id)  # type: ignore
+            result = await self.session.execute(statement)
+            await self.session.commit()
 
-                await self.session.commit()
+            if thread_id is None:
                 logger.debug(f"已更新用户 {user_id} 的所有关注查看时间")
                 return True
+            if result.rowcount > 0:  # type: ignore[attr-defined]
+                logger.debug(f"已更新用户 {user_id} 对帖子 {thread_id} 的查看时间")
+                return True
+            logger.warning(f"用户 {user_id} 未关注帖子 {thread_id}")
+            return False
 
         except Exception as e:
             logger.error(f"更新查看时间失败: {e}", exc_info=True)
@@ -303,6 +375,8 @@ class ThreadFollowRepository:
         """
         获取用户未读更新的数量
 
+        未读数由触发器维护在 follow_unread_stat 中 (见 FollowUnreadRepository)，这里只读取一行。
+
         Args:
             user_id: 用户Discord ID
 
@@ -310,28 +384,7 @@ class ThreadFollowRepository:
             未读更新数量
         """
         try:
-            # 查询有更新且未查看的帖子数量
-            statement = (
-                select(func.count())
-                .select_from(ThreadFollow)
-                .join(Thread, ThreadFollow.thread_id == Thread.thread_id)
-                .where(
-                    and_(
-                        ThreadFollow.user_id == user_id,
-                        Thread.latest_update_at.isnot(None),
-                        # 未查看 或 更新时间晚于查看时间
-                        (
-                            (ThreadFollow.last_viewed_at.is_(None))
-                            | (Thread.latest_update_at > ThreadFollow.last_viewed_at)
-                        ),
-                    )
-                )
-            )
-
-            result = await self.session.execute(statement)
-            count = result.scalar() or 0
-
-            return count
+            return await FollowUnreadRepository(self.session).get_unread_count(user_id)
 
         except Exception as e:
             logger.error(f"获取未读数量失败: {e}", exc_info=True)
@@ -349,16 +402,46 @@ class ThreadFollowRepository:
             是否关注
         """
         try:
-            statement = select(ThreadFollow).where(
+            statement = select(ThreadFollow.id).where(
                 and_(
                     ThreadFollow.user_id == user_id, ThreadFollow.thread_id == thread_id
                 )
             )
             result = await self.session.execute(statement)
-            follow = result.scalar_one_or_none()
-
-            return follow is not None
+            return result.first() is not None
 
         except Exception as e:
             logger.error(f"检查关注状态失败: {e}", exc_info=True)
             return False
+
+    async def get_followed_thread_ids(self, thread_ids: List[int]) -> set[int]:
+        """
+        从给定的帖子ID列表中，返回至少有一条关注记录的帖子ID
+
+        Args:
+            thread_ids: 帖子Discord ID列表
+
+        Returns:
+            有关注记录的帖子Discord ID集合
+        """
+        if not thread_ids:
+            return set()
+
+        statement = (
+            select(ThreadFollow.thread_id)
+            .where(col(ThreadFollow.thread_id).in_(thread_ids))
+            .distinct()
+        )
+        result = await self.session.execute(statement)
+        return set(result.scalars().all())
+
+    async def get_all_followed_thread_ids(self) -> set[int]:
+        """
+        返回所有至少有一条关注记录的帖子ID，用于重建内存中的已关注帖子索引
+
+        Returns:
+            有关注记录的帖子Discord ID集合
+        """
+        statement = select(ThreadFollow.thread_id).distinct()
+        result = await self.session.execute(statement)
+        return set(result.scalars().all())
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.follow_unread_repository import FollowUnreadRepository
+
+logger = logging.getLogger(__name__)
+
+
+class FollowUnreadReconciler:
+    """
+    关注未读数的定期校正任务。
+
+    follow_unread_stat 由触发器增量维护，正常情况下不会出现偏差；绕过触发器的手工修改、
+    迁移前的旧数据等仍可能使计数偏离实际值。本任务每 interval 秒把物化表与关注表/帖子表的
+    直接聚合比对一次，只重新计算存在偏差的用户，并记录警告。
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, *, interval: float = 3600):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计信息
+        self.runs = 0
+        self.corrected_users = 0
+        self.last_drift = 0
+
+    def start(self):
+        """启动后台校正任务。"""
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def reconcile_once(self) -> int:
+        """比对并校正一次，返回存在偏差的用户数"""
+        async with self.session_factory() as session:
+            repo = FollowUnreadRepository(session)
+            drift = await repo.find_drift()
+            if drift:
+                logger.warning(
+                    f"关注未读数存在偏差，共 {len(drift)} 个用户，前几项 (用户, 表中的值, 实际值): {drift[:5]}"
+                )
+                await repo.reconcile(user_id for user_id, _, _ in drift)
+                await session.commit()
+
+        self.runs += 1
+        self.last_drift = len(drift)
+        self.corrected_users += len(drift)
+        return len(drift)
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.reconcile_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("校正关注未读数时发生错误。", exc_info=e)
+
+    def get_stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "last_drift": self.last_drift,
+            "corrected_users": self.corrected_users,
+        }
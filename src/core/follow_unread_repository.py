@@ -0,0 +1,113 @@
+import logging
+from typing import Iterable, List, cast
+
+from sqlalchemy import ColumnElement, and_, delete, func, insert, literal_column, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from models import FollowUnreadStat, Thread, ThreadFollow
+
+logger = logging.getLogger(__name__)
+
+# 每次 IN 条件中的用户数，避免超出 SQLite 的参数数量上限
+USER_ID_CHUNK_SIZE = 500
+
+
+class FollowUnreadRepository:
+    """
+    封装物化的关注未读数 (follow_unread_stat) 的读取、校验与校正。
+    该表由数据库触发器 (见 shared/database.py 的 FOLLOW_UNREAD_TRIGGERS) 增量维护，本类不提交事务。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_unread_count(self, user_id: int) -> int:
+        """按主键读取用户的未读更新数量，没有记录时为 0"""
+        result = await self.session.execute(
+            select(FollowUnreadStat.unread_count).where(
+                FollowUnreadStat.user_id == user_id
+            )
+        )
+        return max(int(result.scalar_one_or_none() or 0), 0)
+
+    # ---------------------------------------------------------
+    # 校验与校正
+    # ---------------------------------------------------------
+    @staticmethod
+    def _expected_counts_query():
+        """从关注表和帖子表直接聚合得到的 (用户, 未读数)，只包含未读数大于 0 的用户"""
+        latest_update_at = cast(ColumnElement, Thread.latest_update_at)
+        last_viewed_at = cast(ColumnElement, ThreadFollow.last_viewed_at)
+        return (
+            select(ThreadFollow.user_id, func.count().label("unread_count"))
+            .join(Thread, cast(ColumnElement, Thread.thread_id) == ThreadFollow.thread_id)
+            .where(
+                and_(
+                    latest_update_at.isnot(None),
+                    or_(last_viewed_at.is_(None), latest_update_at > last_viewed_at),
+                )
+            )
+            .group_by(ThreadFollow.user_id)
+        )
+
+    async def find_drift(self) -> List[tuple[int, int, int]]:
+        """
+        比对物化表与直接聚合的结果。
+
+        Returns:
+            [(用户ID, 表中的值, 实际值)]，无偏差时为空列表。
+        """
+        stored_result = await self.session.execute(
+            select(FollowUnreadStat.user_id, FollowUnreadStat.unread_count).where(
+                FollowUnreadStat.unread_count != 0
+            )
+        )
+        stored = {int(row[0]): int(row[1]) for row in stored_result.all()}
+        expected_result = await self.session.execute(self._expected_counts_query())
+        expected = {int(row[0]): int(row[1]) for row in expected_result.all()}
+        return [
+            (user_id, stored.get(user_id, 0), expected.get(user_id, 0))
+            for user_id in sorted(stored.keys() | expected.keys())
+            if stored.get(user_id, 0) != expected.get(user_id, 0)
+        ]
+
+    async def reconcile(self, user_ids: Iterable[int]) -> None:
+        """按关注表和帖子表重新计算指定用户的未读数"""
+        unique_user_ids = list(dict.fromkeys(user_ids))
+        for start in range(0, len(unique_user_ids), USER_ID_CHUNK_SIZE):
+            chunk = unique_user_ids[start : start + USER_ID_CHUNK_SIZE]
+            await self.session.execute(
+                delete(FollowUnreadStat).where(
+                    col(FollowUnreadStat.user_id).in_(chunk)
+                )
+            )
+            await self.session.execute(
+                insert(FollowUnreadStat).from_select(
+                    ["user_id", "unread_count"],
+                    self._expected_counts_query().where(
+                        col(ThreadFollow.user_id).in_(chunk)
+                    ),
+                )
+            )
+
+    async def rebuild(self) -> None:
+        """清空物化表并从关注表和帖子表重新聚合"""
+        await self.session.execute(delete(FollowUnreadStat))
+        await self.session.execute(
+            insert(FollowUnreadStat).from_select(
+                ["user_id", "unread_count"], self._expected_counts_query()
+            )
+        )
+
+    async def is_empty_with_unread(self) -> bool:
+        """物化表为空而存在未读的关注 (如未经迁移直接升级) 时返回 True，需要重建"""
+        has_stats = await self.session.execute(
+            select(literal_column("1")).select_from(FollowUnreadStat).limit(1)
+        )
+        if has_stats.first() is not None:
+            return False
+        has_unread = await self.session.execute(
+            self._expected_counts_query().limit(1)
+        )
+        return has_unread.first() is not None
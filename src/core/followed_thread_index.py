@@ -0,0 +1,71 @@
+import logging
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.follow_repository import ThreadFollowRepository
+
+logger = logging.getLogger(__name__)
+
+
+class FollowedThreadIndex:
+    """
+    内存中的 "已完成首次关注" 帖子集合，取代每次同步都查询关注表的做法。
+
+    帖子被加入集合的情况：关注表中已有该帖子的记录 (启动时 rebuild 读入)、任何途径新增了关注、
+    或首次检测的自动关注已经处理过 (即使成员为空或帖子已不可访问)。
+    集合只增不减：用户之后取消全部关注，也不会再次触发首次检测的自动关注。
+    rebuild 完成前 has_followers 回退到查询数据库，结果为真时同样记入集合。
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self._thread_ids: set[int] = set()
+        self._loaded = False
+
+        # 统计信息
+        self.memory_checks = 0
+        self.db_checks = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def rebuild(self):
+        """从关注表重建索引。重建期间标记的帖子会保留"""
+        async with self.session_factory() as session:
+            thread_ids = await ThreadFollowRepository(
+                session
+            ).get_all_followed_thread_ids()
+        self._thread_ids |= thread_ids
+        self._loaded = True
+        logger.info(f"已关注帖子索引重建完成，共 {len(self._thread_ids)} 个帖子。")
+
+    def mark(self, thread_id: int):
+        """记录帖子已有关注 (或已处理过首次检测)"""
+        self._thread_ids.add(thread_id)
+
+    async def has_followers(self, thread_id: int) -> bool:
+        if thread_id in self._thread_ids:
+            self.memory_checks += 1
+            return True
+        if self._loaded:
+            self.memory_checks += 1
+            return False
+
+        self.db_checks += 1
+        async with self.session_factory() as session:
+            followed = await ThreadFollowRepository(session).get_followed_thread_ids(
+                [thread_id]
+            )
+        if thread_id in followed:
+            self._thread_ids.add(thread_id)
+            return True
+        return False
+
+    def get_stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "indexed_threads": len(self._thread_ids),
+            "memory_checks": self.memory_checks,
+            "db_checks": self.db_checks,
+        }
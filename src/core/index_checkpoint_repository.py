@@ -0,0 +1,116 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models import IndexCheckpoint
+from shared.enum.index_mode import IndexMode, IndexStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """SQLite 不保存时区信息，读出的时间统一视为 UTC"""
+    if dt is None or dt.tzinfo is not None:
+        return dt
+    return dt.replace(tzinfo=timezone.utc)
+
+
+class IndexCheckpointRepository:
+    """封装与 IndexCheckpoint 表相关的数据库操作。"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_checkpoint(self, channel_id: int) -> Optional[IndexCheckpoint]:
+        """获取频道的索引检查点，时间字段统一转换为 UTC。"""
+        result = await self.session.execute(
+            select(IndexCheckpoint).where(IndexCheckpoint.channel_id == channel_id)
+        )
+        checkpoint = result.scalar_one_or_none()
+        if checkpoint:
+            checkpoint.archive_before = _as_utc(checkpoint.archive_before)
+            checkpoint.started_at = _as_utc(checkpoint.started_at)  # type: ignore[assignment]
+            checkpoint.last_success_started_at = _as_utc(
+                checkpoint.last_success_started_at
+            )
+        return checkpoint
+
+    async def start_run(
+        self,
+        channel_id: int,
+        mode: IndexMode,
+        started_at: datetime,
+        archive_before: Optional[datetime] = None,
+        discovered: int = 0,
+        processed: int = 0,
+        failures: int = 0,
+    ) -> None:
+        """
+        标记一次索引任务开始。续建时传入上一次的游标与计数；
+        `last_success_started_at` 不会被覆盖。
+        """
+        values = {
+            "channel_id": channel_id,
+            "status": IndexStatus.RUNNING.value,
+            "mode": mode.value,
+            "archive_before": archive_before,
+            "discovered": discovered,
+            "processed": processed,
+            "failures": failures,
+            "started_at": started_at,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        stmt = sqlite_insert(IndexCheckpoint).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["channel_id"],
+            set_={k: v for k, v in values.items() if k != "channel_id"},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def save_progress(
+        self,
+        channel_id: int,
+        archive_before: Optional[datetime],
+        discovered: int,
+        processed: int,
+        failures: int,
+    ) -> None:
+        """持久化已安全处理完毕的归档分页游标及计数。"""
+        stmt = (
+            update(IndexCheckpoint)
+            .where(IndexCheckpoint.channel_id == channel_id)  # type: ignore
+            .values(
+                archive_before=archive_before,
+                discovered=discovered,
+                processed=processed,
+                failures=failures,
+            )
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def finish_run(
+        self, channel_id: int, status: IndexStatus, started_at: datetime
+    ) -> None:
+        """
+        标记一次索引任务结束。
+        成功完成时清空游标，并把本次开始时间记为下次增量索引的基准。
+        """
+        values: dict = {"status": status.value}
+        if status == IndexStatus.COMPLETED:
+            values["archive_before"] = None
+            values["last_success_started_at"] = started_at
+
+        stmt = (
+            update(IndexCheckpoint)
+            .where(IndexCheckpoint.channel_id == channel_id)  # type: ignore
+            .values(**values)
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
@@ -0,0 +1,103 @@
+import logging
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.config_repository import ConfigRepository
+from models import MutexTagGroup
+
+logger = logging.getLogger(__name__)
+
+
+class _CompiledGroup(NamedTuple):
+    group: MutexTagGroup
+    # {标签名: 按优先级排序后的位置}，越小优先级越高
+    priorities: dict[str, int]
+    override_tag_name: Optional[str]
+
+
+class MutexConflict(NamedTuple):
+    """一个互斥组在某个帖子上的冲突"""
+
+    group: MutexTagGroup
+    conflicting_names: set[str]
+    keep_name: str
+    """没有覆盖标签时保留的最高优先级标签名"""
+    override_tag_name: Optional[str]
+
+
+class MutexTagMatcher:
+    """
+    编译后的互斥标签规则。
+
+    从数据库读取全部互斥组后建立 {标签名: [互斥组]} 的倒排索引，判断一个帖子的标签是否冲突时
+    只需对帖子的每个标签查一次索引，不访问数据库。互斥规则按标签名配置 (不同论坛中同名标签的ID不同)，
+    因此索引以标签名为键。配置面板保存或删除互斥组后需调用 refresh。
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self._groups: List[_CompiledGroup] = []
+        self._index: dict[str, List[int]] = {}
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def refresh(self):
+        """从数据库重新读取并编译全部互斥组"""
+        async with self.session_factory() as session:
+            groups = await ConfigRepository(session).get_all_mutex_groups_with_rules()
+        self.compile(groups)
+        logger.info(f"互斥标签规则已编译，共 {len(self._groups)} 个互斥组。")
+
+    def compile(self, groups: Iterable[MutexTagGroup]):
+        compiled: List[_CompiledGroup] = []
+        index: dict[str, List[int]] = {}
+        for group in groups:
+            priorities: dict[str, int] = {}
+            for rule in sorted(group.rules, key=lambda r: r.priority):
+                priorities.setdefault(rule.tag_name, len(priorities))
+            if len(priorities) < 2:
+                continue
+            position = len(compiled)
+            compiled.append(_CompiledGroup(group, priorities, group.override_tag_name))
+            for name in priorities:
+                index.setdefault(name, []).append(position)
+
+        # 整体替换，评估过程中不会看到编译到一半的结果
+        self._groups, self._index = compiled, index
+        self._loaded = True
+
+    async def ensure_loaded(self):
+        if not self._loaded:
+            await self.refresh()
+
+    def match(self, tag_names: Iterable[str]) -> List[MutexConflict]:
+        """返回帖子标签触发的所有互斥组冲突，按互斥组的读取顺序排列"""
+        hits: dict[int, set[str]] = {}
+        for name in set(tag_names):
+            for position in self._index.get(name, ()):
+                hits.setdefault(position, set()).add(name)
+
+        conflicts = []
+        for position in sorted(hits):
+            names = hits[position]
+            if len(names) < 2:
+                continue
+            compiled = self._groups[position]
+            keep_name = min(names, key=compiled.priorities.__getitem__)
+            conflicts.append(
+                MutexConflict(
+                    compiled.group, names, keep_name, compiled.override_tag_name
+                )
+            )
+        return conflicts
+
+    def get_stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "groups": len(self._groups),
+            "indexed_tag_names": len(self._index),
+        }
@@ -23,6 +23,21 @@ class RedisTrendService:
         await redis.zincrby(key, count, str(thread_id))
         await redis.expire(key, 86400 * ConstantEnum.MAX_SURGE_DAYS.value)
 
+    async def record_increments(self, metric: str, counts: dict[int, int]):
+        """批量记录多个帖子的增量，所有命令通过一次管道提交，只产生一次网络往返"""
+        counts = {thread_id: count for thread_id, count in counts.items() if count > 0}
+        if not counts:
+            return
+
+        redis = RedisManager.get_client()
+        key = self._get_daily_key(metric, datetime.now(timezone.utc))
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for thread_id, count in counts.items():
+                pipe.zincrby(key, count, str(thread_id))
+            pipe.expire(key, 86400 * ConstantEnum.MAX_SURGE_DAYS.value)
+            await pipe.execute()
+
     async def get_top_surging_ids(self, metric: str, days: int, limit: int) -> list[int]:
         """聚合多天数据带有分布式锁机制以确保高并发性能"""
         redis = RedisManager.get_client()
@@ -1,5 +1,5 @@
-import asyncio
 import datetime
+import hashlib
 import logging
 import re
 from typing import TYPE_CHECKING, List, Optional, Union
@@ -7,10 +7,14 @@ from typing import TYPE_CHECKING, List, Optional, Union
 import discord
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from core.author_repository import AuthorRepository
+from core.author_cache_service import AuthorCacheService
+from core.follow_repository import ThreadFollowRepository
+from core.followed_thread_index import FollowedThreadIndex
 from core.tag_repository import TagRepository
+from core.thread_record_dto import ThreadRecord
 from core.thread_repository import ThreadRepository
-from shared.discord_utils import DiscordUtils
+from shared.enum.api_route import APIRoute
+from shared.exceptions import APIQueueFullError
 
 if TYPE_CHECKING:
     from bot_main import MyBot
@@ -27,52 +31,60 @@ class SyncService:
         self,
         bot: "MyBot",
         session_factory: async_sessionmaker,
+        author_cache: Optional[AuthorCacheService] = None,
     ):
         self.bot = bot
         self.session_factory = session_factory
+        # 作者信息的缓存与批量回写
+        self.author_cache = author_cache or AuthorCacheService(bot, session_factory)
+        # 已有关注的帖子索引，启动时由 bot 调用 rebuild
+        self.followed_index = FollowedThreadIndex(session_factory)
 
-    async def _save_author_to_db(
-        self,
-        author_id: int,
-        guild: discord.Guild,
-        source_member: discord.Member | discord.User | None = None,
-    ) -> None:
+        # 统计信息：因元数据未变化而跳过的帖子数 / 完整解析的帖子数
+        self.skipped_count = 0
+        self.parsed_count = 0
+
+    @staticmethod
+    def compute_fingerprint(thread: discord.Thread) -> str:
         """
-        获取作者信息并保存到数据库。
+        根据标题、已应用的标签、消息数和最后一条消息ID计算帖子的元数据指纹。
+        这些字段都来自帖子对象本身，计算指纹不需要额外的 API 请求。
         """
-        # 获取用户对象
-        user_obj = await DiscordUtils.get_or_fetch_user(
-            bot=self.bot,
-            user_id=author_id,
-            guild=guild,
-            source_member=source_member,
+        tag_ids = ",".join(
+            str(tag_id) for tag_id in sorted(t.id for t in thread.applied_tags or [])
         )
+        raw = f"{thread.name}|{tag_ids}|{thread.message_count}|{thread.last_message_id}"
+        return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
 
-        if not user_obj:
-            return
-
-        # 准备要插入或更新的数据
-        author_data = {
-            "id": user_obj.id,
-            "name": user_obj.name,
-            "global_name": user_obj.global_name,
-            "display_name": user_obj.display_name,
-            "avatar_url": user_obj.display_avatar.url,
-        }
-
-        # 存储数据
-        try:
-            async with self.session_factory() as session:
-                repository = AuthorRepository(session)
-                await repository.upsert_author(author_data)
-        except Exception as e:
-            logger.error(f"更新作者 {author_id} 信息到数据库时失败: {e}", exc_info=True)
+    async def skip_if_unchanged(self, thread: discord.Thread) -> bool:
+        """
+        检查帖子自上次完整同步以来元数据是否未变化。
 
-    async def _parse_thread_data(self, thread: discord.Thread) -> Optional[dict]:
+        未变化时只将 not_found_count 归零 (如有必要) 并返回 True，调用方可以跳过读取
+        历史消息的完整解析；帖子未入库、没有指纹或指纹不同时返回 False。
+        """
+        async with self.session_factory() as session:
+            repo = ThreadRepository(session=session)
+            state = await repo.get_sync_state(thread.id)
+            if state is None or state[0] != self.compute_fingerprint(thread):
+                return False
+            if state[1]:
+                await repo.reset_not_found_count(thread.id)
+
+        self.skipped_count += 1
+        return True
+
+    async def _parse_thread_data(
+        self, thread: discord.Thread, *, save_author: bool = True
+    ) -> Optional[dict]:
         """
         解析一个帖子，根据其结构（普通或重建）返回标准化的数据字典。
         如果帖子无效或不满足索引条件，返回 None。
+
+        Args:
+            save_author: 是否把作者交给 AuthorCacheService 在后台批量写入。批量写入时由调用方自行获取作者。
         """
+        self.parsed_count += 1
         messages = [msg async for msg in thread.history(limit=2, oldest_first=True)]
         if not messages:
             return None
@@ -175,6 +187,9 @@ class SyncService:
                 target_message = await self.bot.api_scheduler.submit(
                     coro_factory=lambda: target_channel.fetch_message(message_id),
                     priority=5,  # 中等优先级
+                    route=APIRoute.FETCH_MESSAGE,
+                    major_id=channel_id,
+                    dedup_key=(APIRoute.FETCH_MESSAGE, channel_id, message_id),
                 )
 
                 if not target_message or not target_message.attachments:
@@ -252,13 +267,9 @@ class SyncService:
                 if inline_image_urls:
                     thumbnail_urls.extend(inline_image_urls)
 
-        if final_author_id and thread.guild:
-            asyncio.create_task(
-                self._save_author_to_db(
-                    author_id=final_author_id,
-                    guild=thread.guild,
-                    source_member=source_user_for_author_service,
-                )
+        if save_author and final_author_id and thread.guild:
+            self.author_cache.enqueue(
+                final_author_id, thread.guild, source_user_for_author_service
             )
 
         return {
@@ -276,18 +287,20 @@ class SyncService:
             "not_found_count": 0,
             "first_message_excerpt": excerpt,
             "thumbnail_urls": thumbnail_urls,
+            "sync_fingerprint": self.compute_fingerprint(thread),
         }
 
-    async def sync_thread(
+    async def _resolve_thread(
         self,
         thread: Union[discord.Thread, int],
-        priority: int = 10,
-        *,
-        fetch_if_incomplete: bool = False,
-    ):
+        priority: int,
+        fetch_if_incomplete: bool,
+        raise_errors: bool = False,
+    ) -> Optional[discord.Thread]:
         """
-        同步一个帖子的数据到数据库，包括其标签。
-        该方法可以接受一个完整的帖子对象，或者一个帖子ID。
+        将帖子ID或可能不完整的帖子对象解析为完整的帖子对象。
+        找不到帖子时增加其 not_found_count 并返回 None；获取时发生其他错误时，
+        raise_errors 为 True 则抛出，否则记录日志并返回 None。
         """
         if isinstance(thread, int):
             thread_id = thread
@@ -295,6 +308,9 @@ class SyncService:
                 fetched_channel = await self.bot.api_scheduler.submit(
                     coro_factory=lambda tid=thread_id: self.bot.fetch_channel(tid),
                     priority=priority,
+                    route=APIRoute.FETCH_CHANNEL,
+                    major_id=thread_id,
+                    dedup_key=(APIRoute.FETCH_CHANNEL, thread_id),
                 )
                 if not isinstance(fetched_channel, discord.Thread):
                     logger.warning(
@@ -303,7 +319,7 @@ class SyncService:
                     async with self.session_factory() as session:
                         repo = ThreadRepository(session=session)
                         await repo.increment_not_found_count(thread_id=thread_id)
-                    return
+                    return None
                 thread = fetched_channel
             except discord.NotFound:
                 logger.warning(
@@ -312,13 +328,18 @@ class SyncService:
                 async with self.session_factory() as session:
                     repo = ThreadRepository(session=session)
                     await repo.increment_not_found_count(thread_id=thread_id)
-                return
+                return None
+            except APIQueueFullError:
+                # 调度队列已满，交给调用方决定是否稍后重试 (如审计提前结束本批)
+                raise
             except Exception as e:
+                if raise_errors:
+                    raise
                 logger.error(
                     f"sync_thread: 通过ID {thread_id} 获取帖子时发生未知错误: {e}",
                     exc_info=True,
                 )
-                return
+                return None
 
         elif fetch_if_incomplete:
             try:
@@ -326,6 +347,9 @@ class SyncService:
                 thread = await self.bot.api_scheduler.submit(
                     coro_factory=lambda tid=thread_id: self.bot.fetch_channel(tid),
                     priority=priority,
+                    route=APIRoute.FETCH_CHANNEL,
+                    major_id=thread_id,
+                    dedup_key=(APIRoute.FETCH_CHANNEL, thread_id),
                 )
             except discord.NotFound:
                 logger.warning(
@@ -334,9 +358,92 @@ class SyncService:
                 async with self.session_factory() as session:
                     repo = ThreadRepository(session=session)
                     await repo.increment_not_found_count(thread_id=thread.id)
-                return
+                return None
 
         assert isinstance(thread, discord.Thread)
+        return thread
+
+    async def build_thread_record(
+        self,
+        thread: Union[discord.Thread, int],
+        priority: int = 10,
+        *,
+        fetch_if_incomplete: bool = False,
+    ) -> Optional[ThreadRecord]:
+        """
+        解析一个帖子及其标签和作者，返回待写入的记录，不写入数据库。
+        供 ThreadBatchWriteService 批量写入使用；帖子无效或不满足索引条件时返回 None。
+        """
+        resolved = await self._resolve_thread(thread, priority, fetch_if_incomplete)
+        if resolved is None:
+            return None
+
+        thread_data = await self._parse_thread_data(resolved, save_author=False)
+        if thread_data is None:
+            return None
+
+        author_data = None
+        if thread_data["author_id"] and resolved.guild:
+            try:
+                # 与上次写入相同的作者不再随帖子写入
+                author_data = await self.author_cache.get_author_for_record(
+                    thread_data["author_id"], resolved.guild, resolved.owner
+                )
+            except Exception as e:
+                logger.error(
+                    f"获取作者 {thread_data['author_id']} 信息时失败: {e}", exc_info=True
+                )
+
+        return {
+            "thread_data": thread_data,
+            "tags_data": {t.id: t.name for t in resolved.applied_tags or []},
+            "author_data": author_data,
+        }
+
+    async def sync_thread(
+        self,
+        thread: Union[discord.Thread, int],
+        priority: int = 10,
+        *,
+        fetch_if_incomplete: bool = False,
+        skip_unchanged: bool = False,
+        raise_errors: bool = False,
+    ) -> bool:
+        """
+        同步一个帖子的数据到数据库，包括其标签。
+        该方法可以接受一个完整的帖子对象，或者一个帖子ID。
+
+        Args:
+            skip_unchanged: 元数据指纹与上次完整同步相同时跳过解析 (用于审计等批量重新同步)。
+                首楼编辑不会改变指纹，由消息编辑事件以默认参数触发同步。
+            raise_errors: 为 True 时，通过ID获取帖子发生的错误 (找不到帖子除外) 直接抛出，
+                由需要重试的调用方 (如补录队列) 处理；默认记录日志后返回 False。
+
+        Returns:
+            帖子已写入数据库 (或因未变化而跳过) 时为 True；帖子不存在、不满足索引条件
+            或获取失败时为 False
+        """
+        # 已有完整帖子对象时，在重新获取之前就检查指纹，未变化则连获取请求也省去
+        if (
+            skip_unchanged
+            and isinstance(thread, discord.Thread)
+            and await self.skip_if_unchanged(thread)
+        ):
+            return True
+
+        resolved = await self._resolve_thread(
+            thread, priority, fetch_if_incomplete, raise_errors
+        )
+        if resolved is None:
+            return False
+        # 只有帖子ID时，需要先获取帖子对象才能计算指纹
+        if (
+            skip_unchanged
+            and isinstance(thread, int)
+            and await self.skip_if_unchanged(resolved)
+        ):
+            return True
+        thread = resolved
 
         # 调用辅助方法解析帖子数据
         thread_data = await self._parse_thread_data(thread)
@@ -344,7 +451,7 @@ class SyncService:
         # 检查解析结果，如果为 None 则中止同步
         if thread_data is None:
             # logger.info(f"帖子 {thread.id} 不满足索引条件或无效，同步中止。")
-            return
+            return False
 
         # 准备标签数据并存入数据库
         tags_data = {t.id: t.name for t in thread.applied_tags or []}
@@ -357,28 +464,13 @@ class SyncService:
             repo = ThreadRepository(session=session)
             await repo.add_or_update_thread_with_tags(thread_data=thread_data, tags=tags)
 
-        # 检查是否是首次被关注（检查关注表而不是帖子表）
-        is_first_follow = False
-        async with self.session_factory() as session:
-            from sqlmodel import func, select
-
-            from models import ThreadFollow
+        # 检查是否是首次被关注（查询内存中的已关注帖子索引）
+        if not await self.followed_index.has_followers(thread.id):
+            # 首次被关注的老帖子，批量添加所有成员到关注列表
+            await self.auto_follow_on_first_detect(thread)
+        return True
 
-            # 检查该帖子是否有任何关注记录
-            statement = (
-                select(func.count())
-                .select_from(ThreadFollow)
-                .where(ThreadFollow.thread_id == thread.id)
-            )
-            result = await session.execute(statement)
-            follow_count = result.scalar() or 0
-            is_first_follow = follow_count == 0
-
-        # 如果是首次被关注的老帖子，批量添加所有成员到关注列表
-        if is_first_follow:
-            await self._auto_follow_on_first_detect(thread)
-
-    async def _auto_follow_on_first_detect(self, thread: discord.Thread):
+    async def auto_follow_on_first_detect(self, thread: discord.Thread):
         """首次检测到老帖子时，自动为所有成员添加关注"""
         try:
             # 获取帖子中的所有成员ID
@@ -391,8 +483,6 @@ class SyncService:
                 member_ids.append(member.id)
 
             if member_ids:
-                from core.follow_repository import ThreadFollowRepository
-
                 async with self.session_factory() as session:
                     follow_service = ThreadFollowRepository(session)
                     added_count = await follow_service.batch_add_follows(
@@ -402,9 +492,13 @@ class SyncService:
                         logger.info(
                             f"老帖子 {thread.id} 首次检测，为 {added_count} 个成员添加了自动关注"
                         )
+            # 成员为空也视为已处理，避免每次同步都重新获取成员列表
+            self.followed_index.mark(thread.id)
         except discord.NotFound:
             logger.warning(f"老帖子 {thread.id} 已被删除，跳过自动关注")
+            self.followed_index.mark(thread.id)
         except discord.Forbidden:
             logger.warning(f"老帖子 {thread.id} 没有权限获取成员列表，跳过自动关注")
+            self.followed_index.mark(thread.id)
         except Exception as e:
             logger.error(f"老帖子自动关注失败 (帖子 {thread.id}): {e}", exc_info=True)
@@ -1,6 +1,9 @@
+import asyncio
+import bisect
 import logging
+import time
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, Iterable, List, Protocol
 
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
@@ -9,9 +12,20 @@ from core.tag_repository import TagRepository
 logger = logging.getLogger(__name__)
 
 
+class ForumTagLike(Protocol):
+    """discord.ForumTag 中本服务用到的部分"""
+
+    id: int
+    name: str
+
+
 class TagCacheService:
     """
     一个封装了标签缓存的服务
+
+    - build_cache: 从数据库全量重建缓存，在启动时以及无法增量更新时使用。
+    - apply_channel_tag_diff: 频道的可用标签变化时，只写入/更新/删除变化的标签并就地修改缓存。
+    两者的耗时 (总耗时与不让出事件循环的同步部分) 分别记录在 last_rebuild_stats / last_diff_stats。
     """
 
     def __init__(self, session_factory: async_sessionmaker):
@@ -19,38 +33,148 @@ class TagCacheService:
         self._id_to_name: Dict[int, str] = {}
         self._name_to_ids: Dict[str, List[int]] = defaultdict(list)
         self._unique_tag_names: List[str] = []
+        # 至少有一个已索引帖子使用的标签ID，用于计算 global_merged_tags
+        self._used_tag_ids: set[int] = set()
         self.global_merged_tags: list[str] = []
+        # 全量重建与增量更新互斥，避免重建读到旧数据后覆盖增量更新的结果
+        self._lock = asyncio.Lock()
+
+        self.last_rebuild_stats: dict = {}
+        self.last_diff_stats: dict = {}
 
     async def build_cache(self):
         """
         从数据库加载所有标签，并构建/重建缓存。
-        这应该在机器人启动时以及索引更新后调用。
+        这应该在机器人启动时以及增量更新失败后调用。
         """
         logger.debug("Building tag cache...")
-        async with self.session_factory() as session:
-            tag_service = TagRepository(session)
-            all_tags = await tag_service.get_all_tags()
-            all_unique_tags_from_indexed_threads = (
-                await tag_service.get_all_unique_tags_from_indexed_threads()
-            )
-
-        self._id_to_name.clear()
-        self._name_to_ids.clear()
-
-        temp_name_to_ids = defaultdict(list)
-        for tag in all_tags:
-            self._id_to_name[tag.id] = tag.name
-            temp_name_to_ids[tag.name].append(tag.id)
-
-        self._name_to_ids = dict(temp_name_to_ids)
-        self._unique_tag_names = sorted(self._name_to_ids.keys())
+        async with self._lock:
+            started = time.perf_counter()
+            async with self.session_factory() as session:
+                tag_service = TagRepository(session)
+                all_tags = await tag_service.get_all_tags()
+                all_unique_tags_from_indexed_threads = (
+                    await tag_service.get_all_unique_tags_from_indexed_threads()
+                )
+
+            blocking_started = time.perf_counter()
+            temp_name_to_ids = defaultdict(list)
+            id_to_name: Dict[int, str] = {}
+            for tag in all_tags:
+                id_to_name[tag.id] = tag.name
+                temp_name_to_ids[tag.name].append(tag.id)
+
+            self._id_to_name = id_to_name
+            self._name_to_ids = dict(temp_name_to_ids)
+            self._unique_tag_names = sorted(self._name_to_ids.keys())
+            self._used_tag_ids = {tag.id for tag in all_unique_tags_from_indexed_threads}
+            self._refresh_global_merged_tags()
+            finished = time.perf_counter()
+
+        self.last_rebuild_stats = {
+            "tags": len(all_tags),
+            "total_seconds": finished - started,
+            "blocking_seconds": finished - blocking_started,
+        }
         logger.info(
             f"Tag cache built. Found {len(all_tags)} tags, "
-            f"{len(self._unique_tag_names)} unique names."
+            f"{len(self._unique_tag_names)} unique names. "
+            f"耗时 {self.last_rebuild_stats['total_seconds'] * 1000:.1f}ms，"
+            f"其中阻塞事件循环 {self.last_rebuild_stats['blocking_seconds'] * 1000:.1f}ms。"
         )
 
+    async def apply_channel_tag_diff(
+        self, before_tags: Iterable[ForumTagLike], after_tags: Iterable[ForumTagLike]
+    ) -> dict:
+        """
+        根据频道更新前后的可用标签，增量更新数据库中的标签表与缓存。
+
+        - 新增与改名的标签写入数据库 (一条 Upsert) 并更新缓存。
+        - 移除的标签只在没有任何帖子使用时从数据库和缓存中删除；仍被使用的标签保留，
+          这样已索引的帖子仍能按标签名搜索到。
+        出错时抛出异常，调用方应回退到 build_cache。
+
+        Returns:
+            {"added": [...], "renamed": [...], "removed": [...], "total_seconds": ..., "blocking_seconds": ...}
+        """
+        before = {tag.id: tag.name for tag in before_tags}
+        after = {tag.id: tag.name for tag in after_tags}
+        added = {tag_id: name for tag_id, name in after.items() if tag_id not in before}
+        renamed = {
+            tag_id: name
+            for tag_id, name in after.items()
+            if tag_id in before and before[tag_id] != name
+        }
+        removed = [tag_id for tag_id in before if tag_id not in after]
+
+        async with self._lock:
+            started = time.perf_counter()
+            deleted: list[int] = []
+            if added or renamed or removed:
+                async with self.session_factory() as session:
+                    tag_repository = TagRepository(session)
+                    await tag_repository.upsert_tags({**added, **renamed})
+                    deleted = await tag_repository.delete_unused_tags(removed)
+                    await session.commit()
+
+            blocking_started = time.perf_counter()
+            for tag_id, name in {**added, **renamed}.items():
+                self._set_tag(tag_id, name)
+            for tag_id in deleted:
+                self._remove_tag(tag_id)
+            if self._used_tag_ids.intersection(renamed):
+                self._refresh_global_merged_tags()
+            finished = time.perf_counter()
+
+        self.last_diff_stats = {
+            "added": sorted(added),
+            "renamed": sorted(renamed),
+            "removed": sorted(deleted),
+            "total_seconds": finished - started,
+            "blocking_seconds": finished - blocking_started,
+        }
+        return self.last_diff_stats
+
+    def _set_tag(self, tag_id: int, name: str):
+        old_name = self._id_to_name.get(tag_id)
+        if old_name == name:
+            return
+        if old_name is not None:
+            self._discard_name_id(old_name, tag_id)
+        self._id_to_name[tag_id] = name
+        ids = self._name_to_ids.setdefault(name, [])
+        if not ids:
+            bisect.insort(self._unique_tag_names, name)
+        ids.append(tag_id)
+
+    def _remove_tag(self, tag_id: int):
+        name = self._id_to_name.pop(tag_id, None)
+        if name is not None:
+            self._discard_name_id(name, tag_id)
+        if tag_id in self._used_tag_ids:
+            self._used_tag_ids.discard(tag_id)
+            self._refresh_global_merged_tags()
+
+    def _discard_name_id(self, name: str, tag_id: int):
+        ids = self._name_to_ids.get(name)
+        if not ids:
+            return
+        if tag_id in ids:
+            ids.remove(tag_id)
+        if not ids:
+            del self._name_to_ids[name]
+            index = bisect.bisect_left(self._unique_tag_names, name)
+            if (
+                index < len(self._unique_tag_names)
+                and self._unique_tag_names[index] == name
+            ):
+                del self._unique_tag_names[index]
+
+    def _refresh_global_merged_tags(self):
         self.global_merged_tags = sorted(
-            [tag.name for tag in all_unique_tags_from_indexed_threads]
+            self._id_to_name[tag_id]
+            for tag_id in self._used_tag_ids
+            if tag_id in self._id_to_name
         )
 
     def get_tag_name_by_id(self, tag_id: int) -> str | None:
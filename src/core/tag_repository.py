@@ -1,12 +1,12 @@
 import logging
 from typing import List, Sequence, cast
 
-from sqlalchemy import ColumnElement
+from sqlalchemy import ColumnElement, delete, exists
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from models import Tag, Thread
+from models import Tag, Thread, ThreadTagLink
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,20 @@ class TagRepository:
             return []
 
         tag_ids = list(tags_data.keys())
+        await self.upsert_tags(tags_data)
+
+        # 查询所有相关的标签对象
+        final_statement = select(Tag).where(cast(ColumnElement, Tag.id).in_(tag_ids))
+        result = await self.session.execute(final_statement)
+        return list(result.scalars().all())
+
+    async def upsert_tags(self, tags_data: dict[int, str]) -> None:
+        """
+        根据标签ID和名称的字典，创建或更新标签，不查询标签对象。
+        """
+        if not tags_data:
+            return
+
         values_to_insert = [{"id": id, "name": name} for id, name in tags_data.items()]
 
         # 使用 INSERT ... ON CONFLICT DO UPDATE 一次性完成创建和更新
@@ -39,11 +53,6 @@ class TagRepository:
 
         await self.session.execute(update_stmt)
 
-        # 查询所有相关的标签对象
-        final_statement = select(Tag).where(cast(ColumnElement, Tag.id).in_(tag_ids))
-        result = await self.session.execute(final_statement)
-        return list(result.scalars().all())
-
     async def get_tags_for_channels(self, channel_ids: List[int]) -> Sequence[Tag]:
         """获取指定频道列表内的所有唯一标签"""
         statement = (
@@ -67,6 +76,25 @@ class TagRepository:
         result = await self.session.execute(statement)
         return result.scalars().all()
 
+    async def delete_unused_tags(self, tag_ids: List[int]) -> List[int]:
+        """
+        删除给定ID中没有任何帖子关联的标签，返回被删除的标签ID。不提交事务。
+        仍被帖子使用的标签会保留，以免影响按标签名搜索这些帖子。
+        """
+        if not tag_ids:
+            return []
+
+        unused = ~exists().where(ThreadTagLink.tag_id == Tag.id)
+        result = await self.session.execute(
+            select(Tag.id).where(cast(ColumnElement, Tag.id).in_(tag_ids), unused)
+        )
+        unused_ids = list(result.scalars().all())
+        if unused_ids:
+            await self.session.execute(
+                delete(Tag).where(cast(ColumnElement, Tag.id).in_(unused_ids))
+            )
+        return unused_ids
+
     async def update_tag_name(self, tag_id: int, new_name: str):
         """更新指定ID的标签的名称。"""
         statement = select(Tag).where(Tag.id == tag_id)  # type: ignore
@@ -0,0 +1,183 @@
+import logging
+from typing import List, Optional, cast
+
+from sqlalchemy import ColumnElement, delete, func, insert, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models import ChannelTagStat, ChannelThreadStat, Tag, Thread, ThreadTagLink
+
+logger = logging.getLogger(__name__)
+
+# (服务器ID, 频道ID, 标签ID) 或 (服务器ID, 频道ID) -> 帖子数
+TagStatKey = tuple[int, ...]
+
+
+class TagStatRepository:
+    """
+    封装物化的标签统计表 (channel_tag_stat / channel_thread_stat) 的读取、校验与重建。
+    两张表由数据库触发器 (见 shared/database.py 的 TAG_STAT_TRIGGERS) 增量维护，本类不提交事务。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # ---------------------------------------------------------
+    # 读取
+    # ---------------------------------------------------------
+    async def get_tag_rows(
+        self, guild_id: Optional[int], channel_ids: Optional[List[int]]
+    ) -> List[tuple[str, int, int, int]]:
+        """返回指定范围内各频道中每个标签的有效帖子数 (标签名, 标签ID, 频道ID, 帖子数)"""
+        channel_id_column = cast(ColumnElement, ChannelTagStat.channel_id)
+        tag_id_column = cast(ColumnElement, ChannelTagStat.tag_id)
+        count_column = cast(ColumnElement, ChannelTagStat.thread_count)
+
+        statement = (
+            select(Tag.name, tag_id_column, channel_id_column, func.sum(count_column))
+            .join(Tag, cast(ColumnElement, Tag.id) == tag_id_column)
+            .where(count_column > 0)
+            .group_by(Tag.name, tag_id_column, channel_id_column)
+        )
+        if guild_id is not None:
+            statement = statement.where(ChannelTagStat.guild_id == guild_id)
+        if channel_ids:
+            statement = statement.where(channel_id_column.in_(channel_ids))
+
+        result = await self.session.execute(statement)
+        return [
+            (str(row[0]), int(row[1]), int(row[2]), int(row[3]))
+            for row in result.all()
+        ]
+
+    async def get_thread_counts(self, channel_ids: List[int]) -> dict[int, int]:
+        """返回指定频道的有效帖子数 {频道ID: 帖子数}"""
+        if not channel_ids:
+            return {}
+        channel_id_column = cast(ColumnElement, ChannelThreadStat.channel_id)
+        count_column = cast(ColumnElement, ChannelThreadStat.thread_count)
+
+        statement = (
+            select(channel_id_column, func.sum(count_column))
+            .where(channel_id_column.in_(channel_ids))
+            .group_by(channel_id_column)
+        )
+        result = await self.session.execute(statement)
+        return {int(row[0]): int(row[1]) for row in result.all() if row[1]}
+
+    async def get_total_thread_count(
+        self, guild_id: Optional[int], channel_ids: Optional[List[int]]
+    ) -> int:
+        """返回指定范围内的有效帖子总数"""
+        count_column = cast(ColumnElement, ChannelThreadStat.thread_count)
+        statement = select(func.coalesce(func.sum(count_column), 0))
+        if guild_id is not None:
+            statement = statement.where(ChannelThreadStat.guild_id == guild_id)
+        if channel_ids:
+            statement = statement.where(
+                cast(ColumnElement, ChannelThreadStat.channel_id).in_(channel_ids)
+            )
+        result = await self.session.execute(statement)
+        return int(result.scalar_one())
+
+    # ---------------------------------------------------------
+    # 校验与重建
+    # ---------------------------------------------------------
+    @staticmethod
+    def _expected_tag_counts_query():
+        """从帖子表和标签关联表直接聚合得到的 (服务器, 频道, 标签) 帖子数"""
+        return (
+            select(
+                Thread.guild_id,
+                Thread.channel_id,
+                ThreadTagLink.tag_id,
+                func.count().label("thread_count"),
+            )
+            .join(Thread, cast(ColumnElement, Thread.id) == ThreadTagLink.thread_id)
+            .where(Thread.not_found_count == 0)
+            .group_by(Thread.guild_id, Thread.channel_id, ThreadTagLink.tag_id)
+        )
+
+    @staticmethod
+    def _expected_thread_counts_query():
+        """从帖子表直接聚合得到的 (服务器, 频道) 帖子数"""
+        return (
+            select(Thread.guild_id, Thread.channel_id, func.count().label("thread_count"))
+            .where(Thread.not_found_count == 0)
+            .group_by(Thread.guild_id, Thread.channel_id)
+        )
+
+    async def _collect(self, statement) -> dict[TagStatKey, int]:
+        result = await self.session.execute(statement)
+        return {
+            tuple(int(value) for value in row[:-1]): int(row[-1])
+            for row in result.all()
+            if row[-1]
+        }
+
+    async def find_drift(self) -> dict[str, list[tuple[TagStatKey, int, int]]]:
+        """
+        比对物化表与直接聚合的结果。
+
+        Returns:
+            {"channel_tag": [...], "channel_thread": [...]}，每项为 (键, 表中的值, 实际值)，无偏差时为空列表。
+        """
+        drift: dict[str, list[tuple[TagStatKey, int, int]]] = {}
+        for name, stored_statement, expected_statement in (
+            (
+                "channel_tag",
+                select(
+                    ChannelTagStat.guild_id,
+                    ChannelTagStat.channel_id,
+                    ChannelTagStat.tag_id,
+                    ChannelTagStat.thread_count,
+                ),
+                self._expected_tag_counts_query(),
+            ),
+            (
+                "channel_thread",
+                select(
+                    ChannelThreadStat.guild_id,
+                    ChannelThreadStat.channel_id,
+                    ChannelThreadStat.thread_count,
+                ),
+                self._expected_thread_counts_query(),
+            ),
+        ):
+            stored = await self._collect(stored_statement)
+            expected = await self._collect(expected_statement)
+            drift[name] = [
+                (key, stored.get(key, 0), expected.get(key, 0))
+                for key in sorted(stored.keys() | expected.keys())
+                if stored.get(key, 0) != expected.get(key, 0)
+            ]
+        return drift
+
+    async def rebuild(self) -> None:
+        """清空物化表并从帖子表和标签关联表重新聚合"""
+        await self.session.execute(delete(ChannelTagStat))
+        await self.session.execute(delete(ChannelThreadStat))
+        await self.session.execute(
+            insert(ChannelTagStat).from_select(
+                ["guild_id", "channel_id", "tag_id", "thread_count"],
+                self._expected_tag_counts_query(),
+            )
+        )
+        await self.session.execute(
+            insert(ChannelThreadStat).from_select(
+                ["guild_id", "channel_id", "thread_count"],
+                self._expected_thread_counts_query(),
+            )
+        )
+
+    async def is_empty_with_threads(self) -> bool:
+        """物化表为空而帖子表不为空 (如未经迁移直接升级) 时返回 True，需要重建"""
+        has_stats = await self.session.execute(
+            select(literal_column("1")).select_from(ChannelThreadStat).limit(1)
+        )
+        if has_stats.first() is not None:
+            return False
+        has_threads = await self.session.execute(
+            select(literal_column("1")).select_from(Thread).limit(1)
+        )
+        return has_threads.first() is not None
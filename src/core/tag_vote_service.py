@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.thread_repository import ThreadRepository, format_tag_vote_stats
+
+logger = logging.getLogger(__name__)
+
+# {标签ID: (赞成数, 反对数)}
+Tallies = dict[int, tuple[int, int]]
+
+
+class TagVoteService:
+    """
+    标签投票与投票数缓存。
+
+    - 每次投票只执行一条 Upsert 语句 (ThreadRepository.upsert_tag_vote)，
+      语句返回的该标签最新票数直接写入缓存。
+    - get_stats 在缓存命中时不查询数据库；未命中时用一条聚合查询载入该帖子所有标签的票数。
+    - 同一帖子的投票与载入按帖子ID分段加锁串行执行，避免同一用户快速连点时
+      先提交的结果后写入缓存，覆盖掉较新的票数。
+    缓存按最近最少使用淘汰，最多保留 max_threads 个帖子。
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, session_factory: async_sessionmaker, *, max_threads: int = 2000):
+        self.session_factory = session_factory
+        self.max_threads = max_threads
+        self._tallies: OrderedDict[int, Tallies] = OrderedDict()
+        self._locks = [asyncio.Lock() for _ in range(self.LOCK_STRIPES)]
+
+        # 统计信息
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.votes = 0
+
+    def _lock_for(self, thread_id: int) -> asyncio.Lock:
+        return self._locks[thread_id % self.LOCK_STRIPES]
+
+    def _store(self, thread_id: int, tallies: Tallies):
+        self._tallies[thread_id] = tallies
+        self._tallies.move_to_end(thread_id)
+        while len(self._tallies) > self.max_threads:
+            self._tallies.popitem(last=False)
+
+    async def _get_tallies(self, thread_id: int) -> Tallies:
+        tallies = self._tallies.get(thread_id)
+        if tallies is not None:
+            self.cache_hits += 1
+            self._tallies.move_to_end(thread_id)
+            return tallies
+
+        self.cache_misses += 1
+        async with self.session_factory() as session:
+            tallies = await ThreadRepository(session).get_tag_vote_tallies(thread_id)
+        self._store(thread_id, tallies)
+        return tallies
+
+    async def get_stats(self, thread_id: int, tag_map: dict[int, str]) -> dict:
+        """获取一个帖子的标签投票统计 {标签名: {"upvotes", "downvotes", "score"}}"""
+        async with self._lock_for(thread_id):
+            tallies = await self._get_tallies(thread_id)
+        return format_tag_vote_stats(tallies, tag_map)
+
+    async def record_vote(
+        self,
+        user_id: int,
+        thread_id: int,
+        tag_id: int,
+        vote_value: int,
+        tag_map: dict[int, str],
+    ) -> dict:
+        """
+        记录一次标签投票 (再次投出相同的票时取消)，返回该帖子最新的投票统计。
+        帖子不存在或未应用该标签时不记录，返回当前统计。
+        """
+        async with self._lock_for(thread_id):
+            async with self.session_factory() as session:
+                result = await ThreadRepository(session).upsert_tag_vote(
+                    user_id, thread_id, tag_id, vote_value
+                )
+                await session.commit()
+
+            if result is None:
+                logger.warning(
+                    f"record_vote: 帖子 {thread_id} 不存在或未应用标签 {tag_id}。"
+                )
+            else:
+                self.votes += 1
+                _, upvotes, downvotes = result
+                tallies = self._tallies.get(thread_id)
+                if tallies is not None:
+                    tallies[tag_id] = (upvotes, downvotes)
+                    self._tallies.move_to_end(thread_id)
+
+            tallies = await self._get_tallies(thread_id)
+        return format_tag_vote_stats(tallies, tag_map)
+
+    def get_stats_summary(self) -> dict:
+        return {
+            "cached_threads": len(self._tallies),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "votes": self.votes,
+        }
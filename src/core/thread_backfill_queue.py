@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.thread_backfill_repository import ThreadBackfillRepository
+
+if TYPE_CHECKING:
+    from core.sync_service import SyncService
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadBackfillQueue:
+    """
+    幽灵帖子 (有活动但数据库中不存在的帖子) 的补录队列。
+
+    批量写入回复数/反应数时发现的幽灵帖子不再各自创建一个同步任务，而是放入本队列：
+    - 按帖子去重，最多 max_size 个，满时丢弃新帖子并计数 (之后再有活动时会重新加入)。
+    - 队列持久化在 thread_backfill 表中，重启后由 load() 恢复。
+    - 后台任务每分钟最多补录 rate_per_minute 个帖子，sync_thread 中的 API 请求以较低优先级经调度器执行；
+      获取失败的帖子重新排到队尾，失败 max_attempts 次后放弃；帖子不存在或不满足索引条件时直接放弃。
+      放弃的帖子计入 failed，只有真正写入数据库的帖子计入 synced。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        sync_service: "SyncService",
+        *,
+        max_size: int = 5000,
+        rate_per_minute: float = 60,
+        priority: int = 9,
+        max_attempts: int = 3,
+    ):
+        self.session_factory = session_factory
+        self.sync_service = sync_service
+        self.max_size = max_size
+        self.interval = 60 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+        # {帖子ID: 已失败次数}，按加入顺序排列
+        self._queue: OrderedDict[int, int] = OrderedDict()
+        self._inflight: Optional[int] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计信息
+        self.enqueued_count = 0
+        self.deduplicated_count = 0
+        self.dropped_count = 0
+        self.synced_count = 0
+        self.retried_count = 0
+        self.failed_count = 0
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._queue)
+
+    async def load(self):
+        """从数据库恢复上次未完成的补录队列"""
+        async with self.session_factory() as session:
+            rows = await ThreadBackfillRepository(session).get_all(self.max_size)
+        for thread_id, attempts in rows:
+            self._queue.setdefault(thread_id, attempts)
+        if self._queue:
+            logger.info(f"已恢复 {len(self._queue)} 个待补录的帖子。")
+            self._wakeup.set()
+
+    def start(self):
+        """启动后台补录任务。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """停止后台任务。队列已持久化，剩余的帖子在下次启动时继续补录。"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def enqueue_many(self, thread_ids: Iterable[int], source: str) -> int:
+        """
+        加入待补录的帖子，立即返回实际新加入的数量。
+        :param source: 发现幽灵帖子的来源 (如 "reply_count")，记录在数据库中便于排查。
+        """
+        accepted: list[int] = []
+        for thread_id in thread_ids:
+            if thread_id in self._queue or thread_id == self._inflight:
+                self.deduplicated_count += 1
+            elif len(self._queue) >= self.max_size:
+                self.dropped_count += 1
+            else:
+                self._queue[thread_id] = 0
+                accepted.append(thread_id)
+
+        if not accepted:
+            return 0
+        self.enqueued_count += len(accepted)
+        self._wakeup.set()
+        try:
+            async with self.session_factory() as session:
+                await ThreadBackfillRepository(session).add_many(accepted, source)
+                await session.commit()
+        except Exception:
+            # 内存中的队列仍然有效，只是重启后不会恢复
+            logger.error(f"持久化 {len(accepted)} 个待补录帖子时失败", exc_info=True)
+        return len(accepted)
+
+    async def drain_once(self) -> bool:
+        """补录队首的一个帖子，队列为空时返回 False"""
+        if not self._queue:
+            return False
+        thread_id, attempts = self._queue.popitem(last=False)
+        self._inflight = thread_id
+        try:
+            # 同步中的 REST 请求以 self.priority 各自经过调度器，这里不再整体提交；
+            # 获取失败时抛出异常以便重试，而不是被 sync_thread 记录日志后吞掉
+            synced = await self.sync_service.sync_thread(
+                thread_id, priority=self.priority, raise_errors=True
+            )
+        except Exception:
+            attempts += 1
+            logger.warning(
+                f"补录帖子 {thread_id} 失败 (第 {attempts} 次)", exc_info=True
+            )
+            await self._record_failure(thread_id, attempts)
+            return True
+        finally:
+            self._inflight = None
+
+        if not synced:
+            # 帖子已被删除或不满足索引条件，重试也不会成功，直接放弃
+            logger.info(f"补录帖子 {thread_id} 未写入 (帖子不存在或不满足索引条件)")
+            self.failed_count += 1
+            await self._persist(ThreadBackfillRepository.remove, thread_id)
+            return True
+
+        self.synced_count += 1
+        await self._persist(ThreadBackfillRepository.remove, thread_id)
+        return True
+
+    async def _record_failure(self, thread_id: int, attempts: int):
+        if attempts >= self.max_attempts:
+            self.failed_count += 1
+            await self._persist(ThreadBackfillRepository.remove, thread_id)
+            return
+        self.retried_count += 1
+        # 重新排到队尾；期间又被加入过时保留原有位置
+        self._queue.setdefault(thread_id, attempts)
+        await self._persist(ThreadBackfillRepository.set_attempts, thread_id, attempts)
+
+    async def _persist(self, operation, *args):
+        try:
+            async with self.session_factory() as session:
+                await operation(ThreadBackfillRepository(session), *args)
+                await session.commit()
+        except Exception:
+            logger.error("更新补录队列时失败", exc_info=True)
+
+    async def _run_loop(self):
+        while True:
+            try:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                await self.drain_once()
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("幽灵帖子补录循环发生错误。", exc_info=e)
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_length": len(self._queue),
+            "enqueued": self.enqueued_count,
+            "deduplicated": self.deduplicated_count,
+            "dropped": self.dropped_count,
+            "synced": self.synced_count,
+            "retried": self.retried_count,
+            "failed": self.failed_count,
+        }
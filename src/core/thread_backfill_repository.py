@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from models import ThreadBackfill
+
+
+class ThreadBackfillRepository:
+    """封装与 ThreadBackfill (幽灵帖子补录队列) 表相关的数据库操作，均不提交事务。"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_many(self, thread_ids: list[int], source: str) -> None:
+        """加入待补录的帖子，已在队列中的帖子保持不变"""
+        if not thread_ids:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = sqlite_insert(ThreadBackfill.__table__).on_conflict_do_nothing(  # type: ignore[attr-defined]
+            index_elements=["thread_id"]
+        )
+        await self.session.execute(
+            stmt,
+            [
+                {"thread_id": thread_id, "source": source, "attempts": 0, "enqueued_at": now}
+                for thread_id in thread_ids
+            ],
+        )
+
+    async def get_all(self, limit: int) -> list[tuple[int, int]]:
+        """按加入顺序返回最多 limit 个 (帖子ID, 已失败次数)"""
+        result = await self.session.execute(
+            select(ThreadBackfill.thread_id, ThreadBackfill.attempts)
+            .order_by(col(ThreadBackfill.id))
+            .limit(limit)
+        )
+        return [(thread_id, attempts) for thread_id, attempts in result.all()]
+
+    async def remove(self, thread_id: int) -> None:
+        await self.session.execute(
+            delete(ThreadBackfill).where(col(ThreadBackfill.thread_id) == thread_id)
+        )
+
+    async def set_attempts(self, thread_id: int, attempts: int) -> None:
+        await self.session.execute(
+            update(ThreadBackfill)
+            .where(col(ThreadBackfill.thread_id) == thread_id)
+            .values(attempts=attempts)
+        )
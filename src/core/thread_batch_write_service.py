@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.author_repository import AuthorRepository
+from core.follow_repository import ThreadFollowRepository
+from core.tag_repository import TagRepository
+from core.thread_record_dto import ThreadRecord
+from core.thread_repository import ThreadRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadBatchWriteService:
+    """
+    帖子批量写入缓冲池。
+    消费者提交解析好的 ThreadRecord，累计到 batch_size 条或每隔 flush_interval_ms 毫秒，
+    在一个事务内用多行语句写入标签、作者、帖子和标签关联，取代逐帖一次事务的写法。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = 200,
+        flush_interval_ms: int = 500,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+
+        self._pending: list[tuple[ThreadRecord, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # 统计信息
+        self.written_count = 0
+        self.batch_count = 0
+        self.write_seconds = 0.0
+
+    def start(self):
+        """启动定时刷新的后台任务"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """停止后台任务，并写入所有剩余的记录"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def submit(self, record: ThreadRecord) -> asyncio.Future:
+        """
+        提交一条待写入的记录。
+
+        缓冲区满时会立即在当前协程中写入一批，从而对提交方形成背压。
+
+        Returns:
+            写入完成后被设置结果的 Future。结果为 True 表示该帖子在写入时还没有任何关注记录
+            (首次检测)，写入失败时 Future 会携带异常。
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        return future
+
+    async def flush(self):
+        """写入缓冲区中的所有记录"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+                # 提交方被取消时也要写完这一批，确保每个 Future 都会得到结果
+                await asyncio.shield(self._write_batch(batch))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"定时写入帖子批次时出错: {e}", exc_info=True)
+
+    async def _write_batch(self, batch: list[tuple[ThreadRecord, asyncio.Future]]):
+        """写入一批记录；整批失败时逐条重试，避免一条坏数据拖垮整批"""
+        started = time.perf_counter()
+        try:
+            first_detect = await self._write_records([record for record, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                record, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            logger.warning(
+                f"批量写入 {len(batch)} 个帖子失败，改为逐条写入: {e}", exc_info=True
+            )
+            for item in batch:
+                await self._write_batch([item])
+            return
+
+        self.batch_count += 1
+        self.written_count += len(batch)
+        self.write_seconds += time.perf_counter() - started
+        for record, future in batch:
+            if not future.done():
+                future.set_result(first_detect[record["thread_data"]["thread_id"]])
+
+    async def _write_records(self, records: list[ThreadRecord]) -> dict[int, bool]:
+        """
+        在一个事务内写入一批记录。
+
+        Returns:
+            {帖子Discord ID: 写入时该帖子是否还没有任何关注记录}
+        """
+        # 同一帖子在一批中出现多次时，以最后一次解析的结果为准
+        latest = {record["thread_data"]["thread_id"]: record for record in records}
+
+        tags_data: dict[int, str] = {}
+        for record in latest.values():
+            tags_data.update(record["tags_data"])
+        authors_data = [
+            record["author_data"]
+            for record in latest.values()
+            if record["author_data"]
+        ]
+
+        async with self.session_factory() as session:
+            try:
+                await TagRepository(session).upsert_tags(tags_data)
+                await AuthorRepository(session).bulk_upsert_authors(authors_data)  # type: ignore[arg-type]
+                await ThreadRepository(session).bulk_upsert_threads_with_tags(
+                    threads_data=[record["thread_data"] for record in latest.values()],
+                    tag_ids_by_thread={
+                        thread_id: set(record["tags_data"])
+                        for thread_id, record in latest.items()
+                    },
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+            followed = await ThreadFollowRepository(session).get_followed_thread_ids(
+                list(latest)
+            )
+
+        return {thread_id: thread_id not in followed for thread_id in latest}
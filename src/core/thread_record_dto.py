@@ -0,0 +1,9 @@
+from typing import Any, Optional, TypedDict
+
+
+class ThreadRecord(TypedDict):
+    """一个解析完毕、等待写入数据库的帖子"""
+
+    thread_data: dict[str, Any]
+    tags_data: dict[int, str]
+    author_data: Optional[dict[str, Any]]
@@ -2,11 +2,13 @@ import logging
 from datetime import datetime
 from typing import List, Optional, Sequence, cast
 
-from sqlalchemy import ColumnElement, case, func, update
+from sqlalchemy import ColumnElement, case, delete, func, literal, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import select
 
+from core.tag_stat_repository import TagStatRepository
 from dto.meta import ChannelThreadCount
 from models import Tag, TagVote, Thread, ThreadTagLink
 from ThreadManager.update_data_dto import UpdateData
@@ -14,6 +16,21 @@ from ThreadManager.update_data_dto import UpdateData
 logger = logging.getLogger(__name__)
 
 
+def format_tag_vote_stats(
+    tallies: dict[int, tuple[int, int]], tag_map: dict[int, str]
+) -> dict:
+    """把 {标签ID: (赞成数, 反对数)} 转换为 {标签名: {"upvotes", "downvotes", "score"}}"""
+    stats = {}
+    for tag_id, tag_name in tag_map.items():
+        upvotes, downvotes = tallies.get(tag_id, (0, 0))
+        stats[tag_name] = {
+            "upvotes": upvotes,
+            "downvotes": downvotes,
+            "score": upvotes - downvotes,
+        }
+    return stats
+
+
 class ThreadRepository:
     """封装与 Thread 表相关的数据库操作。"""
 
@@ -66,6 +83,85 @@ class ThreadRepository:
             self.session.add(new_thread)
         await self.session.commit()
 
+    async def bulk_upsert_threads_with_tags(
+        self, threads_data: List[dict], tag_ids_by_thread: dict[int, set[int]]
+    ) -> dict[int, int]:
+        """
+        使用多行语句批量添加或更新帖子及其标签关联，结果与逐个调用
+        add_or_update_thread_with_tags 相同。不提交事务，由调用方控制。
+
+        Args:
+            threads_data: 帖子数据字典列表，各字典的键相同且 thread_id 互不重复。
+            tag_ids_by_thread: {帖子Discord ID: 应用的标签ID集合}，标签需已存在。
+
+        Returns:
+            {帖子Discord ID: 帖子主键 (Thread.id)}
+        """
+        if not threads_data:
+            return {}
+
+        # 新帖子使用模型默认值补全未提供的字段；已有帖子只覆盖本次提供的字段
+        provided_keys = set(threads_data[0])
+        defaults = Thread(**threads_data[0]).model_dump(
+            exclude={"id", *provided_keys}
+        )
+        rows = [{**defaults, **data} for data in threads_data]
+
+        # 直接使用 Core 表对象并以 executemany 方式执行，语句只编译一次
+        thread_table = Thread.__table__  # type: ignore[attr-defined]
+        insert_stmt = sqlite_insert(thread_table)
+        upsert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=["thread_id"],
+            set_={
+                key: insert_stmt.excluded[key]
+                for key in provided_keys
+                if key != "thread_id"
+            },
+        )
+        await self.session.execute(upsert_stmt, rows)
+
+        thread_ids = [data["thread_id"] for data in threads_data]
+        pk_result = await self.session.execute(
+            select(Thread.id, Thread.thread_id).where(  # type: ignore
+                cast(ColumnElement, Thread.thread_id).in_(thread_ids)
+            )
+        )
+        pk_by_thread_id = {row[1]: row[0] for row in pk_result.all()}
+
+        # 非破坏性地更新标签，以保留 ThreadTagLink 中的投票数据
+        pks = list(pk_by_thread_id.values())
+        link_result = await self.session.execute(
+            select(ThreadTagLink.thread_id, ThreadTagLink.tag_id).where(  # type: ignore
+                cast(ColumnElement, ThreadTagLink.thread_id).in_(pks)
+            )
+        )
+        current_links = {(row[0], row[1]) for row in link_result.all()}
+        new_links = {
+            (pk_by_thread_id[thread_id], tag_id)
+            for thread_id, tag_ids in tag_ids_by_thread.items()
+            if thread_id in pk_by_thread_id
+            for tag_id in tag_ids
+        }
+
+        links_to_remove = current_links - new_links
+        if links_to_remove:
+            await self.session.execute(
+                delete(ThreadTagLink).where(
+                    tuple_(ThreadTagLink.thread_id, ThreadTagLink.tag_id).in_(  # type: ignore
+                        list(links_to_remove)
+                    )
+                )
+            )
+
+        links_to_add = new_links - current_links
+        if links_to_add:
+            await self.session.execute(
+                sqlite_insert(ThreadTagLink.__table__).on_conflict_do_nothing(),  # type: ignore[attr-defined]
+                [{"thread_id": pk, "tag_id": tag_id} for pk, tag_id in links_to_add],
+            )
+
+        return pk_by_thread_id
+
     async def delete_thread_index(self, thread_id: int):
         """删除帖子记录"""
         statement = select(Thread).where(Thread.thread_id == thread_id)  # type: ignore
@@ -117,109 +213,86 @@ class ThreadRepository:
         # 返回 rowcount 是否大于 0
         return result.rowcount > 0
 
-    async def record_tag_vote(
-        self,
-        user_id: int,
-        thread_id: int,
-        tag_id: int,
-        vote_value: int,
-        tag_map: dict[int, str],
-    ) -> dict:
+    async def upsert_tag_vote(
+        self, user_id: int, thread_id: int, tag_id: int, vote_value: int
+    ) -> Optional[tuple[int, int, int]]:
         """
-        记录一次标签投票，并更新 ThreadTagLink 表中的 upvotes 和 downvotes。
+        用一条 INSERT ... ON CONFLICT DO UPDATE 语句记录一次标签投票，不提交事务。
+        再次投出相同的票时取消投票 (记为 0)，投出相反的票时改票；
+        threadtaglink 的 upvotes / downvotes 由 TAG_VOTE_TRIGGERS 在同一语句内调整。
+
+        Returns:
+            (本次投票后该用户的票, 该标签的赞成数, 反对数)；帖子不存在或未应用该标签时返回 None。
         """
-        # 查找帖子对象以获取其内部ID
-        thread_statement = select(Thread).where(Thread.thread_id == thread_id)  # type: ignore
-        thread_result = await self.session.execute(thread_statement)
-        db_thread = thread_result.scalars().first()
-        if not db_thread or not db_thread.id:
-            logger.warning(f"record_tag_vote: 未找到 thread_id={thread_id} 的帖子。")
-            return {}
+        vote_column = cast(ColumnElement, TagVote.vote)
+        counted = TagVote.__table__.alias("counted")  # type: ignore[attr-defined]
+        thread_pk = select(Thread.id).where(Thread.thread_id == thread_id).scalar_subquery()
+
+        # RETURNING 中的子查询能看到本条语句写入后的投票记录
+        def count_of(value: int):
+            return (
+                select(func.count())
+                .select_from(counted)
+                .where(
+                    counted.c.thread_id == thread_pk,
+                    counted.c.tag_id == tag_id,
+                    counted.c.vote == value,
+                )
+                .scalar_subquery()
+            )
 
-        # 查找对应的 ThreadTagLink 记录
-        link_stmt = select(ThreadTagLink).where(
-            ThreadTagLink.thread_id == db_thread.id,
-            ThreadTagLink.tag_id == tag_id,  # type: ignore
+        # 只有帖子存在且应用了该标签时 SELECT 才有结果，否则不会插入任何行
+        source = (
+            select(
+                literal(user_id),
+                ThreadTagLink.tag_id,
+                Thread.id,
+                literal(vote_value),
+            )
+            .join(ThreadTagLink, cast(ColumnElement, ThreadTagLink.thread_id) == Thread.id)
+            .where(Thread.thread_id == thread_id, ThreadTagLink.tag_id == tag_id)
         )
-        link_result = await self.session.execute(link_stmt)
-        link_record = link_result.scalars().first()
-        if not link_record:
-            logger.warning(f"record_tag_vote: 帖子 {thread_id} 并未应用标签 {tag_id}。")
-            return await self.get_tag_vote_stats(thread_id, tag_map)
-
-        # 查找现有投票
-        vote_stmt = select(TagVote).where(
-            TagVote.user_id == user_id,  # type: ignore
-            TagVote.thread_id == db_thread.id,  # type: ignore
-            TagVote.tag_id == tag_id,  # type: ignore
+        insert_stmt = sqlite_insert(TagVote).from_select(
+            ["user_id", "tag_id", "thread_id", "vote"], source
         )
-        vote_result = await self.session.execute(vote_stmt)
-        existing_vote = vote_result.scalars().first()
-
-        if existing_vote:
-            previous_vote = existing_vote.vote
-            if previous_vote == vote_value:  # 取消投票
-                if previous_vote == 1:
-                    link_record.upvotes -= 1
-                else:
-                    link_record.downvotes -= 1
-                await self.session.delete(existing_vote)
-            else:  # 更改投票
-                if previous_vote == 1:
-                    link_record.upvotes -= 1
-                else:
-                    link_record.downvotes -= 1
-
-                if vote_value == 1:
-                    link_record.upvotes += 1
-                else:
-                    link_record.downvotes += 1
-                existing_vote.vote = vote_value
-                self.session.add(existing_vote)
-        else:  # 新投票
-            if vote_value == 1:
-                link_record.upvotes += 1
-            else:
-                link_record.downvotes += 1
-            new_vote = TagVote(
-                user_id=user_id, thread_id=db_thread.id, tag_id=tag_id, vote=vote_value
-            )
-            self.session.add(new_vote)
+        statement = insert_stmt.on_conflict_do_update(
+            index_elements=["user_id", "tag_id", "thread_id"],
+            set_={
+                "vote": case(
+                    (vote_column == insert_stmt.excluded.vote, 0),
+                    else_=insert_stmt.excluded.vote,
+                )
+            },
+        ).returning(vote_column, count_of(1), count_of(-1))
 
-        self.session.add(link_record)
-        await self.session.commit()
+        row = (await self.session.execute(statement)).first()
+        if row is None:
+            return None
+        return int(row[0]), int(row[1]), int(row[2])
 
-        # 返回该帖子的最新完整统计数据
-        return await self.get_tag_vote_stats(thread_id, tag_map)
+    async def get_tag_vote_tallies(self, thread_id: int) -> dict[int, tuple[int, int]]:
+        """获取一个帖子各标签的投票数 {标签ID: (赞成数, 反对数)}，没有投票的标签不在结果中"""
+        vote_column = cast(ColumnElement, TagVote.vote)
+        statement = (
+            select(
+                TagVote.tag_id,
+                func.sum(case((vote_column == 1, 1), else_=0)),
+                func.sum(case((vote_column == -1, 1), else_=0)),
+            )
+            .join(Thread, cast(ColumnElement, Thread.id) == TagVote.thread_id)
+            .where(Thread.thread_id == thread_id)
+            .group_by(TagVote.tag_id)
+        )
+        result = await self.session.execute(statement)
+        return {int(row[0]): (int(row[1]), int(row[2])) for row in result.all()}
 
     async def get_tag_vote_stats(self, thread_id: int, tag_map: dict[int, str]) -> dict:
         """
         获取一个帖子的标签投票统计。
-        从与该帖子关联的 ThreadTagLink 记录中聚合数据。
+        机器人内请优先使用 TagVoteService.get_stats，它在缓存命中时不查询数据库。
         """
-        thread_stmt = select(Thread).where(Thread.thread_id == thread_id)  # type: ignore
-        result = await self.session.execute(thread_stmt)
-        db_thread = result.scalars().first()
-
-        if not db_thread:
-            return {}
-
-        # 查询所有与该帖子相关的 ThreadTagLink 记录
-        link_stmt = select(ThreadTagLink).where(ThreadTagLink.thread_id == db_thread.id)  # type: ignore
-        link_results = await self.session.execute(link_stmt)
-        link_records = link_results.scalars().all()
-
-        stats = {}
-        for record in link_records:
-            tag_name = tag_map.get(record.tag_id)
-            if tag_name:
-                stats[tag_name] = {
-                    "upvotes": record.upvotes,
-                    "downvotes": record.downvotes,
-                    "score": record.upvotes - record.downvotes,
-                }
-
-        return stats
+        tallies = await self.get_tag_vote_tallies(thread_id)
+        return format_tag_vote_stats(tallies, tag_map)
 
     async def batch_update_thread_activity(self, updates: dict[int, UpdateData]) -> int:
         """
@@ -273,6 +346,32 @@ class ThreadRepository:
         result = await self.session.execute(stmt)
         return result.rowcount
 
+    async def batch_update_thread_reaction_counts(self, counts: dict[int, int]) -> int:
+        """
+        批量更新多个帖子的反应数。
+
+        Args:
+            counts(dict[int, int]): {thread_id: reaction_count}
+
+        Returns:
+            (int) 成功更新的行数。
+        """
+        if not counts:
+            return 0
+
+        reaction_count_case = case(
+            counts, value=Thread.thread_id, else_=Thread.reaction_count
+        )
+        stmt = (
+            update(Thread)
+            .where(cast(ColumnElement, Thread.thread_id).in_(list(counts.keys())))
+            .values(reaction_count=reaction_count_case)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
     async def get_existing_thread_ids(self, thread_ids: List[int]) -> List[int]:
         """
         从给定的ID列表中，查询并返回那些在数据库中真实存在的记录ID
@@ -286,6 +385,65 @@ class ThreadRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_created_since_flags(
+        self, thread_ids: List[int], since: datetime
+    ) -> dict[int, bool]:
+        """
+        查询给定ID中在数据库里存在的帖子，返回 {帖子ID: 是否在 since 之后创建}。
+        不在结果中的ID即为数据库中不存在的帖子。
+        """
+        if not thread_ids:
+            return {}
+
+        stmt = select(Thread.thread_id, Thread.created_at >= since).where(  # type: ignore
+            cast(ColumnElement, Thread.thread_id).in_(thread_ids)
+        )
+        result = await self.session.execute(stmt)
+        return {thread_id: bool(is_recent) for thread_id, is_recent in result.all()}
+
+    async def get_sync_state(self, thread_id: int) -> Optional[tuple[Optional[str], int]]:
+        """
+        获取帖子上次完整同步时的指纹和 not_found_count。
+
+        Returns:
+            (sync_fingerprint, not_found_count)；帖子不存在时返回 None。
+        """
+        stmt = select(Thread.sync_fingerprint, Thread.not_found_count).where(  # type: ignore
+            Thread.thread_id == thread_id
+        )
+        result = await self.session.execute(stmt)
+        row = result.first()
+        return (row[0], row[1]) if row else None
+
+    async def get_sync_fingerprints(
+        self, thread_ids: List[int]
+    ) -> dict[int, Optional[str]]:
+        """
+        批量获取帖子上次完整同步时的指纹。
+
+        Returns:
+            {thread_id: sync_fingerprint}，未入库的帖子不在结果中。
+        """
+        if not thread_ids:
+            return {}
+        stmt = select(Thread.thread_id, Thread.sync_fingerprint).where(  # type: ignore
+            cast(ColumnElement, Thread.thread_id).in_(thread_ids)
+        )
+        result = await self.session.execute(stmt)
+        return {thread_id: fingerprint for thread_id, fingerprint in result.all()}
+
+    async def reset_not_found_count(self, thread_id: int) -> bool:
+        """拉取帖子成功时，将其 not_found_count 归零"""
+        stmt = (
+            update(Thread)
+            .where(Thread.thread_id == thread_id)  # type: ignore
+            .values(not_found_count=0)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount > 0
+
     async def increment_not_found_count(self, thread_id: int) -> bool:
         """当找不到帖子时，将其 not_found_count 计数加一"""
         stmt = (
@@ -353,52 +511,26 @@ class ThreadRepository:
     async def get_thread_count_by_channels(
         self, channel_ids: List[int]
     ) -> List[ChannelThreadCount]:
-        """批量获取指定频道列表中的有效帖子总数"""
+        """批量获取指定频道列表中的有效帖子总数，读取物化的频道统计表"""
         if not channel_ids:
             return []
 
-        # 使用 cast 将 SQLModel 字段转换为 ColumnElement，以便在聚合查询中使用
-        channel_id_column = cast(ColumnElement, Thread.channel_id)
-        id_column = cast(ColumnElement, Thread.id)
-        not_found_count_column = cast(ColumnElement, Thread.not_found_count)
-
-        # 构建聚合查询：统计每个频道中 not_found_count 为 0 的有效帖子数
-        statement = (
-            select(channel_id_column, func.count(id_column))
-            .where(channel_id_column.in_(channel_ids))
-            .where(not_found_count_column == 0)
-            .group_by(channel_id_column)
-        )
-        result = await self.session.execute(statement)
-        rows = result.all()
+        counts = await TagStatRepository(self.session).get_thread_counts(channel_ids)
 
         # 将查询结果转换为 DTO 列表
         return [
-            ChannelThreadCount(channel_id=int(row[0]), thread_count=int(row[1]))
-            for row in rows
+            ChannelThreadCount(channel_id=channel_id, thread_count=thread_count)
+            for channel_id, thread_count in counts.items()
         ]
 
     async def get_total_thread_count_for_scope(
         self, guild_id: Optional[int], channel_ids: Optional[List[int]]
     ) -> int:
-        """获取指定范围内的有效帖子去重总数"""
-        thread_id_column = cast(ColumnElement, Thread.id)
-        not_found_count_column = cast(ColumnElement, Thread.not_found_count)
-        guild_id_column = cast(ColumnElement, Thread.guild_id)
-        channel_id_column = cast(ColumnElement, Thread.channel_id)
-
-        statement = select(func.count(thread_id_column.distinct())).where(
-            not_found_count_column == 0
+        """获取指定范围内的有效帖子去重总数，读取物化的频道统计表"""
+        return await TagStatRepository(self.session).get_total_thread_count(
+            guild_id=guild_id, channel_ids=channel_ids
         )
 
-        if guild_id is not None:
-            statement = statement.where(guild_id_column == guild_id)
-        if channel_ids:
-            statement = statement.where(channel_id_column.in_(channel_ids))
-
-        result = await self.session.execute(statement)
-        return result.scalar_one_or_none() or 0
-
     async def get_random_threads(
         self,
         limit: int,
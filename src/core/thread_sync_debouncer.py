@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Union
+
+import discord
+
+if TYPE_CHECKING:
+    from core.sync_service import SyncService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingSync:
+    """窗口内合并后的一次同步请求"""
+
+    thread: Union[discord.Thread, int]
+    fetch_if_incomplete: bool = False
+    sources: Counter[str] = field(default_factory=Counter)
+
+
+class ThreadSyncDebouncer:
+    """
+    按帖子合并短时间内的多次同步请求。
+    同一帖子第一次请求后等待 window 秒，期间的所有请求 (标题/标签修改、首楼编辑等) 合并为一次 sync_thread，
+    使用最后一次请求带来的帖子对象。合并窗口从第一次请求起计算，持续的事件不会无限推迟同步。
+    同步进行中到达的请求会在本次同步结束后再同步一次，不会与之并发。
+    """
+
+    def __init__(self, sync_service: "SyncService", window: float = 3.0):
+        self.sync_service = sync_service
+        self.window = window
+        self._pending: dict[int, _PendingSync] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+        self._running: dict[int, asyncio.Task] = {}
+
+        # 统计信息
+        self.requested_count = 0
+        self.collapsed_count = 0
+        self.collapsed_by_source: Counter[str] = Counter()
+        self.synced_count = 0
+
+    def request(
+        self,
+        thread: Union[discord.Thread, int],
+        *,
+        source: str,
+        fetch_if_incomplete: bool = False,
+    ):
+        """
+        请求同步一个帖子，立即返回。
+        :param source: 触发来源 (如 "thread_update")，用于统计被合并的事件。
+        """
+        thread_id = thread if isinstance(thread, int) else thread.id
+        self.requested_count += 1
+
+        pending = self._pending.get(thread_id)
+        if pending is not None:
+            self.collapsed_count += 1
+            self.collapsed_by_source[source] += 1
+            # 保留最新的帖子对象，只有 ID 时不覆盖已有的对象
+            if not isinstance(thread, int):
+                pending.thread = thread
+            pending.fetch_if_incomplete |= fetch_if_incomplete
+            pending.sources[source] += 1
+            return
+
+        self._pending[thread_id] = _PendingSync(
+            thread, fetch_if_incomplete, Counter({source: 1})
+        )
+        self._timers[thread_id] = asyncio.create_task(self._run_after_window(thread_id))
+
+    async def _run_after_window(self, thread_id: int):
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            return
+        await self._run(thread_id)
+
+    async def _run(self, thread_id: int):
+        self._timers.pop(thread_id, None)
+        running = self._running.get(thread_id)
+        if running is not None:
+            # 上一次同步仍在进行，等它结束后再用最新状态同步
+            await asyncio.gather(running, return_exceptions=True)
+
+        pending = self._pending.pop(thread_id, None)
+        if pending is None:
+            return
+        task = asyncio.current_task()
+        if task is not None:
+            self._running[thread_id] = task
+        try:
+            await self.sync_service.sync_thread(
+                thread=pending.thread, fetch_if_incomplete=pending.fetch_if_incomplete
+            )
+            self.synced_count += 1
+        except Exception:
+            logger.warning(
+                f"合并后的帖子同步失败 (帖子ID: {thread_id}，来源: {dict(pending.sources)})",
+                exc_info=True,
+            )
+        finally:
+            if self._running.get(thread_id) is task:
+                del self._running[thread_id]
+
+    async def flush(self):
+        """立即执行所有等待中的同步 (用于关闭时)"""
+        timers = list(self._timers.items())
+        for _, timer in timers:
+            timer.cancel()
+        await asyncio.gather(*(timer for _, timer in timers), return_exceptions=True)
+        await asyncio.gather(
+            *(self._run(thread_id) for thread_id, _ in timers), return_exceptions=True
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "requested": self.requested_count,
+            "collapsed": self.collapsed_count,
+            "collapsed_by_source": dict(self.collapsed_by_source),
+            "synced": self.synced_count,
+            "pending": len(self._pending),
+        }
+
+    def cancel(self, thread_id: int) -> bool:
+        """取消一个帖子等待中的同步 (如帖子已被删除)，返回是否有被取消的请求"""
+        timer = self._timers.pop(thread_id, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending.pop(thread_id, None) is not None
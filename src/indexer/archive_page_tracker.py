@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Optional
+
+
+class ArchivePageTracker:
+    """
+    跟踪每个分页中尚未处理完的帖子数，计算可以安全持久化的归档分页游标。
+
+    消费者并发处理帖子，完成顺序与发现顺序不一致。只有当某一页及其之前的所有页
+    都已处理完毕时，才能把该页的游标写入检查点，否则重启后会漏掉未处理的帖子。
+    第 0 页固定为活跃帖子，它没有归档游标，不会改变已保存的游标。
+    """
+
+    ACTIVE_PAGE = 0
+
+    def __init__(self, initial_cursor: Optional[datetime] = None, initial_count: int = 0):
+        self._outstanding: dict[int, int] = {}
+        self._sizes: dict[int, int] = {}
+        self._cursors: dict[int, Optional[datetime]] = {}
+        self._sealed: set[int] = set()
+        self._next_page = self.ACTIVE_PAGE
+
+        self.safe_cursor: Optional[datetime] = initial_cursor
+        """所有已确认处理完毕的归档分页中，最后一页的游标"""
+
+        self.safe_count: int = initial_count
+        """已确认处理完毕的归档帖子总数 (不含活跃帖子)"""
+
+    def add(self, page: int) -> None:
+        """登记一个已放入队列的帖子。"""
+        self._outstanding[page] = self._outstanding.get(page, 0) + 1
+        self._sizes[page] = self._sizes.get(page, 0) + 1
+
+    def seal(self, page: int, cursor: Optional[datetime]) -> bool:
+        """
+        标记某一页已全部放入队列。
+
+        Returns:
+            安全游标是否因此前进。
+        """
+        self._cursors[page] = cursor
+        self._sealed.add(page)
+        self._outstanding.setdefault(page, 0)
+        self._sizes.setdefault(page, 0)
+        return self._advance()
+
+    def done(self, page: int) -> bool:
+        """
+        登记一个帖子处理完毕 (无论成功或失败)。
+
+        Returns:
+            安全游标是否因此前进。
+        """
+        self._outstanding[page] -= 1
+        return self._advance()
+
+    def _advance(self) -> bool:
+        advanced = False
+        while (
+            self._next_page in self._sealed
+            and self._outstanding.get(self._next_page, 0) == 0
+        ):
+            page = self._next_page
+            if page != self.ACTIVE_PAGE:
+                cursor = self._cursors[page]
+                if cursor is not None:
+                    self.safe_cursor = cursor
+                self.safe_count += self._sizes[page]
+                advanced = True
+            del self._outstanding[page]
+            del self._sizes[page]
+            del self._cursors[page]
+            self._sealed.discard(page)
+            self._next_page += 1
+        return advanced
@@ -1,13 +1,16 @@
 import asyncio
 import logging
-from typing import TYPE_CHECKING, cast
+import time
+from typing import TYPE_CHECKING, Optional, cast
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from core.index_checkpoint_repository import IndexCheckpointRepository
 from indexer.views import IndexerDashboard
+from shared.enum.index_mode import IndexMode, IndexStatus
 from shared.safe_defer import safe_defer
 from ThreadManager.cog import ThreadManager
 
@@ -17,6 +20,9 @@ if TYPE_CHECKING:
 # 获取一个模块级别的 logger
 logger = logging.getLogger(__name__)
 
+# 自适应并发的调整周期 (秒)
+CONCURRENCY_ADJUST_INTERVAL = 5
+
 
 class Indexer(commands.Cog):
     """构建索引相关命令"""
@@ -37,7 +43,19 @@ class Indexer(commands.Cog):
     @app_commands.command(
         name="构建索引", description="对当前论坛频道的所有帖子进行索引"
     )
-    async def build_index(self, interaction: discord.Interaction):
+    @app_commands.describe(模式="完整索引 / 从上次中断处继续 / 只索引上次成功后有变化的帖子")
+    @app_commands.choices(
+        模式=[
+            app_commands.Choice(name="完整索引", value=IndexMode.FULL.value),
+            app_commands.Choice(name="继续上次", value=IndexMode.RESUME.value),
+            app_commands.Choice(name="增量索引", value=IndexMode.INCREMENTAL.value),
+        ]
+    )
+    async def build_index(
+        self,
+        interaction: discord.Interaction,
+        模式: Optional[app_commands.Choice[str]] = None,
+    ):
         await safe_defer(interaction, ephemeral=True)
         if not isinstance(interaction.channel, discord.Thread):
             await self.bot.api_scheduler.submit(
@@ -58,9 +76,73 @@ class Indexer(commands.Cog):
             )
             return
 
-        dashboard = IndexerDashboard(self, channel, self.config)
+        requested_mode = IndexMode(模式.value) if 模式 else IndexMode.FULL
+        dashboard = await self._create_dashboard(channel, requested_mode)
         await dashboard.start(interaction)
 
+    async def _create_dashboard(
+        self, channel: discord.ForumChannel, requested_mode: IndexMode
+    ) -> IndexerDashboard:
+        """
+        根据频道的索引检查点确定实际的运行模式并创建仪表板。
+        没有可续建的进度或增量基准时，回退为完整索引。
+        """
+        async with self.session_factory() as session:
+            checkpoint = await IndexCheckpointRepository(session).get_checkpoint(
+                channel.id
+            )
+
+        if (
+            requested_mode == IndexMode.RESUME
+            and checkpoint
+            and checkpoint.status != IndexStatus.COMPLETED.value
+        ):
+            return IndexerDashboard(
+                self,
+                channel,
+                self.config,
+                mode=IndexMode.RESUME,
+                resume_from=checkpoint.archive_before,
+                resumed_count=checkpoint.processed,
+                run_started_at=checkpoint.started_at,
+            )
+
+        if (
+            requested_mode == IndexMode.INCREMENTAL
+            and checkpoint
+            and checkpoint.last_success_started_at
+        ):
+            return IndexerDashboard(
+                self,
+                channel,
+                self.config,
+                mode=IndexMode.INCREMENTAL,
+                incremental_since=checkpoint.last_success_started_at,
+            )
+
+        if requested_mode != IndexMode.FULL:
+            logger.info(
+                f"[{channel.id}] 没有可用的索引检查点，{requested_mode.value} 模式回退为完整索引。"
+            )
+        return IndexerDashboard(self, channel, self.config)
+
+    async def _save_checkpoint(self, dashboard: IndexerDashboard):
+        """持久化已安全处理完毕的归档分页游标"""
+        tracker = dashboard.page_tracker
+        try:
+            async with self.session_factory() as session:
+                await IndexCheckpointRepository(session).save_progress(
+                    channel_id=dashboard.channel.id,
+                    archive_before=tracker.safe_cursor,
+                    discovered=tracker.safe_count,
+                    processed=tracker.safe_count,
+                    failures=len(dashboard.progress["failures"]),
+                )
+        except Exception as e:
+            logging.warning(
+                f"[{dashboard.channel.id}] 保存索引检查点失败: {e}", exc_info=True
+            )
+
     async def run_indexer(self, dashboard: IndexerDashboard):
         """运行生产者和消费者任务"""
         logging.debug(f"[{dashboard.channel.id}] run_indexer 开始")
@@ -85,23 +167,42 @@ class Indexer(commands.Cog):
             await dashboard.update_embed()
             return
 
-        # 步骤 2: 启动生产者和消费者
+        # 步骤 2: 记录检查点，启动生产者和消费者
+        async with self.session_factory() as session:
+            await IndexCheckpointRepository(session).start_run(
+                channel_id=dashboard.channel.id,
+                mode=dashboard.mode,
+                started_at=dashboard.run_started_at,
+                archive_before=dashboard.page_tracker.safe_cursor,
+                discovered=dashboard.page_tracker.safe_count,
+                processed=dashboard.page_tracker.safe_count,
+            )
+
         logging.info(
-            f"[{dashboard.channel.id}] 标签预同步完成，启动 {dashboard.consumer_concurrency} 个消费者"
+            f"[{dashboard.channel.id}] 标签预同步完成，启动 {dashboard.consumer_count} 个消费者，"
+            f"初始并发 {dashboard.concurrency.limit}"
         )
         loop = self.bot.loop
+        dashboard.write_service.start()
         producer_task = loop.create_task(self.producer(dashboard))
         consumer_tasks = [
             loop.create_task(self.consumer(dashboard, consumer_id=i))
-            for i in range(dashboard.consumer_concurrency)
+            for i in range(dashboard.consumer_count)
         ]
+        consumer_tasks.append(loop.create_task(self.concurrency_controller(dashboard)))
 
         try:
             # 等待生产者完成（所有帖子都被发现并放入队列）
             await producer_task
 
-            # 等待队列中的所有项目都被消费者处理
-            await dashboard.queue.join()
+            # 等待队列中的所有项目都被消费者处理；取消时消费者会提前退出，不再等待队列清空
+            join_task = loop.create_task(dashboard.queue.join())
+            cancel_task = loop.create_task(dashboard.wait_cancelled())
+            await asyncio.wait(
+                {join_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            join_task.cancel()
+            cancel_task.cancel()
 
         except Exception as e:
             dashboard.progress["error"] = f"{type(e).__name__}: {e}"
@@ -115,9 +216,45 @@ class Indexer(commands.Cog):
             # 等待所有被取消的消费者任务完全停止
             await asyncio.gather(*consumer_tasks, return_exceptions=True)
 
+            # 写入缓冲区中剩余的帖子，并等待它们的后续处理完成，之后检查点才是准确的
+            await dashboard.write_service.stop()
+            await asyncio.gather(*dashboard.pending_writes, return_exceptions=True)
+            write_service = dashboard.write_service
+            logging.info(
+                f"[{dashboard.channel.id}] 批量写入 {write_service.written_count} 个帖子，"
+                f"共 {write_service.batch_count} 批，耗时 {write_service.write_seconds:.2f}s"
+            )
+            author_stats = self.bot.sync_service.author_cache.get_stats()
+            logging.info(
+                f"[{dashboard.channel.id}] 作者信息 (累计): 每 1000 个帖子获取用户 "
+                f"{author_stats['user_lookups_per_1k_threads']} 次，"
+                f"写入数据库 {author_stats['db_writes_per_1k_threads']} 行"
+            )
+
             # 标记完成并更新UI
-            if not dashboard.progress.get("error"):
-                dashboard.progress["finished"] = True
+            dashboard.progress["finished"] = True
+
+            # 记录检查点的最终状态：取消或失败的任务可以通过“继续上次”模式续建
+            if dashboard.progress.get("error"):
+                final_status = IndexStatus.FAILED
+            elif dashboard.is_cancelled():
+                final_status = IndexStatus.CANCELLED
+            else:
+                final_status = IndexStatus.COMPLETED
+            try:
+                if final_status != IndexStatus.COMPLETED:
+                    await self._save_checkpoint(dashboard)
+                async with self.session_factory() as session:
+                    await IndexCheckpointRepository(session).finish_run(
+                        channel_id=dashboard.channel.id,
+                        status=final_status,
+                        started_at=dashboard.run_started_at,
+                    )
+            except Exception as e:
+                logging.error(
+                    f"[{dashboard.channel.id}] 更新索引检查点状态失败: {e}",
+                    exc_info=True,
+                )
 
             # 检查令牌是否已过期来决定如何发送最终状态
             if dashboard.is_token_expired:
@@ -146,7 +283,7 @@ class Indexer(commands.Cog):
                 await dashboard.update_embed()
 
             # 分发全局事件
-            if not dashboard.progress.get("error"):
+            if final_status == IndexStatus.COMPLETED:
                 logging.info(
                     f"[{dashboard.channel.id}] 索引完成，分发 'index_updated' 事件。"
                 )
@@ -157,31 +294,56 @@ class Indexer(commands.Cog):
         channel = dashboard.channel
         progress = dashboard.progress
         queue = dashboard.queue
+        tracker = dashboard.page_tracker
 
         # 活跃线程 (来自缓存，无API调用)
         for thread in channel.threads:
-            await queue.put(thread)
+            tracker.add(tracker.ACTIVE_PAGE)
+            await queue.put((tracker.ACTIVE_PAGE, thread))
             progress["discovered"] += 1
-
-        # 已归档线程 (手动分页)
-        before_timestamp = None
-        while not dashboard.is_cancelled():
+        tracker.seal(tracker.ACTIVE_PAGE, None)
+
+        # 已归档线程 (手动分页)，续建时从检查点游标处继续
+        before_timestamp = dashboard.resume_from
+        page = tracker.ACTIVE_PAGE
+        reached_indexed = False
+        while not dashboard.is_cancelled() and not reached_indexed:
+            page += 1
             batch = []
             try:
                 async for thread in channel.archived_threads(
                     limit=100, before=before_timestamp
                 ):
+                    # 增量模式：早于上次成功索引开始时间归档的帖子已被索引且之后未变化，
+                    # 归档列表按归档时间倒序排列，后面的帖子只会更早，因此可以停止翻页
+                    if (
+                        dashboard.incremental_since
+                        and thread.archive_timestamp < dashboard.incremental_since
+                    ):
+                        reached_indexed = True
+                        break
                     batch.append(thread)
-                    await queue.put(thread)
+                    tracker.add(page)
+                    await queue.put((page, thread))
                     progress["discovered"] += 1
             except Exception as e:
+                # 记录为致命错误：任务会以失败状态结束并保留游标，之后可以“继续上次”；
+                # 若当作扫描完毕，任务会被标记为完成，未扫描的归档帖子会被之后的增量索引永久跳过
                 logging.error(f"[{channel.id}] 获取归档帖子时出错: {e}", exc_info=True)
-                pass
+                progress["error"] = f"获取归档帖子失败: {type(e).__name__}: {e}"
+
+            if batch:
+                before_timestamp = batch[-1].archive_timestamp
+            if tracker.seal(page, before_timestamp if batch else None):
+                await self._save_checkpoint(dashboard)
 
-            if not batch:
+            if not batch or progress.get("error"):
                 break
 
-            before_timestamp = batch[-1].archive_timestamp
+        if reached_indexed:
+            logging.info(
+                f"[{channel.id}] 增量索引已到达上次成功索引的位置，停止扫描归档帖子。"
+            )
 
         if not dashboard.is_cancelled():
             progress["total"] = progress["discovered"]
@@ -196,18 +358,29 @@ class Indexer(commands.Cog):
                 if dashboard.is_cancelled():
                     break
 
-                async with dashboard.consumer_semaphore:
+                async with dashboard.concurrency.slot():
                     if (
                         dashboard.is_cancelled()
-                    ):  # 再次检查，因为可能在等待信号量时被取消
+                    ):  # 再次检查，因为可能在等待并发名额时被取消
                         break
 
-                    thread = await dashboard.queue.get()
+                    page, thread = await dashboard.queue.get()
 
+                    write_future = None
                     try:
-                        await self.sync_service.sync_thread(
+                        # 元数据未变化的已索引帖子无需重新获取和解析
+                        if await self.sync_service.skip_if_unchanged(thread):
+                            dashboard.progress["skipped"] += 1
+                            continue
+
+                        dashboard.progress["parsed"] += 1
+                        started = time.monotonic()
+                        record = await self.sync_service.build_thread_record(
                             thread, fetch_if_incomplete=True
                         )
+                        dashboard.concurrency.record_latency(time.monotonic() - started)
+                        if record is not None:
+                            write_future = await dashboard.write_service.submit(record)
                     except Exception as e:
                         error_reason = f"{type(e).__name__}"
                         logging.error(
@@ -218,21 +391,76 @@ class Indexer(commands.Cog):
                             {"id": thread.id, "reason": error_reason}
                         )
                     finally:
-                        # 无论成功还是失败，都将帖子标记为“已处理”，以确保进度条最终能达到100%
-                        dashboard.progress["processed"] += 1
-                        dashboard.queue.task_done()
+                        if write_future is None:
+                            await self._mark_processed(dashboard, page)
+                        else:
+                            # 不等待批次写入，消费者继续处理下一个帖子
+                            task = self.bot.loop.create_task(
+                                self._finish_write(dashboard, page, thread, write_future)
+                            )
+                            dashboard.pending_writes.add(task)
+                            task.add_done_callback(dashboard.pending_writes.discard)
 
         except asyncio.CancelledError:
             # logging.info(f"消费者 #{consumer_id} 被取消")
             pass
 
+    async def concurrency_controller(self, dashboard: IndexerDashboard):
+        """周期性地根据 429 次数和处理延迟调整消费者并发 (与消费者一同启动和取消)"""
+        monitor = self.bot.rate_limit_monitor
+        last_429 = monitor.total_429
+        try:
+            while True:
+                await asyncio.sleep(CONCURRENCY_ADJUST_INTERVAL)
+                current_429 = monitor.total_429
+                rate_limited, last_429 = current_429 - last_429, current_429
+                # 暂停期间索引没有发出请求，不调整
+                if dashboard.is_paused():
+                    continue
+                reason = await dashboard.concurrency.adjust(rate_limited)
+                if reason:
+                    logging.info(
+                        f"[{dashboard.channel.id}] 索引并发调整为 {dashboard.concurrency.limit} ({reason})"
+                    )
+        except asyncio.CancelledError:
+            pass
+
+    async def _finish_write(
+        self,
+        dashboard: IndexerDashboard,
+        page: int,
+        thread: discord.Thread,
+        write_future: asyncio.Future,
+    ):
+        """等待帖子所在批次写入数据库，再处理首次检测的自动关注并标记为已处理。"""
+        try:
+            is_first_detect = await write_future
+            if is_first_detect:
+                await self.sync_service.auto_follow_on_first_detect(thread)
+        except Exception as e:
+            logging.error(f"写入帖子 {thread.id} 时出错: {e}", exc_info=True)
+            dashboard.progress["failures"].append(
+                {"id": thread.id, "reason": f"{type(e).__name__}"}
+            )
+        finally:
+            await self._mark_processed(dashboard, page)
+
+    async def _mark_processed(self, dashboard: IndexerDashboard, page: int):
+        """将帖子标记为已处理；一整页处理完毕后，把该页的游标写入检查点。"""
+        # 无论成功还是失败，都将帖子标记为“已处理”，以确保进度条最终能达到100%
+        dashboard.progress["processed"] += 1
+        dashboard.queue.task_done()
+        if dashboard.page_tracker.done(page):
+            await self._save_checkpoint(dashboard)
+
     @commands.Cog.listener()
     async def on_guild_channel_update(
         self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
     ):
         """
         监听频道更新事件。
-        当变动的频道为已索引频道且标签发生任何变化（增、删、改）时，重建 TagService 的缓存。
+        当变动的频道为已索引频道且标签发生任何变化（增、删、改）时，只把该频道变化的标签
+        增量应用到 TagService 的缓存；增量更新失败时回退到全量重建。
         """
         if not isinstance(after, discord.ForumChannel) or not isinstance(
             before, discord.ForumChannel
@@ -248,11 +476,24 @@ class Indexer(commands.Cog):
             return
 
         logging.info(
-            f"检测到已索引论坛频道 '{after.name}' (ID: {after.id}) 的标签发生变化，准备刷新 TagService 缓存。"
+            f"检测到已索引论坛频道 '{after.name}' (ID: {after.id}) 的标签发生变化，准备更新 TagService 缓存。"
         )
 
         try:
-            # 调用服务重建整个缓存，确保数据完全同步
+            diff = await self.tag_service.apply_channel_tag_diff(
+                before.available_tags, after.available_tags
+            )
+            logging.info(
+                f"TagService 缓存已增量更新: 新增 {len(diff['added'])}、改名 {len(diff['renamed'])}、"
+                f"删除 {len(diff['removed'])} 个标签，阻塞事件循环 {diff['blocking_seconds'] * 1000:.2f}ms。"
+            )
+            return
+        except Exception as e:
+            logging.error(
+                f"增量更新 TagService 缓存时出错，回退到全量重建: {e}", exc_info=True
+            )
+
+        try:
             await self.tag_service.build_cache()
             logging.info("TagService 缓存已因频道更新而成功刷新。")
         except Exception as e:
@@ -5,38 +5,92 @@ from typing import Optional
 
 import discord
 
+from core.thread_batch_write_service import ThreadBatchWriteService
+from shared.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from indexer.archive_page_tracker import ArchivePageTracker
+from shared.enum.index_mode import IndexMode
+from shared.exceptions import APIRequestExpiredError
 from shared.safe_defer import safe_defer
 
+MODE_LABELS = {
+    IndexMode.FULL: "完整索引",
+    IndexMode.RESUME: "继续上次",
+    IndexMode.INCREMENTAL: "增量索引",
+}
+
 
 class IndexerDashboard(discord.ui.View):
     """索引器仪表板视图，用于控制和显示索引过程。"""
 
-    def __init__(self, cog, channel: discord.ForumChannel, config: dict):
+    def __init__(
+        self,
+        cog,
+        channel: discord.ForumChannel,
+        config: dict,
+        mode: IndexMode = IndexMode.FULL,
+        resume_from: Optional[datetime] = None,
+        resumed_count: int = 0,
+        incremental_since: Optional[datetime] = None,
+        run_started_at: Optional[datetime] = None,
+    ):
         super().__init__(timeout=None)
         self.cog = cog
         self.channel = channel
         self.interaction: Optional[discord.Interaction] = None
         self.config = config
 
+        # 运行模式与检查点
+        self.mode = mode
+        # 续建时沿用被中断任务的开始时间：成功后它会成为增量索引的基准，
+        # 若改用续建的开始时间，两次开始之间归档的帖子会被之后的增量索引永久跳过
+        self.run_started_at = run_started_at or datetime.now(timezone.utc)
+        # 续建时，归档帖子从这个 archive_timestamp 之前继续翻页
+        self.resume_from = resume_from
+        # 增量索引时，早于该时间归档的帖子视为已索引且未变化
+        self.incremental_since = incremental_since
+        self.page_tracker = ArchivePageTracker(
+            initial_cursor=resume_from, initial_count=resumed_count
+        )
+
         # 新增属性
         self.start_time: Optional[datetime] = None
         # 将令牌有效期设置为14.5分钟（870秒），留出一些缓冲时间
         self.token_expiry_duration = timedelta(seconds=870)
 
-        # 从配置初始化消费者并发数和信号量
-        self.consumer_concurrency = self.config.get("performance", {}).get(
-            "indexer_concurrency", 5
+        # 从配置初始化自适应并发限制：以 indexer_concurrency 为初始值，
+        # 根据处理延迟和 429 次数在 [1, indexer_max_concurrency] 之间调整
+        performance_config = self.config.get("performance", {})
+        initial_concurrency = performance_config.get("indexer_concurrency", 5)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=initial_concurrency,
+            max_limit=performance_config.get(
+                "indexer_max_concurrency", initial_concurrency * 2
+            ),
+            target_latency=performance_config.get("indexer_target_latency_ms", 3000)
+            / 1000,
         )
-        self.consumer_semaphore = asyncio.Semaphore(self.consumer_concurrency)
+        # 按最大并发数启动消费者，实际同时处理的数量由 concurrency 控制
+        self.consumer_count = self.concurrency.max_limit
+
+        # 消费者解析出的帖子交给批量写入服务，按批次写入数据库
+        self.write_service = ThreadBatchWriteService(
+            cog.session_factory,
+            batch_size=performance_config.get("indexer_batch_size", 200),
+            flush_interval_ms=performance_config.get("indexer_batch_interval_ms", 500),
+        )
+        # 等待批次写入结果的任务，防止被垃圾回收
+        self.pending_writes: set[asyncio.Task] = set()
 
         self.queue = asyncio.Queue()
         self.progress = {
-            "discovered": 0,
-            "processed": 0,
+            "discovered": resumed_count,
+            "processed": resumed_count,
             "total": 0,
             "finished": False,
             "error": None,
             "failures": [],  # 用于记录非致命的处理失败
+            "skipped": 0,  # 元数据未变化、跳过解析的帖子数
+            "parsed": 0,  # 完整解析的帖子数
         }
 
         self._paused = asyncio.Event()
@@ -99,6 +153,7 @@ class IndexerDashboard(discord.ui.View):
 
         embed = discord.Embed(title=title, color=color)
         embed.add_field(name="状态", value=state, inline=False)
+        embed.add_field(name="模式", value=MODE_LABELS[self.mode], inline=False)
         embed.add_field(
             name="已发现帖子", value=str(progress_stats["discovered"]), inline=True
         )
@@ -107,6 +162,25 @@ class IndexerDashboard(discord.ui.View):
             value=f"{progress_stats['processed']} / {progress_stats.get('total', progress_stats['discovered'])}",
             inline=True,
         )
+        embed.add_field(
+            name="跳过未变化 / 完整解析",
+            value=f"{progress_stats['skipped']} / {progress_stats['parsed']}",
+            inline=True,
+        )
+
+        concurrency = self.concurrency
+        recent_limits = " → ".join(
+            str(limit) for _, limit, _ in list(concurrency.history)[-8:]
+        )
+        last_reason = concurrency.history[-1][2]
+        embed.add_field(
+            name="并发",
+            value=(
+                f"当前 {concurrency.limit} (范围 {concurrency.min_limit}~{concurrency.max_limit})\n"
+                f"历史: {recent_limits}\n最近调整: {last_reason}"
+            ),
+            inline=False,
+        )
 
         if error:
             embed.add_field(name="致命错误", value=f"```\n{error}\n```", inline=False)
@@ -141,7 +215,8 @@ class IndexerDashboard(discord.ui.View):
                 break  # 退出循环，停止更新UI
 
             logging.debug(f"[{self.channel.id}] UI updater_loop tick.")
-            await self.update_embed()
+            # 周期刷新在排队超过 10 秒后已经过时，直接丢弃，由下一次刷新补上
+            await self.update_embed(deadline=10)
             await asyncio.sleep(2)  # 每2秒更新一次
 
         logging.info(
@@ -150,8 +225,13 @@ class IndexerDashboard(discord.ui.View):
         )
         # 循环结束后，不再调用 update_embed，等待 run_indexer 发出最终的更新指令
 
-    async def update_embed(self):
-        """更新嵌入消息"""
+    async def update_embed(self, deadline: Optional[float] = None):
+        """
+        更新嵌入消息
+
+        Args:
+            deadline: 最长排队秒数，超过后放弃这次更新；为空时一直等待。
+        """
         if not self.interaction:
             return
 
@@ -165,12 +245,17 @@ class IndexerDashboard(discord.ui.View):
 
             # 使用中等优先级更新进度，以免阻塞高优任务
             # logging.info(f"正在为频道 {self.channel.id} 更新UI...")
-            await self.cog.bot.api_scheduler.submit(
-                coro_factory=lambda: self.interaction.edit_original_response(
-                    embed=embed, view=self
-                ),
-                priority=5,
-            )
+            try:
+                await self.cog.bot.api_scheduler.submit(
+                    coro_factory=lambda: self.interaction.edit_original_response(
+                        embed=embed, view=self
+                    ),
+                    priority=5,
+                    deadline=deadline,
+                    label="indexer.dashboard_update",
+                )
+            except APIRequestExpiredError:
+                logging.debug(f"[{self.channel.id}] 进度更新排队超时，已跳过。")
 
     @discord.ui.button(
         label="暂停", style=discord.ButtonStyle.secondary, custom_id="indexer_pause"
@@ -211,3 +296,6 @@ class IndexerDashboard(discord.ui.View):
 
     async def wait_if_paused(self):
         await self._paused.wait()
+
+    async def wait_cancelled(self):
+        await self._cancelled.wait()
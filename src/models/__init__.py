@@ -1,16 +1,22 @@
+from models.audit_checkpoint import AuditCheckpoint
 from models.author import Author
 from models.banner_application import BannerApplication
 from models.banner_carousel import BannerCarousel
 from models.banner_waitlist import BannerWaitlist
 from models.booklist import Booklist
 from models.booklist_item import BooklistItem
+from models.channel_tag_stat import ChannelTagStat
+from models.channel_thread_stat import ChannelThreadStat
+from models.index_checkpoint import IndexCheckpoint
 from models.bot_config import BotConfig
+from models.follow_unread_stat import FollowUnreadStat
 from models.mutex_tag_group import MutexTagGroup
 from models.mutex_tag_rule import MutexTagRule
 from models.thread_tag_link import ThreadTagLink
 from models.tag import Tag
 from models.tag_vote import TagVote
 from models.thread import Thread
+from models.thread_backfill import ThreadBackfill
 from models.thread_follow import ThreadFollow
 from models.user_collection import UserCollection
 from models.user_search_preferences import UserSearchPreferences
@@ -34,4 +40,10 @@ __all__ = [
     "UserCollection",
     "Booklist",
     "BooklistItem",
+    "AuditCheckpoint",
+    "IndexCheckpoint",
+    "ThreadBackfill",
+    "ChannelTagStat",
+    "ChannelThreadStat",
+    "FollowUnreadStat",
 ]
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class AuditCheckpoint(SQLModel, table=True):
+    """后台审计进度检查点，用于在重启后从上次的位置继续审计"""
+
+    __tablename__ = "audit_checkpoint"  # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, description="审计任务名称")
+
+    last_thread_pk: int = Field(
+        default=0, description="最后一个已提交审计的帖子主键 (Thread.id)，作为游标"
+    )
+    cycle: int = Field(default=0, description="已完成的完整审计轮次数")
+    cycle_started_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="当前审计轮次的开始时间 (UTC)",
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        description="检查点最后更新时间 (UTC)",
+    )
@@ -0,0 +1,19 @@
+from sqlmodel import BigInteger, Column, Field, SQLModel
+
+
+class ChannelTagStat(SQLModel, table=True):
+    """
+    各频道中每个标签下的有效帖子数 (not_found_count == 0)。
+    由数据库触发器随帖子及标签关联的变化同步维护，标签统计接口直接读取本表。
+    """
+
+    __tablename__ = "channel_tag_stat"  # type: ignore
+
+    guild_id: int = Field(
+        sa_column=Column(BigInteger, primary_key=True), description="服务器 Discord ID"
+    )
+    channel_id: int = Field(
+        sa_column=Column(BigInteger, primary_key=True), description="频道 Discord ID"
+    )
+    tag_id: int = Field(primary_key=True, description="标签 Discord ID")
+    thread_count: int = Field(default=0, description="带有该标签的有效帖子数")
@@ -0,0 +1,18 @@
+from sqlmodel import BigInteger, Column, Field, SQLModel
+
+
+class ChannelThreadStat(SQLModel, table=True):
+    """
+    各频道的有效帖子数 (not_found_count == 0)。
+    由数据库触发器随帖子的增删和可见性变化同步维护，频道帖子数统计直接读取本表。
+    """
+
+    __tablename__ = "channel_thread_stat"  # type: ignore
+
+    guild_id: int = Field(
+        sa_column=Column(BigInteger, primary_key=True), description="服务器 Discord ID"
+    )
+    channel_id: int = Field(
+        sa_column=Column(BigInteger, primary_key=True), description="频道 Discord ID"
+    )
+    thread_count: int = Field(default=0, description="频道中的有效帖子数")
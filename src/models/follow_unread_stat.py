@@ -0,0 +1,16 @@
+from sqlmodel import BigInteger, Column, Field, SQLModel
+
+
+class FollowUnreadStat(SQLModel, table=True):
+    """
+    每个用户关注列表中有未读更新的帖子数。
+    由数据库触发器在帖子发布更新、用户查看或增删关注时同步维护 (写时扩散)，
+    未读数接口只需按主键读取一行。没有记录的用户未读数为 0。
+    """
+
+    __tablename__ = "follow_unread_stat"  # type: ignore
+
+    user_id: int = Field(
+        sa_column=Column(BigInteger, primary_key=True), description="用户Discord ID"
+    )
+    unread_count: int = Field(default=0, description="有未读更新的关注帖子数")
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import BigInteger, Column, Field, SQLModel
+
+from shared.enum.index_mode import IndexMode, IndexStatus
+
+
+class IndexCheckpoint(SQLModel, table=True):
+    """论坛频道的索引进度检查点，用于断点续建与增量索引"""
+
+    __tablename__ = "index_checkpoint"  # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    channel_id: int = Field(
+        sa_column=Column(BigInteger, unique=True, index=True, nullable=False),
+        description="论坛频道 Discord ID",
+    )
+
+    status: str = Field(
+        default=IndexStatus.RUNNING.value, description="最近一次索引任务的状态"
+    )
+    mode: str = Field(default=IndexMode.FULL.value, description="最近一次索引任务的运行模式")
+
+    archive_before: Optional[datetime] = Field(
+        default=None,
+        description="已完整处理的归档帖子分页游标 (archive_timestamp)，续建时从这里继续向前翻页",
+    )
+    discovered: int = Field(default=0, description="本次任务已发现的帖子数")
+    processed: int = Field(default=0, description="本次任务已安全处理的帖子数")
+    failures: int = Field(default=0, description="本次任务处理失败的帖子数")
+
+    started_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="本次任务的开始时间 (UTC)",
+    )
+    last_success_started_at: Optional[datetime] = Field(
+        default=None,
+        description="最近一次成功完成的索引任务的开始时间 (UTC)，作为增量索引的基准",
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        description="检查点最后更新时间 (UTC)",
+    )
@@ -20,7 +20,7 @@ class TagVote(SQLModel, table=True):
     user_id: int = Field(index=True)
     tag_id: int = Field(index=True, foreign_key="tag.id")
     thread_id: int = Field(index=True, foreign_key="thread.id")
-    vote: int  # 1 代表赞成, -1 代表反对
+    vote: int  # 1 代表赞成, -1 代表反对, 0 代表已取消
 
     # 关系定义，用于 ORM 查询，不产生外键约束
     tag: "Tag" = Relationship(back_populates="votes")
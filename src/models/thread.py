@@ -82,6 +82,12 @@ class Thread(SQLModel, table=True):
     )
     """拉取失败次数，大于 0 则搜索不到，大于5则删除"""
 
+    sync_fingerprint: Optional[str] = Field(
+        default=None,
+        description="上次完整同步时帖子元数据 (标题、标签、消息数、最后消息ID) 的指纹",
+    )
+    """上次完整同步时的元数据指纹，未变化的帖子可跳过首楼解析"""
+
     display_count: int = Field(
         default=0,
         sa_column=Column(BigInteger, index=True),
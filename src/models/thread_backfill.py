@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import BigInteger, Column, Field, SQLModel
+
+
+class ThreadBackfill(SQLModel, table=True):
+    """等待补录的帖子：有活动但数据库中不存在的帖子 (幽灵数据)，重启后继续补录"""
+
+    __tablename__ = "thread_backfill"  # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    thread_id: int = Field(
+        sa_column=Column(BigInteger, unique=True, index=True, nullable=False),
+        description="帖子 Discord ID",
+    )
+    source: str = Field(default="", description="发现该帖子的来源，如 reply_count")
+    attempts: int = Field(default=0, description="已失败的补录次数")
+    enqueued_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="加入补录队列的时间 (UTC)",
+    )
@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class ThreadFollow(SQLModel, table=True):
     """用户关注帖子的关联表"""
 
     __tablename__ = "thread_follow"  # type: ignore
+    __table_args__ = (
+        # 用户和帖子的组合必须唯一，批量关注依赖它以 INSERT ... ON CONFLICT DO NOTHING 去重
+        Index("ix_thread_follow_user_thread", "user_id", "thread_id", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(index=True, description="用户Discord ID")
@@ -18,7 +22,3 @@ class ThreadFollow(SQLModel, table=True):
     last_viewed_at: Optional[datetime] = Field(
         default=None, description="最后查看时间，用于计算未读更新"
     )
-
-    class Config:
-        # 用户和帖子的组合必须唯一
-        table_args = {"sqlite_autoincrement": True}
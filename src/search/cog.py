@@ -494,8 +494,15 @@ class Search(commands.Cog):
         page: int,
         per_page: int,
         preview_mode: str,
+        facets: bool = True,
     ) -> dict:
-        """解析虚拟标签、执行数据库搜索并构建结果 Embed 列表"""
+        """
+        解析虚拟标签、执行数据库搜索并构建结果 Embed 列表
+
+        Args:
+            facets: 为 False 时不统计结果集的标签计数，返回的 tag_counts 为 None。
+                翻页时筛选条件不变，由调用方沿用上次的计数
+        """
         try:
             # 提取所有已被索引的频道ID，用于计算
             all_indexed_channels = self.cache_service.get_indexed_channel_ids_list()
@@ -547,14 +554,19 @@ class Search(commands.Cog):
             async with self.session_factory() as session:
                 repo = SearchService(session, self.tag_service)
                 offset = (page - 1) * per_page
-                threads, total_threads = await repo.search_threads_with_count(
-                    search_qo,
-                    limit=per_page,
-                    offset=offset,
-                    total_display_count=total_display_count,
-                    exploration_factor=exploration_factor,
-                    strength_weight=strength_weight,
+                threads, total_threads, search_facets = (
+                    await repo.search_threads_with_facets(
+                        search_qo,
+                        limit=per_page,
+                        offset=offset,
+                        total_display_count=total_display_count,
+                        exploration_factor=exploration_factor,
+                        strength_weight=strength_weight,
+                        facets=facets,
+                    )
                 )
+            # 结果集中各标签的帖子数，用于在标签选择器中标注；未统计时为 None
+            tag_counts = search_facets.tag_counts if search_facets else None
 
             # 当排序方法为按创建时间或收藏时间排序时，不记录展示次数
             count_view = not (
@@ -570,7 +582,11 @@ class Search(commands.Cog):
                 await self.impression_cache_service.increment(thread_ids_to_update)
 
             if not threads:
-                return {"has_results": False, "total": total_threads}
+                return {
+                    "has_results": False,
+                    "total": total_threads,
+                    "tag_counts": tag_counts,
+                }
 
             # 为帖子详情 embed 提取用于渲染的虚拟标签关联
             origins = (
@@ -610,6 +626,7 @@ class Search(commands.Cog):
                 "page": page,
                 "per_page": per_page,
                 "max_page": (total_threads + per_page - 1) // per_page or 1,
+                "tag_counts": tag_counts,
             }
         except Exception:
             logger.error("在 _search_and_display 中发生错误", exc_info=True)
@@ -90,3 +90,20 @@ class SortMethod(Enum):
                 # CUSTOM 没有 short_label，返回一个合理的默认值
                 return item.value.short_label or default
         return default
+
+
+# 分面统计中反应数直方图的分段下限，最后一段为 "500+"
+FACET_REACTION_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500)
+
+# 分面统计的延迟预算 (毫秒)：在 20 万帖子的语料上，对单个论坛频道规模的结果集 (约 2 万个帖子)
+# 计算标签计数与两个直方图，p95 应低于此值。
+FACET_LATENCY_BUDGET_MS = 150
+
+# 结果集超过此数量时不计算直方图 (只返回标签计数，并标记 histograms_skipped)。
+# 直方图需要再扫描一遍帖子表，全部 20 万帖子时单直方图部分就要 200~400ms。
+FACET_HISTOGRAM_MAX_RESULTS = 30_000
+
+# 整个语料 (20 万个结果，只算标签计数) 的延迟预算 (毫秒)。耗时随结果集大小线性增长，
+# 结果集超过 FACET_HISTOGRAM_MAX_RESULTS 时按此预算判断。
+# 见 tests/benchmarks/bench_search_facets.py，超出预算时 SearchService 会记录警告。
+FACET_FULL_CORPUS_LATENCY_BUDGET_MS = 600
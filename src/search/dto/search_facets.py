@@ -0,0 +1,22 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class SearchFacetsDTO(BaseModel):
+    """一次搜索结果集的分面统计"""
+
+    tag_counts: Dict[str, int] = {}
+    """结果集中带有各标签的帖子数，按标签名合并 (不同频道的同名标签计为同一个)"""
+
+    reaction_histogram: Dict[str, int] = {}
+    """按反应数分段的帖子数，键为分段标签 (如 "10-24")，按分段顺序排列；未请求时为空"""
+
+    created_histogram: Dict[str, int] = {}
+    """按创建月份 (YYYY-MM) 统计的帖子数，按时间顺序排列；未请求时为空"""
+
+    histograms_skipped: bool = False
+    """请求了直方图，但结果集超过 FACET_HISTOGRAM_MAX_RESULTS 而未计算"""
+
+    elapsed_ms: float = 0.0
+    """计算分面统计的耗时 (毫秒)"""
@@ -1,16 +1,36 @@
 import asyncio
+import json
 import logging
 import re
+import time
 from functools import partial
-from typing import Sequence
+from typing import Optional, Sequence
 
 import rjieba
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
-from sqlmodel import Float, and_, case, cast, func, select
+from sqlmodel import (
+    Float,
+    Integer,
+    and_,
+    case,
+    cast,
+    column,
+    func,
+    literal,
+    select,
+    union_all,
+)
 
 from core.tag_cache_service import TagCacheService
 from models import Author, Tag, Thread, ThreadTagLink, UserCollection
+from search.constants import (
+    FACET_FULL_CORPUS_LATENCY_BUDGET_MS,
+    FACET_HISTOGRAM_MAX_RESULTS,
+    FACET_LATENCY_BUDGET_MS,
+    FACET_REACTION_BUCKETS,
+)
+from search.dto.search_facets import SearchFacetsDTO
 from search.qo.thread_search import ThreadSearchQuery
 from shared.database import thread_fts_table
 from shared.enum.collection_type import CollectionType
@@ -86,6 +106,42 @@ class SearchService:
         """
         根据搜索条件搜索帖子并分页
         """
+        threads, total_count, _ = await self.search_threads_with_facets(
+            query,
+            limit=limit,
+            total_display_count=total_display_count,
+            exploration_factor=exploration_factor,
+            strength_weight=strength_weight,
+            offset=offset,
+            exclude_thread_ids=exclude_thread_ids,
+        )
+        return threads, total_count
+
+    async def search_threads_with_facets(
+        self,
+        query: ThreadSearchQuery,
+        *,
+        limit: int,
+        total_display_count: int,
+        exploration_factor: float,
+        strength_weight: float,
+        offset: int = 0,
+        exclude_thread_ids: Sequence[int | str] | None = None,
+        facets: bool = False,
+        histograms: bool = False,
+    ) -> tuple[Sequence[Thread], int, Optional[SearchFacetsDTO]]:
+        """
+        根据搜索条件搜索帖子并分页，可同时返回整个结果集 (不只是当前页) 的分面统计。
+
+        Args:
+            facets: 为 True 时计算结果集中各标签的帖子数
+            histograms: 为 True 时 (需同时开启 facets) 额外计算反应数与创建月份的直方图；
+                结果集超过 FACET_HISTOGRAM_MAX_RESULTS 时跳过并标记 histograms_skipped
+
+        Returns:
+            (当前页帖子, 结果总数, 分面统计或 None)
+        """
+        empty_facets = SearchFacetsDTO() if facets else None
         try:
             # 解析时间字符串
             try:
@@ -307,13 +363,13 @@ class SearchService:
                             fts_include_ids &= group_ids
 
                 if fts_include_ids is not None and not fts_include_ids:
-                    return [], 0
+                    return [], 0, empty_facets
 
             # 2c. 合并 FTS 结果到过滤器（纯 ID 集合，不再 JOIN thread_fts）
             if fts_include_ids is not None:
                 final_fts_ids = fts_include_ids - fts_exclude_ids
                 if not final_fts_ids:
-                    return [], 0
+                    return [], 0, empty_facets
                 filters.append(Thread.id.in_(final_fts_ids))  # type: ignore
             elif fts_exclude_ids:
                 filters.append(Thread.id.not_in(fts_exclude_ids))  # type: ignore
@@ -345,7 +401,13 @@ class SearchService:
             total_count = len(matched_ids)
 
             if total_count == 0:
-                return [], 0
+                return [], 0, empty_facets
+
+            search_facets = (
+                await self._compute_facets(matched_ids, histograms)
+                if facets
+                else None
+            )
 
             # --- 步骤 5: 用具体 ID 列表获取分页数据（无嵌套子查询）---
             final_select_stmt = (
@@ -423,14 +485,113 @@ class SearchService:
             result = await self.session.execute(final_select_stmt)
             threads = result.scalars().all()
 
-            return threads, total_count
+            return threads, total_count, search_facets
 
         except Exception:
             logging.error(
-                "Error during search_threads_with_count execution", exc_info=True
+                "Error during search_threads_with_facets execution", exc_info=True
             )
             raise
 
+    async def _compute_facets(
+        self, matched_ids: Sequence[int], histograms: bool
+    ) -> SearchFacetsDTO:
+        """
+        用一条 UNION ALL 语句对整个结果集计算分面统计：
+        标签计数 (kind=0) 按标签ID分组扫描一遍标签关联表；直方图 (kind=1) 扫描一遍帖子表，
+        按 (反应数分段, 创建月份) 分组后在内存中拆成两个直方图。查询次数不随标签数量增加。
+
+        步骤 4 已经得到结果集的全部ID，这里以一个 JSON 数组参数传入 (json_each 展开)，
+        不再重复执行过滤条件和标签子查询，也避免为每个ID生成一个绑定参数。
+
+        结果集超过 FACET_HISTOGRAM_MAX_RESULTS 时不计算直方图，使全部帖子的查询也能在
+        FACET_FULL_CORPUS_LATENCY_BUDGET_MS 内完成。
+        """
+        started = time.perf_counter()
+        histograms_skipped = histograms and len(matched_ids) > FACET_HISTOGRAM_MAX_RESULTS
+        if histograms_skipped:
+            histograms = False
+        matched_ids_json = json.dumps(list(matched_ids))
+        matched_id_rows = select(column("value")).select_from(
+            func.json_each(matched_ids_json)
+        )
+
+        parts = [
+            select(
+                literal(0).label("kind"),
+                ThreadTagLink.tag_id.label("bucket"),  # type: ignore[attr-defined]
+                literal(None, Integer).label("month"),
+                func.count().label("thread_count"),
+            )
+            .where(ThreadTagLink.thread_id.in_(matched_id_rows))  # type: ignore[attr-defined]
+            .group_by(ThreadTagLink.tag_id)
+        ]
+        if histograms:
+            reaction_bucket = case(
+                *[
+                    (Thread.reaction_count >= lower, index)
+                    for index, lower in reversed(list(enumerate(FACET_REACTION_BUCKETS)))
+                ],
+                else_=0,
+            )
+            created_month = cast(func.strftime("%Y%m", Thread.created_at), Integer)
+            parts.append(
+                select(literal(1), reaction_bucket, created_month, func.count())
+                .where(Thread.id.in_(matched_id_rows))  # type: ignore[union-attr]
+                .group_by(reaction_bucket, created_month)
+            )
+
+        statement = union_all(*parts) if len(parts) > 1 else parts[0]
+        rows = (await self.session.execute(statement)).all()
+
+        tag_counts: dict[str, int] = {}
+        reaction_counts: dict[int, int] = {}
+        month_counts: dict[int, int] = {}
+        for kind, bucket, month, count in rows:
+            if kind == 0:
+                tag_name = self.tag_cache_service.get_tag_name_by_id(bucket)
+                if tag_name:
+                    tag_counts[tag_name] = tag_counts.get(tag_name, 0) + count
+                continue
+            reaction_counts[bucket] = reaction_counts.get(bucket, 0) + count
+            if month is not None:
+                month_counts[month] = month_counts.get(month, 0) + count
+
+        search_facets = SearchFacetsDTO(
+            tag_counts=dict(
+                sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))
+            ),
+            reaction_histogram={
+                self._reaction_bucket_label(index): reaction_counts[index]
+                for index in sorted(reaction_counts)
+            },
+            created_histogram={
+                f"{month // 100:04d}-{month % 100:02d}": month_counts[month]
+                for month in sorted(month_counts)
+            },
+            histograms_skipped=histograms_skipped,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+        budget_ms = (
+            FACET_LATENCY_BUDGET_MS
+            if len(matched_ids) <= FACET_HISTOGRAM_MAX_RESULTS
+            else FACET_FULL_CORPUS_LATENCY_BUDGET_MS
+        )
+        if search_facets.elapsed_ms > budget_ms:
+            logging.warning(
+                f"分面统计耗时 {search_facets.elapsed_ms:.0f}ms ({len(matched_ids)} 个结果)，"
+                f"超出预算 {budget_ms}ms"
+            )
+        return search_facets
+
+    @staticmethod
+    def _reaction_bucket_label(index: int) -> str:
+        lower = FACET_REACTION_BUCKETS[index]
+        if index + 1 >= len(FACET_REACTION_BUCKETS):
+            return f"{lower}+"
+        upper = FACET_REACTION_BUCKETS[index + 1] - 1
+        return str(lower) if lower == upper else f"{lower}-{upper}"
+
     async def get_tags_for_author(self, author_id: int) -> Sequence[Tag]:
         """获取指定作者发布过的所有帖子的唯一标签列表"""
         statement = (
@@ -50,6 +50,8 @@ class CollectionSearchStrategy(SearchStrategy):
         components = []
         state = view.search_state
         all_tags = state.all_available_tags
+        # 上一次搜索结果集中各标签的帖子数，用于标注标签选项
+        tag_counts = (view.last_search_results or {}).get("tag_counts")
 
         # 第 0 行: 批量操作按钮
         components.append(
@@ -81,6 +83,7 @@ class CollectionSearchStrategy(SearchStrategy):
                 placeholder_prefix="正选",
                 custom_id="generic_include_tags",
                 on_change_callback=view.on_include_tags_change,
+                tag_counts=tag_counts,
                 row=1,
             )
         )
@@ -41,6 +41,8 @@ class DefaultSearchStrategy(SearchStrategy):
         components = []
         state = view.search_state
         all_tags = state.all_available_tags
+        # 上一次搜索结果集中各标签的帖子数，用于标注标签选项
+        tag_counts = (view.last_search_results or {}).get("tag_counts")
 
         # 第 0 行: 正选标签
         components.append(
@@ -52,6 +54,7 @@ class DefaultSearchStrategy(SearchStrategy):
                 placeholder_prefix="正选",
                 custom_id="generic_include_tags",
                 on_change_callback=view.on_include_tags_change,
+                tag_counts=tag_counts,
                 row=0,
             )
         )
@@ -66,6 +69,7 @@ class DefaultSearchStrategy(SearchStrategy):
                 placeholder_prefix="反选",
                 custom_id="generic_exclude_tags",
                 on_change_callback=view.on_exclude_tags_change,
+                tag_counts=tag_counts,
                 row=1,
             )
         )
@@ -57,6 +57,8 @@ class GenericSearchView(discord.ui.View):
         # --- UI状态 ---
         self.tags_per_page = 25
         self.last_search_results: dict | None = None
+        # 上次统计标签计数时的查询条件，相同时翻页沿用计数
+        self._facets_key: str | None = None
         self.custom_settings_message: Optional[discord.WebhookMessage] = None
 
     async def start(self, send_new_ephemeral: bool = False):
@@ -198,6 +200,13 @@ class GenericSearchView(discord.ui.View):
         state = self.search_state
         search_qo = self.build_query_object()
 
+        # 只有筛选条件改变时才重新统计标签计数；翻页时查询条件不变，
+        # 沿用上一次的计数，避免每次翻页都扫描整个结果集
+        # (search_and_display 会改写查询对象，需在调用前取得键)
+        facets_key = repr(search_qo)
+        cached_tag_counts = (self.last_search_results or {}).get("tag_counts")
+        compute_facets = facets_key != self._facets_key or cached_tag_counts is None
+
         # 从 self.search_state 中获取显示参数
         results = await self.cog.search_and_display(
             interaction=interaction,
@@ -205,7 +214,14 @@ class GenericSearchView(discord.ui.View):
             page=state.page,
             per_page=state.results_per_page,  # 传递每页数量
             preview_mode=state.preview_image_mode,  # 传递预览模式
+            facets=compute_facets,
         )
+        if results.get("error"):
+            self._facets_key = None
+        elif compute_facets:
+            self._facets_key = facets_key
+        else:
+            results["tag_counts"] = cached_tag_counts
         return results
 
     async def update_view_from_pager(
@@ -426,6 +442,8 @@ class GenericSearchView(discord.ui.View):
 
     async def refresh_view(self):
         """提供给子视图的回调，用于在数据更新后刷新此主视图"""
+        # 数据 (如收藏) 已变化，即使查询条件相同也需重新统计
+        self._facets_key = None
         if self.last_interaction:
             await self.update_view(self.last_interaction, rerun_search=True)
 
@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    可在运行中调整上限的自适应并发限制 (AIMD: 加性增、乘性减)，用于索引消费者和 API 调度器。
+
+    每个调整周期结束时调用 adjust：
+    - 周期内出现 429 或超时，或平均处理延迟超过目标值：并发上限乘以 backoff_factor；
+    - 否则如果周期内并发确实跑满了上限：上限加一。
+    上限始终限制在 [min_limit, max_limit] 之间，每次变化都会记入 history。
+    调整上限不会影响在途请求已占用的名额：上限降低时，只是在在途数回落到新上限以下之前不再放行。
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        target_latency: float = 3.0,
+        backoff_factor: float = 0.5,
+        history_size: int = 20,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.target_latency = target_latency
+        self.backoff_factor = backoff_factor
+        self.limit = self._clamp(initial)
+        self.in_flight = 0
+
+        self.history: deque[tuple[datetime, int, str]] = deque(maxlen=history_size)
+        """(时间, 调整后的并发上限, 原因)"""
+        self.history.append((datetime.now(timezone.utc), self.limit, "初始"))
+
+        self._condition = asyncio.Condition()
+        self._latencies: list[float] = []
+        self._peak_in_flight = 0
+
+    def _clamp(self, value: int) -> int:
+        return min(self.max_limit, max(self.min_limit, value))
+
+    async def acquire(self) -> None:
+        """占用一个并发名额，当前在途数达到上限时等待"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+
+    async def release(self) -> None:
+        """归还一个并发名额"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """在上下文中占用一个并发名额"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    async def resize(self, min_limit: int, max_limit: int, reason: str = "配置更新") -> None:
+        """更新上下限，当前上限超出新范围时收拢到范围内"""
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        await self._set_limit(self._clamp(self.limit), reason)
+
+    def record_latency(self, seconds: float) -> None:
+        """记录一次处理耗时"""
+        self._latencies.append(seconds)
+
+    async def adjust(self, rate_limited: int, timeouts: int = 0) -> Optional[str]:
+        """
+        根据上一个周期的观测结果调整并发上限。
+
+        Args:
+            rate_limited: 周期内观察到的 429 次数。
+            timeouts: 周期内观察到的超时 / 连接失败次数。
+
+        Returns:
+            上限发生变化时返回原因，否则返回 None。
+        """
+        latencies, self._latencies = self._latencies, []
+        peak, self._peak_in_flight = self._peak_in_flight, self.in_flight
+        average = sum(latencies) / len(latencies) if latencies else None
+
+        if rate_limited > 0:
+            new_limit = self._clamp(int(self.limit * self.backoff_factor))
+            reason = f"{rate_limited} 次 429"
+        elif timeouts > 0:
+            new_limit = self._clamp(int(self.limit * self.backoff_factor))
+            reason = f"{timeouts} 次超时"
+        elif average is not None and average > self.target_latency:
+            new_limit = self._clamp(int(self.limit * self.backoff_factor))
+            reason = f"平均延迟 {average:.1f}s"
+        elif latencies and peak >= self.limit:
+            new_limit = self._clamp(self.limit + 1)
+            reason = "运行健康"
+        else:
+            return None
+
+        if new_limit == self.limit:
+            return None
+        await self._set_limit(new_limit, reason)
+        return reason
+
+    async def _set_limit(self, new_limit: int, reason: str) -> None:
+        if new_limit == self.limit:
+            return
+        async with self._condition:
+            self.limit = new_limit
+            self._condition.notify_all()
+        self.history.append((datetime.now(timezone.utc), new_limit, reason))
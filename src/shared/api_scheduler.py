@@ -1,10 +1,21 @@
 import asyncio
 import logging
+import time
+from collections import Counter
+from datetime import datetime
 from itertools import count
-from typing import Any, Callable, Coroutine, NamedTuple
+from typing import Any, Callable, Coroutine, Hashable, NamedTuple, Optional
 
 from aiohttp.client_exceptions import ClientConnectorError
 
+from shared.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from shared.api_scheduler_metrics import SchedulerMetrics
+from shared.enum.api_route import APIRoute
+from shared.enum.queue_overflow_policy import QueueOverflowPolicy
+from shared.exceptions import APIQueueFullError, APIRequestExpiredError
+from shared.rate_limit_monitor import RateLimitEvent
+from shared.token_bucket import TokenBucket
+
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
@@ -19,6 +30,52 @@ class APIRequest(NamedTuple):
     count: int
     coro_factory: Callable[[], Coroutine[Any, Any, Any]]  # 将 coro 改为 coro_factory
     future: asyncio.Future
+    route: Optional[str] = None  # Discord API 路由，用于匹配速率限制桶
+    major_id: Optional[int] = None  # 路由主参数 (channel_id 等) 的取值，每个取值各有一个桶
+    dedup_key: Optional[Hashable] = None  # 相同 key 的排队中或执行中请求共享同一个结果
+    enqueued_at: float = 0.0  # 提交时间，用于计算老化后的优先级
+    label: str = "unlabeled"  # 调用方标签，用于分类统计
+
+
+def parse_rate_limit_config(
+    performance_config: dict,
+) -> tuple[Optional[tuple[int, float]], dict[str, tuple[int, float]]]:
+    """
+    从 performance 配置中读取全局和各路由的速率限制。
+    api_global_rate_limit 为 [请求数, 秒]，设为 null 表示不限制；
+    api_route_buckets 为 {路由: [请求数, 秒]}，对路由的每个主参数取值分别生效。
+    """
+    global_rate_limit = performance_config.get("api_global_rate_limit", [50, 1])
+    route_buckets = performance_config.get("api_route_buckets", {})
+    return (
+        (int(global_rate_limit[0]), float(global_rate_limit[1]))
+        if global_rate_limit
+        else None,
+        {
+            route: (int(limit), float(per))
+            for route, (limit, per) in route_buckets.items()
+        },
+    )
+
+
+def parse_queue_config(performance_config: dict) -> dict[str, Any]:
+    """
+    从 performance 配置中读取调度队列的老化和容量设置。
+    api_max_queue_depth 为 {优先级: 最大排队数}，JSON 中的键是字符串。
+    """
+    return {
+        "aging_interval": performance_config.get("api_priority_aging_seconds", 10),
+        "aging_floor": performance_config.get("api_priority_aging_floor", 5),
+        "max_queue_depth": {
+            int(priority): int(depth)
+            for priority, depth in performance_config.get(
+                "api_max_queue_depth", {}
+            ).items()
+        },
+        "overflow_policy": QueueOverflowPolicy(
+            performance_config.get("api_queue_overflow", QueueOverflowPolicy.REJECT)
+        ),
+    }
 
 
 class APIScheduler:
@@ -26,68 +83,299 @@ class APIScheduler:
     一个带优先级的中央API请求调度器。
     它确保高优先级任务（如用户UI交互）能抢占低优先级任务（如后台索引），
     并使用Semaphore来使总并发数不超过Discord的速率限制。
+
+    除并发数外，调度器还维护一个全局令牌桶，并为配置了限制的路由按主参数取值 (如每个 channel_id) 各维护一个令牌桶：
+    每次派发时，在全局桶有余量的前提下，选择所在桶仍有余量的最高优先级请求，
+    这样低优先级请求耗尽某个桶的额度时，不会挡住其他桶的请求，也不会让同一个桶上的高优先级请求撞上 429。
+    discord.py 自行消化 429 并重试，调度器通过 on_rate_limited 接收 RateLimitMonitor 转发的 429，
+    在 retry_after 内暂停对应的桶 (全局 429 则暂停全部请求)。
+
+    为防止低优先级请求被饿死，排队中的请求每等待 aging_interval 秒，优先级提升一级，
+    但最多提升到 aging_floor，不会越过交互请求使用的高优先级；
+    每个优先级可以设置最大排队数，超出时按 overflow_policy 拒绝新请求或丢弃最旧的请求；
+    提交时还可以指定截止时间，超时仍未执行的请求会被取消，而不是迟到执行。
     """
 
-    def __init__(self, concurrent_requests: int = 10):
+    # 空闲的主参数桶超过这个数量时清理一次，避免每个帖子各留一个桶
+    MAX_IDLE_BUCKETS = 1024
+    # 并发上限的调整周期 (秒)
+    CONCURRENCY_ADJUST_INTERVAL = 5
+
+    def __init__(
+        self,
+        concurrent_requests: int = 10,
+        *,
+        min_concurrent_requests: int = 4,
+        target_latency: float = 2.0,
+        global_rate_limit: Optional[tuple[int, float]] = (50, 1.0),
+        route_buckets: Optional[dict[str, tuple[int, float]]] = None,
+        aging_interval: Optional[float] = 10.0,
+        aging_floor: int = 5,
+        max_queue_depth: Optional[dict[int, int]] = None,
+        overflow_policy: QueueOverflowPolicy = QueueOverflowPolicy.REJECT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         """
         初始化调度器。
-        :param concurrent_requests: 允许同时发往Discord API的最大并发请求数。
+        :param concurrent_requests: 允许同时发往Discord API的最大并发请求数，也是初始并发数。
+        :param min_concurrent_requests: 自动调整时并发数的下限。
+        :param target_latency: 单个 Discord API 请求的目标平均耗时 (秒)，超过时并发减半。
+        :param global_rate_limit: 全局速率限制 (请求数, 秒)，None 表示不限制。
+        :param route_buckets: 各路由的速率限制 {路由: (请求数, 秒)}，对路由的每个主参数取值分别生效；
+            未配置的路由只受全局限制，收到 429 时在 retry_after 内暂停。
+        :param aging_interval: 排队请求每等待多少秒提升一级优先级，None 表示不老化。
+        :param aging_floor: 老化最多提升到的优先级。应高于 (数值大于) 交互请求的优先级，
+            否则积压的后台请求会排到新的交互请求之前。
+        :param max_queue_depth: 各优先级的最大排队数 {优先级: 数量}，未配置的优先级不限制。
+        :param overflow_policy: 队列已满时拒绝新请求还是丢弃最旧的请求。
+        :param clock: 单调时钟，测试时可以替换。
         """
-        self._queue = asyncio.PriorityQueue[APIRequest]()
-        self._semaphore = asyncio.Semaphore(concurrent_requests)
+        self._pending: list[APIRequest] = []
+        # 各优先级 (提交时的原始优先级) 当前的排队数
+        self._pending_by_priority: Counter[int] = Counter()
+        self._wakeup = asyncio.Event()
+        # 并发上限按 429、超时和请求耗时自动调整 (AIMD)，调整不影响在途请求已占用的名额
+        self._limiter = AdaptiveConcurrencyLimiter(
+            initial=concurrent_requests,
+            min_limit=min(min_concurrent_requests, concurrent_requests),
+            max_limit=concurrent_requests,
+            target_latency=target_latency,
+        )
         self._task: asyncio.Task | None = None
+        self._controller_task: asyncio.Task | None = None
+        self._resize_task: asyncio.Task | None = None
         self._is_running = False
         self._counter = count()
+        self._clock = clock
+
+        self._global_bucket: Optional[TokenBucket] = None
+        # 各路由配置的限制 {路由: (请求数, 秒)}
+        self._route_limits: dict[str, tuple[int, float]] = {}
+        # 按 (路由, 主参数取值) 懒创建的令牌桶
+        self._buckets: dict[tuple[str, Optional[int]], TokenBucket] = {}
+        # 收到 429 的 (路由, 主参数取值)，在此时间之前不派发
+        self._blocked_until: dict[tuple[str, Optional[int]], float] = {}
+        # 收到全局 429 后，在此时间之前不派发任何请求
+        self._global_blocked_until = 0.0
+        self.update_rate_limits(global_rate_limit, route_buckets)
+        self.update_queue_policy(
+            aging_interval, max_queue_depth, overflow_policy, aging_floor
+        )
+
+        # 排队中或执行中、带 dedup_key 的请求 {dedup_key: 共享的 Future}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+        # 统计信息
+        self.rate_limited_count = 0
+        self.rate_limited_by_route: Counter[str] = Counter()
+        self.coalesced_count = 0
+        self.coalesced_by_route: Counter[str] = Counter()
+        self.rejected_by_priority: Counter[int] = Counter()
+        self.shed_by_priority: Counter[int] = Counter()
+        self.expired_by_priority: Counter[int] = Counter()
+        self.timeout_count = 0
+        # 按优先级和调用方标签统计的计数与耗时直方图
+        self.metrics = SchedulerMetrics()
 
     async def _dispatcher_loop(self):
         """调度器的主循环，从队列中拉取请求并派发给worker。"""
         logger.debug("API scheduler loop started.")
         while self._is_running:
-            await self._semaphore.acquire()
+            await self._limiter.acquire()
             try:
-                # 从优先级队列中获取下一个最高优先级的请求
-                request = await self._queue.get()
+                # 获取下一个速率限制允许发送的最高优先级请求
+                request = await self._next_request()
 
-                # 检查是否是哨兵对象 (None)
+                # 调度器已停止
                 if request is None:
-                    self._semaphore.release()  # 释放为哨兵对象获取的信号量
-                    self._queue.task_done()
+                    await self._limiter.release()
                     break
 
                 # 为请求创建一个worker任务
                 asyncio.create_task(self._worker(request))
 
-                # 立即标记任务完成，因为我们已经把它移交给了worker
-                self._queue.task_done()
-
             except asyncio.CancelledError:
                 # 如果在获取信号量后、创建worker前被取消，释放信号量以防泄漏
-                self._semaphore.release()
+                await self._limiter.release()
                 logger.info("API scheduler loop was explicitly cancelled.")
                 break
             except Exception:
                 # 同样，在其他异常情况下也要释放信号量
-                self._semaphore.release()
+                await self._limiter.release()
                 logger.exception("Error in API scheduler loop. This should not happen.")
                 # 短暂休眠以避免在持续错误的情况下快速消耗CPU
                 await asyncio.sleep(1)
 
+    async def _next_request(self) -> Optional[APIRequest]:
+        """等待并取出下一个可以发送的请求，调度器停止时返回 None"""
+        while self._is_running:
+            request, wait = self._pick_ready(self._clock())
+            if request is not None:
+                return request
+            # 没有可发送的请求：等到最近的桶重置，或有新请求提交
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return None
+
+    def _get_bucket(self, key: tuple[str, Optional[int]]) -> Optional[TokenBucket]:
+        """取得 (路由, 主参数取值) 对应的令牌桶，路由没有配置限制时返回 None"""
+        bucket = self._buckets.get(key)
+        if bucket is None and key[0] in self._route_limits:
+            if len(self._buckets) >= self.MAX_IDLE_BUCKETS:
+                now = self._clock()
+                # 窗口已过期的桶与新建的桶等价，可以丢弃 (wait_time 会先按时间补满令牌)
+                self._buckets = {
+                    k: b
+                    for k, b in self._buckets.items()
+                    if b.wait_time(now) > 0 or b.reset_at is not None
+                }
+            bucket = self._buckets[key] = TokenBucket(*self._route_limits[key[0]])
+        return bucket
+
+    def _route_wait_time(self, request: APIRequest, now: float) -> float:
+        if request.route is None:
+            return 0.0
+        key = (request.route, request.major_id)
+        bucket = self._buckets.get(key)
+        wait = bucket.wait_time(now) if bucket else 0.0
+        blocked_until = self._blocked_until.get(key)
+        if blocked_until is not None:
+            if blocked_until <= now:
+                del self._blocked_until[key]
+            else:
+                wait = max(wait, blocked_until - now)
+        return wait
+
+    def _pick_ready(self, now: float) -> tuple[Optional[APIRequest], Optional[float]]:
+        """
+        选出路由桶有余量的最高优先级请求并扣除令牌。
+
+        Returns:
+            (请求, None)；没有可发送的请求时返回 (None, 需要等待的秒数)，
+            队列为空时等待时间为 None。
+        """
+        if not self._pending:
+            return None, None
+
+        global_wait = self._global_blocked_until - now
+        if self._global_bucket is not None:
+            global_wait = max(global_wait, self._global_bucket.wait_time(now))
+        if global_wait > 0:
+            return None, global_wait
+
+        best: Optional[APIRequest] = None
+        best_key: tuple[float, int] = (0, 0)
+        soonest: Optional[float] = None
+        for request in self._pending:
+            wait = self._route_wait_time(request, now)
+            if wait > 0:
+                soonest = wait if soonest is None else min(soonest, wait)
+                continue
+            key = (self._effective_priority(request, now), request.count)
+            if best is None or key < best_key:
+                best, best_key = request, key
+
+        if best is None:
+            return None, soonest
+
+        self._remove_pending(best)
+        if self._global_bucket is not None:
+            self._global_bucket.consume(now)
+        if best.route is not None:
+            bucket = self._get_bucket((best.route, best.major_id))
+            if bucket is not None:
+                bucket.consume(now)
+        return best, None
+
+    def _effective_priority(self, request: APIRequest, now: float) -> float:
+        """老化后的优先级：每等待 aging_interval 秒提升一级，最多提升到 aging_floor"""
+        if not self.aging_interval:
+            return request.priority
+        aged = request.priority - (now - request.enqueued_at) // self.aging_interval
+        # 本身就高于下限的请求不受影响
+        return max(aged, min(request.priority, self.aging_floor))
+
+    def _expire(self, future: asyncio.Future):
+        """
+        截止时间到达时由定时器调用：请求仍在排队则取消，已开始执行则不做处理。
+        定时器独立于并发名额，所有名额都被占用时也能按时取消。
+        """
+        for request in self._pending:
+            if request.future is future:
+                self._remove_pending(request)
+                self.expired_by_priority[request.priority] += 1
+                self.metrics.record_outcome(request.priority, request.label, "expired")
+                if not future.done():
+                    future.set_exception(
+                        APIRequestExpiredError(
+                            f"请求 (优先级: {request.priority}) 在截止时间前未能执行"
+                        )
+                    )
+                return
+
+    def _admit(self, priority: int, label: str):
+        """检查该优先级的队列容量，已满时按策略拒绝新请求或丢弃最旧的请求"""
+        max_depth = self.max_queue_depth.get(priority)
+        if max_depth is None or self._pending_by_priority[priority] < max_depth:
+            return
+
+        queued = [r for r in self._pending if r.priority == priority]
+        if self.overflow_policy == QueueOverflowPolicy.REJECT or not queued:
+            self.rejected_by_priority[priority] += 1
+            self.metrics.record_outcome(priority, label, "rejected")
+            raise APIQueueFullError(f"优先级 {priority} 的请求队列已满 ({max_depth})")
+
+        oldest = min(queued, key=lambda r: r.count)
+        self._remove_pending(oldest)
+        self.shed_by_priority[priority] += 1
+        self.metrics.record_outcome(priority, oldest.label, "shed")
+        if not oldest.future.done():
+            oldest.future.set_exception(
+                APIQueueFullError(f"优先级 {priority} 的请求队列已满，最旧的请求被丢弃")
+            )
+
+    def _enqueue(self, request: APIRequest):
+        self._pending.append(request)
+        self._pending_by_priority[request.priority] += 1
+        self._wakeup.set()
+
+    def _remove_pending(self, request: APIRequest):
+        self._pending.remove(request)
+        self._pending_by_priority[request.priority] -= 1
+
     async def _worker(self, request: APIRequest):
         """处理单个API请求的完整生命周期"""
         max_retries = 3
         retry_delay = 1.0  # 初始延迟时间 (秒)
+        priority, label = request.priority, request.label
+        self.metrics.record_wait(priority, label, self._clock() - request.enqueued_at)
         try:
             for attempt in range(max_retries):
                 try:
                     # 在每次尝试时都创建一个新的协程
                     fresh_coroutine = request.coro_factory()
-                    result = await fresh_coroutine
+                    started = self._clock()
+                    try:
+                        result = await fresh_coroutine
+                    finally:
+                        elapsed = self._clock() - started
+                        self.metrics.record_exec(priority, label, elapsed)
+                    # 只有单个 REST 调用 (带路由) 的耗时能反映 Discord 的响应速度，
+                    # 包装了整段业务流程的请求不参与并发调整
+                    if request.route is not None:
+                        self._limiter.record_latency(elapsed)
 
+                    self.metrics.record_outcome(priority, label, "succeeded")
                     if not request.future.done():
                         request.future.set_result(result)
                     return
                 except (asyncio.TimeoutError, ClientConnectorError) as e:
+                    self.timeout_count += 1
                     if attempt < max_retries - 1:
+                        self.metrics.record_retry(priority, label)
                         logger.debug(
                             f"协程 (优先级: {request.priority}) 遇到可重试错误 ({type(e).__name__})，"
                             f"将在 {retry_delay:.1f} 秒后进行重试 ({attempt + 2}/{max_retries})..."
@@ -98,6 +386,7 @@ class APIScheduler:
                         logger.error(
                             f"协程 (优先级: {request.priority}) 在 {max_retries} 次尝试后仍然失败。"
                         )
+                        self.metrics.record_outcome(priority, label, "failed")
                         if not request.future.done():
                             request.future.set_exception(e)
                         return
@@ -105,30 +394,150 @@ class APIScheduler:
                     logger.exception(
                         f"执行协程 (优先级: {request.priority}) 时发生错误: {e}"
                     )
+                    self.metrics.record_outcome(priority, label, "failed")
                     if not request.future.done():
                         request.future.set_exception(e)
                     return
         finally:
-            self._semaphore.release()
+            await self._limiter.release()
 
     async def submit(
-        self, *, coro_factory: Callable[[], Coroutine], priority: int
+        self,
+        *,
+        coro_factory: Callable[[], Coroutine],
+        priority: int,
+        route: Optional[str] = None,
+        major_id: Optional[int] = None,
+        dedup_key: Optional[Hashable] = None,
+        deadline: Optional[float] = None,
+        label: Optional[str] = None,
     ) -> Any:
         """
         向调度器提交一个API请求。
         :param coro_factory: 一个返回API调用协程的函数。
         :param priority: 请求的优先级 (1=最高, 10=低)。
+        :param route: 请求的 Discord API 路由 (见 APIRoute)，为空时只受全局限制。
+        :param major_id: 路由主参数的取值 (如 fetch_channel 的 channel_id)，同一路由的不同取值使用不同的桶。
+        :param dedup_key: 去重键。已有相同 key 的请求在排队或执行时，不再发起新请求，
+            而是等待同一个结果；请求仍在排队时，其优先级提升为所有等待者中最高的一个。
+            只应用于结果与调用时机无关的读取类请求。
+        :param deadline: 最长排队秒数。超过后仍未开始执行的请求会被取消，并抛出 APIRequestExpiredError；
+            合并到已有请求上的提交沿用原请求的截止时间。
+        :param label: 调用方标签 (如 "indexer.fetch_thread")，用于按调用方统计排队和执行耗时；
+            为空时使用路由，两者都为空时记为 "unlabeled"。
         :return: API调用协程的返回结果。
+        :raises APIQueueFullError: 该优先级的队列已满。
         """
         if not self._is_running:
             raise RuntimeError("API 调度器没有在运行")
+        if isinstance(route, APIRoute):
+            route = route.value
+        label = label or route or "unlabeled"
+        self.metrics.record_submitted(priority, label)
+
+        if dedup_key is not None and dedup_key in self._inflight:
+            future = self._inflight[dedup_key]
+            self.coalesced_count += 1
+            self.metrics.record_outcome(priority, label, "coalesced")
+            self.coalesced_by_route[route or "global"] += 1
+            self._raise_pending_priority(dedup_key, priority)
+            # 一个等待者被取消时，不能取消其他等待者共享的 Future
+            return await asyncio.shield(future)
+
+        self._admit(priority, label)
+        now = self._clock()
         future = asyncio.get_running_loop().create_future()
         count = next(self._counter)
         request = APIRequest(
-            priority=priority, count=count, coro_factory=coro_factory, future=future
+            priority=priority,
+            count=count,
+            coro_factory=coro_factory,
+            future=future,
+            route=route,
+            major_id=major_id,
+            dedup_key=dedup_key,
+            enqueued_at=now,
+            label=label,
         )
-        await self._queue.put(request)
-        return await future
+        if deadline is not None:
+            timer = asyncio.get_running_loop().call_later(
+                deadline, self._expire, future
+            )
+            future.add_done_callback(lambda _: timer.cancel())
+        if dedup_key is None:
+            self._enqueue(request)
+            return await future
+
+        self._inflight[dedup_key] = future
+        future.add_done_callback(lambda done: self._forget_inflight(dedup_key, done))
+        self._enqueue(request)
+        return await asyncio.shield(future)
+
+    def _forget_inflight(self, dedup_key: Hashable, future: asyncio.Future):
+        if self._inflight.get(dedup_key) is future:
+            del self._inflight[dedup_key]
+
+    def _raise_pending_priority(self, dedup_key: Hashable, priority: int):
+        """把仍在排队的同 key 请求的优先级提升到 priority (数值越小越优先)"""
+        for index, request in enumerate(self._pending):
+            if request.dedup_key == dedup_key:
+                if priority < request.priority:
+                    self._pending[index] = request._replace(priority=priority)
+                    self._pending_by_priority[request.priority] -= 1
+                    self._pending_by_priority[priority] += 1
+                    self._wakeup.set()
+                return
+
+    def update_rate_limits(
+        self,
+        global_rate_limit: Optional[tuple[int, float]],
+        route_buckets: Optional[dict[str, tuple[int, float]]] = None,
+    ):
+        """更新全局和各路由的速率限制配置，已有的路由桶会按新配置重新创建"""
+        self._global_bucket = (
+            TokenBucket(*global_rate_limit) if global_rate_limit else None
+        )
+        self._route_limits = {
+            (route.value if isinstance(route, APIRoute) else route): (limit, per)
+            for route, (limit, per) in (route_buckets or {}).items()
+        }
+        self._buckets.clear()
+        self._wakeup.set()
+
+    def update_queue_policy(
+        self,
+        aging_interval: Optional[float],
+        max_queue_depth: Optional[dict[int, int]] = None,
+        overflow_policy: QueueOverflowPolicy = QueueOverflowPolicy.REJECT,
+        aging_floor: int = 5,
+    ):
+        """更新优先级老化间隔与上限、各优先级的最大排队数和队列已满时的处理方式"""
+        self.aging_interval = aging_interval
+        self.aging_floor = aging_floor
+        self.max_queue_depth = dict(max_queue_depth or {})
+        self.overflow_policy = QueueOverflowPolicy(overflow_policy)
+        self._wakeup.set()
+
+    def on_rate_limited(self, event: RateLimitEvent):
+        """
+        RateLimitMonitor 的回调：discord.py 收到 429 时，在 retry_after 内暂停对应的桶。
+        全局 429 暂停所有请求；无法识别的路由只计数，由 discord.py 自己重试。
+        """
+        now = self._clock()
+        until = now + event.retry_after
+        if event.is_global:
+            self._global_blocked_until = max(self._global_blocked_until, until)
+            return
+
+        self.rate_limited_count += 1
+        matched = APIRoute.match(event.method or "", event.url or "")
+        if matched is None:
+            self.rate_limited_by_route["unknown"] += 1
+            return
+        route, major_id = matched
+        self.rate_limited_by_route[route.value] += 1
+        key = (route.value, major_id)
+        self._blocked_until[key] = max(self._blocked_until.get(key, 0.0), until)
 
     def start(self):
         """启动调度器后台任务。"""
@@ -136,19 +545,68 @@ class APIScheduler:
             return
         self._is_running = True
         self._task = asyncio.create_task(self._dispatcher_loop())
+        self._controller_task = asyncio.create_task(self._concurrency_controller())
         # logger.info("API 调度器开始")
 
-    def update_concurrency(self, new_concurrent_requests: int):
-        """更新并发请求数"""
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        导出调度器的观测数据：各优先级当前排队数、按优先级和调用方标签统计的
+        去向计数、重试次数、排队等待和执行耗时的直方图，以及当前并发上限和限流次数。
+        """
+        return {
+            **self.metrics.snapshot(self._pending_by_priority),
+            "concurrency_limit": self.concurrency_limit,
+            "rate_limited": self.rate_limited_count,
+            "timeouts": self.timeout_count,
+        }
+
+    @property
+    def concurrency_limit(self) -> int:
+        """当前的并发上限"""
+        return self._limiter.limit
+
+    @property
+    def concurrency_history(self) -> list[tuple[datetime, int, str]]:
+        """最近的并发上限调整记录 (时间, 调整后的上限, 原因)"""
+        return list(self._limiter.history)
+
+    async def _concurrency_controller(self):
+        """周期性地根据 429、超时次数和请求耗时调整并发上限"""
+        last_429, last_timeouts = self.rate_limited_count, self.timeout_count
+        try:
+            while self._is_running:
+                await asyncio.sleep(self.CONCURRENCY_ADJUST_INTERVAL)
+                rate_limited = self.rate_limited_count - last_429
+                timeouts = self.timeout_count - last_timeouts
+                last_429, last_timeouts = self.rate_limited_count, self.timeout_count
+                reason = await self._limiter.adjust(rate_limited, timeouts)
+                if reason:
+                    logger.info(
+                        f"API调度器并发数调整为 {self._limiter.limit} ({reason})"
+                    )
+        except asyncio.CancelledError:
+            pass
+
+    def update_concurrency(
+        self, new_concurrent_requests: int, min_concurrent_requests: Optional[int] = None
+    ):
+        """
+        更新并发数的上下限。
+        在途请求占用的名额保持不变，上限降低时只是暂缓放行新请求，直到在途数回落。
+        """
         if new_concurrent_requests <= 0:
             raise ValueError("并发请求数必须大于0")
 
-        # 创建新的信号量
-        old_semaphore = self._semaphore
-        self._semaphore = asyncio.Semaphore(new_concurrent_requests)
+        old_max = self._limiter.max_limit
+        min_limit = min(
+            min_concurrent_requests or self._limiter.min_limit, new_concurrent_requests
+        )
+        self._resize_task = asyncio.get_running_loop().create_task(
+            self._limiter.resize(min_limit, new_concurrent_requests)
+        )
 
         logger.info(
-            f"API调度器并发数已更新: {old_semaphore._value} -> {new_concurrent_requests}"
+            f"API调度器并发上限已更新: {old_max} -> {new_concurrent_requests}"
         )
 
     async def stop(self):
@@ -159,8 +617,12 @@ class APIScheduler:
         logger.info("即将停止API调度器...")
         self._is_running = False
 
-        # 向队列中放入哨兵对象，以通知循环退出
-        await self._queue.put(None)  # type: ignore
+        # 唤醒正在等待的主循环，让其退出
+        self._wakeup.set()
+
+        if self._controller_task:
+            self._controller_task.cancel()
+            await asyncio.gather(self._controller_task, return_exceptions=True)
 
         # 等待调度器主循环任务自然结束
         if self._task:
@@ -0,0 +1,114 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Hashable, Optional
+
+# 直方图的桶上界 (秒)，最后一个桶收集超过最大上界的样本
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 请求的最终去向
+OUTCOMES = ("succeeded", "failed", "coalesced", "rejected", "shed", "expired")
+
+
+class LatencyHistogram:
+    """固定桶边界的耗时直方图，记录样本数、总和与最大值"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        bounds = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class _Series:
+    """一个维度取值 (某个优先级或某个调用方标签) 下的计数和直方图"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.retries = 0
+        self.outcomes: Counter[str] = Counter()
+        self.wait = LatencyHistogram()
+        self.exec = LatencyHistogram()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "retries": self.retries,
+            **{outcome: self.outcomes[outcome] for outcome in OUTCOMES},
+            "wait_seconds": self.wait.snapshot(),
+            "exec_seconds": self.exec.snapshot(),
+        }
+
+
+class SchedulerMetrics:
+    """
+    APIScheduler 的观测数据，同时按优先级和调用方标签两个维度统计：
+    提交数、各去向 (成功/失败/合并/拒绝/丢弃/过期) 的次数、重试次数，
+    以及排队等待时间 (提交到派发) 和每次执行耗时的直方图。
+    时间由调度器的时钟给出，本类只做累加。
+    """
+
+    def __init__(self):
+        self._by_priority: defaultdict[int, _Series] = defaultdict(_Series)
+        self._by_label: defaultdict[str, _Series] = defaultdict(_Series)
+
+    def _series(self, priority: int, label: str) -> tuple[_Series, _Series]:
+        return self._by_priority[priority], self._by_label[label]
+
+    def record_submitted(self, priority: int, label: str):
+        for series in self._series(priority, label):
+            series.submitted += 1
+
+    def record_outcome(self, priority: int, label: str, outcome: str):
+        for series in self._series(priority, label):
+            series.outcomes[outcome] += 1
+
+    def record_wait(self, priority: int, label: str, seconds: float):
+        for series in self._series(priority, label):
+            series.wait.observe(seconds)
+
+    def record_exec(self, priority: int, label: str, seconds: float):
+        for series in self._series(priority, label):
+            series.exec.observe(seconds)
+
+    def record_retry(self, priority: int, label: str):
+        for series in self._series(priority, label):
+            series.retries += 1
+
+    def snapshot(
+        self, queue_depth: Optional[dict[Hashable, int]] = None
+    ) -> dict[str, Any]:
+        """
+        导出当前的统计数据。
+        :param queue_depth: 各优先级当前的排队数，由调度器提供。
+        """
+        return {
+            "queue_depth": {
+                str(priority): depth
+                for priority, depth in sorted((queue_depth or {}).items())
+                if depth
+            },
+            "by_priority": {
+                str(priority): series.snapshot()
+                for priority, series in sorted(self._by_priority.items())
+            },
+            "by_label": {
+                label: series.snapshot()
+                for label, series in sorted(self._by_label.items())
+            },
+        }
@@ -32,6 +32,248 @@ thread_fts_table = Table(
 )
 
 
+# 维护 channel_tag_stat / channel_thread_stat 的触发器：
+# 只统计 not_found_count == 0 的帖子，帖子的增删、可见性/频道变化和标签关联的增删都在同一事务内更新计数。
+# 帖子与其标签关联无论谁先删除，计数都只减一次 (先删关联时删除帖子的触发器已找不到关联，反之亦然)。
+TAG_STAT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_insert_stat
+    AFTER INSERT ON threadtaglink BEGIN
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT t.guild_id, t.channel_id, new.tag_id, 1 FROM thread t
+        WHERE t.id = new.thread_id AND t.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_delete_stat
+    AFTER DELETE ON threadtaglink BEGIN
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE tag_id = old.tag_id AND (guild_id, channel_id) = (
+            SELECT guild_id, channel_id FROM thread
+            WHERE id = old.thread_id AND not_found_count = 0
+        );
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threadtaglink_after_update_stat
+    AFTER UPDATE OF thread_id, tag_id ON threadtaglink BEGIN
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE tag_id = old.tag_id AND (guild_id, channel_id) = (
+            SELECT guild_id, channel_id FROM thread
+            WHERE id = old.thread_id AND not_found_count = 0
+        );
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT t.guild_id, t.channel_id, new.tag_id, 1 FROM thread t
+        WHERE t.id = new.thread_id AND t.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_insert_stat
+    AFTER INSERT ON thread WHEN new.not_found_count = 0 BEGIN
+        INSERT INTO channel_thread_stat(guild_id, channel_id, thread_count)
+        VALUES (new.guild_id, new.channel_id, 1)
+        ON CONFLICT(guild_id, channel_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_delete_stat
+    AFTER DELETE ON thread WHEN old.not_found_count = 0 BEGIN
+        UPDATE channel_thread_stat SET thread_count = thread_count - 1
+        WHERE guild_id = old.guild_id AND channel_id = old.channel_id;
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE guild_id = old.guild_id AND channel_id = old.channel_id
+            AND tag_id IN (SELECT tag_id FROM threadtaglink WHERE thread_id = old.id);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_update_stat
+    AFTER UPDATE OF not_found_count, guild_id, channel_id ON thread
+    WHEN (old.not_found_count = 0) IS NOT (new.not_found_count = 0)
+        OR old.guild_id IS NOT new.guild_id
+        OR old.channel_id IS NOT new.channel_id
+    BEGIN
+        UPDATE channel_thread_stat SET thread_count = thread_count - 1
+        WHERE old.not_found_count = 0
+            AND guild_id = old.guild_id AND channel_id = old.channel_id;
+        UPDATE channel_tag_stat SET thread_count = thread_count - 1
+        WHERE old.not_found_count = 0
+            AND guild_id = old.guild_id AND channel_id = old.channel_id
+            AND tag_id IN (SELECT tag_id FROM threadtaglink WHERE thread_id = old.id);
+        INSERT INTO channel_thread_stat(guild_id, channel_id, thread_count)
+        SELECT new.guild_id, new.channel_id, 1 WHERE new.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id) DO UPDATE SET thread_count = thread_count + 1;
+        INSERT INTO channel_tag_stat(guild_id, channel_id, tag_id, thread_count)
+        SELECT new.guild_id, new.channel_id, tag_id, 1 FROM threadtaglink
+        WHERE thread_id = new.id AND new.not_found_count = 0
+        ON CONFLICT(guild_id, channel_id, tag_id) DO UPDATE SET thread_count = thread_count + 1;
+    END;
+    """,
+]
+
+
+
+# 由 tag_vote 维护 threadtaglink.upvotes / downvotes 的触发器：
+# 投票的 Upsert 与计数调整在同一条语句内完成。vote 取 1 (赞成)、-1 (反对)、0 (已取消)。
+TAG_VOTE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_insert_tally
+    AFTER INSERT ON tag_vote WHEN new.vote != 0 BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes + (new.vote = 1), downvotes = downvotes + (new.vote = -1)
+        WHERE thread_id = new.thread_id AND tag_id = new.tag_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_update_tally
+    AFTER UPDATE OF vote ON tag_vote WHEN old.vote IS NOT new.vote BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes + (new.vote = 1) - (old.vote = 1),
+            downvotes = downvotes + (new.vote = -1) - (old.vote = -1)
+        WHERE thread_id = new.thread_id AND tag_id = new.tag_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tag_vote_after_delete_tally
+    AFTER DELETE ON tag_vote WHEN old.vote != 0 BEGIN
+        UPDATE threadtaglink
+        SET upvotes = upvotes - (old.vote = 1), downvotes = downvotes - (old.vote = -1)
+        WHERE thread_id = old.thread_id AND tag_id = old.tag_id;
+    END;
+    """,
+]
+
+# 维护 follow_unread_stat 的触发器 (写时扩散)：
+# 一条关注记录 f 未读，当且仅当其帖子的 latest_update_at 不为空，且 f 从未查看或查看时间早于该更新。
+# 帖子发布更新时把未读数的变化量累加到每个关注者的计数上；增删关注或更新查看时间时只调整该用户的计数。
+# 计数以 Upsert 累加变化量，没有记录的用户视为 0，变化量为 0 时不写入。
+FOLLOW_UNREAD_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_insert_unread
+    AFTER INSERT ON thread_follow BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT new.user_id, 1 FROM thread t
+        WHERE t.thread_id = new.thread_id AND t.latest_update_at IS NOT NULL
+            AND (new.last_viewed_at IS NULL OR t.latest_update_at > new.last_viewed_at)
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_delete_unread
+    AFTER DELETE ON thread_follow BEGIN
+        UPDATE follow_unread_stat SET unread_count = unread_count - 1
+        WHERE user_id = old.user_id AND EXISTS (
+            SELECT 1 FROM thread t
+            WHERE t.thread_id = old.thread_id AND t.latest_update_at IS NOT NULL
+                AND (old.last_viewed_at IS NULL OR t.latest_update_at > old.last_viewed_at)
+        );
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_follow_after_update_unread
+    AFTER UPDATE OF user_id, thread_id, last_viewed_at ON thread_follow BEGIN
+        UPDATE follow_unread_stat SET unread_count = unread_count - 1
+        WHERE user_id = old.user_id AND EXISTS (
+            SELECT 1 FROM thread t
+            WHERE t.thread_id = old.thread_id AND t.latest_update_at IS NOT NULL
+                AND (old.last_viewed_at IS NULL OR t.latest_update_at > old.last_viewed_at)
+        );
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT new.user_id, 1 FROM thread t
+        WHERE t.thread_id = new.thread_id AND t.latest_update_at IS NOT NULL
+            AND (new.last_viewed_at IS NULL OR t.latest_update_at > new.last_viewed_at)
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_insert_unread
+    AFTER INSERT ON thread WHEN new.latest_update_at IS NOT NULL BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT f.user_id, COUNT(*) FROM thread_follow f
+        WHERE f.thread_id = new.thread_id
+            AND (f.last_viewed_at IS NULL OR new.latest_update_at > f.last_viewed_at)
+        GROUP BY f.user_id
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_delete_unread
+    AFTER DELETE ON thread WHEN old.latest_update_at IS NOT NULL BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT f.user_id, -COUNT(*) FROM thread_follow f
+        WHERE f.thread_id = old.thread_id
+            AND (f.last_viewed_at IS NULL OR old.latest_update_at > f.last_viewed_at)
+        GROUP BY f.user_id
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_after_update_unread
+    AFTER UPDATE OF latest_update_at, thread_id ON thread
+    WHEN old.latest_update_at IS NOT new.latest_update_at OR old.thread_id IS NOT new.thread_id
+    BEGIN
+        INSERT INTO follow_unread_stat(user_id, unread_count)
+        SELECT user_id, SUM(delta) FROM (
+            SELECT f.user_id, -1 AS delta FROM thread_follow f
+            WHERE f.thread_id = old.thread_id AND old.latest_update_at IS NOT NULL
+                AND (f.last_viewed_at IS NULL OR old.latest_update_at > f.last_viewed_at)
+            UNION ALL
+            SELECT f.user_id, 1 FROM thread_follow f
+            WHERE f.thread_id = new.thread_id AND new.latest_update_at IS NOT NULL
+                AND (f.last_viewed_at IS NULL OR new.latest_update_at > f.last_viewed_at)
+        )
+        WHERE true
+        GROUP BY user_id HAVING SUM(delta) != 0
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = unread_count + excluded.unread_count;
+    END;
+    """,
+]
+
+# 关注表 (user_id, thread_id) 的唯一索引，批量关注依赖它以 INSERT ... ON CONFLICT DO NOTHING 去重。
+# create_all 不会为已存在的表补建索引，旧版本建出的库中可能没有该索引并已有重复记录：
+# 先合并重复记录 (保留 id 最小的一条，最后查看时间取组内最大值)，再建唯一索引。
+THREAD_FOLLOW_UNIQUE_INDEX = "ix_thread_follow_user_thread"
+THREAD_FOLLOW_DEDUP_STATEMENTS = [
+    """
+    UPDATE thread_follow
+    SET last_viewed_at = (
+        SELECT MAX(f.last_viewed_at) FROM thread_follow f
+        WHERE f.user_id = thread_follow.user_id AND f.thread_id = thread_follow.thread_id
+    )
+    WHERE id IN (
+        SELECT MIN(id) FROM thread_follow
+        GROUP BY user_id, thread_id HAVING COUNT(*) > 1
+    )
+    """,
+    """
+    DELETE FROM thread_follow
+    WHERE id NOT IN (SELECT MIN(id) FROM thread_follow GROUP BY user_id, thread_id)
+    """,
+    f"DROP INDEX IF EXISTS {THREAD_FOLLOW_UNIQUE_INDEX}",
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS {THREAD_FOLLOW_UNIQUE_INDEX}
+    ON thread_follow (user_id, thread_id)
+    """,
+]
+
+
+async def ensure_thread_follow_unique_index(conn) -> bool:
+    """唯一索引已存在时不做任何事；否则合并重复的关注记录后建立索引，返回 True"""
+    result = await conn.execute(
+        text(
+            "SELECT \"unique\" FROM pragma_index_list('thread_follow') WHERE name = :name"
+        ),
+        {"name": THREAD_FOLLOW_UNIQUE_INDEX},
+    )
+    row = result.first()
+    if row is not None and row[0]:
+        return False
+    for statement in THREAD_FOLLOW_DEDUP_STATEMENTS:
+        await conn.execute(text(statement))
+    return True
+
+
 @event.listens_for(async_engine.sync_engine, "connect")
 def _setup_tokenizer_on_connect(dbapi_connection, connection_record):
     """
@@ -119,6 +361,10 @@ async def init_db():
                 """
             )
         )
+        for trigger in TAG_STAT_TRIGGERS + TAG_VOTE_TRIGGERS + FOLLOW_UNREAD_TRIGGERS:
+            await conn.execute(text(trigger))
+        # 在触发器之后执行，合并删除重复记录时未读数随之校正
+        await ensure_thread_follow_unique_index(conn)
 
         # 重建 FTS 索引（使用当前分词器重新索引全部内容）并合并碎片段
         await conn.execute(
@@ -190,6 +436,10 @@ async def init_db_for_test(engine_instance: AsyncEngine):
                 """
             )
         )
+        for trigger in TAG_STAT_TRIGGERS + TAG_VOTE_TRIGGERS + FOLLOW_UNREAD_TRIGGERS:
+            await conn.execute(text(trigger))
+        # 在触发器之后执行，合并删除重复记录时未读数随之校正
+        await ensure_thread_follow_unique_index(conn)
 
 
 async def close_db():
@@ -3,6 +3,8 @@ from typing import TYPE_CHECKING, Optional
 
 import discord
 
+from shared.enum.api_route import APIRoute
+
 if TYPE_CHECKING:
     from bot_main import MyBot
 
@@ -56,6 +58,8 @@ class DiscordUtils:
                 user_obj = await bot.api_scheduler.submit(
                     coro_factory=lambda: bot.fetch_user(user_id),
                     priority=8,  # 优先级略低于帖子同步
+                    route=APIRoute.FETCH_USER,
+                    dedup_key=(APIRoute.FETCH_USER, user_id),
                 )
             except discord.NotFound:
                 logger.warning(f"无法通过 API 找到 ID 为 {user_id} 的用户。")
@@ -0,0 +1,51 @@
+import re
+from enum import Enum
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Discord 按这些主参数 (major parameter) 分别计算速率限制，其他路径参数不影响分桶
+MAJOR_PARAMETERS = ("channel_id", "guild_id", "webhook_id")
+
+
+class APIRoute(str, Enum):
+    """
+    提交给 APIScheduler 的 Discord API 路由，用于匹配对应的速率限制桶。
+    与 Discord 的路由模板一致；路由以主参数开头时 (如 channel_id)，
+    每个主参数取值各有一个桶，否则同一路由的所有请求共享一个桶。
+    """
+
+    FETCH_CHANNEL = "GET /channels/{channel_id}"
+    """获取频道或帖子"""
+
+    FETCH_MESSAGE = "GET /channels/{channel_id}/messages/{message_id}"
+    """获取单条消息"""
+
+    FETCH_USER = "GET /users/{user_id}"
+    """获取用户"""
+
+    @property
+    def has_major_parameter(self) -> bool:
+        """路由的第一个路径参数是否为 Discord 的主参数"""
+        first = re.search(r"\{(\w+)\}", self.value)
+        return first is not None and first.group(1) in MAJOR_PARAMETERS
+
+    @classmethod
+    def match(cls, method: str, url: str) -> Optional[tuple["APIRoute", Optional[int]]]:
+        """
+        将一次请求的方法和 URL 解析为 (路由, 主参数取值)。
+        URL 可以是完整地址 (https://discord.com/api/v10/channels/1) 或路径，无法识别时返回 None。
+        """
+        path = re.sub(r"^/api/v\d+", "", urlsplit(url).path).rstrip("/")
+        for route in cls:
+            pattern = _ROUTE_PATTERNS[route]
+            match = pattern.fullmatch(f"{method.upper()} {path}")
+            if match:
+                major_id = int(match.group(1)) if route.has_major_parameter else None
+                return route, major_id
+        return None
+
+
+_ROUTE_PATTERNS = {
+    route: re.compile(re.sub(r"\\\{\w+\\\}", r"(\\d+)", re.escape(route.value)))
+    for route in APIRoute
+}
@@ -0,0 +1,23 @@
+from enum import Enum
+
+
+class IndexMode(str, Enum):
+    """构建索引的运行模式"""
+
+    FULL = "full"
+    """从最新的帖子开始完整扫描整个频道"""
+
+    RESUME = "resume"
+    """从上一次被中断的位置继续扫描"""
+
+    INCREMENTAL = "incremental"
+    """只扫描上一次成功索引之后有变化的帖子"""
+
+
+class IndexStatus(str, Enum):
+    """频道索引检查点的状态"""
+
+    RUNNING = "running"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+    COMPLETED = "completed"
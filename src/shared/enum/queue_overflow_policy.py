@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class QueueOverflowPolicy(str, Enum):
+    """API 调度器某个优先级的队列已满时的处理方式"""
+
+    REJECT = "reject"
+    """拒绝新提交的请求"""
+
+    SHED_OLDEST = "shed_oldest"
+    """丢弃该优先级中等待最久的请求，接受新请求"""
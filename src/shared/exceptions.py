@@ -2,3 +2,18 @@ class InvalidRangeFormat(ValueError):
     """当范围字符串格式无效时抛出此异常。"""
 
     pass
+
+
+class APIQueueFullError(RuntimeError):
+    """当 API 调度器中某个优先级的队列已满，请求被拒绝或被挤出队列时抛出此异常。"""
+
+    pass
+
+
+class APIRequestExpiredError(RuntimeError):
+    """
+    当 API 请求在队列中等待超过其截止时间、未被执行就被取消时抛出此异常。
+    不继承 TimeoutError：在另一个请求的协程中抛出时，不应被调度器当作 Discord 超时重试或用来下调并发。
+    """
+
+    pass
@@ -0,0 +1,72 @@
+import logging
+from typing import Callable, NamedTuple, Optional
+
+# discord.py 在 HTTP 层自行处理 429 (等待后重试)，不会把它暴露给调用方，
+# 只会在 discord.http 日志中输出警告，因此通过日志来统计 429 次数。
+DISCORD_HTTP_LOGGER = "discord.http"
+
+# discord.http 中每次 429 响应各输出一次的两条警告 (等待重试 / 超时过长直接报错)，
+# 参数依次为 method, url, retry_after
+RATE_LIMITED_MESSAGES = (
+    "We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.",
+    "We are being rate limited. %s %s responded with 429. Timeout of %.2f was too long, erroring instead.",
+)
+# 全局限流时在上面的警告之后额外输出的一条警告，参数为 retry_after
+GLOBAL_RATE_LIMITED_MESSAGE = "Global rate limit has been hit. Retrying in %.2f seconds."
+
+
+class RateLimitEvent(NamedTuple):
+    """从 discord.http 日志中解析出的一次 429"""
+
+    method: Optional[str]  # 全局限流时为 None
+    url: Optional[str]  # 全局限流时为 None
+    retry_after: float
+    is_global: bool
+
+
+class RateLimitMonitor(logging.Handler):
+    """
+    统计 Discord API 返回 429 (被限流) 的次数，
+    并把每次 429 通知给监听者 (如 APIScheduler，用来在 retry_after 内暂停对应的桶)。
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.total_429 = 0
+        """自安装以来观察到的 429 响应总数 (含全局限流)"""
+        self.global_429 = 0
+        """其中属于全局限流的次数"""
+        self._listeners: list[Callable[[RateLimitEvent], None]] = []
+
+    def add_listener(self, listener: Callable[[RateLimitEvent], None]) -> None:
+        """注册一个在每次 429 时被同步调用的回调"""
+        self._listeners.append(listener)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # 按 discord.py 的原始格式字符串精确匹配，一次全局限流会输出两条警告，只计一次
+        if record.msg in RATE_LIMITED_MESSAGES:
+            self.total_429 += 1
+            method, url, retry_after = record.args[:3]  # type: ignore[index]
+            self._notify(
+                RateLimitEvent(str(method), str(url), float(retry_after), False), record
+            )
+        elif record.msg == GLOBAL_RATE_LIMITED_MESSAGE:
+            self.global_429 += 1
+            retry_after = record.args[0]  # type: ignore[index]
+            self._notify(RateLimitEvent(None, None, float(retry_after), True), record)
+
+    def _notify(self, event: RateLimitEvent, record: logging.LogRecord) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                self.handleError(record)
+
+    def install(self) -> None:
+        """挂载到 discord.http 日志记录器上"""
+        http_logger = logging.getLogger(DISCORD_HTTP_LOGGER)
+        if self not in http_logger.handlers:
+            http_logger.addHandler(self)
+
+    def uninstall(self) -> None:
+        logging.getLogger(DISCORD_HTTP_LOGGER).removeHandler(self)
@@ -0,0 +1,37 @@
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    按 Discord 速率限制语义实现的令牌桶：
+    一个窗口内最多 limit 个请求，窗口从第一次取令牌时开始计时，到期后一次性补满。
+    窗口长度额外加上 margin 比例的余量，抵消本地时钟与 Discord 之间的误差。
+    """
+
+    def __init__(self, limit: int, per: float, margin: float = 0.1):
+        if limit <= 0 or per <= 0:
+            raise ValueError("令牌桶的 limit 和 per 必须大于0")
+        self.limit = limit
+        self.per = per
+        self.margin = margin
+        self.remaining = limit
+        self.reset_at: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+
+    def wait_time(self, now: float) -> float:
+        """距离桶内有可用令牌还需等待的秒数，0 表示现在就可以发送"""
+        self._refill(now)
+        if self.remaining > 0 or self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - now)
+
+    def consume(self, now: float):
+        """取走一个令牌，调用前应确认 wait_time 为 0"""
+        self._refill(now)
+        if self.reset_at is None:
+            self.reset_at = now + self.per * (1 + self.margin)
+        self.remaining -= 1
@@ -1,4 +1,4 @@
-from typing import Awaitable, Callable, List, Set
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 
 import discord
 
@@ -13,8 +13,13 @@ class TagSelect(discord.ui.Select):
         placeholder_prefix: str,
         custom_id: str,
         on_change_callback: Callable[[discord.Interaction, Set[str]], Awaitable[None]],
+        tag_counts: Optional[Dict[str, int]] = None,
         **kwargs,
     ):
+        """
+        Args:
+            tag_counts: 当前搜索结果集中各标签的帖子数 (搜索分面统计)，提供时显示在选项说明中
+        """
         self.all_tags = all_tags
         self.selected_tags = selected_tags
         self.tag_page = page
@@ -35,7 +40,15 @@ class TagSelect(discord.ui.Select):
                 unique_current_page_tags.append(tag)
 
         options = [
-            discord.SelectOption(label=tag_name, value=tag_name)
+            discord.SelectOption(
+                label=tag_name,
+                value=tag_name,
+                description=(
+                    f"当前结果中 {tag_counts.get(tag_name, 0)} 个帖子"
+                    if tag_counts is not None
+                    else None
+                ),
+            )
             for tag_name in unique_current_page_tags
         ]
 
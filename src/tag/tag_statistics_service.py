@@ -1,11 +1,8 @@
 import logging
 from collections import defaultdict
-from typing import Any, Dict, List, cast, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
-from sqlalchemy import ColumnElement, func
-from sqlalchemy.sql import Select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 from api.v1.schemas.tags import (
     ChannelTagInfo,
@@ -13,9 +10,9 @@ from api.v1.schemas.tags import (
     TagStatsRequest,
     TagStatsResponse,
 )
+from core.tag_stat_repository import TagStatRepository
 from core.thread_repository import ThreadRepository
 from core.cache_service import CacheService
-from models import Tag, Thread, ThreadTagLink
 
 logger = logging.getLogger(__name__)
 
@@ -129,41 +126,8 @@ class TagStatisticsService:
     async def _get_real_tag_rows(
         self, guild_id: int | None, channel_ids: List[int] | None
     ) -> List[tuple[str, int, int, int]]:
-        """查询真实标签在各频道下的聚合统计"""
-        tag_id_column = cast(ColumnElement, Tag.id)
-        tag_name_column = cast(ColumnElement, Tag.name)
-        link_tag_id_column = cast(ColumnElement, ThreadTagLink.tag_id)
-        link_thread_id_column = cast(ColumnElement, ThreadTagLink.thread_id)
-        thread_id_column = cast(ColumnElement, Thread.id)
-        thread_channel_id_column = cast(ColumnElement, Thread.channel_id)
-        thread_guild_id_column = cast(ColumnElement, Thread.guild_id)
-        thread_not_found_count_column = cast(ColumnElement, Thread.not_found_count)
-
-        # 通过一次跨表聚合查询拿到真实标签统计
-        statement: Select = (
-            select(
-                tag_name_column,
-                tag_id_column,
-                thread_channel_id_column,
-                func.count(func.distinct(thread_id_column)),
-            )
-            .select_from(Tag)
-            .join(ThreadTagLink, tag_id_column == link_tag_id_column)
-            .join(Thread, link_thread_id_column == thread_id_column)
-            .where(thread_not_found_count_column == 0)
-            .group_by(tag_name_column, tag_id_column, thread_channel_id_column)
-        )
-
-        if guild_id is not None:
-            statement = statement.where(thread_guild_id_column == guild_id)
-        if channel_ids:
-            statement = statement.where(thread_channel_id_column.in_(channel_ids))
-
-        result = await self.session.execute(statement)
-        return [
-            (str(row[0]), int(row[1]), int(row[2]), int(row[3]))
-            for row in result.all()
-        ]
+        """查询真实标签在各频道下的聚合统计，读取由触发器维护的物化统计表"""
+        return await TagStatRepository(self.session).get_tag_rows(guild_id, channel_ids)
 
     async def _append_virtual_tag_stats(
         self,
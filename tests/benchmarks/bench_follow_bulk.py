@@ -0,0 +1,169 @@
+"""
+关注批量操作基准：一个用户关注 --threads 个帖子时，对比逐条 ORM 操作与集合式 SQL。
+
+用法:
+    python tests/benchmarks/bench_follow_bulk.py --threads 10000
+
+使用临时的 SQLite 文件数据库，并安装 FOLLOW_UNREAD_TRIGGERS，与生产环境一致。
+- 关注: 逐帖「查询是否已关注 + ORM 插入」 vs batch_follow_threads (INSERT ... ON CONFLICT DO NOTHING)
+- 全部标记已读: 加载全部 ORM 对象逐个修改 vs update_last_viewed(user_id) (单条 UPDATE)
+- 取消关注: 逐帖 remove_follow vs batch_unfollow_threads (分块 DELETE ... IN)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from core.follow_repository import ThreadFollowRepository  # noqa: E402
+from models import Thread, ThreadFollow  # noqa: E402
+from shared.database import FOLLOW_UNREAD_TRIGGERS  # noqa: E402
+
+USER_ID = 42
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+async def create_factory(path: str, thread_count: int) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        for trigger in FOLLOW_UNREAD_TRIGGERS:
+            await conn.execute(text(trigger))
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as session:
+        session.add_all(
+            Thread(
+                thread_id=1_000_000 + index,
+                channel_id=100,
+                title=f"合成帖子 {index}",
+                author_id=1,
+                latest_update_at=BASE_TIME + timedelta(minutes=index),
+            )
+            for index in range(thread_count)
+        )
+        await session.commit()
+    return factory
+
+
+async def legacy_follow(factory: async_sessionmaker, thread_ids: list[int]):
+    """原 add_follow 的实现：先查询是否已关注，再构造 ORM 对象插入"""
+    async with factory() as session:
+        for thread_id in thread_ids:
+            result = await session.execute(
+                select(ThreadFollow).where(
+                    ThreadFollow.user_id == USER_ID, ThreadFollow.thread_id == thread_id
+                )
+            )
+            if result.scalar_one_or_none() is None:
+                session.add(
+                    ThreadFollow(
+                        user_id=USER_ID,
+                        thread_id=thread_id,
+                        followed_at=datetime.now(timezone.utc),
+                    )
+                )
+                await session.commit()
+
+
+async def legacy_mark_all_read(factory: async_sessionmaker):
+    """原 update_last_viewed(thread_id=None) 的实现：加载全部关注逐个修改"""
+    async with factory() as session:
+        result = await session.execute(
+            select(ThreadFollow).where(ThreadFollow.user_id == USER_ID)
+        )
+        now = datetime.now(timezone.utc)
+        for follow in result.scalars().all():
+            follow.last_viewed_at = now
+        await session.commit()
+
+
+async def legacy_unfollow(factory: async_sessionmaker, thread_ids: list[int]):
+    async with factory() as session:
+        repo = ThreadFollowRepository(session)
+        for thread_id in thread_ids:
+            await repo.remove_follow(USER_ID, thread_id)
+
+
+async def bulk_follow(factory: async_sessionmaker, thread_ids: list[int]):
+    async with factory() as session:
+        await ThreadFollowRepository(session).batch_follow_threads(USER_ID, thread_ids)
+
+
+async def bulk_mark_all_read(factory: async_sessionmaker):
+    async with factory() as session:
+        await ThreadFollowRepository(session).update_last_viewed(USER_ID)
+
+
+async def bulk_unfollow(factory: async_sessionmaker, thread_ids: list[int]):
+    async with factory() as session:
+        await ThreadFollowRepository(session).batch_unfollow_threads(USER_ID, thread_ids)
+
+
+async def measure(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def run(factory: async_sessionmaker, thread_ids: list[int], bulk: bool) -> dict:
+    if bulk:
+        steps = {
+            "关注": bulk_follow(factory, thread_ids),
+            "全部标记已读": bulk_mark_all_read(factory),
+            "取消关注": bulk_unfollow(factory, thread_ids),
+        }
+    else:
+        steps = {
+            "关注": legacy_follow(factory, thread_ids),
+            "全部标记已读": legacy_mark_all_read(factory),
+            "取消关注": legacy_unfollow(factory, thread_ids),
+        }
+    timings = {}
+    for name, coro in steps.items():
+        timings[name] = await measure(coro)
+        if name == "关注":
+            async with factory() as session:
+                unread = await ThreadFollowRepository(session).get_unread_count(USER_ID)
+            assert unread == len(thread_ids), unread
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=10_000)
+    args = parser.parse_args()
+    thread_ids = [1_000_000 + index for index in range(args.threads)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = await run(
+            await create_factory(os.path.join(tmp, "legacy.db"), args.threads),
+            thread_ids,
+            bulk=False,
+        )
+        bulk = await run(
+            await create_factory(os.path.join(tmp, "bulk.db"), args.threads),
+            thread_ids,
+            bulk=True,
+        )
+
+    print(f"一个用户关注 {args.threads} 个帖子")
+    for name in legacy:
+        print(
+            f"{name}: 逐条 {legacy[name] * 1000:.0f}ms / 集合式 {bulk[name] * 1000:.0f}ms "
+            f"({legacy[name] / bulk[name]:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
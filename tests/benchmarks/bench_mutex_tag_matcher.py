@@ -0,0 +1,105 @@
+"""
+互斥标签规则评估基准：对比每次评估都从数据库读取全部互斥组 (原有路径) 与编译后的 MutexTagMatcher。
+
+用法:
+    python tests/benchmarks/bench_mutex_tag_matcher.py --groups 100 --evaluations 2000
+
+使用临时的 SQLite 文件数据库，每个互斥组 2~5 个标签，标签名从 --tag-names 个名字中选取；
+每次评估的帖子带 1~5 个随机标签。
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from core.config_repository import ConfigRepository  # noqa: E402
+from core.mutex_tag_matcher import MutexTagMatcher  # noqa: E402
+
+
+async def create_factory(
+    path: str, groups: int, tag_names: list[str], rng: random.Random
+) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as session:
+        repo = ConfigRepository(session)
+        for _ in range(groups):
+            names = rng.sample(tag_names, rng.randint(2, 5))
+            override = rng.choice(tag_names) if rng.random() < 0.2 else None
+            await repo.add_mutex_group(names, override)
+    return factory
+
+
+async def legacy_evaluate(factory: async_sessionmaker, post_tag_names: set[str]) -> int:
+    """原有路径：读取全部互斥组后逐组求交集"""
+    async with factory() as session:
+        groups = await ConfigRepository(session).get_all_mutex_groups_with_rules()
+    conflicts = 0
+    for group in groups:
+        sorted_rules = sorted(group.rules, key=lambda r: r.priority)
+        group_tag_names = {rule.tag_name for rule in sorted_rules}
+        if len(post_tag_names.intersection(group_tag_names)) > 1:
+            conflicts += 1
+    return conflicts
+
+
+def summarize(name: str, samples: list[float]):
+    print(
+        f"{name}: 中位数 {statistics.median(samples) * 1e6:.1f}us / "
+        f"p99 {sorted(samples)[int(len(samples) * 0.99)] * 1e6:.1f}us"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--tag-names", type=int, default=150)
+    parser.add_argument("--evaluations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tag_names = [f"标签{i}" for i in range(args.tag_names)]
+    posts = [
+        set(rng.sample(tag_names, rng.randint(1, 5))) for _ in range(args.evaluations)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = await create_factory(
+            os.path.join(tmp, "mutex.db"), args.groups, tag_names, rng
+        )
+        matcher = MutexTagMatcher(factory)
+        await matcher.refresh()
+
+        legacy_samples, compiled_samples = [], []
+        mismatches = 0
+        for post in posts:
+            started = time.perf_counter()
+            expected = await legacy_evaluate(factory, post)
+            legacy_samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            actual = len(matcher.match(post))
+            compiled_samples.append(time.perf_counter() - started)
+            mismatches += expected != actual
+
+    print(f"{args.groups} 个互斥组，{args.evaluations} 次评估，结果不一致 {mismatches} 次")
+    summarize("每次读库评估", legacy_samples)
+    summarize("编译后评估  ", compiled_samples)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
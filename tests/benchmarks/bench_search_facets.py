@@ -0,0 +1,185 @@
+"""
+搜索分面统计基准：在 20 万帖子的语料上测量 SearchService 计算结果集标签计数 (以及反应数/创建月份直方图) 的耗时，
+并与逐标签执行 COUNT 查询的做法对比。
+
+用法:
+    python tests/benchmarks/bench_search_facets.py --threads 200000 --rounds 10
+
+使用临时的 SQLite 文件数据库：10 个频道、每频道 20 个标签，每帖 1~4 个标签。
+分别测量全部帖子、单个频道、单个频道 + 一个正选标签三种结果集。
+单个频道 (约 2 万个结果) 计算标签计数 + 直方图的 p95 不超过 FACET_LATENCY_BUDGET_MS，
+且全部帖子 (20 万个结果，超过 FACET_HISTOGRAM_MAX_RESULTS，即使请求直方图也只算标签计数)
+的 p95 不超过 FACET_FULL_CORPUS_LATENCY_BUDGET_MS 即通过。
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from core.tag_cache_service import TagCacheService  # noqa: E402
+from models import Tag, Thread, ThreadTagLink  # noqa: E402
+from search.constants import (  # noqa: E402
+    FACET_FULL_CORPUS_LATENCY_BUDGET_MS,
+    FACET_LATENCY_BUDGET_MS,
+)
+from search.qo.thread_search import ThreadSearchQuery  # noqa: E402
+from search.search_service import SearchService  # noqa: E402
+
+CHANNELS = 10
+TAGS_PER_CHANNEL = 20
+BASE_TIME = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+async def create_factory(path: str, threads: int) -> async_sessionmaker[AsyncSession]:
+    rng = random.Random(0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(Tag),
+            [
+                {"id": channel * 100 + k, "name": f"标签{k}"}
+                for channel in range(CHANNELS)
+                for k in range(TAGS_PER_CHANNEL)
+            ],
+        )
+        thread_rows, link_rows = [], []
+        for i in range(threads):
+            channel = i % CHANNELS
+            thread_rows.append(
+                {
+                    "id": i + 1,
+                    "thread_id": 1_000_000 + i,
+                    "guild_id": 1,
+                    "channel_id": channel,
+                    "title": f"帖子 {i}",
+                    "author_id": i % 5000,
+                    "created_at": BASE_TIME + timedelta(minutes=3 * i),
+                    "last_active_at": BASE_TIME + timedelta(minutes=3 * i + 60),
+                    "reaction_count": int(rng.paretovariate(1.2)) - 1,
+                    "reply_count": rng.randint(0, 200),
+                    "thumbnail_urls": [],
+                }
+            )
+            # 标签分布有偏：序号小的标签更常见
+            for k in {min(int(rng.expovariate(0.25)), TAGS_PER_CHANNEL - 1) for _ in range(rng.randint(1, 4))}:
+                link_rows.append({"thread_id": i + 1, "tag_id": channel * 100 + k})
+        for start in range(0, len(thread_rows), 5000):
+            await conn.execute(insert(Thread), thread_rows[start : start + 5000])
+        for start in range(0, len(link_rows), 10000):
+            await conn.execute(insert(ThreadTagLink), link_rows[start : start + 10000])
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def run_search(factory, tag_cache, query, histograms: bool) -> tuple[float, float, int]:
+    """返回 (整次搜索耗时, 分面统计耗时, 结果总数)"""
+    started = time.perf_counter()
+    async with factory() as session:
+        _, total, facets = await SearchService(session, tag_cache).search_threads_with_facets(
+            query,
+            limit=10,
+            total_display_count=1,
+            exploration_factor=1.0,
+            strength_weight=1.0,
+            facets=True,
+            histograms=histograms,
+        )
+    assert facets is not None
+    return time.perf_counter() - started, facets.elapsed_ms / 1000, total
+
+
+async def per_tag_counts(factory, tag_cache: TagCacheService, channel_id: int) -> float:
+    """对照组：单频道结果集中逐标签执行一次 COUNT"""
+    started = time.perf_counter()
+    async with factory() as session:
+        for name in tag_cache.get_unique_tag_names():
+            ids = tag_cache.get_ids_by_tag_name(name)
+            await session.execute(
+                select(func.count())
+                .select_from(ThreadTagLink)
+                .join(Thread, Thread.id == ThreadTagLink.thread_id)  # type: ignore[arg-type]
+                .where(
+                    Thread.channel_id == channel_id,
+                    Thread.not_found_count == 0,
+                    ThreadTagLink.tag_id.in_(ids),  # type: ignore[attr-defined]
+                )
+            )
+    return time.perf_counter() - started
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = await create_factory(os.path.join(tmp, "search.db"), args.threads)
+        tag_cache = TagCacheService(factory)
+        await tag_cache.build_cache()
+
+        scenarios = [
+            ("全部帖子", ThreadSearchQuery(), False),
+            ("全部帖子 + 直方图 (超出上限，跳过)", ThreadSearchQuery(), True),
+            ("单个频道", ThreadSearchQuery(channel_ids=[3]), False),
+            ("单个频道 + 直方图", ThreadSearchQuery(channel_ids=[3]), True),
+            ("单个频道 + 正选标签 + 直方图", ThreadSearchQuery(channel_ids=[3], include_tags=["标签0"]), True),
+        ]
+        budget_samples: list[float] = []
+        corpus_samples: list[float] = []
+        print(
+            f"{args.threads} 个帖子，每项 {args.rounds} 轮，预算 单个频道 {FACET_LATENCY_BUDGET_MS}ms / "
+            f"全部帖子 {FACET_FULL_CORPUS_LATENCY_BUDGET_MS}ms"
+        )
+        for name, query, histograms in scenarios:
+            await run_search(factory, tag_cache, query, histograms)  # 预热
+            totals, facet_times = [], []
+            for _ in range(args.rounds):
+                total_seconds, facet_seconds, matched = await run_search(
+                    factory, tag_cache, query, histograms
+                )
+                totals.append(total_seconds)
+                facet_times.append(facet_seconds)
+            if name == "单个频道 + 直方图":
+                budget_samples = facet_times
+            elif name.startswith("全部帖子"):
+                corpus_samples += facet_times
+            print(
+                f"{name} ({matched} 个结果): 分面 中位数 {statistics.median(facet_times) * 1000:.1f}ms / "
+                f"p95 {percentile(facet_times, 0.95) * 1000:.1f}ms，"
+                f"整次搜索 中位数 {statistics.median(totals) * 1000:.1f}ms"
+            )
+
+        legacy = await per_tag_counts(factory, tag_cache, 3)
+        print(f"对照: 单个频道逐标签 COUNT {len(tag_cache.get_unique_tag_names())} 次 {legacy * 1000:.1f}ms")
+
+    p95_ms = percentile(budget_samples, 0.95) * 1000
+    verdict = "通过" if p95_ms <= FACET_LATENCY_BUDGET_MS else "未通过"
+    print(f"延迟预算: 单个频道 + 直方图 p95 {p95_ms:.1f}ms / {FACET_LATENCY_BUDGET_MS}ms，{verdict}")
+    corpus_p95_ms = percentile(corpus_samples, 0.95) * 1000
+    verdict = "通过" if corpus_p95_ms <= FACET_FULL_CORPUS_LATENCY_BUDGET_MS else "未通过"
+    print(
+        f"延迟预算: 全部帖子 p95 {corpus_p95_ms:.1f}ms / {FACET_FULL_CORPUS_LATENCY_BUDGET_MS}ms，{verdict}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
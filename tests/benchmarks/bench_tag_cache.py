@@ -0,0 +1,137 @@
+"""
+标签缓存更新基准：对比频道标签变化时全量重建 (TagCacheService.build_cache) 与增量更新
+(TagCacheService.apply_channel_tag_diff) 的总耗时以及阻塞事件循环的时间。
+
+用法:
+    python tests/benchmarks/bench_tag_cache.py --channels 200 --tags-per-channel 20 --threads 100000
+
+使用临时的 SQLite 文件数据库。每轮模拟一个频道新增、改名、删除各一个标签。
+阻塞时间指两次 await 之间的同步部分 (构建字典、排序等)，即这段时间内其他事件都无法处理。
+注意 aiosqlite 下 ORM 结果的构建同样在事件循环线程中进行，因此总耗时是阻塞时间的上限。
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from core.tag_cache_service import TagCacheService  # noqa: E402
+from models import Tag, Thread, ThreadTagLink  # noqa: E402
+
+
+async def create_factory(
+    path: str, channels: int, tags_per_channel: int, threads: int
+) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        tag_rows = [
+            {"id": channel * 1000 + k, "name": f"标签{k}-{channel % 7}"}
+            for channel in range(channels)
+            for k in range(tags_per_channel)
+        ]
+        await conn.execute(insert(Tag), tag_rows)
+        thread_rows = [
+            {
+                "id": i + 1,
+                "thread_id": 1_000_000 + i,
+                "guild_id": 1,
+                "channel_id": i % channels,
+                "title": f"帖子 {i}",
+                "author_id": 1,
+                "thumbnail_urls": [],
+            }
+            for i in range(threads)
+        ]
+        for start in range(0, len(thread_rows), 5000):
+            await conn.execute(insert(Thread), thread_rows[start : start + 5000])
+        link_rows = [
+            {
+                "thread_id": i + 1,
+                "tag_id": (i % channels) * 1000 + (i * k) % tags_per_channel,
+            }
+            for i in range(threads)
+            for k in (1, 3)
+        ]
+        link_rows = list({(r["thread_id"], r["tag_id"]): r for r in link_rows}.values())
+        for start in range(0, len(link_rows), 5000):
+            await conn.execute(insert(ThreadTagLink), link_rows[start : start + 5000])
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+def channel_tags(channel: int, tags_per_channel: int, round_no: int):
+    """第 round_no 轮变化前后的频道标签：新增一个、改名一个、删除一个"""
+    before = {
+        channel * 1000 + k: f"标签{k}-{channel % 7}" for k in range(tags_per_channel)
+    }
+    after = dict(before)
+    after[channel * 1000 + 900 + round_no] = f"新标签{round_no}"
+    after[channel * 1000] = f"改名{round_no}"
+    del after[channel * 1000 + tags_per_channel - 1]
+    to_forum = lambda tags: [SimpleNamespace(id=i, name=n) for i, n in tags.items()]  # noqa: E731
+    return to_forum(before), to_forum(after)
+
+
+def summarize(name: str, totals: list[float], blocking: list[float]):
+    print(
+        f"{name}: 总耗时 中位数 {statistics.median(totals) * 1000:.2f}ms / "
+        f"最大 {max(totals) * 1000:.2f}ms，阻塞事件循环 中位数 "
+        f"{statistics.median(blocking) * 1000:.3f}ms / 最大 {max(blocking) * 1000:.3f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--tags-per-channel", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = await create_factory(
+            os.path.join(tmp, "tags.db"),
+            args.channels,
+            args.tags_per_channel,
+            args.threads,
+        )
+        service = TagCacheService(factory)
+
+        rebuild_totals, rebuild_blocking = [], []
+        for _ in range(args.rounds):
+            await service.build_cache()
+            rebuild_totals.append(service.last_rebuild_stats["total_seconds"])
+            rebuild_blocking.append(service.last_rebuild_stats["blocking_seconds"])
+
+        diff_totals, diff_blocking = [], []
+        for round_no in range(args.rounds):
+            before, after = channel_tags(
+                round_no % args.channels, args.tags_per_channel, round_no
+            )
+            started = time.perf_counter()
+            stats = await service.apply_channel_tag_diff(before, after)
+            diff_totals.append(time.perf_counter() - started)
+            diff_blocking.append(stats["blocking_seconds"])
+
+    print(
+        f"{args.channels} 个频道 x {args.tags_per_channel} 个标签，{args.threads} 个帖子，"
+        f"每项 {args.rounds} 轮"
+    )
+    summarize("全量重建", rebuild_totals, rebuild_blocking)
+    summarize("增量更新", diff_totals, diff_blocking)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+帖子写入吞吐基准：对比逐帖写入 (SyncService.sync_thread 原有路径) 与 ThreadBatchWriteService 批量写入。
+
+用法:
+    python tests/benchmarks/bench_thread_batch_write.py --threads 50000 --legacy-threads 5000
+
+使用临时的 SQLite 文件数据库，模拟一个每帖 0~3 个标签、作者数为帖子数 1/20 的论坛。
+逐帖路径较慢，默认只测量 --legacy-threads 个帖子并按 threads/sec 比较。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+)
+
+from core.author_repository import AuthorRepository  # noqa: E402
+from core.follow_repository import ThreadFollowRepository  # noqa: E402
+from core.tag_repository import TagRepository  # noqa: E402
+from core.thread_batch_write_service import ThreadBatchWriteService  # noqa: E402
+from core.thread_record_dto import ThreadRecord  # noqa: E402
+from core.thread_repository import ThreadRepository  # noqa: E402
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TAGS = {tag_id: f"标签{tag_id}" for tag_id in range(1, 21)}
+
+
+def synthetic_record(index: int) -> ThreadRecord:
+    """生成一个合成帖子，结构与 SyncService.build_thread_record 的结果相同"""
+    author_id = 10_000 + index % max(1, index // 20 + 1)
+    tag_ids = [1 + (index * k) % len(TAGS) for k in range(index % 4)]
+    return {
+        "thread_data": {
+            "thread_id": 1_000_000 + index,
+            "guild_id": 1,
+            "channel_id": 100 + index % 5,
+            "title": f"合成帖子 {index}",
+            "author_id": author_id,
+            "created_at": BASE_TIME + timedelta(minutes=index),
+            "last_active_at": BASE_TIME + timedelta(minutes=index, hours=1),
+            "reaction_count": index % 50,
+            "reply_count": index % 200,
+            "not_found_count": 0,
+            "first_message_excerpt": f"这是第 {index} 个合成帖子的首楼内容。" * 4,
+            "thumbnail_urls": [f"https://example.com/{index}.png"],
+        },
+        "tags_data": {tag_id: TAGS[tag_id] for tag_id in tag_ids},
+        "author_data": {
+            "id": author_id,
+            "name": f"user{author_id}",
+            "global_name": None,
+            "display_name": f"用户 {author_id}",
+            "avatar_url": f"https://example.com/avatar/{author_id}.png",
+        },
+    }
+
+
+async def create_factory(path: str) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def run_legacy(factory: async_sessionmaker, records: list[ThreadRecord]):
+    """逐帖写入：每帖一次标签 upsert + 帖子写入事务 + 作者事务 + 关注计数查询"""
+    for record in records:
+        async with factory() as session:
+            tags = await TagRepository(session).get_or_create_tags(record["tags_data"])
+            await ThreadRepository(session).add_or_update_thread_with_tags(
+                thread_data=record["thread_data"], tags=tags
+            )
+        async with factory() as session:
+            await AuthorRepository(session).upsert_author(record["author_data"])  # type: ignore[arg-type]
+        async with factory() as session:
+            await ThreadFollowRepository(session).get_followed_thread_ids(
+                [record["thread_data"]["thread_id"]]
+            )
+
+
+async def run_batched(
+    factory: async_sessionmaker, records: list[ThreadRecord], batch_size: int
+):
+    writer = ThreadBatchWriteService(factory, batch_size=batch_size)
+    writer.start()
+    futures = [await writer.submit(record) for record in records]
+    await writer.stop()
+    await asyncio.gather(*futures)
+
+
+async def measure(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=50_000)
+    parser.add_argument("--legacy-threads", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_records = [synthetic_record(i) for i in range(args.legacy_threads)]
+        legacy_factory = await create_factory(os.path.join(tmp, "legacy.db"))
+        legacy_seconds = await measure(run_legacy(legacy_factory, legacy_records))
+
+        records = [synthetic_record(i) for i in range(args.threads)]
+        batched_factory = await create_factory(os.path.join(tmp, "batched.db"))
+        first_seconds = await measure(
+            run_batched(batched_factory, records, args.batch_size)
+        )
+        # 再写一遍，模拟重新索引时全部命中 UPDATE 分支
+        second_seconds = await measure(
+            run_batched(batched_factory, records, args.batch_size)
+        )
+
+    print(
+        f"逐帖写入:       {args.legacy_threads} 帖 {legacy_seconds:.2f}s "
+        f"({args.legacy_threads / legacy_seconds:.0f} threads/sec)"
+    )
+    print(
+        f"批量写入 (新建): {args.threads} 帖 {first_seconds:.2f}s "
+        f"({args.threads / first_seconds:.0f} threads/sec)"
+    )
+    print(
+        f"批量写入 (更新): {args.threads} 帖 {second_seconds:.2f}s "
+        f"({args.threads / second_seconds:.0f} threads/sec)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
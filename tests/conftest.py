@@ -0,0 +1,54 @@
+import os
+import sys
+from typing import AsyncGenerator, Awaitable, Callable, Iterable
+
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import models  # noqa: E402,F401  导入所有模型，使 create_all 能建出全部表
+
+# 使用内存数据库进行测试
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+SessionFactoryMaker = Callable[..., Awaitable[async_sessionmaker[AsyncSession]]]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def make_session_factory() -> AsyncGenerator[SessionFactoryMaker, None]:
+    """
+    创建内存数据库的工厂：建好所有表，再依次安装传入的触发器列表
+    (如 shared.database 中的 FOLLOW_UNREAD_TRIGGERS)，返回其 session 工厂。
+    同一测试中可调用多次得到互相独立的数据库，测试结束时统一释放。
+    """
+    engines: list[AsyncEngine] = []
+
+    async def make(*trigger_lists: Iterable[str]) -> async_sessionmaker[AsyncSession]:
+        engine = create_async_engine(
+            TEST_DATABASE_URL,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        engines.append(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            for triggers in trigger_lists:
+                for trigger in triggers:
+                    await conn.execute(text(trigger))
+        return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    yield make
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(
+    make_session_factory: SessionFactoryMaker,
+) -> async_sessionmaker[AsyncSession]:
+    """没有触发器和初始数据的内存数据库。需要触发器或初始数据的测试模块覆盖此 fixture"""
+    return await make_session_factory()
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from shared.rate_limit_monitor import RateLimitMonitor
+
+
+async def saturate(limiter: AdaptiveConcurrencyLimiter, latency: float):
+    """占满当前所有并发名额，并记录每个请求的耗时"""
+    release = asyncio.Event()
+
+    async def worker():
+        async with limiter.slot():
+            limiter.record_latency(latency)
+            await release.wait()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(limiter.limit)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_increases_additively_when_healthy():
+    limiter = AdaptiveConcurrencyLimiter(initial=3, max_limit=5, target_latency=1.0)
+
+    for _ in range(4):
+        await saturate(limiter, latency=0.2)
+        await limiter.adjust(rate_limited=0)
+
+    assert limiter.limit == 5
+    assert [limit for _, limit, _ in limiter.history] == [3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_backs_off_on_429_and_high_latency():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, max_limit=10, target_latency=1.0)
+
+    await saturate(limiter, latency=0.2)
+    assert await limiter.adjust(rate_limited=2) == "2 次 429"
+    assert limiter.limit == 4
+
+    await saturate(limiter, latency=5.0)
+    assert await limiter.adjust(rate_limited=0) is not None
+    assert limiter.limit == 2
+
+    # 下调不会低于最小值
+    await limiter.adjust(rate_limited=1)
+    await limiter.adjust(rate_limited=1)
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_period_does_not_increase():
+    """没有跑满并发的周期不会继续加大并发"""
+    limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=10)
+    async with limiter.slot():
+        limiter.record_latency(0.1)
+    assert await limiter.adjust(rate_limited=0) is None
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_slot_respects_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=4)
+    peak = 0
+    running = 0
+
+    async def worker():
+        nonlocal peak, running
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(worker() for _ in range(10)))
+    assert peak == 2
+
+
+def test_rate_limit_monitor_counts_429_warnings():
+    """一次全局限流会输出两条警告，只计一次；其他包含 429 的警告不计入"""
+    monitor = RateLimitMonitor()
+    monitor.install()
+    try:
+        http_logger = logging.getLogger("discord.http")
+        for url in ("/channels/1", "/channels/2"):
+            http_logger.warning(
+                "We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.",
+                "GET",
+                url,
+                1.0,
+            )
+        http_logger.warning("Global rate limit has been hit. Retrying in %.2f seconds.", 2.0)
+        http_logger.warning("Some other warning about 429")
+    finally:
+        monitor.uninstall()
+    assert monitor.total_429 == 2
+    assert monitor.global_429 == 1
+
+
+@pytest.mark.asyncio
+async def test_timeouts_back_off_and_resize_clamps_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, min_limit=2, max_limit=10)
+
+    assert await limiter.adjust(rate_limited=0, timeouts=3) == "3 次超时"
+    assert limiter.limit == 4
+
+    await limiter.resize(min_limit=1, max_limit=3)
+    assert limiter.limit == 3
+    assert limiter.history[-1][1:] == (3, "配置更新")
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.api_scheduler import APIScheduler
+from shared.enum.api_route import APIRoute
+from shared.rate_limit_monitor import RateLimitMonitor
+from shared.token_bucket import TokenBucket
+
+ROUTE_LIMIT = 10
+ROUTE_WINDOW = 0.3
+
+
+class FakeRateLimited(Exception):
+    """模拟 discord.HTTPException 的 429 响应"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.status = 429
+        self.retry_after = retry_after
+
+
+class FakeDiscordHTTP:
+    """按固定窗口对每个路由限速的假 HTTP 层，超过限制时抛出 429"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.windows: dict[str, tuple[float, int]] = {}
+        self.rate_limited = 0
+        self.served: list[str] = []
+
+    async def request(self, route: str, label: str) -> str:
+        now = time.monotonic()
+        started, used = self.windows.get(route, (now, 0))
+        if now - started >= self.window:
+            started, used = now, 0
+        if used >= self.limit:
+            self.rate_limited += 1
+            raise FakeRateLimited(retry_after=started + self.window - now)
+        self.windows[route] = (started, used + 1)
+        self.served.append(label)
+        await asyncio.sleep(0.01)
+        return label
+
+
+async def run_mixed_workload(
+    route_buckets: dict[str, tuple[int, float]],
+) -> FakeDiscordHTTP:
+    """后台审计先提交 50 个低优先级请求，随后用户交互在同一路由上提交 10 个高优先级请求"""
+    http = FakeDiscordHTTP(ROUTE_LIMIT, ROUTE_WINDOW)
+    scheduler = APIScheduler(
+        concurrent_requests=40, global_rate_limit=None, route_buckets=route_buckets
+    )
+    scheduler.start()
+
+    def submit(label: str, priority: int):
+        return asyncio.create_task(
+            scheduler.submit(
+                coro_factory=lambda: http.request(APIRoute.FETCH_CHANNEL.value, label),
+                priority=priority,
+                route=APIRoute.FETCH_CHANNEL,
+                major_id=1,
+            )
+        )
+
+    audits = [submit("audit", 10) for _ in range(50)]
+    await asyncio.sleep(0.05)
+    interactions = [submit("interaction", 1) for _ in range(10)]
+
+    await asyncio.gather(*audits, *interactions, return_exceptions=True)
+    await scheduler.stop()
+    return http
+
+
+@pytest.mark.asyncio
+async def test_route_buckets_avoid_429_and_keep_priority():
+    """配置路由桶后不再撞上 429，同一路由上的高优先级请求在下一个窗口优先发出"""
+    baseline = await run_mixed_workload(route_buckets={})
+    bucketed = await run_mixed_workload(
+        # 与真实配置一样留出余量，避免事件循环繁忙时派发与假 HTTP 层的窗口错开
+        route_buckets={APIRoute.FETCH_CHANNEL.value: (ROUTE_LIMIT, ROUTE_WINDOW * 1.2)}
+    )
+
+    print(
+        f"429 次数: 仅并发限制 {baseline.rate_limited}, 路由令牌桶 {bucketed.rate_limited}"
+    )
+    assert baseline.rate_limited > 0
+    assert bucketed.rate_limited == 0
+    assert len(bucketed.served) == 60
+    # 第一个窗口被审计请求占满，交互请求占据第二个窗口
+    assert bucketed.served[:ROUTE_LIMIT] == ["audit"] * ROUTE_LIMIT
+    assert bucketed.served[ROUTE_LIMIT : ROUTE_LIMIT * 2] == ["interaction"] * 10
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_per_major_parameter():
+    """同一路由的限制对每个 channel_id 分别生效，一个帖子的桶耗尽不影响其他帖子"""
+    scheduler = APIScheduler(
+        concurrent_requests=10,
+        global_rate_limit=None,
+        route_buckets={APIRoute.FETCH_CHANNEL.value: (1, 0.3)},
+    )
+    scheduler.start()
+    order: list[int] = []
+
+    async def fetch_channel(channel_id: int):
+        order.append(channel_id)
+
+    def submit(channel_id: int):
+        return asyncio.create_task(
+            scheduler.submit(
+                coro_factory=lambda: fetch_channel(channel_id),
+                priority=10,
+                route=APIRoute.FETCH_CHANNEL,
+                major_id=channel_id,
+            )
+        )
+
+    first, again = submit(1), submit(1)
+    other = submit(2)
+    await asyncio.gather(first, other)
+    assert sorted(order) == [1, 2]
+    assert not again.done()
+
+    await again
+    assert order[-1] == 1
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_logged_429_pauses_matching_bucket():
+    """discord.py 记录的 429 经由 RateLimitMonitor 暂停对应的桶，其他频道照常派发"""
+    scheduler = APIScheduler(concurrent_requests=10, global_rate_limit=None)
+    monitor = RateLimitMonitor()
+    monitor.add_listener(scheduler.on_rate_limited)
+    monitor.install()
+    scheduler.start()
+    try:
+        logging.getLogger("discord.http").warning(
+            "We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.",
+            "GET",
+            "https://discord.com/api/v10/channels/7",
+            0.2,
+        )
+    finally:
+        monitor.uninstall()
+
+    async def call():
+        return time.monotonic()
+
+    started = time.monotonic()
+    blocked, free = await asyncio.gather(
+        scheduler.submit(
+            coro_factory=call, priority=1, route=APIRoute.FETCH_CHANNEL, major_id=7
+        ),
+        scheduler.submit(
+            coro_factory=call, priority=1, route=APIRoute.FETCH_CHANNEL, major_id=8
+        ),
+    )
+    assert blocked - started >= 0.15
+    assert free - started < 0.1
+    assert scheduler.rate_limited_count == 1
+    assert scheduler.rate_limited_by_route[APIRoute.FETCH_CHANNEL.value] == 1
+    await scheduler.stop()
+
+
+def test_api_route_match():
+    assert APIRoute.match("GET", "https://discord.com/api/v10/channels/123") == (
+        APIRoute.FETCH_CHANNEL,
+        123,
+    )
+    assert APIRoute.match("GET", "/channels/1/messages/2") == (APIRoute.FETCH_MESSAGE, 1)
+    assert APIRoute.match("GET", "/users/5") == (APIRoute.FETCH_USER, None)
+    assert APIRoute.match("POST", "/channels/1") is None
+
+
+def test_token_bucket_refills_after_window():
+    bucket = TokenBucket(limit=2, per=1.0, margin=0)
+    bucket.consume(0.0)
+    bucket.consume(0.1)
+    assert bucket.wait_time(0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1.0) == 0
+    assert bucket.remaining == 2
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.api_scheduler import APIScheduler
+from shared.enum.api_route import APIRoute
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call():
+    """排队中和执行中的相同请求共享一次调用和同一个结果"""
+    scheduler = APIScheduler(concurrent_requests=5, global_rate_limit=None)
+    scheduler.start()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch_channel():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "thread"
+
+    def submit(priority: int):
+        return asyncio.create_task(
+            scheduler.submit(
+                coro_factory=fetch_channel,
+                priority=priority,
+                route=APIRoute.FETCH_CHANNEL,
+                dedup_key=(APIRoute.FETCH_CHANNEL, 42),
+            )
+        )
+
+    first = submit(10)
+    await asyncio.sleep(0)
+    # 第一个请求已在执行，后续两个请求合并到它上面
+    others = [submit(5), submit(1)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(first, *others) == ["thread"] * 3
+    assert calls == 1
+    assert scheduler.coalesced_count == 2
+    assert scheduler.coalesced_by_route[APIRoute.FETCH_CHANNEL.value] == 2
+
+    # 完成后再提交同一个 key 会发起新的调用
+    await submit(1)
+    assert calls == 2
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_inherits_highest_priority():
+    """排队中的请求被高优先级请求合并后，提升到等待者中最高的优先级"""
+    scheduler = APIScheduler(concurrent_requests=1, global_rate_limit=None)
+    scheduler.start()
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def call(label: str):
+        if label == "blocker":
+            await release.wait()
+        order.append(label)
+        return label
+
+    def submit(label: str, priority: int, dedup_key=None):
+        return asyncio.create_task(
+            scheduler.submit(
+                coro_factory=lambda: call(label),
+                priority=priority,
+                dedup_key=dedup_key,
+            )
+        )
+
+    blocker = submit("blocker", 1)
+    await asyncio.sleep(0)
+    # 唯一的并发名额被占用，以下请求都在排队
+    audit = submit("audit", 10, dedup_key="thread:1")
+    other = submit("other", 5)
+    await asyncio.sleep(0)
+    interaction = submit("ignored", 1, dedup_key="thread:1")
+    await asyncio.sleep(0)
+    release.set()
+
+    await asyncio.gather(blocker, audit, other, interaction)
+    assert order == ["blocker", "audit", "other"]
+    assert interaction.result() == "audit"
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_request():
+    """一个等待者被取消时，其他等待者仍然拿到结果"""
+    scheduler = APIScheduler(concurrent_requests=5, global_rate_limit=None)
+    scheduler.start()
+    release = asyncio.Event()
+
+    async def fetch_user():
+        await release.wait()
+        return "user"
+
+    tasks = [
+        asyncio.create_task(
+            scheduler.submit(coro_factory=fetch_user, priority=8, dedup_key="user:7")
+        )
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+    tasks[0].cancel()
+    release.set()
+
+    assert await tasks[1] == "user"
+    await scheduler.stop()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.api_scheduler import APIScheduler
+from shared.rate_limit_monitor import RateLimitEvent
+
+
+class Tracker:
+    """记录同时在执行的请求数"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def call(self):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_update_concurrency_keeps_in_flight_permits():
+    """降低上限时在途请求不受影响，也不会多放行；提高上限后立即放行更多请求"""
+    scheduler = APIScheduler(
+        concurrent_requests=4, min_concurrent_requests=1, global_rate_limit=None
+    )
+    scheduler.start()
+    tracker = Tracker()
+    tasks = [
+        asyncio.create_task(scheduler.submit(coro_factory=tracker.call, priority=5))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0.01)
+    assert tracker.running == 4
+
+    scheduler.update_concurrency(2)
+    await asyncio.sleep(0.01)
+    assert scheduler.concurrency_limit == 2
+    assert tracker.running == 4
+
+    scheduler.update_concurrency(6)
+    await asyncio.sleep(0.01)
+    # 新上限是 6，但 AIMD 的当前值仍为 2，需要按周期逐步回升
+    assert scheduler.concurrency_limit == 2
+    assert tracker.running == 4
+
+    tracker.release.set()
+    await asyncio.gather(*tasks)
+    assert tracker.peak == 4
+    assert [reason for _, _, reason in scheduler.concurrency_history] == [
+        "初始",
+        "配置更新",
+    ]
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_halve_concurrency():
+    """周期内出现 429 时并发减半，之后在满载且健康时逐步加一"""
+    scheduler = APIScheduler(
+        concurrent_requests=8, min_concurrent_requests=2, global_rate_limit=None
+    )
+    scheduler.CONCURRENCY_ADJUST_INTERVAL = 0.05  # type: ignore[misc]
+    scheduler.start()
+    await asyncio.sleep(0)
+
+    scheduler.on_rate_limited(
+        RateLimitEvent("GET", "https://discord.com/api/v10/channels/1", 0.01, False)
+    )
+    await asyncio.sleep(0.08)
+    assert scheduler.concurrency_limit == 4
+    assert scheduler.concurrency_history[-1][2] == "1 次 429"
+
+    # 持续满载且请求很快：每个周期加一
+    async def quick():
+        await asyncio.sleep(0.005)
+
+    async def load():
+        while scheduler.concurrency_limit < 5:
+            await asyncio.gather(
+                *(
+                    scheduler.submit(coro_factory=quick, priority=5, route="GET /test")
+                    for _ in range(10)
+                )
+            )
+
+    await asyncio.wait_for(load(), timeout=2)
+    assert scheduler.concurrency_history[-1][2] == "运行健康"
+    await scheduler.stop()
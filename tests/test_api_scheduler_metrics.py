@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.api_scheduler import APIScheduler
+from shared.api_scheduler_metrics import LatencyHistogram
+from shared.enum.api_route import APIRoute
+from shared.exceptions import APIQueueFullError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_metrics_by_priority_and_label():
+    """排队数、等待/执行耗时、重试、失败和拒绝都按优先级和调用方标签分别统计"""
+    clock = FakeClock()
+    scheduler = APIScheduler(
+        concurrent_requests=1,
+        global_rate_limit=None,
+        max_queue_depth={10: 2},
+        clock=clock,
+    )
+    scheduler.start()
+    release = asyncio.Event()
+    attempts = {"flaky": 0}
+
+    async def blocker():
+        await release.wait()
+        clock.now += 0.5
+
+    async def fetch():
+        clock.now += 0.2
+        return "ok"
+
+    async def flaky():
+        attempts["flaky"] += 1
+        if attempts["flaky"] == 1:
+            raise asyncio.TimeoutError()
+        return "ok"
+
+    async def broken():
+        raise ValueError("boom")
+
+    first = asyncio.create_task(
+        scheduler.submit(coro_factory=blocker, priority=1, label="ui")
+    )
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(
+            scheduler.submit(
+                coro_factory=fetch, priority=10, route=APIRoute.FETCH_CHANNEL, major_id=1
+            )
+        ),
+        asyncio.create_task(
+            scheduler.submit(coro_factory=flaky, priority=10, label="audit")
+        ),
+    ]
+    await asyncio.sleep(0)
+    with pytest.raises(APIQueueFullError):
+        await scheduler.submit(coro_factory=fetch, priority=10, label="audit")
+
+    metrics = scheduler.get_metrics()
+    assert metrics["queue_depth"] == {"10": 2}
+
+    clock.now = 3.0
+    release.set()
+    await asyncio.gather(first, *tasks)
+    with pytest.raises(ValueError):
+        await scheduler.submit(coro_factory=broken, priority=1, label="ui")
+    await scheduler.stop()
+
+    metrics = scheduler.get_metrics()
+    assert metrics["queue_depth"] == {}
+
+    ui = metrics["by_label"]["ui"]
+    assert (ui["submitted"], ui["succeeded"], ui["failed"]) == (2, 1, 1)
+    assert ui["exec_seconds"]["max"] == pytest.approx(0.5)
+
+    channel = metrics["by_label"][APIRoute.FETCH_CHANNEL.value]
+    # 提交于 0 秒，阻塞请求在 3.5 秒结束后才派发
+    assert channel["wait_seconds"]["max"] == pytest.approx(3.5)
+    assert channel["wait_seconds"]["buckets"]["le_5"] == 1
+    assert channel["exec_seconds"]["buckets"]["le_0.25"] == 1
+
+    audit = metrics["by_label"]["audit"]
+    assert (audit["submitted"], audit["rejected"], audit["retries"]) == (2, 1, 1)
+    assert audit["succeeded"] == 1
+    assert audit["exec_seconds"]["count"] == 2
+
+    low = metrics["by_priority"]["10"]
+    assert (low["submitted"], low["succeeded"], low["rejected"]) == (3, 2, 1)
+    assert metrics["by_priority"]["1"]["failed"] == 1
+    assert metrics["timeouts"] == 1
+
+
+def test_latency_histogram_buckets():
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_0.1": 2, "le_1": 1, "inf": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["avg"] == pytest.approx(2.65 / 4)
+    assert snapshot["max"] == 2.0
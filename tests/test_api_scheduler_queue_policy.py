@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from shared.api_scheduler import APIScheduler, parse_queue_config
+from shared.enum.queue_overflow_policy import QueueOverflowPolicy
+from shared.exceptions import APIQueueFullError, APIRequestExpiredError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Harness:
+    """并发数为 1 的调度器，先用一个阻塞请求占住名额，让后续请求都在排队"""
+
+    def __init__(self, **kwargs):
+        self.scheduler = APIScheduler(
+            concurrent_requests=1, global_rate_limit=None, **kwargs
+        )
+        self.release = asyncio.Event()
+        self.order: list[str] = []
+
+    async def __aenter__(self):
+        self.scheduler.start()
+        self.blocker = self.submit("blocker", 1)
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release.set()
+        await self.scheduler.stop()
+
+    async def _call(self, label: str):
+        if label == "blocker":
+            await self.release.wait()
+        self.order.append(label)
+        return label
+
+    def submit(self, label: str, priority: int, **kwargs) -> asyncio.Task:
+        return asyncio.create_task(
+            self.scheduler.submit(
+                coro_factory=lambda: self._call(label), priority=priority, **kwargs
+            )
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("aging_interval, expected", [(10, "audit"), (None, "backfill")])
+async def test_waiting_requests_age(aging_interval, expected):
+    """等待足够久的低优先级请求老化后排到新的、优先级不高于老化上限的请求之前"""
+    clock = FakeClock()
+    async with Harness(aging_interval=aging_interval, clock=clock) as harness:
+        audit = harness.submit("audit", 10)
+        await asyncio.sleep(0)
+        clock.now = 100.0
+        backfill = harness.submit("backfill", 6)
+        await asyncio.sleep(0)
+        harness.release.set()
+        await asyncio.gather(harness.blocker, audit, backfill)
+
+    assert harness.order[1] == expected
+
+
+@pytest.mark.asyncio
+async def test_aging_never_overtakes_interactive_requests():
+    """排队很久的低优先级请求最多老化到 aging_floor，仍排在新的交互请求之后"""
+    clock = FakeClock()
+    async with Harness(aging_interval=10, aging_floor=5, clock=clock) as harness:
+        audit = harness.submit("audit", 10)
+        await asyncio.sleep(0)
+        clock.now = 10_000.0
+        interaction = harness.submit("interaction", 1)
+        await asyncio.sleep(0)
+        harness.release.set()
+        await asyncio.gather(harness.blocker, audit, interaction)
+
+    assert harness.order == ["blocker", "interaction", "audit"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_new_requests():
+    async with Harness(max_queue_depth={10: 2}) as harness:
+        queued = [harness.submit("audit", 10) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(APIQueueFullError):
+            await harness.scheduler.submit(
+                coro_factory=lambda: harness._call("overflow"), priority=10
+            )
+        # 其他优先级不受影响
+        interaction = harness.submit("interaction", 1)
+        harness.release.set()
+        await asyncio.gather(harness.blocker, *queued, interaction)
+
+    assert harness.scheduler.rejected_by_priority[10] == 1
+    assert "overflow" not in harness.order
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_oldest_request():
+    async with Harness(
+        max_queue_depth={10: 2}, overflow_policy=QueueOverflowPolicy.SHED_OLDEST
+    ) as harness:
+        oldest, second = harness.submit("oldest", 10), harness.submit("second", 10)
+        await asyncio.sleep(0)
+        newest = harness.submit("newest", 10)
+        await asyncio.sleep(0)
+        harness.release.set()
+
+        with pytest.raises(APIQueueFullError):
+            await oldest
+        await asyncio.gather(harness.blocker, second, newest)
+
+    assert harness.order == ["blocker", "second", "newest"]
+    assert harness.scheduler.shed_by_priority[10] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_request_is_cancelled_not_executed():
+    """超过截止时间仍在排队的请求被取消，不会在名额空出后迟到执行"""
+    async with Harness() as harness:
+        late = harness.submit("late", 5, deadline=0.05)
+        on_time = harness.submit("on_time", 5)
+        with pytest.raises(APIRequestExpiredError):
+            await late
+        harness.release.set()
+        await asyncio.gather(harness.blocker, on_time)
+
+    assert harness.order == ["blocker", "on_time"]
+    assert harness.scheduler.expired_by_priority[5] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_error_is_not_treated_as_timeout():
+    """请求的协程中抛出的 APIRequestExpiredError 不重试，也不计入超时"""
+    calls = 0
+
+    async def outer():
+        nonlocal calls
+        calls += 1
+        raise APIRequestExpiredError("内层请求已过期")
+
+    async with Harness() as harness:
+        harness.release.set()
+        with pytest.raises(APIRequestExpiredError):
+            await harness.scheduler.submit(coro_factory=outer, priority=5)
+        await harness.blocker
+
+    assert calls == 1
+    assert harness.scheduler.timeout_count == 0
+
+
+def test_parse_queue_config():
+    options = parse_queue_config(
+        {
+            "api_priority_aging_seconds": 5,
+            "api_max_queue_depth": {"10": 500},
+            "api_queue_overflow": "shed_oldest",
+        }
+    )
+    assert options == {
+        "aging_interval": 5,
+        "aging_floor": 5,
+        "max_queue_depth": {10: 500},
+        "overflow_policy": QueueOverflowPolicy.SHED_OLDEST,
+    }
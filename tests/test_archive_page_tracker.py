@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from indexer.archive_page_tracker import ArchivePageTracker
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_cursor_waits_for_earlier_pages():
+    """后一页先处理完时，游标不能越过尚未处理完的前一页"""
+    tracker = ArchivePageTracker()
+    tracker.seal(tracker.ACTIVE_PAGE, None)
+
+    for page in (1, 2):
+        for _ in range(2):
+            tracker.add(page)
+    tracker.seal(1, BASE - timedelta(days=1))
+    tracker.seal(2, BASE - timedelta(days=2))
+
+    # 第 2 页先全部完成
+    assert tracker.done(2) is False
+    assert tracker.done(2) is False
+    assert tracker.safe_cursor is None
+
+    # 第 1 页完成后，游标一次前进到第 2 页
+    assert tracker.done(1) is False
+    assert tracker.done(1) is True
+    assert tracker.safe_cursor == BASE - timedelta(days=2)
+    assert tracker.safe_count == 4
+
+
+def test_active_page_does_not_move_resumed_cursor():
+    """续建时活跃帖子页不会覆盖已保存的游标，也不计入归档计数"""
+    resumed = BASE - timedelta(days=10)
+    tracker = ArchivePageTracker(initial_cursor=resumed, initial_count=300)
+
+    tracker.add(tracker.ACTIVE_PAGE)
+    tracker.seal(tracker.ACTIVE_PAGE, None)
+    assert tracker.done(tracker.ACTIVE_PAGE) is False
+    assert tracker.safe_cursor == resumed
+    assert tracker.safe_count == 300
+
+    # 空的最后一页不会改变游标
+    tracker.seal(1, None)
+    assert tracker.safe_cursor == resumed
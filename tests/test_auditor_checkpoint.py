@@ -0,0 +1,144 @@
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from typing import List
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Thread
+from auditor.auditor_service import AuditorService
+from auditor.cog import Auditor
+
+
+class FakeSyncService:
+    """记录同步顺序，可在同步指定次数后模拟进程中断"""
+
+    def __init__(self, fail_after: int | None = None):
+        self.submitted: List[int] = []
+        self.skip_flags: List[bool] = []
+        self.fail_after = fail_after
+        self.skipped_count = 0
+        self.parsed_count = 0
+
+    async def sync_thread(self, thread_id: int, *, skip_unchanged: bool = False):
+        if self.fail_after is not None and len(self.submitted) >= self.fail_after:
+            raise RuntimeError("模拟中断")
+        self.submitted.append(thread_id)
+        self.skip_flags.append(skip_unchanged)
+
+
+def make_auditor(
+    session_factory: async_sessionmaker,
+    sync_service: FakeSyncService,
+    batch_size: int,
+    full_parse_every_cycles: int = 4,
+) -> Auditor:
+    """构造一个不依赖 Discord 连接的 Auditor 实例，相当于一次进程启动"""
+    bot = SimpleNamespace(
+        sync_service=sync_service,
+        config={
+            "performance": {
+                "audit_batch_size": batch_size,
+                "audit_interval": 0,
+                "audit_full_parse_every_cycles": full_parse_every_cycles,
+            }
+        },
+    )
+    return Auditor(bot=bot, session_factory=session_factory)  # type: ignore[arg-type]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        session.add_all(
+            [
+                Thread(
+                    channel_id=1,
+                    thread_id=5000 + i,
+                    title=f"Thread {i}",
+                    author_id=1,
+                    created_at=datetime.now(timezone.utc),
+                )
+                for i in range(10)
+            ]
+        )
+        await session.commit()
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded(session_factory: async_sessionmaker):
+    """每批读取的帖子数不超过 batch_size，且按主键顺序推进"""
+    async with session_factory() as session:
+        repo = AuditorService(session)
+        first = await repo.get_thread_batch_after(0, 4)
+        second = await repo.get_thread_batch_after(first[-1][0], 4)
+        third = await repo.get_thread_batch_after(second[-1][0], 4)
+        rest = await repo.get_thread_batch_after(third[-1][0], 4)
+
+    assert [len(b) for b in (first, second, third, rest)] == [4, 4, 2, 0]
+    ids = [tid for batch in (first, second, third) for _, tid in batch]
+    assert ids == [5000 + i for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_restart_resumes_after_completed_batch(session_factory: async_sessionmaker):
+    """处理完一批后重启，新的实例从下一批开始，而不是从头开始"""
+    first_run = FakeSyncService()
+    auditor = make_auditor(session_factory, first_run, batch_size=4)
+    assert await auditor._audit_next_batch() == 4
+    assert first_run.submitted == [5000, 5001, 5002, 5003]
+
+    # 模拟重启：新的 Auditor 实例，只共享数据库
+    second_run = FakeSyncService()
+    restarted = make_auditor(session_factory, second_run, batch_size=4)
+    assert await restarted._audit_next_batch() == 4
+    assert second_run.submitted == [5004, 5005, 5006, 5007]
+
+
+@pytest.mark.asyncio
+async def test_restart_resumes_after_interrupted_batch(session_factory: async_sessionmaker):
+    """批次中途被中断时，游标停在最后一个已提交的帖子"""
+    interrupted = FakeSyncService(fail_after=2)
+    auditor = make_auditor(session_factory, interrupted, batch_size=5)
+    with pytest.raises(RuntimeError):
+        await auditor._audit_next_batch()
+    assert interrupted.submitted == [5000, 5001]
+
+    resumed = FakeSyncService()
+    restarted = make_auditor(session_factory, resumed, batch_size=5)
+    while await restarted._audit_next_batch():
+        pass
+    assert resumed.submitted == [5000 + i for i in range(2, 10)]
+
+    # 一轮结束后游标归零，轮次加一
+    async with session_factory() as session:
+        checkpoint = await AuditorService(session).get_checkpoint()
+    assert checkpoint.last_thread_pk == 0
+    assert checkpoint.cycle == 1
+
+
+@pytest.mark.asyncio
+async def test_periodic_cycles_fully_reparse(session_factory: async_sessionmaker):
+    """指纹不包含反应数等首楼数据，每隔 full_parse_every_cycles 轮完整解析一轮"""
+    sync_service = FakeSyncService()
+    auditor = make_auditor(
+        session_factory, sync_service, batch_size=10, full_parse_every_cycles=3
+    )
+    flags_by_cycle = []
+    for _ in range(4):
+        sync_service.skip_flags.clear()
+        while await auditor._audit_next_batch():
+            pass
+        flags_by_cycle.append(set(sync_service.skip_flags))
+
+    assert flags_by_cycle == [{False}, {True}, {True}, {False}]
+    assert not make_auditor(
+        session_factory, sync_service, batch_size=10, full_parse_every_cycles=1
+    ).should_skip_unchanged(5)
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from core.author_cache_service import AuthorCacheService
+from models import Author
+
+GUILD = SimpleNamespace(get_member=lambda user_id: None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeBot:
+    """本地缓存中没有任何用户，每次获取都要通过调度器调用 fetch_user"""
+
+    def __init__(self):
+        self.fetches = 0
+        self.names: dict[int, str] = {}
+        self.api_scheduler = self
+
+    def get_user(self, user_id):
+        return None
+
+    async def submit(self, *, coro_factory, **kwargs):
+        return await coro_factory()
+
+    async def fetch_user(self, user_id: int):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        name = self.names.get(user_id, f"user{user_id}")
+        return SimpleNamespace(
+            id=user_id,
+            name=name,
+            global_name=None,
+            display_name=name,
+            display_avatar=SimpleNamespace(url=f"https://example.com/{user_id}.png"),
+        )
+
+
+async def stored_names(factory: async_sessionmaker) -> dict[int, str]:
+    async with factory() as session:
+        authors = (await session.execute(select(Author))).scalars().all()
+    return {author.id: author.name for author in authors}
+
+
+@pytest.mark.asyncio
+async def test_1k_threads_fetch_and_write_each_author_once(session_factory):
+    """1000 个帖子来自 50 个作者：每个作者只获取一次、写入一次；再次同步时不再获取或写入"""
+    clock = FakeClock()
+    bot = FakeBot()
+    cache = AuthorCacheService(bot, session_factory, ttl=60, clock=clock)  # type: ignore[arg-type]
+
+    for index in range(1000):
+        cache.enqueue(100 + index % 50, GUILD)  # type: ignore[arg-type]
+    await cache.flush()
+
+    stats = cache.get_stats()
+    print(stats)
+    assert bot.fetches == 50
+    assert stats["user_lookups_per_1k_threads"] == 50
+    assert stats["db_writes_per_1k_threads"] == 50
+    assert stats["db_batches"] == 1
+    assert stats["deduplicated"] == 950
+    assert len(await stored_names(session_factory)) == 50
+
+    for index in range(1000):
+        cache.enqueue(100 + index % 50, GUILD)  # type: ignore[arg-type]
+    await cache.flush()
+    assert bot.fetches == 50
+    assert cache.db_rows_written == 50
+
+    # 缓存过期后重新获取，只写入有变化的作者
+    clock.now = 60
+    bot.names[100] = "renamed"
+    for author_id in range(100, 150):
+        cache.enqueue(author_id, GUILD)  # type: ignore[arg-type]
+    await cache.flush()
+    assert bot.fetches == 100
+    assert cache.db_rows_written == 51
+    assert (await stored_names(session_factory))[100] == "renamed"
+
+
+@pytest.mark.asyncio
+async def test_pending_is_bounded_and_lookups_are_shared(session_factory):
+    bot = FakeBot()
+    cache = AuthorCacheService(bot, session_factory, max_pending=10)  # type: ignore[arg-type]
+    for author_id in range(20):
+        cache.enqueue(author_id, GUILD)  # type: ignore[arg-type]
+    assert cache.get_stats()["pending"] == 10
+    assert cache.dropped == 10
+
+    # 同一作者的并发获取只调用一次 fetch_user
+    results = await asyncio.gather(
+        *(cache.get_author_data(500, GUILD) for _ in range(5))  # type: ignore[arg-type]
+    )
+    assert bot.fetches == 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_record_path_skips_unchanged_authors(session_factory):
+    """批量写入路径：同一作者只在第一次随帖子写入"""
+    cache = AuthorCacheService(FakeBot(), session_factory)  # type: ignore[arg-type]
+    first = await cache.get_author_for_record(7, GUILD)  # type: ignore[arg-type]
+    second = await cache.get_author_for_record(7, GUILD)  # type: ignore[arg-type]
+    assert first is not None and first["id"] == 7
+    assert second is None
+    assert cache.threads_seen == 2
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Thread
+from core.redis_trend_service import RedisTrendService
+from core.thread_backfill_queue import ThreadBackfillQueue
+from shared.redis_client import RedisManager
+from ThreadManager.batch_update_service import BatchUpdateService
+
+
+class BlockingTrendService:
+    """record_increments 在 release 被设置前一直等待，模拟很慢的 Redis"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls: list[dict[int, int]] = []
+
+    async def record_increments(self, metric: str, counts: dict[int, int]):
+        self.calls.append(dict(counts))
+        await self.release.wait()
+
+
+class FakeSyncService:
+    async def sync_thread(self, thread_id, priority=10, *, raise_errors=False):
+        return True
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    now = datetime.now(timezone.utc)
+    async with factory() as session:
+        session.add_all(
+            [
+                Thread(channel_id=1, thread_id=1, title="新帖", author_id=1, created_at=now),
+                Thread(
+                    channel_id=1,
+                    thread_id=2,
+                    title="旧帖",
+                    author_id=1,
+                    created_at=now - timedelta(days=365),
+                ),
+            ]
+        )
+        await session.commit()
+    return factory
+
+
+async def reply_counts(factory: async_sessionmaker) -> dict[int, int]:
+    async with factory() as session:
+        result = await session.execute(select(Thread.thread_id, Thread.reply_count))
+        return dict(result.all())
+
+
+def make_service(factory, trend_service) -> BatchUpdateService:
+    backfill_queue = ThreadBackfillQueue(factory, FakeSyncService())
+    return BatchUpdateService(
+        factory, backfill_queue=backfill_queue, trend_service=trend_service
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_trend_service_does_not_delay_db_flush(session_factory):
+    trend = BlockingTrendService()
+    service = make_service(session_factory, trend)
+    now = datetime.now(timezone.utc)
+
+    for _ in range(3):
+        await service.add_update(1, now)
+    await service.add_update(2, now)
+    await service.add_update(3, now)  # 幽灵帖子
+    await asyncio.wait_for(service.flush_to_db(), timeout=1)
+
+    assert await reply_counts(session_factory) == {1: 3, 2: 1}
+    assert service.backfill_queue.queue_length == 1
+
+    # 第一批仍卡在 Redis 时，后续的增量在内存中合并
+    await service.add_update(1, now)
+    await asyncio.wait_for(service.flush_to_db(), timeout=1)
+    await service.add_update(1, now)
+    await asyncio.wait_for(service.flush_to_db(), timeout=1)
+    assert await reply_counts(session_factory) == {1: 5, 2: 1}
+
+    trend.release.set()
+    await asyncio.wait_for(service.stop(), timeout=1)
+    # 只有有效期内创建的帖子计入趋势，每批一次提交
+    assert trend.calls == [{1: 3}, {1: 2}]
+
+    metrics = service.get_metrics()
+    assert metrics["phase_seconds"]["db_write"]["count"] == 3
+    assert metrics["phase_seconds"]["backfill"]["count"] == 1
+    assert metrics["phase_seconds"]["trend"]["count"] == 2
+    assert metrics["pending_trend_threads"] == 0
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands: list[tuple] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def zincrby(self, key, amount, member):
+        self.commands.append(("zincrby", key, amount, member))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+        return self
+
+    async def execute(self):
+        self.client.executed.append(self.commands)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.executed: list[list[tuple]] = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.mark.asyncio
+async def test_record_increments_uses_one_pipeline(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(RedisManager, "_client", redis)
+
+    await RedisTrendService().record_increments("reply", {1: 2, 2: 0, 3: 5})
+
+    assert len(redis.executed) == 1
+    commands = redis.executed[0]
+    assert [c[0] for c in commands] == ["zincrby", "zincrby", "expire"]
+    assert {(c[2], c[3]) for c in commands[:2]} == {(2, "1"), (5, "3")}
@@ -0,0 +1,133 @@
+import asyncio
+import random
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import ThreadFollow
+from core.follow_join_buffer import FollowJoinBuffer
+from core.follow_repository import ThreadFollowRepository
+from core.followed_thread_index import FollowedThreadIndex
+from shared.database import FOLLOW_UNREAD_TRIGGERS
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    return await make_session_factory(FOLLOW_UNREAD_TRIGGERS)
+
+
+def make_buffer(factory, journal_path=None, **kwargs) -> FollowJoinBuffer:
+    return FollowJoinBuffer(
+        factory,
+        FollowedThreadIndex(factory),
+        journal_path=str(journal_path) if journal_path else None,
+        **kwargs,
+    )
+
+
+async def all_follows(factory) -> list[tuple[int, int]]:
+    async with factory() as session:
+        result = await session.execute(
+            select(ThreadFollow.user_id, ThreadFollow.thread_id)
+        )
+        return sorted((user_id, thread_id) for user_id, thread_id in result.all())
+
+
+@pytest.mark.asyncio
+async def test_stress_joins_are_deduplicated_and_batched(session_factory, tmp_path):
+    """5000 次加入分布在 100 个帖子上，含重复加入与已存在的关注"""
+    rng = random.Random(50)
+    joins = [(rng.randrange(1, 1500), rng.randrange(100, 200)) for _ in range(5000)]
+    async with session_factory() as session:
+        assert await ThreadFollowRepository(session).add_follow(*joins[0])
+
+    buffer = make_buffer(
+        session_factory, tmp_path / "joins.log", flush_interval=0.05, max_batch=500
+    )
+    await buffer.followed_index.rebuild()
+    await buffer.load()
+    buffer.start()
+
+    original = ThreadFollowRepository.add_joined_follows
+    batch_sizes: list[int] = []
+
+    async def recording(self, batch):
+        batch_sizes.append(len(batch))
+        return await original(self, batch)
+
+    with patch.object(ThreadFollowRepository, "add_joined_follows", recording):
+        for index, (user_id, thread_id) in enumerate(joins):
+            buffer.add(user_id, thread_id)
+            if index % 250 == 0:
+                await asyncio.sleep(0)
+        await buffer.stop()
+
+    expected = sorted(set(joins))
+    assert await all_follows(session_factory) == expected
+    # 写入次数远少于加入次数
+    assert len(batch_sizes) <= 5000 // 100
+    assert sum(batch_sizes) == buffer.get_stats()["flushed"]
+    stats = buffer.get_stats()
+    assert stats["pending"] == 0
+    assert stats["inserted"] == len(expected) - 1
+    assert stats["joined"] + stats["deduplicated"] == 5000
+    for thread_id in {thread_id for _, thread_id in expected}:
+        assert await buffer.followed_index.has_followers(thread_id)
+    assert buffer.followed_index.get_stats()["db_checks"] == 0
+    assert (tmp_path / "joins.log").read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_journal_is_replayed_after_crash(session_factory, tmp_path):
+    journal_path = tmp_path / "joins.log"
+    buffer = make_buffer(session_factory, journal_path)
+    await buffer.load()
+    buffer.add(1, 100)
+    buffer.add(2, 100)
+    buffer.add(1, 100)
+    # 模拟进程意外退出：未写库，最后一行写了一半
+    with open(journal_path, "a", encoding="utf-8") as journal:
+        journal.write("3 10")
+    assert await all_follows(session_factory) == []
+
+    restarted = make_buffer(session_factory, journal_path)
+    await restarted.load()
+    assert await all_follows(session_factory) == [(1, 100), (2, 100)]
+    assert restarted.pending_count == 0
+    assert journal_path.read_text() == ""
+
+    async with session_factory() as session:
+        # 加入即视为已查看
+        assert await ThreadFollowRepository(session).get_unread_count(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(session_factory, tmp_path):
+    journal_path = tmp_path / "joins.log"
+    buffer = make_buffer(session_factory, journal_path)
+    await buffer.followed_index.rebuild()
+    await buffer.load()
+    buffer.add(1, 100)
+
+    async def failing(self, batch):
+        raise RuntimeError("database is locked")
+
+    with patch.object(ThreadFollowRepository, "add_joined_follows", failing):
+        assert await buffer.flush() == 0
+    assert buffer.pending_count == 1
+    assert buffer.get_stats()["failed_flushes"] == 1
+    assert not await buffer.followed_index.has_followers(100)
+
+    buffer.add(2, 100)
+    await buffer.stop()
+    assert await all_follows(session_factory) == [(1, 100), (2, 100)]
+    assert await buffer.followed_index.has_followers(100)
+    assert journal_path.read_text() == ""
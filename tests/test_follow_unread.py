@@ -0,0 +1,258 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import FollowUnreadStat, Thread, ThreadFollow
+from core.follow_repository import ThreadFollowRepository
+from core.follow_unread_reconciler import FollowUnreadReconciler
+from core.follow_unread_repository import FollowUnreadRepository
+from core.thread_repository import ThreadRepository
+from shared.database import FOLLOW_UNREAD_TRIGGERS, ensure_thread_follow_unique_index
+
+
+USERS = [10, 11, 12]
+THREADS = [100, 101, 102, 103]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory(FOLLOW_UNREAD_TRIGGERS)
+    async with factory() as session:
+        session.add_all(make_thread(thread_id) for thread_id in THREADS)
+        await session.commit()
+    return factory
+
+
+def make_thread(thread_id: int, latest_update_at: datetime | None = None) -> Thread:
+    return Thread(
+        thread_id=thread_id,
+        channel_id=1,
+        title=f"帖子{thread_id}",
+        author_id=1,
+        latest_update_at=latest_update_at,
+    )
+
+
+async def expected_unread(factory, user_id: int) -> int:
+    """按旧的实现直接联表计算未读数"""
+    async with factory() as session:
+        result = await session.execute(
+            select(Thread.latest_update_at, ThreadFollow.last_viewed_at)
+            .join(Thread, Thread.thread_id == ThreadFollow.thread_id)
+            .where(ThreadFollow.user_id == user_id)
+        )
+        return sum(
+            1
+            for latest_update_at, last_viewed_at in result.all()
+            if latest_update_at is not None
+            and (last_viewed_at is None or latest_update_at > last_viewed_at)
+        )
+
+
+async def assert_consistent(factory):
+    async with factory() as session:
+        repo = ThreadFollowRepository(session)
+        actual = {user_id: await repo.get_unread_count(user_id) for user_id in USERS}
+        assert await FollowUnreadRepository(session).find_drift() == []
+    assert actual == {user_id: await expected_unread(factory, user_id) for user_id in USERS}
+
+
+async def publish_update(factory, thread_id: int):
+    async with factory() as session:
+        assert await ThreadRepository(session).update_thread_update_info(
+            thread_id, f"https://discord.com/channels/1/{thread_id}/1"
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_and_view_cycle(session_factory):
+    async with session_factory() as session:
+        repo = ThreadFollowRepository(session)
+        assert await repo.add_follow(10, 100)
+        assert await repo.add_follow(10, 101)
+        assert await repo.add_follow(11, 100, auto_view=True)
+
+    await publish_update(session_factory, 100)
+    await assert_consistent(session_factory)
+    async with session_factory() as session:
+        assert await ThreadFollowRepository(session).get_unread_count(10) == 1
+        assert await ThreadFollowRepository(session).get_unread_count(11) == 1
+
+    # 再次更新同一帖子不重复计数
+    await publish_update(session_factory, 100)
+    await publish_update(session_factory, 101)
+    async with session_factory() as session:
+        repo = ThreadFollowRepository(session)
+        assert await repo.get_unread_count(10) == 2
+        assert await repo.update_last_viewed(10, 100)
+        assert await repo.get_unread_count(10) == 1
+        assert await repo.update_last_viewed(10)
+        assert await repo.get_unread_count(10) == 0
+        assert await repo.remove_follow(11, 100)
+        assert await repo.get_unread_count(11) == 0
+    await assert_consistent(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_thread_lifecycle_adjusts_followers(session_factory):
+    # 帖子入库前就已被关注 (首次检测时自动关注)
+    async with session_factory() as session:
+        await ThreadFollowRepository(session).batch_add_follows(200, USERS)
+        session.add(make_thread(200, datetime.now(timezone.utc)))
+        await session.commit()
+    await assert_consistent(session_factory)
+    async with session_factory() as session:
+        assert await ThreadFollowRepository(session).get_unread_count(12) == 1
+
+    async with session_factory() as session:
+        await session.execute(delete(Thread).where(Thread.thread_id == 200))
+        await session.commit()
+    await assert_consistent(session_factory)
+    async with session_factory() as session:
+        assert await ThreadFollowRepository(session).get_unread_count(12) == 0
+
+
+@pytest.mark.asyncio
+async def test_random_operations_stay_consistent(session_factory):
+    rng = random.Random(7)
+    clock = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for _ in range(200):
+        clock += timedelta(seconds=1)
+        user_id, thread_id = rng.choice(USERS), rng.choice(THREADS)
+        operation = rng.randrange(5)
+        async with session_factory() as session:
+            repo = ThreadFollowRepository(session)
+            if operation == 0:
+                await repo.add_follow(user_id, thread_id, auto_view=rng.random() < 0.3)
+            elif operation == 1:
+                await repo.remove_follow(user_id, thread_id)
+            elif operation == 2:
+                await repo.update_last_viewed(user_id, thread_id)
+            elif operation == 3:
+                await repo.update_last_viewed(user_id)
+            else:
+                await session.execute(
+                    update(Thread)
+                    .where(Thread.thread_id == thread_id)  # type: ignore[arg-type]
+                    .values(latest_update_at=clock + timedelta(days=rng.choice([-1, 1])))
+                )
+                await session.commit()
+        await assert_consistent(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_reconciler_corrects_drift(session_factory):
+    async with session_factory() as session:
+        await ThreadFollowRepository(session).batch_add_follows(100, [10, 11])
+    await publish_update(session_factory, 100)
+
+    # 绕过触发器直接改动计数
+    async with session_factory() as session:
+        await session.execute(
+            update(FollowUnreadStat)
+            .where(FollowUnreadStat.user_id == 10)  # type: ignore[arg-type]
+            .values(unread_count=5)
+        )
+        session.add(FollowUnreadStat(user_id=12, unread_count=3))
+        await session.commit()
+        assert await FollowUnreadRepository(session).find_drift() == [(10, 5, 1), (12, 3, 0)]
+
+    reconciler = FollowUnreadReconciler(session_factory)
+    assert await reconciler.reconcile_once() == 2
+    assert await reconciler.reconcile_once() == 0
+    await assert_consistent(session_factory)
+    assert reconciler.get_stats()["corrected_users"] == 2
+
+    async with session_factory() as session:
+        repo = FollowUnreadRepository(session)
+        await repo.rebuild()
+        await session.commit()
+        assert await repo.get_unread_count(11) == 1
+        assert await repo.find_drift() == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_follow_operations(session_factory):
+    await publish_update(session_factory, 100)
+    await publish_update(session_factory, 101)
+    async with session_factory() as session:
+        repo = ThreadFollowRepository(session)
+        # 重复的帖子ID与已关注的帖子都被跳过
+        assert await repo.add_follow(10, 100)
+        assert await repo.batch_follow_threads(10, [100, 101, 102, 101]) == 2
+        assert await repo.batch_follow_threads(10, [100, 101]) == 0
+        assert await repo.get_unread_count(10) == 2
+    await assert_consistent(session_factory)
+
+    async with session_factory() as session:
+        repo = ThreadFollowRepository(session)
+        assert await repo.batch_unfollow_threads(10, [101, 103]) == 1
+        assert await repo.get_unread_count(10) == 1
+        assert not await repo.update_last_viewed(10, 103)
+        assert await repo.update_last_viewed(10)
+        assert await repo.get_unread_count(10) == 0
+        assert await repo.is_following(10, 100)
+        assert not await repo.is_following(10, 101)
+    await assert_consistent(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_unique_index_rejects_duplicate_follow(session_factory):
+    async with session_factory() as session:
+        session.add(ThreadFollow(user_id=10, thread_id=100))
+        await session.commit()
+    async with session_factory() as session:
+        session.add(ThreadFollow(user_id=10, thread_id=100))
+        with pytest.raises(IntegrityError):
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_init_db_adds_unique_index_to_legacy_database(session_factory):
+    """旧版本 create_all 建出的库没有唯一索引：批量关注报错而不是插入重复记录，init_db 合并重复记录后建索引"""
+    await publish_update(session_factory, 100)
+    viewed_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+    async with session_factory() as session:
+        await session.execute(text("DROP INDEX ix_thread_follow_user_thread"))
+        session.add_all(
+            [
+                ThreadFollow(user_id=10, thread_id=100),
+                ThreadFollow(user_id=10, thread_id=100, last_viewed_at=viewed_at),
+                ThreadFollow(user_id=11, thread_id=100),
+                ThreadFollow(user_id=11, thread_id=100),
+            ]
+        )
+        await session.commit()
+        assert await ThreadFollowRepository(session).batch_follow_threads(12, [100]) == 0
+
+    async with session_factory() as session:
+        async with session.bind.connect() as conn:  # type: ignore[union-attr]
+            assert await ensure_thread_follow_unique_index(conn)
+            await conn.commit()
+            assert not await ensure_thread_follow_unique_index(conn)
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(ThreadFollow.user_id, ThreadFollow.last_viewed_at).order_by(
+                ThreadFollow.user_id  # type: ignore[arg-type]
+            )
+        )
+        rows = result.all()
+        assert [user_id for user_id, _ in rows] == [10, 11]
+        # 合并时保留最晚的查看时间
+        assert rows[0][1] is not None
+        repo = ThreadFollowRepository(session)
+        assert not await repo.add_follow(11, 100)
+        assert await repo.add_follow(12, 100)
+    await assert_consistent(session_factory)
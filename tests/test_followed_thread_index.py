@@ -0,0 +1,118 @@
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import discord
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import ThreadFollow
+from core.follow_repository import ThreadFollowRepository
+from core.followed_thread_index import FollowedThreadIndex
+from core.sync_service import SyncService
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        session.add_all(
+            [
+                ThreadFollow(user_id=10, thread_id=1),
+                ThreadFollow(user_id=11, thread_id=1),
+                ThreadFollow(user_id=10, thread_id=2),
+            ]
+        )
+        await session.commit()
+    return factory
+
+
+async def follows_of(factory, thread_id: int) -> list[int]:
+    async with factory() as session:
+        result = await session.execute(
+            select(ThreadFollow.user_id).where(ThreadFollow.thread_id == thread_id)
+        )
+        return sorted(result.scalars().all())
+
+
+def make_thread(thread_id: int, member_ids: list[int]):
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = thread_id
+    thread.fetch_members = AsyncMock(
+        return_value=[SimpleNamespace(id=member_id) for member_id in member_ids]
+    )
+    return thread
+
+
+@pytest.mark.asyncio
+async def test_rebuild_answers_from_memory(session_factory):
+    index = FollowedThreadIndex(session_factory)
+    await index.rebuild()
+
+    assert await index.has_followers(1)
+    assert await index.has_followers(2)
+    assert not await index.has_followers(3)
+    assert index.get_stats()["db_checks"] == 0
+
+    index.mark(3)
+    assert await index.has_followers(3)
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_db_before_rebuild(session_factory):
+    index = FollowedThreadIndex(session_factory)
+
+    assert await index.has_followers(1)
+    assert not await index.has_followers(3)
+    # 查到有关注的帖子记入集合，之后不再查询数据库
+    assert await index.has_followers(1)
+    assert index.db_checks == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_add_follows_skips_existing_and_duplicates(session_factory):
+    async with session_factory() as session:
+        added = await ThreadFollowRepository(session).batch_add_follows(
+            thread_id=1, user_ids=[10, 12, 12, 13]
+        )
+
+    assert added == 2
+    assert await follows_of(session_factory, 1) == [10, 11, 12, 13]
+
+
+@pytest.mark.asyncio
+async def test_batch_add_follows_large_member_list(session_factory):
+    member_ids = list(range(100, 1300))
+    async with session_factory() as session:
+        added = await ThreadFollowRepository(session).batch_add_follows(
+            thread_id=5, user_ids=member_ids
+        )
+
+    assert added == len(member_ids)
+    assert await follows_of(session_factory, 5) == member_ids
+
+
+@pytest.mark.asyncio
+async def test_first_detect_runs_once_per_thread(session_factory):
+    sync_service = SyncService(bot=MagicMock(), session_factory=session_factory)
+    await sync_service.followed_index.rebuild()
+
+    thread = make_thread(3, [20, 21])
+    for _ in range(3):
+        if not await sync_service.followed_index.has_followers(thread.id):
+            await sync_service.auto_follow_on_first_detect(thread)
+
+    thread.fetch_members.assert_awaited_once()
+    assert await follows_of(session_factory, 3) == [20, 21]
+
+    # 没有成员的帖子也只获取一次成员列表
+    empty = make_thread(4, [])
+    for _ in range(2):
+        if not await sync_service.followed_index.has_followers(empty.id):
+            await sync_service.auto_follow_on_first_detect(empty)
+    empty.fetch_members.assert_awaited_once()
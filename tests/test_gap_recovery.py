@@ -0,0 +1,133 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from auditor.gap_recovery_service import GapRecoveryService
+from core.sync_service import SyncService
+from models import Thread
+from shared.api_scheduler import APIScheduler
+
+INDEXED_CHANNEL = 10
+
+
+class FakeSyncService:
+    """scheduler 不为空时，像真实的 sync_thread 一样在同步中向调度器提交 REST 请求"""
+
+    compute_fingerprint = staticmethod(SyncService.compute_fingerprint)
+
+    def __init__(self, scheduler: Optional[APIScheduler] = None):
+        self.scheduler = scheduler
+        self.synced: list[int] = []
+        self.priorities: list[int] = []
+
+    async def sync_thread(self, thread, priority=10):
+        self.priorities.append(priority)
+        if self.scheduler is not None:
+            await self.scheduler.submit(
+                coro_factory=lambda: asyncio.sleep(0.01), priority=priority
+            )
+        self.synced.append(thread.id)
+
+
+def make_thread(thread_id: int, message_count: int = 1, channel_id: int = INDEXED_CHANNEL):
+    return SimpleNamespace(
+        id=thread_id,
+        name=f"帖子 {thread_id}",
+        applied_tags=[],
+        message_count=message_count,
+        last_message_id=thread_id * 1000 + message_count,
+        parent_id=channel_id,
+    )
+
+
+async def store(factory: async_sessionmaker, threads):
+    """模拟断线前的完整同步：写入帖子及其当时的指纹"""
+    async with factory() as session:
+        for thread in threads:
+            session.add(
+                Thread(
+                    channel_id=thread.parent_id,
+                    thread_id=thread.id,
+                    title=thread.name,
+                    author_id=1,
+                    sync_fingerprint=SyncService.compute_fingerprint(thread),
+                )
+            )
+        await session.commit()
+
+
+def make_service(factory, threads, scheduler=None, **kwargs):
+    sync_service = FakeSyncService(scheduler)
+    bot = SimpleNamespace(
+        guilds=[SimpleNamespace(threads=threads)],
+        cache_service=SimpleNamespace(
+            is_channel_indexed=lambda channel_id: channel_id == INDEXED_CHANNEL
+        ),
+        api_scheduler=scheduler,
+    )
+    return GapRecoveryService(bot, factory, sync_service, **kwargs), sync_service
+
+
+@pytest.mark.asyncio
+async def test_only_threads_changed_during_gap_are_synced(session_factory):
+    """断线期间有新回复、改名或新建的帖子被同步，未变化和未索引频道的帖子不同步"""
+    before = [make_thread(i) for i in range(1, 6)]
+    await store(session_factory, before)
+
+    replied = make_thread(2, message_count=3)
+    renamed = make_thread(4)
+    renamed.name = "新标题"
+    created = make_thread(9)
+    other_channel = make_thread(20, channel_id=99)
+    now = [before[0], replied, before[2], renamed, before[4], created, other_channel]
+
+    service, sync_service = make_service(session_factory, now, priority=9)
+    stats = await service.run("on_ready")
+
+    assert sorted(sync_service.synced) == [2, 4, 9]
+    # 最近活跃的帖子优先
+    assert sync_service.synced[0] == 9
+    assert set(sync_service.priorities) == {9}
+    assert stats["listed"] == 6
+    assert (stats["changed"], stats["synced"], stats["deferred"]) == (3, 3, 0)
+
+
+@pytest.mark.asyncio
+async def test_budget_defers_remaining_threads_to_auditor(session_factory):
+    threads = [make_thread(i) for i in range(1, 21)]
+    service, sync_service = make_service(
+        session_factory, threads, max_threads=5, concurrency=2
+    )
+    stats = await service.run("on_resumed")
+
+    assert len(sync_service.synced) == 5
+    assert (stats["changed"], stats["synced"], stats["deferred"]) == (20, 5, 15)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_syncs_do_not_starve_scheduler_at_min_concurrency(session_factory):
+    """并发上限降到下限时，concurrency 个同时进行的同步不会占满名额后等待自己的 REST 请求"""
+    scheduler = APIScheduler(
+        concurrent_requests=4, min_concurrent_requests=4, global_rate_limit=None
+    )
+    scheduler.start()
+    try:
+        threads = [make_thread(i) for i in range(1, 13)]
+        service, sync_service = make_service(
+            session_factory, threads, scheduler=scheduler, concurrency=4
+        )
+        stats = await asyncio.wait_for(service.run("on_ready"), timeout=5)
+    finally:
+        # 卡死时调度器主循环也停不下来，同样限时
+        await asyncio.wait_for(scheduler.stop(), timeout=5)
+
+    assert sorted(sync_service.synced) == list(range(1, 13))
+    assert stats["failed"] == 0
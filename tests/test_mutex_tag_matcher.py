@@ -0,0 +1,104 @@
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from core.config_repository import ConfigRepository
+from core.mutex_tag_matcher import MutexTagMatcher
+from ThreadManager.thread_logic import ThreadLogic
+
+
+# 可哈希的 discord.ForumTag 替身
+ForumTag = namedtuple("ForumTag", ["id", "name"])
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        repo = ConfigRepository(session)
+        await repo.add_mutex_group(["原创", "同人", "翻译"])
+        await repo.add_mutex_group(["完结", "连载"], override_tag_name="存疑")
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_match_by_priority_and_override(session_factory):
+    matcher = MutexTagMatcher(session_factory)
+    await matcher.refresh()
+
+    assert matcher.match(["原创", "短篇"]) == []
+
+    (conflict,) = matcher.match(["翻译", "同人", "短篇"])
+    assert conflict.conflicting_names == {"翻译", "同人"}
+    assert conflict.keep_name == "同人"
+    assert conflict.override_tag_name is None
+
+    conflicts = matcher.match(["原创", "翻译", "完结", "连载"])
+    assert [c.keep_name for c in conflicts] == ["原创", "完结"]
+    assert conflicts[1].override_tag_name == "存疑"
+
+
+@pytest.mark.asyncio
+async def test_refresh_after_save_and_delete(session_factory):
+    matcher = MutexTagMatcher(session_factory)
+    await matcher.refresh()
+    assert matcher.match(["短篇", "长篇"]) == []
+
+    async with session_factory() as session:
+        group = await ConfigRepository(session).add_mutex_group(["长篇", "短篇"])
+    # 保存后刷新前仍使用旧规则
+    assert matcher.match(["短篇", "长篇"]) == []
+    await matcher.refresh()
+    assert matcher.match(["短篇", "长篇"])[0].keep_name == "长篇"
+
+    async with session_factory() as session:
+        await ConfigRepository(session).delete_mutex_group(group.id)
+    await matcher.refresh()
+    assert matcher.match(["短篇", "长篇"]) == []
+    assert matcher.get_stats()["groups"] == 2
+
+
+@pytest.mark.asyncio
+async def test_apply_rules_without_db_access(session_factory):
+    matcher = MutexTagMatcher(session_factory)
+    await matcher.refresh()
+
+    def failing_factory():
+        raise AssertionError("评估互斥规则时不应访问数据库")
+
+    bot = MagicMock()
+    bot.mutex_tag_matcher = matcher
+    bot.cache_service.get_bot_config = AsyncMock(
+        return_value=SimpleNamespace(value_int=0)
+    )
+    bot.api_scheduler.submit = AsyncMock()
+    logic = ThreadLogic(bot, failing_factory, {}, sync_service=None)
+    logic._notify_user_of_mutex_removal = AsyncMock(return_value=False)
+
+    tags = {name: ForumTag(i, name) for i, name in enumerate(["原创", "同人", "短篇"])}
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = 1
+    thread.applied_tags = list(tags.values())
+    thread.parent = MagicMock(spec=discord.ForumChannel)
+    thread.parent.available_tags = list(tags.values())
+
+    assert await logic.apply_mutex_tag_rules(thread)
+    (conflict,) = logic._notify_user_of_mutex_removal.await_args.args[1]
+    assert conflict["removed"] == {"同人"}
+    bot.api_scheduler.submit.assert_awaited_once()
+
+    # 没有冲突时直接返回
+    bot.api_scheduler.submit.reset_mock()
+    thread.applied_tags = [tags["原创"], tags["短篇"]]
+    assert not await logic.apply_mutex_tag_rules(thread)
+    bot.api_scheduler.submit.assert_not_awaited()
@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Thread
+from core.thread_backfill_queue import ThreadBackfillQueue
+from ThreadManager.reaction_count_service import ReactionCountService, ReactionCountTracker
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.submitted = 0
+
+    async def submit(self, *, coro_factory, priority, **kwargs):
+        self.submitted += 1
+        return await coro_factory()
+
+
+class FakeSyncService:
+    def __init__(self):
+        self.synced: list[int] = []
+
+    async def sync_thread(self, thread_id, priority=10, *, raise_errors=False):
+        self.synced.append(thread_id)
+        return True
+
+
+class FakeThread:
+    """首楼消息的反应由 reactions {表情: 数量} 给出，记录 REST 获取次数"""
+
+    def __init__(self, thread_id: int, reactions: dict[str, int]):
+        self.id = thread_id
+        self.reactions = reactions
+        self.fetches = 0
+
+    def get_partial_message(self, message_id: int):
+        async def fetch():
+            self.fetches += 1
+            return SimpleNamespace(
+                reactions=[
+                    SimpleNamespace(emoji=emoji, count=count)
+                    for emoji, count in self.reactions.items()
+                ]
+            )
+
+        return SimpleNamespace(fetch=fetch)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        session.add(Thread(channel_id=10, thread_id=1, title="t", author_id=5))
+        await session.commit()
+    return factory
+
+
+async def stored_reaction_count(factory: async_sessionmaker, thread_id: int) -> int:
+    async with factory() as session:
+        return (
+            await session.execute(
+                select(Thread.reaction_count).where(Thread.thread_id == thread_id)
+            )
+        ).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_gateway_events_update_counts_without_refetching(session_factory):
+    """首个事件校准一次，之后数百个反应事件只在内存累加，按表情取最大值批量写入"""
+    scheduler, sync_service = FakeScheduler(), FakeSyncService()
+    backfill_queue = ThreadBackfillQueue(session_factory, sync_service)
+    service = ReactionCountService(
+        session_factory, backfill_queue=backfill_queue, api_scheduler=scheduler
+    )
+    thread = FakeThread(1, {"👍": 3, "❤️": 1})
+
+    # 首个事件触发校准：REST 结果已包含这次反应
+    await service.record_reaction(thread, "👍", 1)
+    for _ in range(300):
+        await service.record_reaction(thread, "❤️", 1)
+    for _ in range(10):
+        await service.record_reaction(thread, "❤️", -1)
+    await service.flush_to_db()
+
+    assert thread.fetches == 1
+    assert scheduler.submitted == 1
+    assert service.events_applied == 310
+    assert await stored_reaction_count(session_factory, 1) == 291
+
+    # 移除到低于另一个表情后，最大值回到 👍
+    for _ in range(291):
+        await service.record_reaction(thread, "❤️", -1)
+    await service.flush_to_db()
+    assert await stored_reaction_count(session_factory, 1) == 3
+    assert sync_service.synced == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_thread_is_synced_after_flush(session_factory):
+    sync_service, scheduler = FakeSyncService(), FakeScheduler()
+    backfill_queue = ThreadBackfillQueue(session_factory, sync_service)
+    service = ReactionCountService(
+        session_factory, backfill_queue=backfill_queue, api_scheduler=scheduler
+    )
+    await service.record_reaction(FakeThread(2, {"👍": 4}), "👍", 1)
+    await service.flush_to_db()
+    assert backfill_queue.queue_length == 1
+    await backfill_queue.drain_once()
+    assert sync_service.synced == [2]
+
+
+def test_tracker_reconciles_periodically():
+    clock = FakeClock()
+    tracker = ReactionCountTracker(reconcile_interval=60, clock=clock)
+    assert tracker.needs_reconcile(1)
+    assert not tracker.apply(1, "👍", 1)
+
+    tracker.begin_reconcile(1)
+    assert not tracker.needs_reconcile(1)
+    # 校准期间的事件会包含在 REST 结果里，不重复计数
+    assert tracker.apply(1, "👍", 1)
+    tracker.seed(1, [("👍", 2)])
+    assert tracker.reaction_count(1) == 2
+
+    clock.now = 59
+    assert not tracker.needs_reconcile(1)
+    clock.now = 60
+    assert tracker.needs_reconcile(1)
+    assert tracker.pop_dirty() == {1: 2}
+    # 过期的状态在写入后被清理
+    assert tracker.tracked_count == 0
@@ -0,0 +1,143 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Tag, Thread, ThreadTagLink
+from search import search_service
+from search.search_service import SearchService
+from search.qo.thread_search import ThreadSearchQuery
+from core.tag_cache_service import TagCacheService
+
+
+# (帖子ID, 频道ID, 标签ID列表, 反应数, 创建时间, not_found_count, show_flag)
+THREADS = [
+    (1, 1, [11, 12], 0, datetime(2024, 1, 5), 0, True),
+    (2, 1, [11], 3, datetime(2024, 1, 20), 0, True),
+    (3, 1, [12], 12, datetime(2024, 2, 1), 0, True),
+    (4, 2, [21], 600, datetime(2024, 2, 9), 0, True),
+    (5, 2, [21, 22], 1, datetime(2024, 3, 3), 0, True),
+    # 软删除与隐藏的帖子不计入
+    (6, 1, [11], 0, datetime(2024, 3, 4), 1, True),
+    (7, 2, [22], 0, datetime(2024, 3, 5), 0, False),
+]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        # 两个频道中各有一个名为 "同人" 的标签 (ID 不同)
+        session.add_all(
+            [
+                Tag(id=11, name="同人"),
+                Tag(id=12, name="原创"),
+                Tag(id=21, name="同人"),
+                Tag(id=22, name="完结"),
+            ]
+        )
+        for pk, channel_id, tag_ids, reactions, created_at, not_found, show in THREADS:
+            session.add(
+                Thread(
+                    id=pk,
+                    channel_id=channel_id,
+                    thread_id=1000 + pk,
+                    title=f"帖子{pk}",
+                    author_id=1,
+                    created_at=created_at.replace(tzinfo=timezone.utc),
+                    reaction_count=reactions,
+                    not_found_count=not_found,
+                    show_flag=show,
+                )
+            )
+            session.add_all(
+                ThreadTagLink(thread_id=pk, tag_id=tag_id) for tag_id in tag_ids
+            )
+        await session.commit()
+    return factory
+
+
+async def search(factory, query: ThreadSearchQuery, **kwargs):
+    tag_service = TagCacheService(session_factory=factory)
+    await tag_service.build_cache()
+    async with factory() as session:
+        return await SearchService(session, tag_service).search_threads_with_facets(
+            query,
+            limit=1,
+            total_display_count=1,
+            exploration_factor=1.414,
+            strength_weight=10.0,
+            **kwargs,
+        )
+
+
+@pytest.mark.asyncio
+async def test_tag_counts_cover_whole_result_set(session_factory):
+    threads, total, facets = await search(
+        session_factory, ThreadSearchQuery(), facets=True
+    )
+
+    assert len(threads) == 1 and total == 5
+    assert facets is not None
+    # 同名标签按名称合并，按数量降序排列
+    assert list(facets.tag_counts.items()) == [("同人", 4), ("原创", 2), ("完结", 1)]
+    assert facets.reaction_histogram == {} and facets.created_histogram == {}
+
+
+@pytest.mark.asyncio
+async def test_histograms_follow_filters(session_factory):
+    _, total, facets = await search(
+        session_factory,
+        ThreadSearchQuery(include_tags=["同人"]),
+        facets=True,
+        histograms=True,
+    )
+
+    assert total == 4
+    assert facets is not None
+    assert facets.tag_counts == {"同人": 4, "原创": 1, "完结": 1}
+    assert list(facets.reaction_histogram.items()) == [("0", 1), ("1-4", 2), ("500+", 1)]
+    assert list(facets.created_histogram.items()) == [
+        ("2024-01", 2),
+        ("2024-02", 1),
+        ("2024-03", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_histograms_are_skipped_for_large_result_sets(session_factory, monkeypatch):
+    """结果集超过上限时只返回标签计数，并标记跳过了直方图"""
+    monkeypatch.setattr(search_service, "FACET_HISTOGRAM_MAX_RESULTS", 3)
+
+    _, total, facets = await search(
+        session_factory, ThreadSearchQuery(), facets=True, histograms=True
+    )
+    assert total == 5
+    assert facets is not None and facets.histograms_skipped
+    assert facets.tag_counts == {"同人": 4, "原创": 2, "完结": 1}
+    assert facets.reaction_histogram == {} and facets.created_histogram == {}
+
+    _, total, facets = await search(
+        session_factory, ThreadSearchQuery(channel_ids=[2]), facets=True, histograms=True
+    )
+    assert total == 2
+    assert facets is not None and not facets.histograms_skipped
+    assert list(facets.reaction_histogram.items()) == [("1-4", 1), ("500+", 1)]
+
+
+@pytest.mark.asyncio
+async def test_facets_are_optional_and_empty_without_results(session_factory):
+    _, _, facets = await search(session_factory, ThreadSearchQuery())
+    assert facets is None
+
+    _, total, facets = await search(
+        session_factory, ThreadSearchQuery(channel_ids=[99]), facets=True
+    )
+    assert total == 0
+    assert facets is not None and facets.tag_counts == {}
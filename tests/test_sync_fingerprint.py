@@ -0,0 +1,121 @@
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import discord
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Thread
+from core.sync_service import SyncService
+
+
+def make_thread(thread_id: int, name: str = "帖子", message_count: int = 3):
+    """构造一个可以通过 isinstance(..., discord.Thread) 检查的帖子对象"""
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = thread_id
+    thread.name = name
+    thread.applied_tags = [SimpleNamespace(id=2), SimpleNamespace(id=1)]
+    thread.message_count = message_count
+    thread.last_message_id = 9000 + message_count
+    # 完整解析会读取历史消息，跳过时不应被调用
+    thread.history.side_effect = AssertionError("不应读取历史消息")
+    return thread
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    stored = make_thread(1)
+    async with factory() as session:
+        session.add_all(
+            [
+                Thread(
+                    channel_id=1,
+                    thread_id=1,
+                    title="帖子",
+                    author_id=1,
+                    not_found_count=2,
+                    sync_fingerprint=SyncService.compute_fingerprint(stored),
+                ),
+                # 旧数据没有指纹，总是需要完整解析
+                Thread(channel_id=1, thread_id=2, title="帖子", author_id=1),
+            ]
+        )
+        await session.commit()
+    return factory
+
+
+def test_fingerprint_ignores_tag_order_and_tracks_metadata():
+    base = SyncService.compute_fingerprint(make_thread(1))
+    reordered = make_thread(1)
+    reordered.applied_tags = list(reversed(reordered.applied_tags))
+
+    assert SyncService.compute_fingerprint(reordered) == base
+    assert SyncService.compute_fingerprint(make_thread(1, name="新标题")) != base
+    assert SyncService.compute_fingerprint(make_thread(1, message_count=4)) != base
+
+
+@pytest.mark.asyncio
+async def test_unchanged_thread_skips_history(session_factory: async_sessionmaker):
+    """未变化的帖子不读取历史消息，只把 not_found_count 归零"""
+    service = SyncService(bot=SimpleNamespace(), session_factory=session_factory)  # type: ignore[arg-type]
+
+    await service.sync_thread(make_thread(1), skip_unchanged=True)
+
+    assert service.skipped_count == 1
+    assert service.parsed_count == 0
+    async with session_factory() as session:
+        db_thread = (
+            await session.execute(select(Thread).where(Thread.thread_id == 1))
+        ).scalar_one()
+    assert db_thread.not_found_count == 0
+
+
+@pytest.mark.asyncio
+async def test_changed_or_unknown_thread_is_parsed(session_factory: async_sessionmaker):
+    """指纹不同、没有指纹或未入库的帖子都需要完整解析"""
+    service = SyncService(bot=SimpleNamespace(), session_factory=session_factory)  # type: ignore[arg-type]
+
+    assert not await service.skip_if_unchanged(make_thread(1, message_count=5))
+    assert not await service.skip_if_unchanged(make_thread(2))
+    assert not await service.skip_if_unchanged(make_thread(3))
+    assert service.skipped_count == 0
+
+
+class InlineScheduler:
+    """直接执行提交的请求"""
+
+    async def submit(self, coro_factory, **kwargs):
+        return await coro_factory()
+
+
+@pytest.mark.asyncio
+async def test_sync_by_id_reports_failures(session_factory: async_sessionmaker):
+    """通过ID同步时：找不到帖子返回 False；其他获取错误按 raise_errors 抛出或返回 False"""
+    bot = SimpleNamespace(api_scheduler=InlineScheduler())
+    service = SyncService(bot=bot, session_factory=session_factory)  # type: ignore[arg-type]
+
+    async def not_found(thread_id):
+        raise discord.NotFound(MagicMock(status=404, reason="Not Found"), "Unknown Channel")
+
+    bot.fetch_channel = not_found
+    assert await service.sync_thread(2, raise_errors=True) is False
+    async with session_factory() as session:
+        db_thread = (
+            await session.execute(select(Thread).where(Thread.thread_id == 2))
+        ).scalar_one()
+    assert db_thread.not_found_count == 1
+
+    async def broken(thread_id):
+        raise RuntimeError("connection reset")
+
+    bot.fetch_channel = broken
+    assert await service.sync_thread(2) is False
+    with pytest.raises(RuntimeError):
+        await service.sync_thread(2, raise_errors=True)
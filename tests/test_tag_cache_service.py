@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Tag
+from core.tag_cache_service import TagCacheService
+from core.thread_repository import ThreadRepository
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory()
+    async with factory() as session:
+        session.add_all(
+            [
+                Tag(id=1, name="原创"),
+                Tag(id=2, name="翻译"),
+                Tag(id=3, name="同人"),
+                # 另一个频道中的同名标签
+                Tag(id=4, name="原创"),
+            ]
+        )
+        await session.commit()
+        # 标签 2 被帖子使用
+        tags = (await session.execute(select(Tag).where(Tag.id == 2))).scalars().all()  # type: ignore
+        await ThreadRepository(session).add_or_update_thread_with_tags(
+            thread_data={
+                "thread_id": 100,
+                "guild_id": 1,
+                "channel_id": 10,
+                "title": "帖子",
+                "author_id": 1,
+            },
+            tags=list(tags),
+        )
+    return factory
+
+
+def forum_tags(tags: dict[int, str]) -> list[SimpleNamespace]:
+    return [SimpleNamespace(id=tag_id, name=name) for tag_id, name in tags.items()]
+
+
+def snapshot(service: TagCacheService) -> dict:
+    return {
+        "id_to_name": dict(service._id_to_name),
+        "name_to_ids": {
+            name: sorted(ids) for name, ids in service.get_all_tag_details().items()
+        },
+        "unique": list(service.get_unique_tag_names()),
+        "merged": list(service.get_global_merged_tags()),
+    }
+
+
+async def rebuilt_snapshot(factory) -> dict:
+    fresh = TagCacheService(factory)
+    await fresh.build_cache()
+    return snapshot(fresh)
+
+
+@pytest.mark.asyncio
+async def test_diff_matches_full_rebuild(session_factory):
+    service = TagCacheService(session_factory)
+    await service.build_cache()
+    assert service.get_global_merged_tags() == ["翻译"]
+
+    before = {1: "原创", 2: "翻译", 3: "同人"}
+    steps = [
+        # 新增
+        {1: "原创", 2: "翻译", 3: "同人", 5: "短篇"},
+        # 改名：被帖子使用的标签改名后，全局合并标签同步更新
+        {1: "原创", 2: "译作", 3: "同人", 5: "短篇"},
+        # 改成与其他频道标签同名
+        {1: "原创", 2: "译作", 3: "同人", 5: "原创"},
+        # 删除：未被使用的标签删除，仍被帖子使用的标签保留
+        {1: "原创"},
+    ]
+    for after in steps:
+        await service.apply_channel_tag_diff(forum_tags(before), forum_tags(after))
+        assert snapshot(service) == await rebuilt_snapshot(session_factory)
+        before = after
+
+    assert sorted(service.get_ids_by_tag_name("原创")) == [1, 4]
+    assert service.get_tag_name_by_id(2) == "译作"
+    assert service.get_tag_name_by_id(3) is None
+    assert service.get_global_merged_tags() == ["译作"]
+    assert service.last_diff_stats["removed"] == [3, 5]
+    assert service.last_diff_stats["blocking_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_build_cache_records_blocking_time(session_factory):
+    service = TagCacheService(session_factory)
+    await service.build_cache()
+
+    stats = service.last_rebuild_stats
+    assert stats["tags"] == 4
+    assert 0 <= stats["blocking_seconds"] <= stats["total_seconds"]
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from auditor.auditor_service import AuditorService
+from models import ChannelTagStat, Tag
+from core.tag_stat_repository import TagStatRepository
+from core.thread_repository import ThreadRepository
+from shared.database import TAG_STAT_TRIGGERS
+
+
+CHANNELS = (10, 20, 30)
+TAG_IDS = (1, 2, 3, 4, 5)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory(TAG_STAT_TRIGGERS)
+    async with factory() as session:
+        session.add_all([Tag(id=tag_id, name=f"标签{tag_id}") for tag_id in TAG_IDS])
+        await session.commit()
+    return factory
+
+
+def thread_data(thread_id: int, channel_id: int) -> dict:
+    return {
+        "thread_id": thread_id,
+        "guild_id": 1,
+        "channel_id": channel_id,
+        "title": f"帖子 {thread_id}",
+        "author_id": 1,
+    }
+
+
+async def assert_no_drift(factory: async_sessionmaker):
+    async with factory() as session:
+        drift = await TagStatRepository(session).find_drift()
+    assert drift == {"channel_tag": [], "channel_thread": []}
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_every_write_path(session_factory):
+    """随机执行各种写入路径 (新建/更新标签/换频道/软删除/恢复/物理删除)，统计表始终与实际聚合一致"""
+    rng = random.Random(42)
+    known: dict[int, int] = {}  # {帖子ID: 频道}
+
+    for step in range(300):
+        action = rng.choice(
+            ["orm_upsert", "bulk_upsert", "not_found", "restore", "delete", "purge"]
+        )
+        async with session_factory() as session:
+            repo = ThreadRepository(session)
+            if action == "orm_upsert":
+                thread_id = rng.randint(1, 40)
+                channel_id = known.get(thread_id) or rng.choice(CHANNELS)
+                if rng.random() < 0.2:
+                    channel_id = rng.choice(CHANNELS)
+                tag_ids = rng.sample(TAG_IDS, rng.randint(0, 3))
+                tags = [await session.get(Tag, tag_id) for tag_id in tag_ids]
+                await repo.add_or_update_thread_with_tags(
+                    thread_data(thread_id, channel_id), tags  # type: ignore[arg-type]
+                )
+                known[thread_id] = channel_id
+            elif action == "bulk_upsert":
+                batch = {
+                    thread_id: known.get(thread_id) or rng.choice(CHANNELS)
+                    for thread_id in rng.sample(range(1, 41), 5)
+                }
+                await repo.bulk_upsert_threads_with_tags(
+                    [thread_data(tid, channel) for tid, channel in batch.items()],
+                    {tid: set(rng.sample(TAG_IDS, rng.randint(0, 3))) for tid in batch},
+                )
+                await session.commit()
+                known.update(batch)
+            elif known and action == "not_found":
+                await repo.increment_not_found_count(rng.choice(list(known)))
+            elif known and action == "restore":
+                await repo.reset_not_found_count(rng.choice(list(known)))
+            elif known and action == "delete":
+                thread_id = rng.choice(list(known))
+                await repo.delete_thread_index(thread_id)
+                del known[thread_id]
+            elif action == "purge":
+                await AuditorService(session).delete_stale_threads(threshold=2)
+
+        if step % 50 == 0:
+            await assert_no_drift(session_factory)
+
+    await assert_no_drift(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_reads_match_direct_aggregation(session_factory):
+    async with session_factory() as session:
+        repo = ThreadRepository(session)
+        await repo.bulk_upsert_threads_with_tags(
+            [thread_data(1, 10), thread_data(2, 10), thread_data(3, 20)],
+            {1: {1, 2}, 2: {1}, 3: {1}},
+        )
+        await session.commit()
+        await repo.increment_not_found_count(2)
+
+        stats = TagStatRepository(session)
+        assert sorted(await stats.get_tag_rows(guild_id=1, channel_ids=None)) == [
+            ("标签1", 1, 10, 1),
+            ("标签1", 1, 20, 1),
+            ("标签2", 2, 10, 1),
+        ]
+        assert await stats.get_tag_rows(guild_id=2, channel_ids=None) == []
+        counts = await repo.get_thread_count_by_channels([10, 20, 30])
+        assert {c.channel_id: c.thread_count for c in counts} == {10: 1, 20: 1}
+        assert await repo.get_total_thread_count_for_scope(1, [10]) == 1
+        assert await repo.get_total_thread_count_for_scope(None, None) == 2
+
+
+@pytest.mark.asyncio
+async def test_rebuild_repairs_drift(session_factory):
+    async with session_factory() as session:
+        await ThreadRepository(session).bulk_upsert_threads_with_tags(
+            [thread_data(1, 10), thread_data(2, 20)], {1: {1}, 2: {1, 2}}
+        )
+        await session.commit()
+        # 模拟绕过触发器造成的偏差
+        await session.execute(update(ChannelTagStat).values(thread_count=7))
+        await session.commit()
+
+        repo = TagStatRepository(session)
+        drift = await repo.find_drift()
+        assert len(drift["channel_tag"]) == 3
+        assert drift["channel_thread"] == []
+
+        await repo.rebuild()
+        await session.commit()
+    await assert_no_drift(session_factory)
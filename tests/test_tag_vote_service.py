@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Tag, TagVote, ThreadTagLink
+from core.tag_vote_service import TagVoteService
+from core.thread_repository import ThreadRepository
+from shared.database import TAG_VOTE_TRIGGERS
+
+
+THREAD_ID = 1000
+TAG_MAP = {1: "原创", 2: "翻译"}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_factory(make_session_factory) -> async_sessionmaker:
+    factory = await make_session_factory(TAG_VOTE_TRIGGERS)
+    async with factory() as session:
+        tags = [Tag(id=tag_id, name=name) for tag_id, name in TAG_MAP.items()]
+        tags.append(Tag(id=3, name="未应用"))
+        session.add_all(tags)
+        await session.commit()
+        await ThreadRepository(session).add_or_update_thread_with_tags(
+            thread_data={
+                "thread_id": THREAD_ID,
+                "guild_id": 1,
+                "channel_id": 10,
+                "title": "帖子",
+                "author_id": 1,
+            },
+            tags=tags[:2],
+        )
+    return factory
+
+
+async def link_counts(factory) -> dict[int, tuple[int, int]]:
+    async with factory() as session:
+        result = await session.execute(
+            select(ThreadTagLink.tag_id, ThreadTagLink.upvotes, ThreadTagLink.downvotes)
+        )
+        return {row[0]: (row[1], row[2]) for row in result.all()}
+
+
+async def db_stats(factory) -> dict:
+    async with factory() as session:
+        return await ThreadRepository(session).get_tag_vote_stats(THREAD_ID, TAG_MAP)
+
+
+@pytest.mark.asyncio
+async def test_vote_toggle_and_switch(session_factory):
+    service = TagVoteService(session_factory)
+
+    stats = await service.record_vote(10, THREAD_ID, 1, 1, TAG_MAP)
+    assert stats["原创"] == {"upvotes": 1, "downvotes": 0, "score": 1}
+
+    await service.record_vote(11, THREAD_ID, 1, -1, TAG_MAP)
+    # 改票
+    stats = await service.record_vote(10, THREAD_ID, 1, -1, TAG_MAP)
+    assert stats["原创"] == {"upvotes": 0, "downvotes": 2, "score": -2}
+    # 再次投出相同的票即取消
+    stats = await service.record_vote(11, THREAD_ID, 1, -1, TAG_MAP)
+    assert stats["原创"] == {"upvotes": 0, "downvotes": 1, "score": -1}
+    assert stats["翻译"] == {"upvotes": 0, "downvotes": 0, "score": 0}
+
+    assert await link_counts(session_factory) == {1: (0, 1), 2: (0, 0)}
+    assert await db_stats(session_factory) == stats
+
+
+@pytest.mark.asyncio
+async def test_stats_served_from_cache(session_factory):
+    service = TagVoteService(session_factory)
+    await service.record_vote(10, THREAD_ID, 2, 1, TAG_MAP)
+
+    misses = service.cache_misses
+    for _ in range(3):
+        stats = await service.get_stats(THREAD_ID, TAG_MAP)
+    assert service.cache_misses == misses
+    assert stats["翻译"]["upvotes"] == 1
+
+    # 新的服务实例从数据库载入一次
+    fresh = TagVoteService(session_factory)
+    assert await fresh.get_stats(THREAD_ID, TAG_MAP) == stats
+    assert fresh.cache_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_vote_on_unapplied_tag_is_ignored(session_factory):
+    service = TagVoteService(session_factory)
+    await service.record_vote(10, THREAD_ID, 3, 1, TAG_MAP)
+    await service.record_vote(10, 9999, 1, 1, TAG_MAP)
+
+    async with session_factory() as session:
+        votes = (await session.execute(select(TagVote))).scalars().all()
+    assert votes == []
+
+
+def slow_commit_factory(factory, delays: list[float]):
+    """前 len(delays) 个会话提交前分别等待对应秒数，让先点击的请求较晚完成"""
+    delays = list(delays)
+
+    def make():
+        session = factory()
+        if delays:
+            delay = delays.pop(0)
+            commit = session.commit
+
+            async def delayed_commit():
+                await asyncio.sleep(delay)
+                await commit()
+
+            session.commit = delayed_commit  # type: ignore[method-assign]
+        return session
+
+    return make
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("clicks", [2, 3, 8])
+async def test_rapid_double_clicks_from_same_user(session_factory, clicks):
+    service = TagVoteService(session_factory)
+    # 先让另一个用户投票并载入缓存，连点结果需要与缓存中的旧值正确合并
+    await service.record_vote(11, THREAD_ID, 1, 1, TAG_MAP)
+    service.session_factory = slow_commit_factory(
+        session_factory, [0.01 * (clicks - i) for i in range(clicks)]
+    )
+
+    results = await asyncio.gather(
+        *(service.record_vote(10, THREAD_ID, 1, 1, TAG_MAP) for _ in range(clicks))
+    )
+
+    # 每次点击都在上一次的基础上切换，奇数次点击后为赞成，偶数次为取消
+    expected_up = 1 + clicks % 2
+    assert [r["原创"]["upvotes"] for r in results] == [
+        1 + (i + 1) % 2 for i in range(clicks)
+    ]
+    final = await service.get_stats(THREAD_ID, TAG_MAP)
+    assert final["原创"] == {"upvotes": expected_up, "downvotes": 0, "score": expected_up}
+    assert await db_stats(session_factory) == final
+    assert (await link_counts(session_factory))[1] == (expected_up, 0)
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(select(TagVote).where(TagVote.user_id == 10))
+        ).scalars().all()
+    assert len(rows) == 1
@@ -0,0 +1,103 @@
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import ThreadBackfill
+from core.thread_backfill_queue import ThreadBackfillQueue
+
+
+class FakeSyncService:
+    """fail 中的帖子每次同步都抛出异常，missing 中的帖子不存在 (与 SyncService 一样返回 False)"""
+
+    def __init__(self, fail: set[int] = frozenset(), missing: set[int] = frozenset()):
+        self.fail = fail
+        self.missing = missing
+        self.synced: list[int] = []
+
+    async def sync_thread(self, thread_id, priority=10, *, raise_errors=False):
+        assert raise_errors, "补录队列需要 sync_thread 抛出获取错误以便重试"
+        if thread_id in self.fail:
+            raise RuntimeError("sync failed")
+        if thread_id in self.missing:
+            return False
+        self.synced.append(thread_id)
+        return True
+
+
+async def persisted(factory: async_sessionmaker) -> dict[int, int]:
+    async with factory() as session:
+        result = await session.execute(
+            select(ThreadBackfill.thread_id, ThreadBackfill.attempts)
+        )
+        return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_enqueue_is_bounded_and_deduplicated(session_factory):
+    queue = ThreadBackfillQueue(session_factory, FakeSyncService(), max_size=3)
+
+    assert await queue.enqueue_many([1, 2, 2], source="reply_count") == 2
+    assert await queue.enqueue_many([2, 3, 4, 5], source="reaction_count") == 1
+
+    stats = queue.get_stats()
+    assert stats["queue_length"] == 3
+    assert stats["deduplicated"] == 2
+    assert stats["dropped"] == 2
+    assert set(await persisted(session_factory)) == {1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_queue_survives_restart(session_factory):
+    sync_service = FakeSyncService()
+    queue = ThreadBackfillQueue(session_factory, sync_service)
+    await queue.enqueue_many([1, 2, 3], source="reply_count")
+    assert await queue.drain_once()
+
+    restarted = ThreadBackfillQueue(session_factory, sync_service)
+    await restarted.load()
+    assert restarted.queue_length == 2
+    while await restarted.drain_once():
+        pass
+
+    assert sync_service.synced == [1, 2, 3]
+    assert await persisted(session_factory) == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_threads_are_retried_then_dropped(session_factory):
+    sync_service = FakeSyncService(fail={1})
+    queue = ThreadBackfillQueue(session_factory, sync_service, max_attempts=2)
+    await queue.enqueue_many([1, 2], source="reply_count")
+
+    # 失败的帖子排到队尾，不阻塞后面的帖子
+    await queue.drain_once()
+    assert await persisted(session_factory) == {1: 1, 2: 0}
+    await queue.drain_once()
+    assert sync_service.synced == [2]
+
+    await queue.drain_once()
+    assert not await queue.drain_once()
+    stats = queue.get_stats()
+    assert (stats["retried"], stats["failed"], stats["synced"]) == (1, 1, 1)
+    assert await persisted(session_factory) == {}
+
+
+@pytest.mark.asyncio
+async def test_missing_threads_count_as_failed_without_retry(session_factory):
+    sync_service = FakeSyncService(missing={1})
+    queue = ThreadBackfillQueue(session_factory, sync_service, max_attempts=3)
+    await queue.enqueue_many([1, 2], source="reply_count")
+
+    while await queue.drain_once():
+        pass
+
+    assert sync_service.synced == [2]
+    stats = queue.get_stats()
+    assert (stats["retried"], stats["failed"], stats["synced"]) == (0, 1, 1)
+    assert await persisted(session_factory) == {}
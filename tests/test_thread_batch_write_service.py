@@ -0,0 +1,163 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models import Author, Tag, Thread, ThreadFollow, ThreadTagLink
+from core.tag_repository import TagRepository
+from core.thread_repository import ThreadRepository
+from core.author_repository import AuthorRepository
+from core.thread_batch_write_service import ThreadBatchWriteService
+from core.thread_record_dto import ThreadRecord
+
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def make_record(
+    thread_id: int, tags: dict[int, str], title: str = "", reply_count: int = 0
+) -> ThreadRecord:
+    """构造一条与 SyncService 解析结果结构相同的记录"""
+    author_id = 100 + thread_id % 3
+    return {
+        "thread_data": {
+            "thread_id": thread_id,
+            "guild_id": 1,
+            "channel_id": 10,
+            "title": title or f"Thread {thread_id}",
+            "author_id": author_id,
+            "created_at": BASE_TIME + timedelta(minutes=thread_id),
+            "last_active_at": BASE_TIME + timedelta(hours=thread_id),
+            "reaction_count": thread_id % 7,
+            "reply_count": reply_count,
+            "not_found_count": 0,
+            "first_message_excerpt": f"excerpt {thread_id}",
+            "thumbnail_urls": [f"https://example.com/{thread_id}.png"],
+        },
+        "tags_data": tags,
+        "author_data": {
+            "id": author_id,
+            "name": f"user{author_id}",
+            "global_name": None,
+            "display_name": f"User {author_id}",
+            "avatar_url": f"https://example.com/a/{author_id}.png",
+        },
+    }
+
+
+async def write_one_by_one(factory: async_sessionmaker, records: list[ThreadRecord]):
+    """现有的逐帖写入路径，作为对照"""
+    for record in records:
+        async with factory() as session:
+            tags = await TagRepository(session).get_or_create_tags(record["tags_data"])
+            await ThreadRepository(session).add_or_update_thread_with_tags(
+                thread_data=record["thread_data"], tags=tags
+            )
+            if record["author_data"]:
+                await AuthorRepository(session).upsert_author(record["author_data"])
+
+
+async def snapshot(factory: async_sessionmaker) -> dict:
+    """导出与写入相关的全部表内容，主键替换为帖子 Discord ID 以便比较"""
+    async with factory() as session:
+        threads = (await session.execute(select(Thread))).scalars().all()
+        pk_to_thread_id = {t.id: t.thread_id for t in threads}
+        links = (await session.execute(select(ThreadTagLink))).scalars().all()
+        tags = (await session.execute(select(Tag))).scalars().all()
+        authors = (await session.execute(select(Author))).scalars().all()
+    return {
+        "threads": sorted(
+            (t.model_dump(exclude={"id"}) for t in threads),
+            key=lambda row: row["thread_id"],
+        ),
+        "links": sorted(
+            (pk_to_thread_id[link.thread_id], link.tag_id, link.upvotes, link.downvotes)
+            for link in links
+        ),
+        "tags": sorted((t.id, t.name) for t in tags),
+        "authors": sorted(
+            sorted(a.model_dump(exclude={"last_updated"}).items()) for a in authors
+        ),
+    }
+
+
+@pytest_asyncio.fixture(scope="function")
+async def factories(make_session_factory) -> tuple[async_sessionmaker, async_sessionmaker]:
+    return await make_session_factory(), await make_session_factory()
+
+
+async def seed_votes(factory: async_sessionmaker, thread_id: int, tag_id: int):
+    """给指定帖子的标签关联写入投票数据，验证更新时不会被覆盖"""
+    async with factory() as session:
+        pk = (
+            await session.execute(select(Thread.id).where(Thread.thread_id == thread_id))
+        ).scalar_one()
+        link = (
+            await session.execute(
+                select(ThreadTagLink).where(
+                    ThreadTagLink.thread_id == pk, ThreadTagLink.tag_id == tag_id
+                )
+            )
+        ).scalar_one()
+        link.upvotes, link.downvotes = 3, 1
+        session.add(link)
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_batch_write_matches_per_thread_write(factories):
+    """批量写入与逐帖写入得到相同的帖子、标签、标签关联和作者数据"""
+    legacy, batched = factories
+    first_round = [
+        make_record(i, {1: "A", 2: "B"} if i % 2 else {2: "B"}) for i in range(1, 21)
+    ]
+    # 第二轮：标题、回复数和标签都有变化，另有新帖子，同一帖子在一批中重复出现
+    second_round = [
+        make_record(i, {2: "B2", 3: "C"}, title=f"New {i}", reply_count=i)
+        for i in range(10, 31)
+    ] + [make_record(30, {3: "C"}, title="Last", reply_count=99)]
+
+    await write_one_by_one(legacy, first_round)
+    writer = ThreadBatchWriteService(batched, batch_size=8)
+    for record in first_round:
+        await writer.submit(record)
+    await writer.stop()
+
+    for factory in (legacy, batched):
+        await seed_votes(factory, thread_id=11, tag_id=2)
+
+    await write_one_by_one(legacy, second_round)
+    writer = ThreadBatchWriteService(batched, batch_size=8)
+    for record in second_round:
+        await writer.submit(record)
+    await writer.stop()
+
+    legacy_rows = await snapshot(legacy)
+    batched_rows = await snapshot(batched)
+    assert batched_rows == legacy_rows
+    # 保留了更新前已有标签关联上的投票
+    assert (11, 2, 3, 1) in batched_rows["links"]
+
+
+@pytest.mark.asyncio
+async def test_futures_report_first_detect(factories):
+    """写入完成后，Future 结果表示该帖子是否还没有任何关注记录"""
+    _, batched = factories
+    async with batched() as session:
+        session.add(ThreadFollow(user_id=1, thread_id=2))
+        await session.commit()
+
+    writer = ThreadBatchWriteService(batched, batch_size=100)
+    futures = [await writer.submit(make_record(i, {})) for i in (1, 2, 3)]
+    assert not any(f.done() for f in futures)
+
+    await writer.flush()
+    assert [f.result() for f in futures] == [True, False, True]
+    assert writer.written_count == 3
+    assert writer.batch_count == 1
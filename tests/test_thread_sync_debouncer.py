@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from core.thread_sync_debouncer import ThreadSyncDebouncer
+
+
+class FakeSyncService:
+    """记录每次同步的参数，可以让同步阻塞到 release 被设置"""
+
+    def __init__(self):
+        self.calls: list[tuple] = []
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def sync_thread(self, thread, fetch_if_incomplete=False):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+            self.calls.append((thread, fetch_if_incomplete))
+        finally:
+            self.running -= 1
+
+
+def thread(thread_id: int, name: str):
+    return SimpleNamespace(id=thread_id, name=name)
+
+
+@pytest.mark.asyncio
+async def test_burst_collapses_into_one_sync():
+    """窗口内的标题修改、标签修改和首楼编辑合并为一次同步，使用最新的帖子对象"""
+    sync_service = FakeSyncService()
+    debouncer = ThreadSyncDebouncer(sync_service, window=0.05)
+
+    debouncer.request(thread(1, "旧标题"), source="thread_update")
+    debouncer.request(thread(1, "新标题"), source="thread_update")
+    debouncer.request(thread(1, "新标题"), source="first_message_edit", fetch_if_incomplete=True)
+    debouncer.request(1, source="thread_update")
+    debouncer.request(thread(2, "其他帖子"), source="thread_update")
+    await asyncio.sleep(0.1)
+
+    assert len(sync_service.calls) == 2
+    synced, fetch_if_incomplete = sync_service.calls[0]
+    assert synced.name == "新标题"
+    assert fetch_if_incomplete is True
+    assert debouncer.get_stats() == {
+        "requested": 5,
+        "collapsed": 3,
+        "collapsed_by_source": {"thread_update": 2, "first_message_edit": 1},
+        "synced": 2,
+        "pending": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_request_during_sync_runs_again_afterwards():
+    """同步进行中到达的请求不与之并发，在其结束后再同步一次"""
+    sync_service = FakeSyncService()
+    sync_service.release.clear()
+    debouncer = ThreadSyncDebouncer(sync_service, window=0.01)
+
+    debouncer.request(thread(1, "a"), source="thread_update")
+    await asyncio.sleep(0.03)
+    assert sync_service.running == 1
+
+    debouncer.request(thread(1, "b"), source="thread_update")
+    await asyncio.sleep(0.03)
+    sync_service.release.set()
+    await asyncio.sleep(0.01)
+
+    assert [t.name for t, _ in sync_service.calls] == ["a", "b"]
+    assert sync_service.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_and_cancel():
+    sync_service = FakeSyncService()
+    debouncer = ThreadSyncDebouncer(sync_service, window=60)
+    debouncer.request(thread(1, "a"), source="thread_update")
+    debouncer.request(thread(2, "b"), source="thread_update")
+
+    assert debouncer.cancel(2)
+    assert not debouncer.cancel(2)
+    await debouncer.flush()
+    assert [t.id for t, _ in sync_service.calls] == [1]